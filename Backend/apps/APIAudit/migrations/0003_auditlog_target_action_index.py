@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIAudit', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='Audit_Log_target__5d1b3b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['target_model', 'target_id', 'action', '-timestamp'], name='audit_target_action_ts_idx'),
+        ),
+    ]
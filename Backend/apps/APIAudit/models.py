@@ -34,7 +34,8 @@ class AuditLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = "Log de Atividade"
         indexes = [
-            models.Index(fields=['target_model', 'target_id']),
+            # Último evento de um alvo (ex.: revisões de uma classificação)
+            models.Index(fields=['target_model', 'target_id', 'action', '-timestamp'], name='audit_target_action_ts_idx'),
         ]
         db_table="Audit_Log"
 
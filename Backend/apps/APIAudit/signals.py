@@ -1,10 +1,12 @@
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
+from simple_history.signals import pre_create_historical_record
 from django.forms.models import model_to_dict
 from apps.core.get_request_user import current_request
 
 from .models import AuditLog
 from apps.APIDocumento.models import Document
+from apps.APIDocumento.history import latest_blob_hashes, store_blob
 from apps.APIDocumento.models import (Category, Classification)
 from apps.APISetor.models import Sector
 from apps.APIEmpresa.models import Enterprise
@@ -153,8 +155,28 @@ def update_search_content(sender, instance, **kwargs):
     Antes de salvar o documento, extrai o texto limpo do JSON
     e salva no campo search_content.
     """
+    update_fields = kwargs.get('update_fields')
+    if 'content' in instance.get_deferred_fields() or (update_fields is not None and 'content' not in update_fields):
+        # content não foi carregado/alterado: search_content continua valendo.
+        return
+
     if instance.content:
         raw_text = extract_text_from_json(instance.content)
         instance.search_content = raw_text[:500000] # Limita a 500k caracteres
     else:
-        instance.search_content = ""
\ No newline at end of file
+        instance.search_content = ""
+
+@receiver(pre_create_historical_record, sender=Document.history.model) # type: ignore
+def store_document_record_blobs(sender, instance, history_instance, **kwargs):
+    """
+    Em vez de copiar o estado Yjs e o HTML em cada versão,
+    grava o conteúdo deduplicado e guarda só o hash na versão.
+    """
+    deferred = instance.get_deferred_fields()
+    yjs_hash = html_hash = None
+    if deferred & {'yjs_state', 'html_snapshot'}:
+        # Colunas não carregadas não mudaram: reaproveita os hashes da última versão.
+        yjs_hash, html_hash = latest_blob_hashes([instance.pk]).get(instance.pk, (None, None))
+
+    history_instance.yjs_state_hash = yjs_hash if 'yjs_state' in deferred else store_blob(instance.yjs_state)
+    history_instance.html_snapshot_hash = html_hash if 'html_snapshot' in deferred else store_blob(instance.html_snapshot)
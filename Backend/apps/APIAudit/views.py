@@ -1,10 +1,13 @@
 
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView, Response
 from django.contrib.auth import get_user_model
 from apps.APIDocumento.models import Attached_Files_Document, Document
+from apps.APIDocumento.history import restore_version_blobs
+from apps.APIDocumento.versioning import listing_etag
 from rest_framework.permissions import IsAuthenticated
-from apps.core.utils import default_response
+from apps.core.utils import default_response, is_not_modified, not_modified_response, set_cache_validators
 from apps.APIDocumento.permissions import IsLinkedToDocument
 from .serializers import DocumentHistorySerializer
 from apps.APIDocumento.serializers import DocumentDetailSerializer
@@ -23,15 +26,29 @@ class DocumentHistoryListView(APIView):
         
         self.check_object_permissions(request, document)
 
-        history_queryset = document.history.all().order_by('-history_date') # type: ignore
+        history_queryset = document.history.select_related('history_user').order_by('-history_date') # type: ignore
+
+        # O histórico só cresce: quantidade e última versão bastam como validador.
+        state = history_queryset.order_by().aggregate(
+            total=Count('history_id'),
+            last_id=Max('history_id'),
+            last_date=Max('history_date')
+        )
+        last_modified = state['last_date']
+        etag = listing_etag('history', document.pk, state['total'], state['last_id'])
+
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
 
         serializer = DocumentHistorySerializer(history_queryset, many=True)
 
-        return Response(default_response(
+        res = Response(default_response(
             success=True,
-            message=f"Histórico recuperado. Total de versões: {history_queryset.count()}",
+            message=f"Histórico recuperado. Total de versões: {state['total']}",
             data=serializer.data
         ))
+        set_cache_validators(res, etag, last_modified)
+        return res
 
 
 class DocumentRevertView(APIView):
@@ -56,7 +73,7 @@ class DocumentRevertView(APIView):
                 data=None # type: ignore
             ), status=404)
 
-        restored_doc = target_version.instance
+        restored_doc = restore_version_blobs(target_version, target_version.instance)
         
         restored_doc.pk = document.pk 
         
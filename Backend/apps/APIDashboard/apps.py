@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApidashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.APIDashboard'
+
+    def ready(self):
+        import apps.APIDashboard.signals
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Q
+
+from apps.APIDocumento.models import Document
+from apps.APIDocumento.reference_data import STATUS_REVIEW_REQUIRED, status_ids_for
+from apps.APISetor.models import Sector
+from .serializers import DashboardDocumentSerializer, ActivityLogSerializer
+from .utils.activity_feed import get_activity_feed
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardComponent(ABC):
+    """
+    Um widget independente do Dashboard Operacional.
+
+    Cada componente tem a sua própria consulta (sempre limitada), o seu TTL
+    de cache e um tempo máximo de carregamento. Se estourar o tempo, o
+    dashboard responde sem ele em vez de esperar pelo mais lento.
+    """
+    name: str = ""
+    cache_ttl: int = 60 # segundos
+    timeout: float = 2.0 # segundos
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def cache_key(self) -> str:
+        return f"dashboard:{self.name}:{self.user.pk}"
+
+    @abstractmethod
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Executa a consulta e retorna os dados já serializados.
+        Roda em uma thread própria (e portanto em uma conexão própria).
+        """
+
+    def _load_in_thread(self) -> List[Dict[str, Any]]:
+        try:
+            return self.load()
+        finally:
+            # A thread do executor não passa pelos sinais de request do Django.
+            close_old_connections()
+
+    async def aload(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Retorna os dados do componente (do cache ou do banco),
+        ou None se ele não ficou pronto a tempo.
+        """
+        cached = await cache.aget(self.cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            data = await asyncio.wait_for(
+                sync_to_async(self._load_in_thread, thread_sensitive=False)(),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Componente '%s' do dashboard excedeu %ss.", self.name, self.timeout)
+            return None
+        except Exception:
+            logger.exception("Erro ao carregar o componente '%s' do dashboard.", self.name)
+            return None
+
+        await cache.aset(self.cache_key, data, self.cache_ttl)
+        return data
+
+
+class RecentDocumentsComponent(DashboardComponent):
+    """
+    Últimos 3 documentos criados ou editados pelo usuário.
+    """
+    name = "my_recent_documents"
+    cache_ttl = 60
+    limit = 3
+
+    def load(self):
+        # DISTINCT ON (document_id): a versão mais recente de cada documento,
+        # depois as 3 mais novas entre elas. Tudo no Postgres, sem varrer o histórico em Python.
+        latest_per_document = Document.history.filter( # type: ignore
+            history_user=self.user,
+            history_type__in=['+', '~'],
+        ).order_by('document_id', '-history_date').distinct('document_id').values('history_id')
+
+        recent_ids = list(
+            Document.history.filter( # type: ignore
+                history_id__in=latest_per_document
+            ).order_by('-history_date').values_list('document_id', flat=True)[:self.limit]
+        )
+
+        documents = Document.objects.filter(
+            pk__in=recent_ids
+        ).select_related('classification').in_bulk()
+
+        ordered = [documents[pk] for pk in recent_ids if pk in documents]
+        return [dict(item) for item in DashboardDocumentSerializer(ordered, many=True).data]
+
+
+class ReviewPendingDocumentsComponent(DashboardComponent):
+    """
+    Documentos com status 'Revisão necessária' nos setores do usuário.
+    """
+    name = "review_pending_documents"
+    cache_ttl = 120
+    limit = 20
+
+    def load(self):
+        user_sectors = Sector.objects.filter(
+            Q(sector_links__user=self.user) |
+            Q(manager=self.user) |
+            Q(enterprise__owner=self.user)
+        ).values('sector_id')
+
+        review_docs = Document.objects.filter(
+            sector__in=user_sectors,
+            classification__classification_status_id__in=status_ids_for(STATUS_REVIEW_REQUIRED)
+        ).select_related('classification').order_by('-created_at')[:self.limit]
+
+        return [dict(item) for item in DashboardDocumentSerializer(review_docs, many=True).data]
+
+
+class ActivityFeedComponent(DashboardComponent):
+    """
+    Últimas 20 atividades (documentos e auditoria) das empresas do usuário.
+    O feed é mantido no Redis por empresa (ver utils/activity_feed.py).
+    """
+    name = "activity_feed"
+    cache_ttl = 30
+    limit = 20
+
+    def load(self):
+        activity_feed = get_activity_feed(self.user, limit=self.limit)
+        return [dict(item) for item in ActivityLogSerializer(activity_feed, many=True).data]
+
+
+OPERATIONAL_DASHBOARD_COMPONENTS = [
+    RecentDocumentsComponent,
+    ReviewPendingDocumentsComponent,
+    ActivityFeedComponent,
+]
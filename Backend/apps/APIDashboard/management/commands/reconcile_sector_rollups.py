@@ -0,0 +1,30 @@
+"""
+Django management command to rebuild/reconcile the sector dashboard rollups.
+
+Runs the same reconciliation as the nightly Celery job. Use it once after
+deploying the rollup tables to backfill them from existing documents.
+
+Usage:
+    python manage.py reconcile_sector_rollups
+    python manage.py reconcile_sector_rollups --sector 3 --sector 7
+"""
+
+from django.core.management.base import BaseCommand
+from apps.APIDashboard.utils.rollups import reconcile_sector_rollups
+
+
+class Command(BaseCommand):
+    help = 'Reconciles the sector dashboard rollups with documents and document history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sector',
+            action='append',
+            type=int,
+            dest='sectors',
+            help='Only reconcile the given sector id (may be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        fixed = reconcile_sector_rollups(options['sectors'])
+        self.stdout.write(self.style.SUCCESS(f'Rollups reconciled. Sectors corrected: {fixed}'))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('APISetor', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectorContributorRollup',
+            fields=[
+                ('contributor_rollup_id', models.BigAutoField(db_column='PK_sector_contributor_rollup', primary_key=True, serialize=False)),
+                ('activity_count', models.PositiveIntegerField(db_column='activity_count_sector_contributor_rollup', default=0)),
+                ('sector', models.ForeignKey(db_column='FK_sector_sector_contributor_rollup', on_delete=django.db.models.deletion.CASCADE, related_name='contributor_rollups', to='APISetor.sector')),
+                ('user', models.ForeignKey(db_column='FK_user_sector_contributor_rollup', on_delete=django.db.models.deletion.CASCADE, related_name='contributor_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Consolidado de Contribuidor',
+                'verbose_name_plural': 'Consolidados de Contribuidores',
+                'db_table': 'Sector_Contributor_Rollup',
+                'indexes': [models.Index(fields=['sector', '-activity_count'], name='sector_contributor_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sector', 'user'), name='unique_sector_contributor_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SectorDailyRollup',
+            fields=[
+                ('rollup_id', models.BigAutoField(db_column='PK_sector_daily_rollup', primary_key=True, serialize=False)),
+                ('day', models.DateField(db_column='day_sector_daily_rollup')),
+                ('documents_delta', models.IntegerField(db_column='documents_delta_sector_daily_rollup', default=0)),
+                ('pending_delta', models.IntegerField(db_column='pending_delta_sector_daily_rollup', default=0)),
+                ('concluded_delta', models.IntegerField(db_column='concluded_delta_sector_daily_rollup', default=0)),
+                ('archived_delta', models.IntegerField(db_column='archived_delta_sector_daily_rollup', default=0)),
+                ('public_delta', models.IntegerField(db_column='public_delta_sector_daily_rollup', default=0)),
+                ('deleted_count', models.PositiveIntegerField(db_column='deleted_count_sector_daily_rollup', default=0)),
+                ('sector', models.ForeignKey(db_column='FK_sector_sector_daily_rollup', on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='APISetor.sector')),
+            ],
+            options={
+                'verbose_name': 'Consolidado Diário do Setor',
+                'verbose_name_plural': 'Consolidados Diários dos Setores',
+                'db_table': 'Sector_Daily_Rollup',
+                'constraints': [models.UniqueConstraint(fields=('sector', 'day'), name='unique_sector_day_rollup')],
+            },
+        ),
+    ]
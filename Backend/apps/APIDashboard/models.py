@@ -0,0 +1,71 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from apps.APISetor.models import Sector
+
+User = get_user_model()
+
+
+class SectorDailyRollup(models.Model):
+    """
+    Variações diárias dos KPIs de um setor.
+
+    Os totais atuais são a soma das variações de todos os dias; as exclusões
+    são contadas por dia para o alerta dos últimos 7 dias. Atualizada pelos
+    sinais de Document/Classification e reconciliada todas as noites.
+    """
+    rollup_id = models.BigAutoField(primary_key=True, db_column='PK_sector_daily_rollup')
+    sector = models.ForeignKey(
+        Sector,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups',
+        db_column='FK_sector_sector_daily_rollup')
+    day = models.DateField(db_column='day_sector_daily_rollup')
+    documents_delta = models.IntegerField(default=0, db_column='documents_delta_sector_daily_rollup')
+    pending_delta = models.IntegerField(default=0, db_column='pending_delta_sector_daily_rollup')
+    concluded_delta = models.IntegerField(default=0, db_column='concluded_delta_sector_daily_rollup')
+    archived_delta = models.IntegerField(default=0, db_column='archived_delta_sector_daily_rollup')
+    public_delta = models.IntegerField(default=0, db_column='public_delta_sector_daily_rollup')
+    deleted_count = models.PositiveIntegerField(default=0, db_column='deleted_count_sector_daily_rollup')
+
+    class Meta:
+        db_table = 'Sector_Daily_Rollup'
+        verbose_name = 'Consolidado Diário do Setor'
+        verbose_name_plural = 'Consolidados Diários dos Setores'
+        constraints = [
+            models.UniqueConstraint(fields=['sector', 'day'], name='unique_sector_day_rollup'),
+        ]
+
+    def __str__(self):
+        return f"Consolidado do setor {self.sector_id} em {self.day}"
+
+
+class SectorContributorRollup(models.Model):
+    """
+    Quantidade acumulada de criações/edições de documentos por usuário em um setor.
+    """
+    contributor_rollup_id = models.BigAutoField(primary_key=True, db_column='PK_sector_contributor_rollup')
+    sector = models.ForeignKey(
+        Sector,
+        on_delete=models.CASCADE,
+        related_name='contributor_rollups',
+        db_column='FK_sector_sector_contributor_rollup')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='contributor_rollups',
+        db_column='FK_user_sector_contributor_rollup')
+    activity_count = models.PositiveIntegerField(default=0, db_column='activity_count_sector_contributor_rollup')
+
+    class Meta:
+        db_table = 'Sector_Contributor_Rollup'
+        verbose_name = 'Consolidado de Contribuidor'
+        verbose_name_plural = 'Consolidados de Contribuidores'
+        constraints = [
+            models.UniqueConstraint(fields=['sector', 'user'], name='unique_sector_contributor_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['sector', '-activity_count'], name='sector_contributor_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} no setor {self.sector_id}: {self.activity_count}"
@@ -1,16 +1,23 @@
 from rest_framework import serializers
 from apps.APIDocumento.models import Document
+from apps.APIDocumento.reference_data import status_label_for
 
 class DashboardDocumentSerializer(serializers.ModelSerializer):
     """
     Serializer simplificado para os cards de documentos.
     """
-    status_label = serializers.CharField(source='classification.classification_status.status', default="Sem Status")
+    # O nome do status vem do registro de referência: basta o select_related('classification').
+    status_label = serializers.SerializerMethodField()
     
     class Meta:
         model = Document
         fields = ['document_id', 'title', 'created_at', 'status_label']
 
+    def get_status_label(self, obj) -> str:
+        classification = obj.classification
+        label = status_label_for(classification.classification_status_id) if classification else None
+        return label or "Sem Status"
+
 class ActivityLogSerializer(serializers.Serializer):
     """
     Serializer para padronizar o Feed de Atividades (AuditLog + SimpleHistory).
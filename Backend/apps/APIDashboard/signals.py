@@ -0,0 +1,181 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from simple_history.signals import post_create_historical_record
+
+from apps.APIAudit.models import AuditLog
+from apps.APIDocumento.models import Category, Classification, Document
+from apps.APISetor.models import Sector
+from .utils.activity_feed import drop_enterprise_feeds, push_feed_entry
+from .utils.feed_formating import format_audit_entry, format_history_entry
+from .utils.rollups import (
+    apply_sector_deltas,
+    classification_deltas,
+    classification_labels,
+    increment_contributor,
+)
+
+
+def resolve_audit_enterprise_id(audit_log: AuditLog):
+    """
+    Descobre a empresa do alvo de um registro de auditoria.
+    Em exclusões o objeto já não existe, então usa o estado salvo no log.
+    """
+    deleted_state = (audit_log.changes or {}).get('deleted_state', {})
+
+    if audit_log.target_model == 'Enterprise':
+        return audit_log.target_id
+
+    if audit_log.target_model == 'Sector':
+        return deleted_state.get('enterprise') or Sector.objects.filter(
+            pk=audit_log.target_id
+        ).values_list('enterprise_id', flat=True).first()
+
+    if audit_log.target_model == 'Category':
+        return deleted_state.get('category_enterprise') or Category.objects.filter(
+            pk=audit_log.target_id
+        ).values_list('category_enterprise_id', flat=True).first()
+
+    if audit_log.target_model == 'Classification':
+        return Document.objects.filter(
+            classification_id=audit_log.target_id
+        ).values_list('sector__enterprise_id', flat=True).first()
+
+    return None
+
+
+@receiver(post_create_historical_record, sender=Document.history.model) # type: ignore
+def push_document_history_to_feed(sender, history_instance, history_user, **kwargs):
+    """
+    Acrescenta a nova versão do documento no feed da empresa do setor.
+    """
+    if not history_instance.sector_id:
+        return
+
+    entry = format_history_entry({
+        'history_date': history_instance.history_date,
+        'history_type': history_instance.history_type,
+        'title': history_instance.title,
+        'document_id': history_instance.document_id,
+        'sector_id': history_instance.sector_id,
+        'history_user_id': history_user.pk if history_user else None,
+        'history_user__name': getattr(history_user, 'name', None),
+    })
+
+    sector = Sector.objects.filter(
+        pk=history_instance.sector_id
+    ).values('enterprise_id', 'is_active').first()
+
+    # Setores inativos não aparecem no feed (mesmo critério de build_enterprise_feed).
+    if not sector or not sector['is_active']:
+        return
+
+    transaction.on_commit(lambda: push_feed_entry(sector['enterprise_id'], entry))
+
+
+@receiver(pre_save, sender=Sector)
+def remember_previous_sector_state(sender, instance, **kwargs):
+    """
+    Guarda se o setor estava ativo para detectar a troca no post_save.
+    """
+    instance._was_active = Sector.objects.filter(
+        pk=instance.pk
+    ).values_list('is_active', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Sector)
+def drop_feed_on_sector_toggle(sender, instance, created, **kwargs):
+    """
+    Ativar ou desativar um setor muda quais versões entram no feed da empresa:
+    a lista é descartada e reconstruída na próxima leitura.
+    """
+    if created or getattr(instance, '_was_active', None) in (None, instance.is_active):
+        return
+
+    enterprise_id = instance.enterprise_id
+    transaction.on_commit(lambda: drop_enterprise_feeds([enterprise_id]))
+
+
+@receiver(post_save, sender=AuditLog)
+def push_audit_log_to_feed(sender, instance, created, **kwargs):
+    """
+    Acrescenta o evento de auditoria no feed da empresa do alvo.
+    """
+    if not created or instance.target_model not in ('Enterprise', 'Sector', 'Category', 'Classification'):
+        return
+
+    enterprise_id = resolve_audit_enterprise_id(instance)
+
+    actor = instance.actor if instance.actor_id else None
+    entry = format_audit_entry({
+        'timestamp': instance.timestamp,
+        'action': instance.action,
+        'target_model': instance.target_model,
+        'target_id': instance.target_id,
+        'target_str': instance.target_str,
+        'actor_id': instance.actor_id,
+        'actor__name': getattr(actor, 'name', None),
+    })
+
+    transaction.on_commit(lambda: push_feed_entry(enterprise_id, entry))
+
+
+@receiver(post_create_historical_record, sender=Document.history.model) # type: ignore
+def update_sector_rollups_from_history(sender, history_instance, history_user, **kwargs):
+    """
+    Atualiza os consolidados do setor na criação, edição e exclusão de documentos.
+    Mudanças de setor são corrigidas pela reconciliação noturna.
+    """
+    sector_id = history_instance.sector_id
+    if not sector_id:
+        return
+
+    history_type = history_instance.history_type
+    day = timezone.localdate(history_instance.history_date)
+
+    if history_type in ('+', '-'):
+        sign = 1 if history_type == '+' else -1
+        status, privacity = classification_labels(history_instance.classification_id)
+        deltas = {'documents_delta': sign, **classification_deltas(status, privacity, sign)}
+        if history_type == '-':
+            deltas['deleted_count'] = 1
+        apply_sector_deltas(sector_id, day, deltas)
+
+    if history_type in ('+', '~') and history_user is not None:
+        increment_contributor(sector_id, history_user.pk)
+
+
+@receiver(pre_save, sender=Classification)
+def remember_previous_classification(sender, instance, **kwargs):
+    """
+    Guarda o status/privacidade anteriores para calcular a variação no post_save.
+    """
+    instance._previous_labels = classification_labels(instance.pk) if instance.pk else (None, None)
+
+
+@receiver(post_save, sender=Classification)
+def update_sector_rollups_from_classification(sender, instance, created, **kwargs):
+    """
+    Move o documento entre os contadores de status/privacidade do setor.
+    Na criação a classificação ainda não tem documento: quem conta é o histórico.
+    """
+    if created:
+        return
+
+    previous = getattr(instance, '_previous_labels', (None, None))
+    current = classification_labels(instance.pk)
+    if previous == current:
+        return
+
+    sector_id = Document.objects.filter(
+        classification_id=instance.pk
+    ).values_list('sector_id', flat=True).first()
+    if not sector_id:
+        return
+
+    deltas = classification_deltas(*previous, sign=-1)
+    for field, value in classification_deltas(*current).items():
+        deltas[field] = deltas.get(field, 0) + value
+
+    apply_sector_deltas(sector_id, timezone.localdate(), deltas)
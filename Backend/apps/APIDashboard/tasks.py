@@ -0,0 +1,17 @@
+import logging
+
+from celery import shared_task
+
+from .utils.rollups import reconcile_sector_rollups
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_sector_rollups_task():
+    """
+    Reconciliação noturna dos consolidados do Dashboard de Setor.
+    """
+    fixed = reconcile_sector_rollups()
+    logger.info("Consolidados de setor reconciliados. Setores corrigidos: %s", fixed)
+    return fixed
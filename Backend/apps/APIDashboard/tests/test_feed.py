@@ -0,0 +1,142 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from django.contrib.auth import get_user_model
+from typing import Any, Dict
+
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector
+from apps.APIDocumento.models import Document
+from apps.APIDashboard.utils.activity_feed import FEED_SIZE, dump_entry, get_activity_feed, load_entry
+from apps.APIDashboard.utils.feed_formating import format_activity_feed
+
+User = get_user_model()
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def history_row(minutes_ago: int, title: str) -> Dict[str, Any]:
+    return {
+        'history_date': NOW - timedelta(minutes=minutes_ago),
+        'history_type': '~',
+        'title': title,
+        'document_id': 1,
+        'sector_id': 1,
+        'history_user_id': 7,
+        'history_user__name': "Ana",
+    }
+
+
+def audit_row(minutes_ago: int, target_str: str) -> Dict[str, Any]:
+    return {
+        'timestamp': NOW - timedelta(minutes=minutes_ago),
+        'action': '+',
+        'target_model': 'Category',
+        'target_id': 3,
+        'target_str': target_str,
+        'actor_id': None,
+        'actor__name': None,
+    }
+
+
+class TestActivityFeedFormatting:
+    """
+    Suíte de testes para a montagem do feed de atividades (utils/feed_formating.py).
+    """
+
+    def test_merges_history_and_audit_in_order(self) -> None:
+        """
+        Testa se as duas fontes são intercaladas da mais nova para a mais antiga.
+
+        Return:
+            None
+        """
+        feed = format_activity_feed(
+            [history_row(1, "Contrato"), history_row(5, "Ata")],
+            [audit_row(3, "Financeiro")],
+        )
+
+        assert [entry['message'] for entry in feed] == [
+            "Ana editou o documento 'Contrato'",
+            "Sistema criou a categoria 'Financeiro'",
+            "Ana editou o documento 'Ata'",
+        ]
+
+    def test_respects_limit(self) -> None:
+        """
+        Testa se o feed para de consumir as fontes ao atingir o limite.
+
+        Return:
+            None
+        """
+        feed = format_activity_feed(
+            [history_row(i, f"Doc {i}") for i in range(10)],
+            [audit_row(i, f"Cat {i}") for i in range(10)],
+            limit=4,
+        )
+
+        assert len(feed) == 4
+
+    def test_redis_entry_round_trip(self) -> None:
+        """
+        Testa se uma entrada serializada para o Redis volta idêntica.
+
+        Return:
+            None
+        """
+        entry = format_activity_feed([history_row(0, "Contrato")])[0]
+
+        assert load_entry(dump_entry(entry).encode()) == entry
+
+
+@pytest.mark.django_db
+class TestActivityFeed:
+    """
+    Suíte de testes para a leitura do feed de atividades (utils/activity_feed.py).
+    """
+
+    @pytest.fixture(autouse=True)
+    def local_cache(self, settings) -> None:
+        """Sem Redis: o feed é sempre reconstruído do banco."""
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Uma empresa com um documento em um setor ativo e, mais recentes,
+        FEED_SIZE documentos em um setor inativo.
+        """
+        owner = User.objects.create_user(username="feed_owner", password="pw", email="feed_owner@e.com", name="Feed Owner")
+        enterprise = Enterprise.objects.create(name="Feed Corp", owner=owner)
+        active = Sector.objects.create(name="Ativo", enterprise=enterprise, manager=owner)
+        inactive = Sector.objects.create(name="Inativo", enterprise=enterprise, manager=owner)
+
+        document = Document.objects.create(title="Do setor ativo", content={}, creator=owner, sector=active)
+        for i in range(FEED_SIZE):
+            Document.objects.create(title=f"Do setor inativo {i}", content={}, creator=owner, sector=inactive)
+
+        inactive.is_active = False
+        inactive.save()
+
+        return {"owner": owner, "document": document, "inactive": inactive}
+
+    # Success
+
+    def test_feed_skips_inactive_sectors_before_limit(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se as versões de setores inativos saem antes do corte em FEED_SIZE,
+        sem esvaziar o feed quando elas são as mais recentes.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        feed = get_activity_feed(scenario_data["owner"])
+
+        sector_ids = [entry['metadata'].get('sector_id') for entry in feed]
+        document_ids = [entry['metadata'].get('document_id') for entry in feed]
+
+        assert scenario_data["inactive"].pk not in sector_ids
+        assert scenario_data["document"].pk in document_ids
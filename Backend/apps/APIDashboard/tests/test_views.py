@@ -0,0 +1,255 @@
+import time
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from typing import Dict, Any
+
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorUser
+from apps.APIDocumento.models import Document, Classification, Classification_Status, Classification_Privacity
+from apps.APIDashboard.components import ReviewPendingDocumentsComponent
+from apps.APIDashboard.models import SectorDailyRollup
+from apps.APIDashboard.utils.rollups import reconcile_sector_rollups
+
+User = get_user_model()
+
+# transaction=True: os componentes rodam em threads próprias (conexões próprias)
+# e só enxergam dados commitados.
+@pytest.mark.django_db(transaction=True)
+class TestOperationalDashboardAPI:
+    """
+    Suíte de testes para o endpoint OperationalDashboardView (/painel/operacional/).
+    """
+
+    @pytest.fixture(autouse=True)
+    def local_cache(self, settings) -> None:
+        """Isola o cache dos componentes entre os testes."""
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Cria um setor com um membro, um documento em revisão e um documento em andamento.
+        """
+        owner = User.objects.create_user(username="dash_owner", password="pw", email="dash_owner@e.com", name="Dash Owner")
+        member = User.objects.create_user(username="dash_member", password="pw", email="dash_member@e.com", name="Dash Member")
+
+        enterprise = Enterprise.objects.create(name="Dash Corp", owner=owner)
+        sector = Sector.objects.create(name="Dash Sector", enterprise=enterprise, manager=owner)
+        SectorUser.objects.create(user=member, sector=sector)
+
+        status_andamento, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        status_revisao, _ = Classification_Status.objects.get_or_create(status="Revisão necessária")
+        privacidade, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        doc_in_progress = Document.objects.create(
+            title="Doc em andamento",
+            content={},
+            creator=member,
+            sector=sector,
+            classification=Classification.objects.create(classification_status=status_andamento, privacity=privacidade),
+        )
+        doc_in_review = Document.objects.create(
+            title="Doc em revisão",
+            content={},
+            creator=member,
+            sector=sector,
+            classification=Classification.objects.create(classification_status=status_revisao, privacity=privacidade),
+        )
+
+        return {
+            "owner": owner,
+            "member": member,
+            "sector": sector,
+            "doc_in_progress": doc_in_progress,
+            "doc_in_review": doc_in_review,
+        }
+
+    # Success
+
+    def test_operational_dashboard_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o dashboard retorna os três componentes e lista
+        apenas o documento que precisa de revisão como pendente.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("dashboard-operacional")
+
+        response = api_client.get(url)
+
+        assert response.status_code == 200 # type: ignore
+        assert response.data['sucesso'] is True # type: ignore
+
+        data = response.data['data'] # type: ignore
+        assert set(data.keys()) >= {"my_recent_documents", "review_pending_documents", "activity_feed"}
+
+        pending_ids = {doc['document_id'] for doc in data['review_pending_documents']}
+        assert pending_ids == {scenario_data["doc_in_review"].pk}
+        assert data['unavailable_components'] == []
+
+    def test_operational_dashboard_partial_response(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Testa se um componente lento é omitido (resposta parcial)
+        sem atrasar os demais.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            monkeypatch (MonkeyPatch) : substitui o carregamento do componente
+        
+        Return:
+            None
+        """
+        def slow_load(component):
+            time.sleep(0.5)
+            return []
+
+        monkeypatch.setattr(ReviewPendingDocumentsComponent, "timeout", 0.1)
+        monkeypatch.setattr(ReviewPendingDocumentsComponent, "load", slow_load)
+
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("dashboard-operacional")
+
+        response = api_client.get(url)
+
+        assert response.status_code == 200 # type: ignore
+        data = response.data['data'] # type: ignore
+        assert data['unavailable_components'] == ["review_pending_documents"]
+        assert data['review_pending_documents'] == []
+
+    # Failure
+
+    def test_operational_dashboard_anonymous_fails(self, api_client: APIClient) -> None:
+        """
+        Testa se um utilizador não autenticado (anônimo) recebe um erro 401.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+        
+        Return:
+            None
+        """
+        url: str = reverse("dashboard-operacional")
+
+        response = api_client.get(url)
+
+        assert response.status_code == 401 # type: ignore
+        assert response.data['sucesso'] is False # type: ignore
+
+
+@pytest.mark.django_db
+class TestSectorDashboardAPI:
+    """
+    Suíte de testes para o endpoint SectorDashboardView (/painel/gerencial/<sector_pk>/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Cria um setor com três documentos: um em andamento, um em revisão (público) e um que é excluído.
+        """
+        owner = User.objects.create_user(username="kpi_owner", password="pw", email="kpi_owner@e.com", name="KPI Owner")
+        enterprise = Enterprise.objects.create(name="KPI Corp", owner=owner)
+        sector = Sector.objects.create(name="KPI Sector", enterprise=enterprise, manager=owner)
+
+        status_andamento, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        status_revisao, _ = Classification_Status.objects.get_or_create(status="Revisão necessária")
+        privado, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+        publico, _ = Classification_Privacity.objects.get_or_create(privacity="Público")
+
+        documents = [
+            Document.objects.create(
+                title=f"Doc {index}",
+                content={},
+                creator=owner,
+                sector=sector,
+                classification=Classification.objects.create(classification_status=status_andamento, privacity=privado),
+            ) for index in range(3)
+        ]
+
+        # Em andamento -> Revisão necessária, e Privado -> Público
+        classification = documents[1].classification
+        classification.classification_status = status_revisao # type: ignore
+        classification.privacity = publico # type: ignore
+        classification.save() # type: ignore
+
+        documents[2].delete()
+
+        return {"owner": owner, "sector": sector}
+
+    def get_dashboard(self, api_client: APIClient, scenario_data: Dict[str, Any]):
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("dashboard-gerencial-setor", kwargs={"sector_pk": scenario_data["sector"].pk})
+        return api_client.get(url)
+
+    # Success
+
+    def test_sector_dashboard_reads_rollups(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se os KPIs acompanham criação, mudança de classificação e exclusão.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        response = self.get_dashboard(api_client, scenario_data)
+
+        assert response.status_code == 200 # type: ignore
+        data = response.data['data'] # type: ignore
+        assert data['kpis'] == {
+            "total_documentos": 2,
+            "pendentes": 1,
+            "concluidos": 0,
+            "arquivados": 0,
+            "publicos": 1,
+        }
+        assert data['insights']['alerta_exclusoes_7dias'] == 1
+        assert len(data['insights']['gargalos_pendentes']) == 1
+
+    def test_sector_dashboard_reconcile_rebuilds_rollups(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a reconciliação noturna reconstrói os consolidados apagados.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        expected = self.get_dashboard(api_client, scenario_data).data['data'] # type: ignore
+
+        SectorDailyRollup.objects.all().delete()
+        reconcile_sector_rollups()
+
+        data = self.get_dashboard(api_client, scenario_data).data['data'] # type: ignore
+        assert data['kpis'] == expected['kpis']
+        assert data['insights']['alerta_exclusoes_7dias'] == expected['insights']['alerta_exclusoes_7dias']
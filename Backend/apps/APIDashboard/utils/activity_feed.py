@@ -0,0 +1,182 @@
+import heapq
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional
+
+from django.db.models import Q
+from django_redis import get_redis_connection
+
+from apps.APIAudit.models import AuditLog
+from apps.APIDocumento.models import Category, Document
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector
+from .feed_formating import (
+    AUDIT_FEED_FIELDS,
+    HISTORY_FEED_FIELDS,
+    FeedEntry,
+    format_activity_feed,
+)
+
+logger = logging.getLogger(__name__)
+
+FEED_SIZE = 20
+FEED_TTL = 60 * 60 * 24 * 7 # 7 dias sem escrita e a lista é descartada
+
+
+def feed_key(enterprise_id: int) -> str:
+    return f"activity_feed:{enterprise_id}"
+
+
+def dump_entry(entry: FeedEntry) -> str:
+    return json.dumps({**entry, 'timestamp': entry['timestamp'].isoformat()})
+
+
+def load_entry(raw: bytes) -> FeedEntry:
+    entry = json.loads(raw)
+    entry['timestamp'] = datetime.fromisoformat(entry['timestamp'])
+    return entry
+
+
+def enterprise_audit_filter(enterprise_id: int) -> Q:
+    """
+    AuditLog não guarda a empresa: ela é resolvida pelo alvo de cada registro.
+    """
+    return (
+        Q(target_model='Enterprise', target_id=enterprise_id) |
+        Q(target_model='Sector', target_id__in=Sector.objects.filter(
+            enterprise_id=enterprise_id
+        ).values('sector_id')) |
+        Q(target_model='Category', target_id__in=Category.objects.filter(
+            category_enterprise_id=enterprise_id
+        ).values('category_id')) |
+        Q(target_model='Classification', target_id__in=Document.objects.filter(
+            sector__enterprise_id=enterprise_id,
+            classification__isnull=False
+        ).values('classification_id'))
+    )
+
+
+def build_enterprise_feed(enterprise_id: int) -> List[FeedEntry]:
+    """
+    Reconstrói o feed de uma empresa a partir do banco (lista fria no Redis).
+    Duas consultas limitadas, só com as colunas usadas pelo feed.
+    Versões de setores inativos ficam de fora antes do corte em FEED_SIZE, para que
+    o feed não saia curto (ativar/desativar um setor descarta a lista, ver signals).
+    """
+    history_rows = Document.history.filter( # type: ignore
+        sector__enterprise_id=enterprise_id,
+        sector__is_active=True
+    ).order_by('-history_date').values(*HISTORY_FEED_FIELDS)[:FEED_SIZE]
+
+    audit_rows = AuditLog.objects.filter(
+        enterprise_audit_filter(enterprise_id)
+    ).order_by('-timestamp').values(*AUDIT_FEED_FIELDS)[:FEED_SIZE]
+
+    return format_activity_feed(history_rows, audit_rows, limit=FEED_SIZE)
+
+
+def get_enterprise_feeds(enterprise_ids: List[int]) -> Dict[int, List[FeedEntry]]:
+    """
+    Lê as listas de várias empresas em um único round-trip ao Redis.
+    Empresas sem lista (ou Redis indisponível) são reconstruídas do banco.
+    """
+    feeds: Dict[int, List[FeedEntry]] = {}
+    con = None
+
+    try:
+        con = get_redis_connection("default")
+        pipe = con.pipeline()
+        for enterprise_id in enterprise_ids:
+            pipe.lrange(feed_key(enterprise_id), 0, FEED_SIZE - 1)
+        for enterprise_id, raw_entries in zip(enterprise_ids, pipe.execute()):
+            if raw_entries:
+                feeds[enterprise_id] = [load_entry(raw) for raw in raw_entries]
+    except Exception as e:
+        logger.warning("Feed de atividades indisponível no Redis: %s", e)
+        con = None
+
+    for enterprise_id in enterprise_ids:
+        if enterprise_id in feeds:
+            continue
+
+        entries = build_enterprise_feed(enterprise_id)
+        feeds[enterprise_id] = entries
+
+        if con is not None and entries:
+            key = feed_key(enterprise_id)
+            try:
+                pipe = con.pipeline()
+                pipe.delete(key)
+                pipe.rpush(key, *[dump_entry(entry) for entry in entries])
+                pipe.expire(key, FEED_TTL)
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Não foi possível gravar o feed da empresa %s: %s", enterprise_id, e)
+
+    return feeds
+
+
+def get_activity_feed(user, limit: int = FEED_SIZE) -> List[FeedEntry]:
+    """
+    Feed de atividades das empresas às quais o usuário está vinculado.
+    """
+    enterprise_ids = list(Enterprise.objects.filter(
+        Q(owner=user) |
+        Q(sectors__sector_links__user=user) |
+        Q(sectors__manager=user)
+    ).values_list('enterprise_id', flat=True).distinct())
+
+    if not enterprise_ids:
+        return []
+
+    feeds = get_enterprise_feeds(enterprise_ids)
+
+    merged = heapq.merge(
+        *feeds.values(),
+        key=lambda entry: entry['timestamp'],
+        reverse=True
+    )
+
+    return list(islice(merged, limit))
+
+
+def push_feed_entry(enterprise_id: Optional[int], entry: FeedEntry) -> None:
+    """
+    Acrescenta uma entrada no topo da lista da empresa (chamado na escrita).
+
+    Se a lista ainda não existe, nada é feito: a primeira leitura a
+    reconstrói do banco, já incluindo esta entrada.
+    """
+    if enterprise_id is None:
+        return
+
+    try:
+        con = get_redis_connection("default")
+        key = feed_key(enterprise_id)
+
+        if not con.exists(key):
+            return
+
+        pipe = con.pipeline()
+        pipe.lpush(key, dump_entry(entry))
+        pipe.ltrim(key, 0, FEED_SIZE - 1)
+        pipe.expire(key, FEED_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Não foi possível atualizar o feed da empresa %s: %s", enterprise_id, e)
+
+
+def drop_enterprise_feeds(enterprise_ids: List[int]) -> None:
+    """
+    Descarta as listas das empresas (usado após operações em lote, que não
+    passam pelos sinais). A próxima leitura reconstrói o feed do banco.
+    """
+    if not enterprise_ids:
+        return
+
+    try:
+        get_redis_connection("default").delete(*[feed_key(enterprise_id) for enterprise_id in enterprise_ids])
+    except Exception as e:
+        logger.warning("Não foi possível descartar o feed das empresas %s: %s", enterprise_ids, e)
@@ -1,25 +1,109 @@
-from django.db.models import QuerySet
-from typing import List, Dict
+import heapq
+from typing import Any, Dict, Iterable, List
 
+# Colunas lidas do histórico de documentos (Document_Record) e do AuditLog.
+# O nome do usuário vem no mesmo SELECT (JOIN), sem uma query por linha.
+HISTORY_FEED_FIELDS = (
+    'history_date',
+    'history_type',
+    'title',
+    'document_id',
+    'sector_id',
+    'history_user_id',
+    'history_user__name',
+)
 
-def format_activity_feed(doc_histories: QuerySet):
+AUDIT_FEED_FIELDS = (
+    'timestamp',
+    'action',
+    'target_model',
+    'target_id',
+    'target_str',
+    'actor_id',
+    'actor__name',
+)
+
+VERBS = {'+': 'criou', '~': 'editou', '-': 'excluiu'}
+
+AUDIT_TARGET_LABELS = {
+    'Category': 'a categoria',
+    'Sector': 'o setor',
+    'Enterprise': 'a empresa',
+    'Classification': 'a classificação',
+}
+
+FeedEntry = Dict[str, Any]
+
+
+def format_history_entry(row: Dict[str, Any]) -> FeedEntry:
+    """
+    Monta a entrada do feed para uma linha do histórico de documentos (values()).
+    """
+    user_name = row['history_user__name']
+    verb = VERBS.get(row['history_type'], 'alterou')
+
+    return {
+        'timestamp': row['history_date'],
+        'user': user_name or 'Usuário',
+        'action_type': row['history_type'],
+        'message': f"{user_name or 'Sistema'} {verb} o documento '{row['title']}'",
+        'metadata': {
+            'document_id': row['document_id'],
+            'sector_id': row['sector_id'],
+            'user_id': row['history_user_id'],
+        }
+    }
+
+
+def format_audit_entry(row: Dict[str, Any]) -> FeedEntry:
+    """
+    Monta a entrada do feed para uma linha do AuditLog (values()).
+    """
+    user_name = row['actor__name']
+    verb = VERBS.get(row['action'], 'alterou')
+    target_label = AUDIT_TARGET_LABELS.get(row['target_model'], 'o registro')
+
+    if row['target_model'] == 'Classification':
+        # O target_str da classificação ("Revisado por ...") não identifica nada para o usuário.
+        message = f"{user_name or 'Sistema'} {verb} {target_label} de um documento"
+    else:
+        message = f"{user_name or 'Sistema'} {verb} {target_label} '{row['target_str']}'"
+
+    return {
+        'timestamp': row['timestamp'],
+        'user': user_name or 'Usuário',
+        'action_type': row['action'],
+        'message': message,
+        'metadata': {
+            'target_model': row['target_model'],
+            'target_id': row['target_id'],
+            'user_id': row['actor_id'],
+        }
+    }
+
+
+def format_activity_feed(
+    history_rows: Iterable[Dict[str, Any]],
+    audit_rows: Iterable[Dict[str, Any]] = (),
+    limit: int = 20
+) -> List[FeedEntry]:
     """
     Funde e ordena logs de tabelas diferentes em uma timeline única.
+
+    As duas fontes já chegam ordenadas da mais nova para a mais antiga,
+    então a fusão é feita em uma única passada (heapq.merge), sem reordenar.
     """
-    feed: List[Dict[str, str | Dict[str, int | None]]] = []
-
-    for h in doc_histories:
-        verb = {'+': 'criou', '~': 'editou', '-': 'excluiu'}.get(h.history_type, 'alterou')
-        doc_name = h.title
-        
-        feed.append({
-            'timestamp': h.history_date,
-            'user': h.history_user.name if h.history_user else 'Usuário',
-            'action_type': h.history_type,
-            'message': f"{h.history_user.name if h.history_user else 'Sistema'} {verb} o documento '{doc_name}'",
-            'metadata': {'document_id': h.document_id, 'user_id': h.history_user.user_id if h.history_user else None}
-        })
-
-    feed.sort(key=lambda x: x['timestamp'], reverse=True) # type: ignore
-    
-    return feed[:20]
\ No newline at end of file
+    merged = heapq.merge(
+        (format_history_entry(row) for row in history_rows),
+        (format_audit_entry(row) for row in audit_rows),
+        key=lambda entry: entry['timestamp'],
+        reverse=True
+    )
+
+    feed: List[FeedEntry] = []
+    for entry in merged:
+        feed.append(entry)
+        if len(feed) == limit:
+            break
+
+    return feed
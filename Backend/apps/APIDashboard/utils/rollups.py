@@ -0,0 +1,197 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.APIDocumento.models import Classification, Document
+from apps.APIDocumento.reference_data import get_reference_data, labels_for
+from ..models import SectorContributorRollup, SectorDailyRollup
+
+# Status/privacidade -> coluna de variação do consolidado.
+STATUS_DELTA_FIELDS = {
+    'Revisão necessária': 'pending_delta',
+    'Concluído': 'concluded_delta',
+    'Arquivado': 'archived_delta',
+}
+# O cadastro usa 'Público'; o valor de choices do model é 'Publico'. Os dois contam.
+PUBLIC_PRIVACITY_VALUES = ('Público', 'Publico')
+
+DELTA_FIELDS = ('documents_delta', 'pending_delta', 'concluded_delta', 'archived_delta', 'public_delta')
+
+DELETION_WINDOW_DAYS = 7
+TOP_CONTRIBUTORS = 5
+
+
+def classification_deltas(status: Optional[str], privacity: Optional[str], sign: int = 1) -> Dict[str, int]:
+    """
+    Variações de status/privacidade de UM documento (sem a contagem total).
+    """
+    deltas: Dict[str, int] = {}
+
+    status_field = STATUS_DELTA_FIELDS.get(status) # type: ignore
+    if status_field:
+        deltas[status_field] = sign
+
+    if privacity in PUBLIC_PRIVACITY_VALUES:
+        deltas['public_delta'] = sign
+
+    return deltas
+
+
+def classification_labels(classification_id: Optional[int]):
+    """
+    Retorna (status, privacidade) de uma classificação em uma única consulta (sem joins:
+    os valores vêm do registro de referência).
+    """
+    if classification_id is None:
+        return None, None
+
+    row = Classification.objects.filter(
+        pk=classification_id
+    ).values_list('classification_status_id', 'privacity_id').first()
+
+    return labels_for(*row) if row else (None, None)
+
+
+def apply_sector_deltas(sector_id: int, day: date, deltas: Dict[str, int]) -> None:
+    """
+    Soma as variações no consolidado do setor para o dia (UPDATE com F(), sem corrida).
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    SectorDailyRollup.objects.get_or_create(sector_id=sector_id, day=day)
+    SectorDailyRollup.objects.filter(sector_id=sector_id, day=day).update(
+        **{field: F(field) + value for field, value in deltas.items()}
+    )
+
+
+def increment_contributor(sector_id: int, user_id: int, amount: int = 1) -> None:
+    """
+    Conta uma criação/edição de documento do usuário no setor.
+    """
+    SectorContributorRollup.objects.get_or_create(sector_id=sector_id, user_id=user_id)
+    SectorContributorRollup.objects.filter(sector_id=sector_id, user_id=user_id).update(
+        activity_count=F('activity_count') + amount
+    )
+
+
+def get_sector_kpis(sector_id: int) -> Dict[str, int]:
+    """
+    KPIs atuais do setor: soma das variações diárias (uma linha por dia).
+    """
+    return SectorDailyRollup.objects.filter(sector_id=sector_id).aggregate(
+        total_documentos=Coalesce(Sum('documents_delta'), 0),
+        pendentes=Coalesce(Sum('pending_delta'), 0),
+        concluidos=Coalesce(Sum('concluded_delta'), 0),
+        arquivados=Coalesce(Sum('archived_delta'), 0),
+        publicos=Coalesce(Sum('public_delta'), 0),
+    )
+
+
+def get_recent_deletions(sector_id: int, days: int = DELETION_WINDOW_DAYS) -> int:
+    start = timezone.localdate() - timedelta(days=days)
+    return SectorDailyRollup.objects.filter(
+        sector_id=sector_id,
+        day__gte=start
+    ).aggregate(total=Coalesce(Sum('deleted_count'), 0))['total']
+
+
+def get_top_contributors(sector_id: int, limit: int = TOP_CONTRIBUTORS):
+    rows = SectorContributorRollup.objects.filter(
+        sector_id=sector_id,
+        activity_count__gt=0
+    ).order_by('-activity_count').values_list('user__name', 'activity_count')[:limit]
+
+    # Mesmo formato da agregação antiga sobre o histórico.
+    return [{'history_user__name': name, 'activity_count': count} for name, count in rows]
+
+
+def reconcile_sector_rollups(sector_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Compara os consolidados com os dados reais e corrige as diferenças.
+
+    - KPIs: a diferença entre o estado real e a soma das variações é gravada no dia de hoje.
+    - Exclusões: os últimos dias são recontados a partir do histórico.
+    - Contribuidores: recontados a partir do histórico.
+
+    Retorna a quantidade de setores corrigidos.
+    """
+    documents = Document.objects.all()
+    history = Document.history.all() # type: ignore
+    rollups = SectorDailyRollup.objects.all()
+    contributors = SectorContributorRollup.objects.all()
+
+    if sector_ids is not None:
+        sector_ids = list(sector_ids)
+        documents = documents.filter(sector_id__in=sector_ids)
+        history = history.filter(sector_id__in=sector_ids)
+        rollups = rollups.filter(sector_id__in=sector_ids)
+        contributors = contributors.filter(sector_id__in=sector_ids)
+
+    reference = get_reference_data()
+    status_filters = {
+        field: Q(classification__classification_status_id__in=reference.status_ids_for(status))
+        for status, field in STATUS_DELTA_FIELDS.items()
+    }
+    actual = {
+        row['sector_id']: row for row in documents.exclude(sector__isnull=True).values('sector_id').annotate(
+            documents_delta=Count('document_id'),
+            **{field: Count('document_id', filter=status_filter) for field, status_filter in status_filters.items()},
+            public_delta=Count('document_id', filter=Q(classification__privacity_id__in=reference.privacity_ids_for(*PUBLIC_PRIVACITY_VALUES))),
+        )
+    }
+    stored = {
+        row['sector_id']: row for row in rollups.values('sector_id').annotate(
+            **{field: Coalesce(Sum(field), 0) for field in DELTA_FIELDS}
+        )
+    }
+
+    today = timezone.localdate()
+    window_start = today - timedelta(days=DELETION_WINDOW_DAYS)
+    fixed = set()
+
+    with transaction.atomic():
+        for sector_id in set(actual) | set(stored):
+            deltas = {
+                field: actual.get(sector_id, {}).get(field, 0) - stored.get(sector_id, {}).get(field, 0)
+                for field in DELTA_FIELDS
+            }
+            if any(deltas.values()):
+                apply_sector_deltas(sector_id, today, deltas)
+                fixed.add(sector_id)
+
+        deletions = history.filter(
+            history_type='-',
+            history_date__date__gte=window_start,
+            sector_id__isnull=False
+        ).annotate(day=TruncDate('history_date')).values('sector_id', 'day').annotate(total=Count('history_id'))
+
+        rollups.filter(day__gte=window_start).update(deleted_count=0)
+        for row in deletions:
+            SectorDailyRollup.objects.update_or_create(
+                sector_id=row['sector_id'],
+                day=row['day'],
+                defaults={'deleted_count': row['total']}
+            )
+
+        contributor_counts = history.filter(
+            history_type__in=['+', '~'],
+            sector_id__isnull=False,
+            history_user__isnull=False
+        ).values('sector_id', 'history_user_id').annotate(total=Count('history_id'))
+
+        contributors.delete()
+        SectorContributorRollup.objects.bulk_create([
+            SectorContributorRollup(
+                sector_id=row['sector_id'],
+                user_id=row['history_user_id'],
+                activity_count=row['total']
+            ) for row in contributor_counts
+        ], batch_size=1000)
+
+    return len(fixed)
@@ -1,5 +1,7 @@
 # apps/core/views.py
 
+import asyncio
+from adrf.views import APIView as AsyncAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -11,8 +13,9 @@ from apps.APISetor.models import SectorUser
 from apps.APIAudit.models import AuditLog
 from apps.APIEmpresa.models import Enterprise
 from apps.APISetor.models import Sector
-from .utils.feed_formating import format_activity_feed
-from .serializers import DashboardDocumentSerializer, ActivityLogSerializer
+from .components import OPERATIONAL_DASHBOARD_COMPONENTS
+from .serializers import DashboardDocumentSerializer
+from .utils.rollups import get_recent_deletions, get_sector_kpis, get_top_contributors
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -22,86 +25,52 @@ from django.db.models import Count, Q
 from datetime import datetime, timedelta
 
 from apps.APIDocumento.models import Document
+from apps.APIDocumento.reference_data import STATUS_REVIEW_REQUIRED, status_ids_for
 from apps.APISetor.models import Sector
 from apps.core.utils import default_response
 
 from .serializers import DashboardDocumentSerializer
 from .permissions import IsSectorManagerOrOwner
 
-class OperationalDashboardView(APIView):
+class OperationalDashboardView(AsyncAPIView):
     """
     Endpoint centralizado para o Dashboard Operacional.
     Retorna:
     1. Meus últimos documentos criados.
     2. Documentos pendentes de revisão (no meu setor).
     3. Feed de atividades (Log Geral + Documentos).
+    
+    Cada item é um componente independente (ver components.py), carregado
+    em paralelo e com cache próprio. Componentes que não ficarem prontos a
+    tempo voltam vazios e são listados em 'unavailable_components'.
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 25
 
-    def get(self, request):
-        request_user = request.user
-        
-        # Componente 1: Últimos 3 arquivos criados ou editados.
-        recent_logs = Document.history.filter( # type:ignore
-            Q(history_type='+') | Q(history_type='~'),
-            history_user=request_user, 
-        ).order_by('-history_date')
-
-        my_docs_ids = []
-        seen_ids = set()
-
-        for log in recent_logs:
-            if log.document_id not in seen_ids:
-                my_docs_ids.append(log.document_id)
-                seen_ids.add(log.document_id)
-            
-            if len(my_docs_ids) == 3:
-                break
-            
-        my_last_docs = Document.objects.filter(pk__in=list(my_docs_ids))
-        
-        # Componente 2: Documentos que precisam ser revisados.
-        enterprise_query = (
-            Q(owner=request_user) |
-            Q(sectors__sector_links__user=request_user) |
-            Q(sectors__manager=request_user) 
-        )
-
-        user_enterprise_links = Enterprise.objects.filter(enterprise_query).distinct()
-
-        user_sector_links = SectorUser.objects.filter(
-            (
-                Q(user=request_user) | Q(sector__manager=request_user) | Q(sector__enterprise__owner=request_user)
-            ),
-            sector__enterprise__in=user_enterprise_links,
-        )
-        
-        review_docs = Document.objects.filter(
-            sector__in=user_sector_links.values_list('sector', flat=True).distinct(),
-            classification__classification_status__status="Revisão necessária" 
-        ).order_by('-created_at')
+    async def get(self, request):
+        components = [component(request.user) for component in OPERATIONAL_DASHBOARD_COMPONENTS]
 
-        # Componente 3: Feed de Atividades nos Documentos (Log Semi-Geral)
-        
-        enterprise_sectors = user_enterprise_links.values_list('sectors__sector_id').exclude(sectors__sector_id=None).exclude(sectors__is_active=False)
-                                                               
-        doc_logs = Document.history.filter( # type: ignore
-            sector__in=enterprise_sectors
-        ).order_by('-history_date')[:20]
+        results = await asyncio.gather(*(component.aload() for component in components))
 
-        activity_feed = format_activity_feed(doc_logs)
+        # --- MONTAGEM DA RESPOSTA ---
+        data = {}
+        unavailable_components = []
 
+        for component, result in zip(components, results):
+            if result is None:
+                unavailable_components.append(component.name)
+                result = []
+            data[component.name] = result
 
-        # --- MONTAGEM DA RESPOSTA ---
-        data = {
-            "my_recent_documents": DashboardDocumentSerializer(my_last_docs, many=True).data,
-            "review_pending_documents": DashboardDocumentSerializer(review_docs, many=True).data,
-            "activity_feed": ActivityLogSerializer(activity_feed, many=True).data
-        }
+        data["unavailable_components"] = unavailable_components
+
+        message = "Dados do dashboard carregados."
+        if unavailable_components:
+            message = "Dados do dashboard carregados parcialmente."
 
         return Response(default_response(
             success=True,
-            message="Dados do dashboard carregados.",
+            message=message,
             data=data # type: ignore
         ))
         
@@ -112,6 +81,7 @@ class SectorDashboardView(APIView):
     Calcula KPIs de volume e insights de fluxo de trabalho.
     """
     permission_classes = [IsAuthenticated, IsSectorManagerOrOwner]
+    query_budget = 15
 
     def get(self, request, sector_pk: int):
         
@@ -128,64 +98,28 @@ class SectorDashboardView(APIView):
         # Checa se o usuário (request.user) pode ver o objeto (sector)
         self.check_object_permissions(request, sector)
 
-        # --- 2. Query Base ---
-        # Filtra todos os documentos que pertencem a este setor
-        sector_docs = Document.objects.filter(sector=sector)
+        # --- 2. KPIs (consolidados) ---
+        # Lidos das tabelas de consolidação (utils/rollups.py), mantidas pelos
+        # sinais de Document/Classification e reconciliadas todas as noites.
+        # Nada aqui varre os documentos ou o histórico do setor.
+        kpi_data = get_sector_kpis(sector.sector_id)
 
-        # --- 3. Cálculo dos 5 KPIs (Uma única consulta) ---
-        
-        kpi_data = sector_docs.aggregate(
-            # KPI 1: Total
-            total_documentos=Count('document_id'),
-            
-            # KPI 2: Pendentes (Baseado nos seus modelos)
-            pendentes=Count('document_id', filter=Q(
-                classification__classification_status__status="Revisão necessária"
-            )),
-            
-            # KPI 3: Concluídos
-            concluidos=Count('document_id', filter=Q(
-                classification__classification_status__status="Concluído"
-            )),
-            
-            # KPI 4: Arquivados
-            arquivados=Count('document_id', filter=Q(
-                classification__classification_status__status="Arquivado"
-            )),
-            
-            # KPI 5: Públicos
-            publicos=Count('document_id', filter=Q(
-                classification__privacity__privacity="Publico"
-            ))
-        )
-        
-        # --- 4. Cálculo dos 3 Insights (Queries separadas) ---
+        # --- 3. Insights ---
 
         # Insight 1: Gargalo (Documentos pendentes mais antigos)
-        oldest_pending_docs = sector_docs.filter(
-            classification__classification_status__status="Revisão necessária"
-        ).order_by('created_at')[:3] # Ordem ASC (mais antigo primeiro)
+        oldest_pending_docs = Document.objects.filter(
+            sector=sector,
+            classification__classification_status_id__in=status_ids_for(STATUS_REVIEW_REQUIRED)
+        ).select_related('classification').order_by('created_at')[:3] # Ordem ASC (mais antigo primeiro)
 
         # Insight 2: Risco (Deleções recentes)
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        deleted_count = Document.history.filter( # type: ignore
-            sector=sector,
-            history_type='-', # Tipo 'Exclusão'
-            history_date__gte=seven_days_ago
-        ).count()
+        deleted_count = get_recent_deletions(sector.sector_id)
 
         # Insight 3: Carga de Trabalho (Top 5 contribuidores)
-        contributors = Document.history.filter( # type: ignore
-            sector=sector,
-            history_type__in=['+', '~'] # Criações + Edições
-        ).values(
-            'history_user__name' # Agrupa por nome
-        ).annotate(
-            activity_count=Count('history_id') # Conta as ações
-        ).order_by('-activity_count')[:5]
+        contributors = get_top_contributors(sector.sector_id)
 
         
-        # --- 5. Montagem da Resposta Final ---
+        # --- 4. Montagem da Resposta Final ---
         
         data = {
             "kpis": {
@@ -198,7 +132,7 @@ class SectorDashboardView(APIView):
             "insights": {
                 "alerta_exclusoes_7dias": deleted_count,
                 "gargalos_pendentes": DashboardDocumentSerializer(oldest_pending_docs, many=True).data,
-                "top_colaboradores": list(contributors)
+                "top_colaboradores": contributors
             }
         }
         
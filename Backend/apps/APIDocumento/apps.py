@@ -6,6 +6,9 @@ from django.db.utils import OperationalError
 class ApidocumentoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.APIDocumento'
+
+    def ready(self):
+        import apps.APIDocumento.signals
     
     # def ready(self):
     #     """
@@ -0,0 +1,115 @@
+import logging
+import mimetypes
+import os
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from apps.core.utils import encode_optimized_image
+from .blobs import acquire_blob, release_blobs, store_upload
+from .models import Attached_Files_Document, FileBlob
+
+logger = logging.getLogger(__name__)
+
+MAX_DIMENSION = 1920
+QUALITY = 85
+
+
+def is_image(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith('image/') # type: ignore
+
+
+def schedule_attachment_optimization(attachment: Attached_Files_Document) -> None:
+    """
+    Agenda a otimização da imagem anexada para depois do commit:
+    o upload responde com o original já gravado.
+    """
+    from apps.core.tasks import optimize_attached_image_task
+
+    attachment_id, file_name = attachment.pk, attachment.file.name
+    transaction.on_commit(lambda: optimize_attached_image_task.delay(attachment_id, file_name))
+
+
+def optimized_name(file_name: str, extension: str) -> str:
+    root, _ = os.path.splitext(file_name)
+    return f"{root}_optimized.{extension}"
+
+
+def optimize_attachment(attachment_id: int, file_name: str) -> str:
+    """
+    Gera a versão otimizada da imagem anexada e troca o arquivo do anexo.
+
+    A versão otimizada também é um blob, gerada uma única vez por conteúdo: anexos
+    com a mesma imagem reaproveitam a do primeiro. A troca é um UPDATE condicionado
+    ao arquivo original: se o anexo foi excluído ou o arquivo mudou nesse meio-tempo,
+    a referência à versão gerada é devolvida.
+    """
+    content_type, _ = mimetypes.guess_type(file_name)
+    if not is_image(content_type):
+        return "Skipped"
+
+    source_blob = FileBlob.objects.filter(attachments__pk=attachment_id, attachments__file=file_name).first()
+
+    if source_blob is not None and source_blob.optimized_id == source_blob.pk: # type: ignore
+        return "Already optimized"
+
+    if source_blob is not None and source_blob.optimized_id is not None: # type: ignore
+        with transaction.atomic():
+            optimized = acquire_blob(source_blob.optimized_id) # type: ignore
+            if optimized is not None:
+                return switch_attachment_file(attachment_id, file_name, source_blob, optimized)
+
+    try:
+        with default_storage.open(file_name, 'rb') as source:
+            original_size = source.size
+            result = encode_optimized_image(source, content_type, MAX_DIMENSION, MAX_DIMENSION, QUALITY) # type: ignore
+    except FileNotFoundError:
+        return "Missing"
+
+    if result is None:
+        return "Not an image"
+
+    output, optimized_type, extension = result
+    if output.getbuffer().nbytes >= original_size:
+        if source_blob is not None:
+            FileBlob.objects.filter(pk=source_blob.pk).update(optimized=source_blob.pk)
+        return "Already optimized"
+
+    with transaction.atomic():
+        optimized = store_upload(
+            ContentFile(output.getvalue()),
+            filename=optimized_name(file_name, extension),
+            content_type=optimized_type
+        )
+        if source_blob is not None:
+            FileBlob.objects.filter(pk=source_blob.pk).update(optimized=optimized.pk)
+
+        return switch_attachment_file(attachment_id, file_name, source_blob, optimized)
+
+
+def switch_attachment_file(attachment_id: int, file_name: str, source_blob: Optional[FileBlob], optimized: FileBlob) -> str:
+    """
+    Aponta o anexo para o blob otimizado e devolve a referência ao original.
+    Anexos anteriores aos blobs não têm referência: o arquivo original é removido.
+    """
+    switched = Attached_Files_Document.objects.filter(
+        pk=attachment_id,
+        file=file_name
+    ).update(file=optimized.file.name, blob=optimized)
+
+    if not switched:
+        release_blobs([optimized.pk])
+        return "Stale"
+
+    if source_blob is not None:
+        release_blobs([source_blob.pk])
+        return "Optimized"
+
+    try:
+        default_storage.delete(file_name)
+    except Exception as e:
+        logger.warning("Não foi possível remover o original do anexo %s (%s): %s", attachment_id, file_name, e)
+
+    return "Optimized"
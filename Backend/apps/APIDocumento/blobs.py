@@ -0,0 +1,142 @@
+import hashlib
+import mimetypes
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.deletion import ProtectedError
+
+from .models import FileBlob
+
+BLOB_PREFIX = 'blobs'
+THUMBNAIL_PREFIX = 'thumbnails'
+
+
+def hash_upload(file_obj: Any) -> Tuple[str, int]:
+    """
+    SHA-256 e tamanho do arquivo, lidos em blocos (o upload não é carregado inteiro na memória).
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    file_obj.seek(0)
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file_obj.seek(0)
+
+    return digest.hexdigest(), size
+
+
+def blob_path(digest: str, filename: str) -> str:
+    """
+    Caminho do blob no storage: blobs/ab/cd/<digest>.<ext> (a extensão vem do primeiro envio).
+    """
+    _, extension = os.path.splitext(filename or '')
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+
+def blob_thumbnail_path(digest: str) -> str:
+    return f"{THUMBNAIL_PREFIX}/{digest}.jpg"
+
+
+def acquire_blob(digest: str) -> Optional[FileBlob]:
+    """
+    Nova referência a um blob já gravado (None se ele não existe).
+    """
+    # O UPDATE trava o blob até o fim da transação: collect_unreferenced_blobs não o remove no meio do caminho.
+    if FileBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1):
+        return FileBlob.objects.get(pk=digest)
+    return None
+
+
+def store_upload(file_obj: Any, filename: Optional[str] = None, content_type: Optional[str] = None) -> FileBlob:
+    """
+    Registra uma nova referência ao conteúdo do arquivo e retorna o blob.
+
+    Se o conteúdo já existe, só a contagem de referências sobe (nada é enviado ao storage).
+    Deve rodar na mesma transação que grava o documento/anexo que aponta para o blob.
+    """
+    filename = filename or getattr(file_obj, 'name', '') or ''
+    content_type = content_type or getattr(file_obj, 'content_type', None) or mimetypes.guess_type(filename)[0] or ''
+    digest, size = hash_upload(file_obj)
+
+    blob = acquire_blob(digest)
+    if blob is not None:
+        return blob
+
+    path = blob_path(digest, filename)
+    if not default_storage.exists(path):
+        stored = default_storage.save(path, file_obj)
+        if stored != path:
+            # Envio concorrente do mesmo conteúdo: a cópia com nome alternativo é descartada.
+            default_storage.delete(stored)
+
+    FileBlob.objects.bulk_create(
+        [FileBlob(digest=digest, file=path, size=size, content_type=content_type[:100])],
+        ignore_conflicts=True
+    )
+    FileBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1)
+
+    return FileBlob.objects.get(pk=digest)
+
+
+def release_blobs(digests: Iterable[Optional[str]]) -> None:
+    """
+    Remove uma referência de cada blob informado (repetições contam várias vezes).
+    Os arquivos ficam no storage até o cleanup_s3_orphans coletar os blobs sem referências.
+    """
+    counts = Counter(digest for digest in digests if digest)
+
+    by_amount: Dict[int, list] = {}
+    for digest, amount in counts.items():
+        by_amount.setdefault(amount, []).append(digest)
+
+    for amount, group in by_amount.items():
+        FileBlob.objects.filter(pk__in=group, ref_count__gte=amount).update(ref_count=F('ref_count') - amount)
+
+
+def collect_unreferenced_blobs(dry_run: bool = True) -> Dict[str, Any]:
+    """
+    Remove do storage e do banco os blobs sem referências.
+
+    Cada blob é travado (SELECT FOR UPDATE) e conferido de novo antes da remoção: um
+    upload concorrente do mesmo conteúdo espera a transação e então grava o blob outra vez.
+
+    Returns:
+        Dict[str, Any]: 'blobs' (coletados), 'files' (arquivos removidos) e 'errors'.
+    """
+    results: Dict[str, Any] = {'blobs': 0, 'files': 0, 'errors': []}
+
+    digests = list(FileBlob.objects.filter(ref_count=0).values_list('pk', flat=True))
+    if dry_run:
+        results['blobs'] = len(digests)
+        return results
+
+    for digest in digests:
+        try:
+            with transaction.atomic():
+                blob = FileBlob.objects.select_for_update().filter(pk=digest, ref_count=0).first()
+                if blob is None:
+                    continue
+
+                names = [name for name in (blob.file.name, blob.thumbnail.name) if name]
+
+                # Primeiro o registro (PROTECT barra blobs ainda referenciados), depois os arquivos.
+                blob.delete()
+                for name in names:
+                    if default_storage.exists(name):
+                        default_storage.delete(name)
+                        results['files'] += 1
+
+                results['blobs'] += 1
+        except ProtectedError:
+            # Contagem desatualizada: ainda há documentos/anexos apontando para o blob.
+            results['errors'].append(f"Blob {digest} still referenced")
+        except Exception as e:
+            results['errors'].append(f"Error collecting blob {digest}: {str(e)}")
+
+    return results
@@ -0,0 +1,343 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, Q, Value, When
+from django.utils import timezone
+
+from apps.APIAudit.models import AuditLog
+from apps.APIDashboard.utils.activity_feed import drop_enterprise_feeds
+from apps.APIDashboard.utils.rollups import apply_sector_deltas, classification_deltas, increment_contributor
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import SectorUser
+from apps.core.utils import delete_rows
+from .blobs import release_blobs
+from .history import bulk_create_history
+from .models import Attached_Files_Document, Classification, Document, DocumentExport, ImportItem
+from .reference_data import PRIVACITY_PUBLIC, labels_for, privacity_ids_for
+from .versioning import touch_documents
+
+logger = logging.getLogger(__name__)
+
+ACTIVATE = 'activate'
+DEACTIVATE = 'deactivate'
+DELETE = 'delete'
+RECLASSIFY = 'reclassify'
+ACTIONS = (ACTIVATE, DEACTIVATE, DELETE, RECLASSIFY)
+
+CHUNK_SIZE = 500
+MAX_SELECTION = 10000
+
+DocumentCategory = Document.categories.through
+
+# Relações reversas de Document e o tratamento de cada uma em delete_documents.
+# O DELETE em lote (delete_rows) não passa pelo collector do Django, então o on_delete
+# de cada FK é aplicado aqui. Uma FK nova para Document precisa entrar em uma das
+# listas (test_bulk_delete_handles_every_relation compara com Document._meta).
+DELETE_CASCADE = [(Attached_Files_Document, 'document_id'), (DocumentCategory, 'document')]
+DELETE_SET_NULL = [(ImportItem, 'document'), (DocumentExport, 'document')]
+
+
+def chunked(items: List[int], size: int = CHUNK_SIZE) -> Iterable[List[int]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# --- Seleção e permissões ---
+
+def permitted_documents_filter(user, action: str) -> Q:
+    """
+    As mesmas regras das views individuais, como filtro de consulta:
+    - excluir: CanDELETEDocument (dono da empresa ou gestor do setor)
+    - ativar/desativar: CanActivateOrDeactivateDocument (+ administrador do setor)
+    - reclassificar: IsLinkedToDocument (criador, dono, gestor, membro ou documento público)
+    """
+    owner_or_manager = Q(sector__enterprise__owner=user) | Q(sector__manager=user)
+
+    if action == DELETE:
+        return owner_or_manager
+
+    if action in (ACTIVATE, DEACTIVATE):
+        return owner_or_manager | Q(sector__in=SectorUser.objects.filter(user=user, is_adm=True).values('sector_id'))
+
+    return Q(creator=user) | (Q(sector__isnull=False) & (
+        owner_or_manager |
+        Q(sector__in=SectorUser.objects.filter(user=user).values('sector_id')) |
+        Q(classification__privacity_id__in=privacity_ids_for(PRIVACITY_PUBLIC))
+    ))
+
+
+def selection_filter(filters: Dict[str, Any]) -> Q:
+    """
+    Filtros aceitos na seleção por busca (mesmos nomes da busca de documentos).
+    """
+    query = Q()
+
+    if 'sector_id' in filters:
+        query &= Q(sector_id=filters['sector_id'])
+    if 'status_id' in filters:
+        query &= Q(classification__classification_status_id=filters['status_id'])
+    if 'privacity_id' in filters:
+        query &= Q(classification__privacity_id=filters['privacity_id'])
+    if 'is_reviewed' in filters:
+        query &= Q(classification__is_reviewed=filters['is_reviewed'])
+    if 'is_active' in filters:
+        query &= Q(is_active=filters['is_active'])
+    if 'category_id' in filters:
+        query &= Q(pk__in=DocumentCategory.objects.filter(category_id=filters['category_id']).values('document_id'))
+    if 'created_before' in filters:
+        query &= Q(created_at__lt=filters['created_before'])
+
+    return query
+
+
+def resolve_selection(user, action: str, document_ids: Optional[List[int]] = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve a seleção (IDs ou filtro) e a permissão do usuário sobre cada documento em uma única consulta.
+
+    Por IDs, documentos inexistentes ou sem permissão são devolvidos em 'not_found'/'forbidden'.
+    Por filtro, só entram documentos das empresas do usuário sobre os quais ele tem permissão.
+    """
+    permitted = permitted_documents_filter(user, action)
+
+    if document_ids is not None:
+        rows = Document.objects.filter(pk__in=document_ids).annotate(
+            allowed=Case(When(permitted, then=Value(True)), default=Value(False), output_field=BooleanField())
+        ).values_list('pk', 'allowed', 'sector__enterprise_id')
+
+        allowed = {pk: enterprise_id for pk, is_allowed, enterprise_id in rows if is_allowed}
+        found = {pk for pk, _, _ in rows}
+
+        return {
+            'document_ids': [pk for pk in document_ids if pk in allowed],
+            'enterprise_ids': sorted({enterprise_id for enterprise_id in allowed.values() if enterprise_id}),
+            'not_found': [pk for pk in document_ids if pk not in found],
+            'forbidden': [pk for pk in document_ids if pk in found and pk not in allowed],
+            'truncated': False,
+        }
+
+    enterprise_links = Enterprise.objects.filter(
+        Q(owner=user) |
+        Q(sectors__sector_links__user=user) |
+        Q(sectors__manager=user)
+    ).values('enterprise_id')
+
+    rows = list(
+        Document.objects.filter(
+            Q(sector__enterprise__in=enterprise_links) & permitted & selection_filter(filters or {})
+        ).order_by('pk').values_list('pk', 'sector__enterprise_id').distinct()[:MAX_SELECTION + 1]
+    )
+
+    return {
+        'document_ids': [pk for pk, _ in rows[:MAX_SELECTION]],
+        'enterprise_ids': sorted({enterprise_id for _, enterprise_id in rows if enterprise_id}),
+        'not_found': [],
+        'forbidden': [],
+        'truncated': len(rows) > MAX_SELECTION,
+    }
+
+
+# --- Operações ---
+
+def set_documents_active(document_ids: List[int], is_active: bool, user) -> int:
+    """
+    Ativa/desativa os documentos com UPDATE por lote e uma versão de histórico por documento.
+    """
+    changed = 0
+
+    for chunk in chunked(document_ids):
+        with transaction.atomic():
+            documents = list(
+                # content: bulk_create_history copia as colunas rastreadas do documento.
+                Document.objects.with_content().filter(pk__in=chunk).exclude(is_active=is_active)
+                .select_for_update()
+            )
+            if not documents:
+                continue
+
+            Document.objects.filter(pk__in=[document.pk for document in documents]).update(
+                is_active=is_active,
+                revision=F('revision') + 1,
+                updated_at=timezone.now()
+            )
+
+            for document in documents:
+                document.is_active = is_active
+            bulk_create_history(documents, '~', user)
+
+            # Sem os sinais do histórico: a contagem de contribuições é somada por setor.
+            for sector_id, count in Counter(document.sector_id for document in documents if document.sector_id).items(): # type: ignore
+                increment_contributor(sector_id, user.pk, count)
+
+            changed += len(documents)
+
+    return changed
+
+
+def delete_documents(document_ids: List[int], user) -> int:
+    """
+    Exclui os documentos por lote: a versão '-' do histórico vai em um único INSERT
+    e cada tabela (anexos, categorias, documentos) recebe um único DELETE.
+    """
+    deleted = 0
+    today = timezone.localdate()
+
+    for chunk in chunked(document_ids):
+        with transaction.atomic():
+            documents = list(
+                Document.objects.with_content().filter(pk__in=chunk).select_for_update()
+            )
+            if not documents:
+                continue
+
+            pks = [document.pk for document in documents]
+            labels = {
+                pk: labels_for(status_id, privacity_id) for pk, status_id, privacity_id in Classification.objects.filter(
+                    pk__in=[document.classification_id for document in documents if document.classification_id] # type: ignore
+                ).values_list('pk', 'classification_status_id', 'privacity_id')
+            }
+
+            bulk_create_history(documents, '-', user)
+
+            # delete_rows não dispara post_delete: as referências aos blobs são liberadas aqui.
+            release_blobs([
+                *(document.file_blob_id for document in documents), # type: ignore
+                *Attached_Files_Document.objects.filter(document_id__in=pks).values_list('blob_id', flat=True)
+            ])
+
+            # on_delete das relações reversas (ver DELETE_CASCADE/DELETE_SET_NULL): as FKs são
+            # verificadas no commit e uma referência esquecida falharia com IntegrityError.
+            for model, field in DELETE_SET_NULL:
+                model.objects.filter(**{f'{field}__in': pks}).update(**{field: None})
+
+            # Um DELETE por tabela, sem carregar as linhas nem disparar post_delete: o histórico
+            # e os blobs já foram tratados acima (QuerySet.delete() os repetiria por documento).
+            for model, field in DELETE_CASCADE:
+                delete_rows(model, field, pks)
+            delete_rows(Document, 'document_id', pks)
+
+            deltas_by_sector: Dict[int, Counter] = defaultdict(Counter)
+            for document in documents:
+                if not document.sector_id: # type: ignore
+                    continue
+                deltas = deltas_by_sector[document.sector_id] # type: ignore
+                deltas.update({'documents_delta': -1, 'deleted_count': 1})
+                deltas.update(classification_deltas(*labels.get(document.classification_id, (None, None)), sign=-1)) # type: ignore
+
+            for sector_id, deltas in deltas_by_sector.items():
+                apply_sector_deltas(sector_id, today, dict(deltas))
+
+            deleted += len(documents)
+
+    return deleted
+
+
+def reclassify_documents(document_ids: List[int], changes: Dict[str, Any], user) -> int:
+    """
+    Altera status, privacidade e/ou revisão das classificações por lote.
+
+    'changes' aceita 'classification_status', 'privacity' (instâncias) e 'is_reviewed'.
+    Classificações que já estão no estado pedido não são tocadas. Cada alteração
+    gera um registro de auditoria (bulk_create) e os consolidados do setor são ajustados.
+    """
+    targets: Dict[str, Any] = {}
+    if 'classification_status' in changes:
+        targets['classification_status_id'] = changes['classification_status'].pk
+    if 'privacity' in changes:
+        targets['privacity_id'] = changes['privacity'].pk
+    if 'is_reviewed' in changes:
+        targets['is_reviewed'] = changes['is_reviewed']
+
+    new_status = changes['classification_status'].status if 'classification_status' in changes else None
+    new_privacity = changes['privacity'].privacity if 'privacity' in changes else None
+
+    changed = 0
+    now = timezone.now()
+
+    for chunk in chunked(document_ids):
+        with transaction.atomic():
+            rows = list(
+                Classification.objects.filter(document__pk__in=chunk).select_for_update(of=('self',)).values(
+                    'pk', 'classification_status_id', 'privacity_id', 'is_reviewed', 'document__sector_id'
+                )
+            )
+
+            changed_rows = [row for row in rows if any(row[field] != value for field, value in targets.items())]
+            if not changed_rows:
+                continue
+
+            # Mudança de status ou de revisão conta como revisão (ver Classification.REVIEW_FIELDS).
+            reviewed_ids = {
+                row['pk'] for row in changed_rows
+                if any(row[field] != targets[field] for field in ('classification_status_id', 'is_reviewed') if field in targets)
+            }
+            other_ids = [row['pk'] for row in changed_rows if row['pk'] not in reviewed_ids]
+
+            review_fields: Dict[str, Any] = {'last_reviewed_at': now}
+            if targets.get('is_reviewed'):
+                review_fields['reviewer_id'] = user.pk
+
+            if reviewed_ids:
+                Classification.objects.filter(pk__in=reviewed_ids).update(**targets, **review_fields)
+            if other_ids:
+                Classification.objects.filter(pk__in=other_ids).update(**targets)
+
+            touch_documents(Document.objects.filter(classification_id__in=[row['pk'] for row in changed_rows]).values_list('pk', flat=True))
+
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    actor=user,
+                    action='~',
+                    target_model='Classification',
+                    target_id=row['pk'],
+                    target_str='Reclassificação em lote',
+                    changes={
+                        field: {'old': row[field], 'new': value}
+                        for field, value in targets.items() if row[field] != value
+                    }
+                ) for row in changed_rows
+            ], batch_size=CHUNK_SIZE)
+
+            deltas_by_sector: Dict[int, Counter] = defaultdict(Counter)
+            for row in changed_rows:
+                if not row['document__sector_id']:
+                    continue
+                old_status, old_privacity = labels_for(row['classification_status_id'], row['privacity_id'])
+
+                deltas = deltas_by_sector[row['document__sector_id']]
+                deltas.update(classification_deltas(old_status, old_privacity, sign=-1))
+                deltas.update(classification_deltas(new_status or old_status, new_privacity or old_privacity))
+
+            for sector_id, deltas in deltas_by_sector.items():
+                apply_sector_deltas(sector_id, timezone.localdate(now), dict(deltas))
+
+            changed += len(changed_rows)
+
+    return changed
+
+
+def run_bulk_operation(action: str, selection: Dict[str, Any], user, changes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Executa a ação sobre os documentos selecionados (ver resolve_selection).
+    Os feeds das empresas afetadas são descartados uma única vez.
+    """
+    document_ids = selection['document_ids']
+
+    if action in (ACTIVATE, DEACTIVATE):
+        affected = set_documents_active(document_ids, action == ACTIVATE, user)
+    elif action == DELETE:
+        affected = delete_documents(document_ids, user)
+    else:
+        affected = reclassify_documents(document_ids, changes or {}, user)
+
+    if affected:
+        drop_enterprise_feeds(selection['enterprise_ids'])
+
+    logger.info("Operação em lote '%s' por %s: %s de %s documentos.", action, user.pk, affected, len(document_ids))
+
+    return {
+        'action': action,
+        'selected': len(document_ids),
+        'affected': affected,
+    }
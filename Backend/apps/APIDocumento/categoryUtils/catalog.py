@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+
+from apps.APIDocumento.models import Category
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TTL = 60 * 60 * 24 # 1 dia; versões antigas simplesmente expiram
+
+# Colunas do catálogo: cobrem CategoryListSerializer e CategoryDetailSerializer.
+CATALOG_FIELDS = (
+    'category_id',
+    'category',
+    'description',
+    'is_public',
+    'color',
+    'category_sector_id',
+    'category_sector__name',
+    'category_enterprise__name',
+)
+
+
+def version_key(enterprise_id: int) -> str:
+    return f"category_catalog:{enterprise_id}:version"
+
+
+def catalog_key(enterprise_id: int, version: int) -> str:
+    return f"category_catalog:{enterprise_id}:v{version}"
+
+
+def initial_version() -> int:
+    """
+    Versões novas partem do relógio (ms): se a chave de versão for expulsa do cache,
+    a nova versão não colide com um catálogo antigo que ainda não expirou.
+    """
+    return time.time_ns() // 1_000_000
+
+
+def get_catalog_versions(enterprise_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Versão atual do catálogo de cada empresa (uma leitura em lote no cache).
+    """
+    enterprise_ids = list(enterprise_ids)
+    stored = cache.get_many([version_key(enterprise_id) for enterprise_id in enterprise_ids])
+
+    versions = {}
+    for enterprise_id in enterprise_ids:
+        version = stored.get(version_key(enterprise_id))
+        if version is None:
+            cache.add(version_key(enterprise_id), initial_version(), None)
+            version = cache.get(version_key(enterprise_id)) or initial_version()
+        versions[enterprise_id] = version
+
+    return versions
+
+
+def bump_catalog_version(enterprise_id: Optional[int]) -> None:
+    """
+    Invalida o catálogo da empresa: a próxima leitura usa uma nova chave.
+    """
+    if enterprise_id is None:
+        return
+
+    try:
+        cache.incr(version_key(enterprise_id))
+    except ValueError:
+        # Versão ainda não criada (ou expulsa do cache).
+        cache.set(version_key(enterprise_id), initial_version(), None)
+    except Exception as e:
+        logger.warning("Não foi possível invalidar o catálogo de categorias da empresa %s: %s", enterprise_id, e)
+
+
+def build_catalog(enterprise_id: int) -> List[Dict[str, Any]]:
+    """
+    Categorias da empresa lidas do banco (uma consulta, ordenadas pelo nome).
+    """
+    rows = Category.objects.filter(
+        category_enterprise_id=enterprise_id
+    ).order_by('category').values(*CATALOG_FIELDS)
+
+    return [
+        {
+            'category_id': row['category_id'],
+            'category': row['category'],
+            'description': row['description'],
+            'is_public': row['is_public'],
+            'color': row['color'],
+            'sector_id': row['category_sector_id'],
+            'sector_name': row['category_sector__name'],
+            'enterprise_name': row['category_enterprise__name'],
+        } for row in rows
+    ]
+
+
+def load_catalogs(versions: Dict[int, int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Catálogos das empresas nas versões informadas (ver get_catalog_versions).
+    Catálogos ausentes no cache são reconstruídos e gravados sob essa versão.
+    """
+    keys = {enterprise_id: catalog_key(enterprise_id, version) for enterprise_id, version in versions.items()}
+    stored = cache.get_many(list(keys.values()))
+
+    catalogs = {}
+    missing = {}
+    for enterprise_id, key in keys.items():
+        if key in stored:
+            catalogs[enterprise_id] = stored[key]
+        else:
+            catalogs[enterprise_id] = missing[key] = build_catalog(enterprise_id)
+
+    if missing:
+        cache.set_many(missing, CATALOG_TTL)
+
+    return catalogs
+
+
+def catalog_etag(*parts: Any) -> str:
+    """
+    ETag forte a partir das versões dos catálogos e dos demais parâmetros da resposta.
+    """
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+# --- Formatos de resposta (mesmos campos dos serializers) ---
+
+def as_list_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formato de CategoryListSerializer.
+    """
+    return {
+        'category_id': entry['category_id'],
+        'category': entry['category'],
+        'description': entry['description'],
+        'sector_name': entry['sector_name'],
+        'enterprise_name': entry['enterprise_name'],
+        'is_public': entry['is_public'],
+        'color': entry['color'],
+    }
+
+
+def as_detail_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formato de CategoryDetailSerializer.
+    """
+    return {
+        'category_id': entry['category_id'],
+        'category': entry['category'],
+        'description': entry['description'],
+        'is_public': entry['is_public'],
+        'enterprise_name': entry['enterprise_name'],
+        'sector_name': entry['sector_name'],
+        'color': entry['color'],
+    }
@@ -0,0 +1,120 @@
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from apps.APIDocumento.models import Category, Document
+from apps.APIDocumento.reference_data import PRIVACITY_PRIVATE, privacity_ids_for
+from apps.APIDocumento.versioning import touch_documents
+from apps.APISetor.models import SectorUser
+
+# Tabela Document_Category (modelo intermediário gerado pelo ManyToManyField).
+DocumentCategory = Document.categories.through
+
+MAX_BULK_DOCUMENTS = 1000
+
+
+def sync_document_categories(document: Document, category_ids: Iterable[int]) -> Tuple[Set[int], Set[int]]:
+    """
+    Deixa o documento com exatamente estas categorias, gravando só a diferença:
+    vínculos que não mudaram não são apagados e reinseridos.
+    Retorna (categorias adicionadas, categorias removidas).
+    """
+    wanted = set(category_ids)
+    current = set(
+        DocumentCategory.objects.filter(document_id=document.pk).values_list('category_id', flat=True)
+    )
+    to_add, to_remove = wanted - current, current - wanted
+
+    with transaction.atomic():
+        if to_remove:
+            DocumentCategory.objects.filter(document_id=document.pk, category_id__in=to_remove).delete()
+        if to_add:
+            DocumentCategory.objects.bulk_create(
+                [DocumentCategory(document_id=document.pk, category_id=category_id) for category_id in to_add],
+                ignore_conflicts=True
+            )
+        # O modelo intermediário não dispara m2m_changed.
+        if to_add or to_remove:
+            touch_documents([document.pk])
+
+    return to_add, to_remove
+
+
+def editable_documents(user, document_ids: List[int]) -> Dict[str, Any]:
+    """
+    Resolve os documentos e a permissão de edição do usuário sobre cada um em uma única consulta.
+    Mesma regra de IsDocumentEditor: dono da empresa, gestor ou membro do setor,
+    ou documento não privado.
+
+    Retorna {'enterprise_by_document': {id: enterprise_id}, 'not_found': [...], 'forbidden': [...]}.
+    """
+    rows = Document.objects.filter(pk__in=document_ids).annotate(
+        is_member=Exists(SectorUser.objects.filter(sector=OuterRef('sector'), user=user))
+    ).values_list(
+        'pk',
+        'sector__enterprise_id',
+        'sector__enterprise__owner_id',
+        'sector__manager_id',
+        'is_member',
+        'classification__privacity_id',
+    )
+
+    private_ids = privacity_ids_for(PRIVACITY_PRIVATE)
+    enterprise_by_document: Dict[int, int] = {}
+    forbidden: List[int] = []
+
+    for document_id, enterprise_id, owner_id, manager_id, is_member, privacity in rows:
+        if enterprise_id is None:
+            forbidden.append(document_id)
+        elif user.pk in (owner_id, manager_id) or is_member or (privacity is not None and privacity not in private_ids):
+            enterprise_by_document[document_id] = enterprise_id
+        else:
+            forbidden.append(document_id)
+
+    found = set(enterprise_by_document) | set(forbidden)
+
+    return {
+        'enterprise_by_document': enterprise_by_document,
+        'not_found': [document_id for document_id in document_ids if document_id not in found],
+        'forbidden': forbidden,
+    }
+
+
+def category_enterprises(category_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    {category_id: enterprise_id} das categorias existentes, em uma consulta.
+    """
+    return dict(
+        Category.objects.filter(pk__in=set(category_ids)).values_list('category_id', 'category_enterprise_id')
+    )
+
+
+def bulk_update_document_categories(document_ids: List[int], add_ids: List[int], remove_ids: List[int]) -> Dict[str, int]:
+    """
+    Aplica as adições e remoções de categorias a todos os documentos em uma transação:
+    um único DELETE e um único bulk_create (vínculos já existentes são ignorados).
+    """
+    removed = 0
+
+    with transaction.atomic():
+        if remove_ids:
+            removed, _ = DocumentCategory.objects.filter(
+                document_id__in=document_ids,
+                category_id__in=remove_ids
+            ).delete()
+
+        if add_ids:
+            DocumentCategory.objects.bulk_create(
+                [
+                    DocumentCategory(document_id=document_id, category_id=category_id)
+                    for document_id in document_ids
+                    for category_id in add_ids
+                ],
+                ignore_conflicts=True,
+                batch_size=MAX_BULK_DOCUMENTS
+            )
+
+        touch_documents(document_ids)
+
+    return {'documents': len(document_ids), 'links_removed': removed}
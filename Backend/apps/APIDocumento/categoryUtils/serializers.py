@@ -4,6 +4,7 @@ from apps.APISetor.models import Sector, SectorUser
 from apps.APIEmpresa.models import Enterprise
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from apps.APIDocumento.categoryUtils.linking import MAX_BULK_DOCUMENTS
 
 User = get_user_model()
 
@@ -260,4 +261,28 @@ class ListCategoriesByDocumentId(serializers.ModelSerializer):
             'category_id',
             'category',
             'description',
-        ]
\ No newline at end of file
+        ]
+
+class BulkDocumentCategoriesSerializer(serializers.Serializer):
+    """
+    Payload do vínculo de categorias em lote:
+    {documents_id[], add_categories_id[], remove_categories_id[]}.
+    """
+    documents_id = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=MAX_BULK_DOCUMENTS)
+    add_categories_id = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    remove_categories_id = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, data):
+        add_ids = set(data['add_categories_id'])
+        remove_ids = set(data['remove_categories_id'])
+
+        if not add_ids and not remove_ids:
+            raise serializers.ValidationError("Informe ao menos uma categoria para adicionar ou remover.")
+
+        if add_ids & remove_ids:
+            raise serializers.ValidationError("Uma categoria não pode ser adicionada e removida ao mesmo tempo.")
+
+        data['documents_id'] = list(dict.fromkeys(data['documents_id']))
+        data['add_categories_id'] = list(add_ids)
+        data['remove_categories_id'] = list(remove_ids)
+        return data
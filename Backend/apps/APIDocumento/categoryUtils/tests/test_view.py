@@ -1407,3 +1407,241 @@ class TestRetrieveCategoryAPI:
 
         assert response.status_code == 401
         assert response.data['sucesso'] is False # type: ignore
+
+@pytest.mark.django_db
+class TestBulkLinkCategoriesAPI:
+    """
+    Suíte de testes do vínculo de categorias por diferença (LinkCategoriesToDocumentView)
+    e do vínculo em lote (BulkLinkCategoriesToDocumentsView).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Retorna uma instância de APIClient para os testes."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Três documentos privados de um setor, um documento de outra empresa e categorias das duas empresas.
+        """
+        owner = User.objects.create_user(username="owner_bulk_cat", password="pw", name="Owner", email='bulk_cat1@gmail.com')
+        member = User.objects.create_user(username="member_bulk_cat", password="pw", name="Member", email='bulk_cat2@gmail.com')
+        outsider = User.objects.create_user(username="outsider_bulk_cat", password="pw", name="Outsider", email='bulk_cat3@gmail.com')
+
+        enterprise_A = Enterprise.objects.create(name="Corp A Bulk", owner=owner)
+        enterprise_B = Enterprise.objects.create(name="Corp B Bulk", owner=outsider)
+        sector_A = Sector.objects.create(name="Setor A", enterprise=enterprise_A, manager=owner)
+        sector_B = Sector.objects.create(name="Setor B", enterprise=enterprise_B, manager=outsider)
+        SectorUser.objects.create(user=member, sector=sector_A, is_adm=False)
+
+        cat_1 = Category.objects.create(category="Bulk 1", category_enterprise=enterprise_A)
+        cat_2 = Category.objects.create(category="Bulk 2", category_enterprise=enterprise_A)
+        cat_B = Category.objects.create(category="Bulk B", category_enterprise=enterprise_B)
+
+        status = Classification_Status.objects.create(status="Em andamento")
+        privacity = Classification_Privacity.objects.create(privacity="Privado")
+
+        def create_document(title, sector, creator):
+            classification = Classification.objects.create(classification_status=status, privacity=privacity)
+            return Document.objects.create(title=title, content={}, creator=creator, sector=sector, classification=classification)
+
+        docs = [create_document(f"Doc {i}", sector_A, owner) for i in range(3)]
+        docs[0].categories.add(cat_1)
+
+        return {
+            "owner": owner, "member": member, "outsider": outsider,
+            "docs": docs, "doc_B": create_document("Doc B", sector_B, outsider),
+            "cat_1": cat_1, "cat_2": cat_2, "cat_B": cat_B,
+        }
+
+    def test_link_categories_keeps_unchanged_links(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o vínculo individual grava apenas a diferença: o vínculo que já existia não é recriado.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        doc: Document = scenario_data["docs"][0]
+        through = Document.categories.through
+        original_link_id = through.objects.get(document=doc, category=scenario_data["cat_1"]).pk
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("vincular-categorias-documento", kwargs={'pk': doc.pk})
+
+        response = api_client.post(url, {"categories_id": [scenario_data["cat_1"].pk, scenario_data["cat_2"].pk]}, format='json')
+
+        assert response.status_code == 200
+        assert through.objects.get(document=doc, category=scenario_data["cat_1"]).pk == original_link_id
+        assert set(doc.categories.values_list('pk', flat=True)) == {scenario_data["cat_1"].pk, scenario_data["cat_2"].pk}
+
+    def test_bulk_link_categories_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se as adições e remoções são aplicadas a todos os documentos.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        docs: List[Document] = scenario_data["docs"]
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("vincular-categorias-documentos-lote")
+        data = {
+            "documents_id": [doc.pk for doc in docs],
+            "add_categories_id": [scenario_data["cat_2"].pk],
+            "remove_categories_id": [scenario_data["cat_1"].pk],
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == 200
+        assert response.data['data'] == {'documents': 3, 'links_removed': 1} # type: ignore
+        for doc in docs:
+            assert list(doc.categories.values_list('pk', flat=True)) == [scenario_data["cat_2"].pk]
+
+    def test_bulk_link_forbidden_document_changes_nothing(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um documento sem permissão de edição invalida o lote inteiro.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        docs: List[Document] = scenario_data["docs"]
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("vincular-categorias-documentos-lote")
+        data = {
+            "documents_id": [docs[1].pk, scenario_data["doc_B"].pk],
+            "add_categories_id": [scenario_data["cat_2"].pk],
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == 403
+        assert response.data['data']['forbidden'] == [scenario_data["doc_B"].pk] # type: ignore
+        assert not docs[1].categories.exists()
+
+    def test_bulk_link_foreign_category_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se uma categoria de outra empresa é recusada.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("vincular-categorias-documentos-lote")
+        data = {
+            "documents_id": [doc.pk for doc in scenario_data["docs"]],
+            "add_categories_id": [scenario_data["cat_B"].pk],
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == 400
+        assert response.data['data']['invalid'] == [scenario_data["cat_B"].pk] # type: ignore
+
+@pytest.mark.django_db
+class TestCategoryCatalogCache:
+    """
+    Suíte de testes do catálogo de categorias em cache com ETag
+    (/categoria/visualizar/disponiveis/ e /categoria/visualizar/<pk>/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Retorna uma instância de APIClient para os testes."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Empresa com um setor e duas categorias (uma do setor, outra sem setor).
+        """
+        owner = User.objects.create_user(username="catalog_owner", password="pw", email="catalog_owner@e.com", name="Catalog Owner")
+        enterprise = Enterprise.objects.create(name="Catalog Corp", owner=owner)
+        sector = Sector.objects.create(name="Catalog Sector", enterprise=enterprise, manager=owner)
+
+        Category.objects.create(category="Contratos", category_enterprise=enterprise, category_sector=sector)
+        Category.objects.create(category="Atas", category_enterprise=enterprise)
+
+        return {"owner": owner, "enterprise": enterprise, "sector": sector}
+
+    # Success
+
+    def test_catalog_revalidation_returns_304(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a listagem devolve um ETag e se a revalidação com If-None-Match responde 304 sem corpo.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("listar-categorias-disponiveis")
+
+        response = api_client.get(url)
+
+        assert response.status_code == 200
+        assert [item['category'] for item in response.data['data']] == ["Atas", "Contratos"] # type: ignore
+        etag = response['ETag']
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert not response.content
+
+    def test_catalog_is_invalidated_on_category_save(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se criar uma categoria muda o ETag e a nova categoria aparece na listagem do setor.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : executa os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("listar-categorias", kwargs={'pk': scenario_data["sector"].pk})
+
+        response = api_client.get(url)
+        etag = response['ETag']
+        assert [item['category'] for item in response.data['data']] == ["Contratos"] # type: ignore
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Category.objects.create(
+                category="Propostas",
+                category_enterprise=scenario_data["enterprise"],
+                category_sector=scenario_data["sector"]
+            )
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert [item['category'] for item in response.data['data']] == ["Contratos", "Propostas"] # type: ignore
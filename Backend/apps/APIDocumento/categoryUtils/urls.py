@@ -7,6 +7,7 @@ from .views import (
     UpdateCategoryView, 
     DeleteCategoryView, 
     LinkCategoriesToDocumentView,
+    BulkLinkCategoriesToDocumentsView,
     ListCategoriesByDocumentView,
     ListAllDisponibleCategoriesView)
 
@@ -17,6 +18,7 @@ category_urlpatterns = [
     path('categoria/alterar/<int:pk>/', UpdateCategoryView.as_view(), name='alterar-categoria'),
     path('categoria/excluir/<int:pk>/', DeleteCategoryView.as_view(), name='excluir-categoria'),
     path('categoria/vincular-categorias/<int:pk>/', LinkCategoriesToDocumentView.as_view(), name='vincular-categorias-documento'),
+    path('categoria/vincular-categorias/lote/', BulkLinkCategoriesToDocumentsView.as_view(), name='vincular-categorias-documentos-lote'),
     path('categoria/visualizar/vinculos/<int:pk>/', ListCategoriesByDocumentView.as_view(), name='listar-vinculos-categoria'),
     path('categoria/visualizar/disponiveis/<int:pk>/', ListAvailableCategoriesByDocumentIdView.as_view(), name='listar-categoria-disponiveis-documento'),
     path('categoria/visualizar/disponiveis/', ListAllDisponibleCategoriesView.as_view(), name='listar-categorias-disponiveis')
@@ -3,8 +3,10 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from apps.APIDocumento.categoryUtils.permissions import CanListCategory, IsCategoryADM, IsCategoryEditor, IsCategoryVisible, IsDocumentEditor
 from apps.APIDocumento.permissions import IsLinkedToDocument
-from apps.core.utils import default_response
-from apps.APIDocumento.categoryUtils.serializers import CategoryDetailSerializer, CategoryListSerializer, CreateCategorySerializer, DeleteCategorySerializer, DocumentAddCategoriesSerializer, ListCategoriesByDocumentId, UpdateCategorySerializer
+from apps.core.utils import default_response, etag_matches, not_modified_response, set_cache_validators
+from apps.APIDocumento.categoryUtils.catalog import as_detail_entry, as_list_entry, catalog_etag, get_catalog_versions, load_catalogs
+from apps.APIDocumento.categoryUtils.linking import bulk_update_document_categories, category_enterprises, editable_documents, sync_document_categories
+from apps.APIDocumento.categoryUtils.serializers import BulkDocumentCategoriesSerializer, CategoryDetailSerializer, CategoryListSerializer, CreateCategorySerializer, DeleteCategorySerializer, DocumentAddCategoriesSerializer, ListCategoriesByDocumentId, UpdateCategorySerializer
 from apps.APIDocumento.models import Classification, Classification_Privacity, Classification_Status, Document, Category
 from typing import Type
 from rest_framework.views import APIView, Response
@@ -105,24 +107,23 @@ class ListCategoryView(APIView):
         Returns:
             HttpResponse: Uma resposta contendo a lista de categorias.
         """
-        request_user = request.user
-        
-        sector_query = get_object_or_404(Sector, pk=pk)
-        
-        category_query = Q(category_sector=sector_query) 
+        sector_query = get_object_or_404(Sector.objects.select_related('enterprise__owner', 'manager'), pk=pk)
 
         self.check_object_permissions(request, sector_query)
 
-        categories_queryset = Category.objects.filter(category_query).select_related(
-            'category_enterprise', 
-            'category_sector'
-        ).distinct()
+        versions = get_catalog_versions([sector_query.enterprise_id]) # type: ignore
+        etag = catalog_etag('sector', pk, versions)
+
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
 
-        serializer = CategoryListSerializer(categories_queryset, many=True)
+        catalog = load_catalogs(versions)[sector_query.enterprise_id] # type: ignore
+        categories = [as_list_entry(entry) for entry in catalog if entry['sector_id'] == sector_query.pk]
 
         res: HttpResponse = Response()
         res.status_code = 200
-        res.data = default_response(success=True, message="Lista de categorias recuperada com sucesso.", data=serializer.data)
+        res.data = default_response(success=True, message="Lista de categorias recuperada com sucesso.", data=categories)
+        set_cache_validators(res, etag)
         return res
 
 class UpdateCategoryView(APIView):
@@ -254,10 +255,9 @@ class LinkCategoriesToDocumentView(APIView):
         categories_to_add = serializer.validated_data['categories'] # type: ignore
         
         try: 
-            document.categories.clear() # Remove all existing categories
+            added, removed = sync_document_categories(document, [category.pk for category in categories_to_add])
 
-            if categories_to_add:
-                document.categories.add(*categories_to_add)
+            if added or removed:
                 message = "Categorias vinculadas com sucesso."
             else:
                 message = "Nenhuma categoria nova para adicionar."
@@ -277,6 +277,75 @@ class LinkCategoriesToDocumentView(APIView):
         )
         return res
     
+class BulkLinkCategoriesToDocumentsView(APIView):
+    """
+    View de Ação para adicionar e/ou remover Categorias de vários Documentos de uma vez.
+
+    O payload contém 'documents_id', 'add_categories_id' e 'remove_categories_id' (listas).
+    Documentos e categorias são validados em uma consulta cada; se algum for inválido,
+    nada é alterado. O usuário precisa poder editar todos os documentos (IsDocumentEditor).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request) -> HttpResponse:
+        """
+        Manipula a requisição POST de vínculo em lote.
+
+        Args:
+            request (Request): Contém o payload {documents_id[], add_categories_id[], remove_categories_id[]}.
+
+        Returns:
+            HttpResponse: O resumo da operação.
+        """
+        serializer = BulkDocumentCategoriesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        document_ids = serializer.validated_data['documents_id'] # type: ignore
+        add_ids = serializer.validated_data['add_categories_id'] # type: ignore
+        remove_ids = serializer.validated_data['remove_categories_id'] # type: ignore
+
+        documents = editable_documents(request.user, document_ids)
+
+        if documents['not_found']:
+            res: HttpResponse = Response()
+            res.status_code = 404
+            res.data = default_response(success=False, message="Documentos não encontrados.", data={"not_found": documents['not_found']})
+            return res
+
+        if documents['forbidden']:
+            res: HttpResponse = Response()
+            res.status_code = 403
+            res.data = default_response(success=False, message="Você não tem permissão para modificar estes documentos.", data={"forbidden": documents['forbidden']})
+            return res
+
+        enterprise_by_category = category_enterprises(add_ids + remove_ids)
+        missing_categories = [category_id for category_id in add_ids + remove_ids if category_id not in enterprise_by_category]
+
+        if missing_categories:
+            res: HttpResponse = Response()
+            res.status_code = 404
+            res.data = default_response(success=False, message="Categorias não encontradas.", data={"not_found": missing_categories})
+            return res
+
+        document_enterprises = set(documents['enterprise_by_document'].values())
+        foreign_categories = [
+            category_id for category_id in add_ids
+            if document_enterprises != {enterprise_by_category[category_id]}
+        ]
+
+        if foreign_categories:
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="As categorias devem pertencer à empresa de todos os documentos.", data={"invalid": foreign_categories})
+            return res
+
+        summary = bulk_update_document_categories(document_ids, add_ids, remove_ids)
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(success=True, message="Categorias atualizadas com sucesso.", data=summary) # type: ignore
+        return res
+    
 class ListCategoriesByDocumentView(APIView):
     permission_classes = [IsAuthenticated, IsDocumentEditor]
 
@@ -352,36 +421,37 @@ class ListAvailableCategoriesByDocumentIdView(APIView):
 
         search_term = request.query_params.get('search', None)
         
-        doc_enterprise = document.sector.enterprise # type: ignore
+        enterprise_id = document.sector.enterprise_id # type: ignore
+        linked_category_ids = sorted(cat.pk for cat in document.categories.all())
 
-        available_categories = Category.objects.filter(
-            category_enterprise=doc_enterprise
-        )
+        versions = get_catalog_versions([enterprise_id])
+        etag = catalog_etag('available', pk, versions, linked_category_ids, search_term)
 
-        if search_term:
-            available_categories = available_categories.filter(
-                Q(category__icontains=search_term) |
-                Q(description__icontains=search_term)
-            )
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
 
-        linked_category_ids = [cat.pk for cat in document.categories.all()]
-        
-        if linked_category_ids:
-            available_categories = available_categories.exclude(
-                pk__in=linked_category_ids
-            )
-            
-        final_queryset = available_categories.order_by('category')[:20] 
+        available_categories = [
+            entry for entry in load_catalogs(versions)[enterprise_id]
+            if entry['category_id'] not in linked_category_ids
+        ]
 
-        response_serializer = CategoryDetailSerializer(final_queryset, many=True)
+        if search_term:
+            term = search_term.casefold()
+            available_categories = [
+                entry for entry in available_categories
+                if term in entry['category'].casefold() or term in (entry['description'] or '').casefold()
+            ]
+
+        categories = [as_detail_entry(entry) for entry in available_categories[:20]]
 
         res: HttpResponse = Response()
         res.status_code = 200
         res.data = default_response(
             success=True,
             message="Categorias disponíveis encontradas.",
-            data=response_serializer.data
+            data=categories
         )
+        set_cache_validators(res, etag)
         return res
     
 class ListAllDisponibleCategoriesView(APIView):
@@ -397,29 +467,29 @@ class ListAllDisponibleCategoriesView(APIView):
     def get(self, request):
         request_user = request.user
 
-        user_enterprise_links = Enterprise.objects.filter(
+        enterprise_ids = sorted(Enterprise.objects.filter(
             Q(owner=request_user) |
             Q(sectors__sector_links__user=request_user) |
             Q(sectors__manager=request_user)
-        ).distinct()
+        ).values_list('enterprise_id', flat=True).distinct())
 
+        versions = get_catalog_versions(enterprise_ids)
+        etag = catalog_etag('all', sorted(versions.items()))
 
-        queryset = Category.objects.filter(
-            category_enterprise__in=user_enterprise_links
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        categories = sorted(
+            (as_list_entry(entry) for catalog in load_catalogs(versions).values() for entry in catalog),
+            key=lambda entry: entry['category'].casefold()
         )
-        
-        final_queryset = queryset.select_related(
-            'category_enterprise',
-            'category_sector'
-        ).order_by('category')
-        
-        serializer = self.serializer_class(final_queryset, many=True)
 
         res: HttpResponse = Response()
         res.status_code = 200
         res.data = default_response(
             success=True,
-            message=f"Encontradas {final_queryset.count()} categorias.",
-            data=serializer.data
+            message=f"Encontradas {len(categories)} categorias.",
+            data=categories
         )
-        return res
\ No newline at end of file
+        set_cache_validators(res, etag)
+        return res
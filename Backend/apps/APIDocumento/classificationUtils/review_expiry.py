@@ -0,0 +1,173 @@
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.APIAudit.models import AuditLog
+from apps.APIDashboard.utils.rollups import apply_sector_deltas, classification_deltas
+from apps.APIDocumento.models import Classification, Classification_Status, Document
+from apps.APIDocumento.reference_data import labels_for, status_id_for, status_ids_for
+from apps.APIDocumento.versioning import touch_documents
+from apps.APISetor.models import SectorReviewPolicy
+
+logger = logging.getLogger(__name__)
+
+REVIEW_REQUIRED_STATUS = 'Revisão necessária'
+# Documentos nestes status não expiram.
+EXEMPT_STATUSES = (REVIEW_REQUIRED_STATUS, 'Arquivado')
+
+BATCH_SIZE = 500
+METRICS_CACHE_KEY = 'review_expiry:last_run'
+
+
+def expired_classifications(policy: SectorReviewPolicy, cutoff, since=None) -> List[QuerySet]:
+    """
+    Classificações do setor cuja revisão venceu entre 'since' e 'cutoff', em duas
+    consultas separadas (um OR entre as duas tabelas impediria o uso dos índices):
+    - revisadas: intervalo em Classification.last_reviewed_at (classification_reviewed_idx),
+      com o setor lido do índice Document (classification) INCLUDE (sector);
+    - nunca revisadas: last_reviewed_at IS NULL e intervalo em Document (sector, created_at).
+    Com 'since' (execuções incrementais) o custo acompanha os documentos que vencem na janela.
+    """
+    reviewed = Classification.objects.filter(last_reviewed_at__lt=cutoff, document__sector_id=policy.sector_id)
+    never_reviewed = Classification.objects.filter(
+        last_reviewed_at__isnull=True,
+        document__sector_id=policy.sector_id,
+        document__created_at__lt=cutoff
+    )
+
+    if since is not None:
+        reviewed = reviewed.filter(last_reviewed_at__gte=since)
+        never_reviewed = never_reviewed.filter(document__created_at__gte=since)
+
+    exempt = status_ids_for(*EXEMPT_STATUSES)
+    return [queryset.exclude(classification_status_id__in=exempt) for queryset in (reviewed, never_reviewed)]
+
+
+def expired_classification_ids(policy: SectorReviewPolicy, cutoff, since=None) -> List[int]:
+    """
+    União dos IDs das duas consultas de expired_classifications.
+    """
+    ids = set()
+    for queryset in expired_classifications(policy, cutoff, since):
+        ids.update(queryset.values_list('classification_id', flat=True))
+    return sorted(ids)
+
+
+def chunked(items: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def expire_policy(policy: SectorReviewPolicy, review_status_id: int, now, dry_run: bool = False) -> int:
+    """
+    Aplica o vencimento de um setor. Retorna a quantidade de documentos vencidos.
+    """
+    cutoff = now - timedelta(days=policy.days)
+    since = policy.expired_until
+
+    if since is not None and cutoff <= since:
+        return 0
+
+    candidate_ids = expired_classification_ids(policy, cutoff, since)
+
+    if dry_run:
+        return len(candidate_ids)
+
+    expired = 0
+    for chunk in chunked(candidate_ids, BATCH_SIZE):
+        with transaction.atomic():
+            # Relê travando as linhas: quem foi revisado nesse meio-tempo sai da lista.
+            rows = [
+                (pk, *labels_for(status_id, privacity_id))
+                for queryset in expired_classifications(policy, cutoff, since)
+                for pk, status_id, privacity_id in queryset.filter(
+                    classification_id__in=chunk
+                ).select_for_update(of=('self',)).values_list(
+                    'classification_id', 'classification_status_id', 'privacity_id'
+                )
+            ]
+            if not rows:
+                continue
+
+            Classification.objects.bulk_update(
+                [Classification(classification_id=pk, classification_status_id=review_status_id) for pk, _, _ in rows],
+                ['classification_status'],
+                batch_size=BATCH_SIZE
+            )
+            touch_documents(Document.objects.filter(classification_id__in=[pk for pk, _, _ in rows]).values_list('pk', flat=True))
+
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    actor=None,
+                    action='~',
+                    target_model='Classification',
+                    target_id=pk,
+                    target_str='Revisão vencida',
+                    changes={
+                        'classification_status': {'old': status, 'new': REVIEW_REQUIRED_STATUS},
+                        'reason': f'Política de revisão do setor ({policy.days} dias)',
+                    }
+                ) for pk, status, _ in rows
+            ], batch_size=BATCH_SIZE)
+
+            # bulk_update não dispara sinais: os consolidados do setor são ajustados aqui.
+            deltas: Counter = Counter()
+            for _, status, privacity in rows:
+                deltas.update(classification_deltas(status, privacity, sign=-1))
+                deltas.update(classification_deltas(REVIEW_REQUIRED_STATUS, privacity))
+            apply_sector_deltas(policy.sector_id, timezone.localdate(now), dict(deltas))
+
+            expired += len(rows)
+
+    SectorReviewPolicy.objects.filter(pk=policy.pk).update(expired_until=cutoff)
+    return expired
+
+
+def run_review_expiry(dry_run: bool = False, sector_ids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+    """
+    Move para 'Revisão necessária' os documentos cuja revisão venceu
+    segundo a política do setor. Retorna as métricas da execução.
+    """
+    started = time.monotonic()
+    now = timezone.now()
+
+    policies = SectorReviewPolicy.objects.filter(
+        is_active=True,
+        days__gt=0,
+        sector__is_active=True
+    )
+    if sector_ids is not None:
+        policies = policies.filter(sector_id__in=list(sector_ids))
+
+    review_status_id = status_id_for(REVIEW_REQUIRED_STATUS)
+    if review_status_id is None:
+        raise Classification_Status.DoesNotExist(f"Status '{REVIEW_REQUIRED_STATUS}' não cadastrado.")
+
+    per_sector: Dict[int, int] = {}
+    for policy in policies:
+        count = expire_policy(policy, review_status_id, now, dry_run=dry_run)
+        if count:
+            per_sector[policy.sector_id] = count
+
+    metrics = {
+        'started_at': now.isoformat(),
+        'dry_run': dry_run,
+        'policies': len(policies),
+        'sectors_with_expirations': len(per_sector),
+        'expired_documents': sum(per_sector.values()),
+        'per_sector': per_sector,
+        'duration_ms': round((time.monotonic() - started) * 1000, 1),
+    }
+
+    if not dry_run:
+        cache.set(METRICS_CACHE_KEY, metrics, None)
+
+    logger.info("Expiração de revisões: %s", metrics)
+    return metrics
@@ -1,6 +1,5 @@
 from rest_framework.serializers import ModelSerializer
 from apps.APIDocumento.models import Classification, Classification_Privacity, Classification_Status
-from apps.APIAudit.models import AuditLog
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -32,29 +31,22 @@ class ReviewDetailsSerializer(serializers.ModelSerializer):
     
     def get_last_review_date_from_log(self, obj):
         """
-        Busca a última data no log.
+        Data da última revisão (desnormalizada em Classification.last_reviewed_at).
         """
-        last_log = AuditLog.objects.filter(
-            target_model='Classification',
-            action="~",
-            target_id=obj.classification_id,
-        ).order_by('timestamp').first()
-
-        if last_log:
-            return last_log.timestamp
-        
-        return None
+        return obj.last_reviewed_at
 
     def get_review_age_days(self, obj):
         """
         Calcula a idade da revisão em dias.
+        Usa a anotação de Classification.objects.with_review_age() quando disponível.
         """
-        last_date = self.get_last_review_date_from_log(obj)
-        
-        if not last_date:
+        if hasattr(obj, 'review_age_days'):
+            return obj.review_age_days
+
+        if not obj.last_reviewed_at:
             return None
             
-        delta = timezone.now() - last_date
+        delta = timezone.now() - obj.last_reviewed_at
         return delta.days
         
 
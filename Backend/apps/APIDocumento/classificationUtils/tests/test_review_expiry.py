@@ -0,0 +1,130 @@
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from typing import Dict, Any
+
+from apps.APIAudit.models import AuditLog
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorReviewPolicy
+from apps.APIDocumento.models import Document, Classification, Classification_Status, Classification_Privacity
+from apps.APIDocumento.classificationUtils.review_expiry import (
+    expired_classification_ids,
+    expired_classifications,
+    run_review_expiry,
+)
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestReviewExpiry:
+    """
+    Suíte de testes do motor de expiração das políticas de revisão.
+    """
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Setor com política de 30 dias e quatro documentos:
+        revisado há 40 dias, revisado há 5 dias, nunca revisado (criado há 40 dias) e arquivado antigo.
+        """
+        owner = User.objects.create_user(username="sla_owner", password="pw", email="sla_owner@e.com", name="SLA Owner")
+        enterprise = Enterprise.objects.create(name="SLA Corp", owner=owner)
+        sector = Sector.objects.create(name="SLA Sector", enterprise=enterprise, manager=owner)
+        SectorReviewPolicy.objects.create(sector=sector, days=30, is_active=True)
+
+        status_concluido, _ = Classification_Status.objects.get_or_create(status="Concluído")
+        status_arquivado, _ = Classification_Status.objects.get_or_create(status="Arquivado")
+        Classification_Status.objects.get_or_create(status="Revisão necessária")
+        privacidade, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        now = timezone.now()
+
+        def create_document(title, status, reviewed_days_ago=None, created_days_ago=0):
+            classification = Classification.objects.create(classification_status=status, privacity=privacidade)
+            Classification.objects.filter(pk=classification.pk).update(
+                last_reviewed_at=now - timedelta(days=reviewed_days_ago) if reviewed_days_ago is not None else None
+            )
+            document = Document.objects.create(title=title, content={}, creator=owner, sector=sector, classification=classification)
+            Document.objects.filter(pk=document.pk).update(created_at=now - timedelta(days=created_days_ago))
+            return document
+
+        return {
+            "sector": sector,
+            "expired_reviewed": create_document("Revisado há 40 dias", status_concluido, reviewed_days_ago=40, created_days_ago=60),
+            "recent": create_document("Revisado há 5 dias", status_concluido, reviewed_days_ago=5, created_days_ago=60),
+            "expired_never_reviewed": create_document("Nunca revisado", status_concluido, created_days_ago=40),
+            "archived": create_document("Arquivado", status_arquivado, reviewed_days_ago=90, created_days_ago=90),
+        }
+
+    def status_of(self, document: Document) -> str:
+        return Classification.objects.get(pk=document.classification_id).classification_status.status # type: ignore
+
+    # Success
+
+    def test_review_expiry_dry_run_changes_nothing(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o dry-run apenas conta os documentos vencidos.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        metrics = run_review_expiry(dry_run=True)
+
+        assert metrics['expired_documents'] == 2
+        assert self.status_of(scenario_data["expired_reviewed"]) == "Concluído"
+        assert SectorReviewPolicy.objects.get(sector=scenario_data["sector"]).expired_until is None
+
+    def test_review_expiry_flips_only_expired_documents(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se apenas os documentos vencidos passam para 'Revisão necessária',
+        com auditoria, e se uma segunda execução não encontra nada novo.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        metrics = run_review_expiry()
+
+        assert metrics['expired_documents'] == 2
+        assert self.status_of(scenario_data["expired_reviewed"]) == "Revisão necessária"
+        assert self.status_of(scenario_data["expired_never_reviewed"]) == "Revisão necessária"
+        assert self.status_of(scenario_data["recent"]) == "Concluído"
+        assert self.status_of(scenario_data["archived"]) == "Arquivado"
+
+        assert AuditLog.objects.filter(target_model='Classification', target_str='Revisão vencida').count() == 2
+
+        assert run_review_expiry()['expired_documents'] == 0
+
+    def test_expired_classifications_split_queries(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se revisadas e nunca revisadas saem de consultas separadas, sem OR
+        (que impediria o uso dos índices), e se a união traz os dois vencidos.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        policy = SectorReviewPolicy.objects.get(sector=scenario_data["sector"])
+        cutoff = timezone.now() - timedelta(days=policy.days)
+
+        reviewed, never_reviewed = expired_classifications(policy, cutoff)
+
+        assert ' OR ' not in str(reviewed.query)
+        assert ' OR ' not in str(never_reviewed.query)
+        assert list(reviewed.values_list('classification_id', flat=True)) == [scenario_data["expired_reviewed"].classification_id]
+        assert list(never_reviewed.values_list('classification_id', flat=True)) == [scenario_data["expired_never_reviewed"].classification_id]
+        assert expired_classification_ids(policy, cutoff) == sorted([
+            scenario_data["expired_reviewed"].classification_id,
+            scenario_data["expired_never_reviewed"].classification_id,
+        ])
@@ -275,6 +275,36 @@ class TestUpdateClassificationAPI:
         assert document.classification.privacity == privacidade_publico# type: ignore
         assert document.classification.reviewer == new_reviewer# type: ignore
 
+    def test_update_classification_sets_last_reviewed_at(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se marcar a revisão atualiza last_reviewed_at e se a idade da revisão
+        vem igual pelo serializer e pela anotação em lote (with_review_age).
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        owner: User = scenario_data["owner"] # type: ignore
+        document: Document = scenario_data["doc_with_classification"] # type: ignore
+
+        api_client.force_authenticate(user=owner)
+        url: str = reverse("alterar-classificacao", kwargs={'pk': document.pk})
+
+        response = api_client.patch(url, {"is_reviewed": True}, format="json")
+
+        assert response.status_code == 200
+        review_details = response.data['data']['review_details'] # type: ignore
+        assert review_details['last_review_date_from_log'] is not None
+        assert review_details['review_age_days'] == 0
+
+        annotated = Classification.objects.with_review_age().get(pk=document.classification_id) # type: ignore
+        assert annotated.last_reviewed_at is not None
+        assert annotated.review_age_days == 0
+
     # --- Testes de Falha ---
 
     def test_update_classification_doc_not_found_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
@@ -2,6 +2,7 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django_redis import get_redis_connection
 from asgiref.sync import sync_to_async
+from apps.core.metrics import YJS_QUEUE_DEPTH, editor_connected, editor_disconnected, frame_relayed, observe_call
 from apps.core.tasks import persist_document_task
 from .models import Document
 
@@ -13,19 +14,24 @@ class DocumentConsumer(AsyncWebsocketConsumer):
         
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        editor_connected(self.doc_id)
+        self.counted = True
 
         # Envia estado inicial se existir (Opcional no modo Relay, mas bom para UX)
         # Usamos sync_to_async para ler do banco sem travar
         try:
-            doc = await Document.objects.aget(pk=self.doc_id)
-            if doc.yjs_state:
+            yjs_state = await Document.objects.filter(pk=self.doc_id).values_list('yjs_state', flat=True).aget()
+            if yjs_state:
                 # Envia como um Update inicial
                 # Protocolo: [MsgSync=0] [Update=2] [Blob]
-                await self.send(bytes_data=b'\x00\x02' + doc.yjs_state)
+                await self.send(bytes_data=b'\x00\x02' + bytes(yjs_state))
         except Document.DoesNotExist:
             pass
 
     async def disconnect(self, close_code):
+        # disconnect também é chamado quando o connect falhou antes do accept.
+        if getattr(self, 'counted', False):
+            editor_disconnected(self.doc_id)
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
         persist_document_task.delay(self.doc_id)
 
@@ -47,6 +53,7 @@ class DocumentConsumer(AsyncWebsocketConsumer):
                 'sender_channel_name': self.channel_name
             }
         )
+        frame_relayed(len(bytes_data))
         
         # 3. Trigger de Persistência (Debounce manual no Redis)
         # Verifica se já existe uma flag de "espera"
@@ -63,15 +70,20 @@ class DocumentConsumer(AsyncWebsocketConsumer):
     @sync_to_async
     def push_to_redis(self, data):
         con = get_redis_connection("default")
-        con.rpush(self.redis_queue_key, data)
-        con.expire(self.redis_queue_key, 3600) # Expira em 1h
+        with observe_call('redis', 'rpush'):
+            depth = con.rpush(self.redis_queue_key, data)
+        with observe_call('redis', 'expire'):
+            con.expire(self.redis_queue_key, 3600) # Expira em 1h
+        YJS_QUEUE_DEPTH.observe(depth)
 
     @sync_to_async
     def check_debounce(self):
         con = get_redis_connection("default")
-        return con.exists(f"deb_persist_{self.doc_id}")
+        with observe_call('redis', 'exists'):
+            return con.exists(f"deb_persist_{self.doc_id}")
 
     @sync_to_async
     def set_debounce(self):
         con = get_redis_connection("default")
-        con.set(f"deb_persist_{self.doc_id}", 1, ex=10) # 10 segundos
\ No newline at end of file
+        with observe_call('redis', 'set'):
+            con.set(f"deb_persist_{self.doc_id}", 1, ex=10) # 10 segundos
\ No newline at end of file
@@ -0,0 +1,158 @@
+import logging
+import os
+import zipfile
+from typing import Any, List, Optional
+
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch, Q, QuerySet
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.APIDocumento.models import Attached_Files_Document, Document, DocumentExport
+from apps.APIDocumento.reference_data import PRIVACITY_EXCLUSIVE, privacity_ids_for
+from apps.core.presigned_url import generate_presigned_url
+from .formats import RENDERERS
+from .streaming import copy_from_storage, open_storage_writer, storage_key
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PREFIX = 'exports'
+# Documentos lidos por vez (conteúdo + anexos): a memória não depende do tamanho do setor.
+CHUNK_SIZE = 100
+# O progresso é gravado a cada tantos documentos.
+PROGRESS_EVERY = 25
+MISSING_FILES_NAME = 'arquivos-ausentes.txt'
+
+
+def export_documents(export: DocumentExport) -> QuerySet:
+    """
+    Documentos da exportação: o documento pedido ou os documentos ativos do setor que
+    o solicitante pode ver (os exclusivos só se ele estiver entre os usuários exclusivos).
+    """
+    if export.document_id is not None: # type: ignore
+        return Document.objects.filter(pk=export.document_id) # type: ignore
+
+    return Document.objects.filter(
+        sector_id=export.sector_id, # type: ignore
+        is_active=True
+    ).exclude(
+        Q(classification__privacity_id__in=privacity_ids_for(PRIVACITY_EXCLUSIVE)) &
+        ~Q(classification__exclusive_users=export.requested_by_id) # type: ignore
+    )
+
+
+def archive_name(export: DocumentExport) -> str:
+    return f"{EXPORT_PREFIX}/{export.pk}.zip"
+
+
+def entry_name(title: Optional[str], fallback: str) -> str:
+    return slugify(title or '')[:80] or fallback
+
+
+def write_file(archive: zipfile.ZipFile, file_name: str, arcname: str, missing: List[str]) -> None:
+    """
+    Copia um arquivo do storage para o ZIP em blocos (o arquivo não é carregado inteiro).
+    """
+    try:
+        with archive.open(arcname, 'w', force_zip64=True) as entry:
+            copy_from_storage(file_name, entry)
+    except FileNotFoundError:
+        missing.append(f"{arcname} ({file_name})")
+
+
+def write_document(archive: zipfile.ZipFile, export: DocumentExport, document: Document, missing: List[str]) -> None:
+    """
+    Pasta do documento no ZIP: o conteúdo renderizado, o arquivo original e os anexos ativos.
+    """
+    folder = f"{document.pk}-{entry_name(document.title, 'documento')}"
+    render = RENDERERS[export.format]
+
+    archive.writestr(f"{folder}/{entry_name(document.title, 'documento')}.{export.format}", render(document.title, document.content))
+
+    if not export.include_files:
+        return
+
+    if document.file_url:
+        _, extension = os.path.splitext(document.file_url.name)
+        write_file(archive, document.file_url.name, f"{folder}/original/{entry_name(document.title, 'original')}{extension}", missing)
+
+    for attachment in document.active_attachments: # type: ignore
+        _, extension = os.path.splitext(attachment.file.name)
+        arcname = f"{folder}/anexos/{attachment.pk}-{entry_name(attachment.title, 'anexo')}{extension}"
+        write_file(archive, attachment.file.name, arcname, missing)
+
+
+def run_export(export_id: Any) -> str:
+    """
+    Gera o ZIP da exportação direto no storage (multipart upload no S3), documento a documento.
+
+    Os documentos são lidos em blocos de CHUNK_SIZE e cada arquivo é copiado em blocos:
+    exportações de setores inteiros rodam com memória constante.
+    """
+    # A troca pendente -> em andamento é um UPDATE condicional: só um worker a
+    # consegue, mesmo que a task seja entregue duas vezes ao mesmo tempo.
+    claimed = DocumentExport.objects.filter(
+        pk=export_id, status=DocumentExport.STATUS_PENDING
+    ).update(status=DocumentExport.STATUS_RUNNING)
+    if not claimed:
+        # Já processada ou em processamento por outro worker.
+        return "Skipped"
+
+    export = DocumentExport.objects.get(pk=export_id)
+    queryset = export_documents(export)
+    total = queryset.count()
+    DocumentExport.objects.filter(pk=export.pk).update(total=total)
+
+    documents = queryset.with_content().prefetch_related( # type: ignore
+        Prefetch(
+            'attached_files',
+            queryset=Attached_Files_Document.objects.filter(detached_at__isnull=True).only('pk', 'document_id', 'title', 'file'),
+            to_attr='active_attachments'
+        )
+    ).order_by('pk').iterator(chunk_size=CHUNK_SIZE)
+
+    name = archive_name(export)
+    missing: List[str] = []
+    processed = 0
+
+    try:
+        with open_storage_writer(name) as output:
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for document in documents:
+                    write_document(archive, export, document, missing)
+                    processed += 1
+                    if processed % PROGRESS_EVERY == 0:
+                        DocumentExport.objects.filter(pk=export.pk).update(processed=processed)
+
+                if missing:
+                    archive.writestr(MISSING_FILES_NAME, '\n'.join(missing))
+    except Exception as e:
+        logger.exception("Falha na exportação %s", export.pk)
+        DocumentExport.objects.filter(pk=export.pk).update(
+            status=DocumentExport.STATUS_FAILED,
+            processed=processed,
+            error=str(e)[:2000],
+            finished_at=timezone.now()
+        )
+        return "Failed"
+
+    DocumentExport.objects.filter(pk=export.pk).update(
+        status=DocumentExport.STATUS_COMPLETED,
+        processed=processed,
+        file=name,
+        finished_at=timezone.now()
+    )
+    return "Completed"
+
+
+def download_url(export: DocumentExport, expiration: int = 3600) -> Optional[str]:
+    """
+    URL temporária (presigned) do ZIP; None enquanto a exportação não termina.
+    """
+    if export.status != DocumentExport.STATUS_COMPLETED or not export.file:
+        return None
+
+    key = storage_key(export.file.name)
+    if key is None:
+        return default_storage.url(export.file.name)
+    return generate_presigned_url(key, expiration)
@@ -0,0 +1,343 @@
+import io
+import json
+import zipfile
+import zlib
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+from xml.sax.saxutils import escape as xml_escape
+
+# Mesmo limite do renderer HTML (ver rendering.py).
+MAX_DEPTH = 64
+
+BOLD, ITALIC, UNDERLINE, CODE = 1, 2, 8, 16
+
+
+class Run(NamedTuple):
+    text: str
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+
+
+class Block(NamedTuple):
+    """
+    Bloco de texto do documento: 'paragraph', 'h1'..'h6', 'quote', 'code' ou 'item'
+    (item de lista, com o marcador em 'prefix' e o nível em 'level').
+    """
+    kind: str
+    runs: List[Run]
+    prefix: str = ''
+    level: int = 0
+
+
+def inline_runs(node: Any, depth: int = 0) -> List[Run]:
+    """
+    Trechos de texto de um bloco (texto, quebras de linha e links viram texto corrido).
+    """
+    if not isinstance(node, dict) or depth > MAX_DEPTH:
+        return []
+
+    node_type = node.get('type')
+    if node_type in ('text', 'code-highlight'):
+        text_format = node.get('format') if isinstance(node.get('format'), int) else 0
+        return [Run(str(node.get('text') or ''), bool(text_format & BOLD), bool(text_format & ITALIC), bool(text_format & UNDERLINE))] # type: ignore
+    if node_type == 'linebreak':
+        return [Run('\n')]
+    if node_type == 'tab':
+        return [Run('\t')]
+    if node_type in ('list', 'image', 'video'):
+        # Listas aninhadas viram blocos próprios; mídias não entram no texto.
+        return []
+
+    runs: List[Run] = []
+    for child in node.get('children') or []:
+        runs.extend(inline_runs(child, depth + 1))
+    return runs
+
+
+def list_blocks(node: Dict[str, Any], level: int, depth: int) -> Iterator[Block]:
+    numbered = node.get('listType') == 'number' or node.get('tag') == 'ol'
+    number = node.get('start') if isinstance(node.get('start'), int) else 1
+
+    for item in node.get('children') or []:
+        if not isinstance(item, dict):
+            continue
+
+        runs = inline_runs(item, depth + 1)
+        if runs:
+            if node.get('listType') == 'check':
+                prefix = '[x]' if item.get('checked') else '[ ]'
+            else:
+                prefix = f"{number}." if numbered else '•'
+            yield Block('item', runs, prefix, level)
+            number += 1
+
+        for child in item.get('children') or []:
+            if isinstance(child, dict) and child.get('type') == 'list':
+                yield from list_blocks(child, level + 1, depth + 2)
+
+
+def lexical_blocks(content: Any) -> Iterator[Block]:
+    """
+    Percorre o JSON do editor (Lexical) e produz os blocos de texto, na ordem do documento.
+    Imagens e vídeos não entram na exportação em PDF/DOCX.
+    """
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return
+
+    if not isinstance(content, dict):
+        return
+
+    root = content.get('root', content)
+    for node in (root.get('children') if isinstance(root, dict) else None) or []:
+        if not isinstance(node, dict):
+            continue
+
+        node_type = node.get('type')
+        if node_type == 'list':
+            yield from list_blocks(node, 0, 1)
+        elif node_type == 'table':
+            for row in node.get('children') or []:
+                cells = [''.join(run.text for run in inline_runs(cell, 2)) for cell in (row.get('children') or []) if isinstance(cell, dict)] if isinstance(row, dict) else []
+                yield Block('paragraph', [Run(' | '.join(cells))])
+        elif node_type == 'heading':
+            tag = node.get('tag')
+            yield Block(tag if tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6') else 'h2', inline_runs(node))
+        elif node_type in ('quote', 'code'):
+            yield Block(node_type, inline_runs(node))
+        else:
+            runs = inline_runs(node)
+            if runs or node_type == 'paragraph':
+                yield Block('paragraph', runs)
+
+
+# --- DOCX (Office Open XML, sem dependências) ---
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+# Tamanho da fonte (meios-pontos) por tipo de bloco.
+DOCX_SIZES = {'h1': 36, 'h2': 32, 'h3': 28, 'h4': 26, 'h5': 24, 'h6': 22}
+
+
+def docx_run(run: Run, kind: str) -> str:
+    properties = []
+    if run.bold or kind in DOCX_SIZES:
+        properties.append('<w:b/>')
+    if run.italic or kind == 'quote':
+        properties.append('<w:i/>')
+    if run.underline:
+        properties.append('<w:u w:val="single"/>')
+    if kind == 'code':
+        properties.append('<w:rFonts w:ascii="Courier New" w:hAnsi="Courier New"/>')
+    if kind in DOCX_SIZES:
+        properties.append(f'<w:sz w:val="{DOCX_SIZES[kind]}"/>')
+
+    parts = []
+    for index, line in enumerate(run.text.split('\n')):
+        if index:
+            parts.append('<w:br/>')
+        if line:
+            parts.append(f'<w:t xml:space="preserve">{xml_escape(line)}</w:t>')
+
+    return f"<w:r><w:rPr>{''.join(properties)}</w:rPr>{''.join(parts)}</w:r>"
+
+
+def docx_paragraph(block: Block) -> str:
+    runs = list(block.runs)
+    indent = ''
+    if block.kind == 'item':
+        runs.insert(0, Run(f"{block.prefix} "))
+        indent = f'<w:ind w:left="{360 * (block.level + 1)}"/>'
+    elif block.kind == 'quote':
+        indent = '<w:ind w:left="720"/>'
+
+    return f"<w:p><w:pPr>{indent}</w:pPr>{''.join(docx_run(run, block.kind) for run in runs)}</w:p>"
+
+
+def render_docx(title: str, content: Any) -> bytes:
+    """
+    O documento em DOCX: título e blocos de texto, com negrito/itálico/sublinhado,
+    tamanhos dos títulos e recuo das listas e citações.
+    """
+    blocks = [Block('h1', [Run(title or '')]), *lexical_blocks(content)]
+    body = ''.join(docx_paragraph(block) for block in blocks)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}<w:sectPr><w:pgSz w:w="11906" w:h="16838"/></w:sectPr></w:body>'
+        '</w:document>'
+    )
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml', DOCX_CONTENT_TYPES)
+        docx.writestr('_rels/.rels', DOCX_RELS)
+        docx.writestr('word/document.xml', document)
+
+    return output.getvalue()
+
+
+# --- PDF (fontes padrão do PDF, sem dependências) ---
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842 # A4 em pontos
+MARGIN = 56
+
+# (fonte, tamanho) por tipo de bloco. F1 Helvetica, F2 Helvetica-Bold, F3 Helvetica-Oblique, F4 Courier.
+PDF_FONTS = {
+    'h1': ('F2', 20), 'h2': ('F2', 16), 'h3': ('F2', 14), 'h4': ('F2', 12), 'h5': ('F2', 11), 'h6': ('F2', 11),
+    'quote': ('F3', 11), 'code': ('F4', 10), 'paragraph': ('F1', 11), 'item': ('F1', 11),
+}
+PDF_BASE_FONTS = {'F1': 'Helvetica', 'F2': 'Helvetica-Bold', 'F3': 'Helvetica-Oblique', 'F4': 'Courier'}
+
+# Largura média dos caracteres (em em) usada na quebra de linha.
+CHAR_WIDTH = {'F1': 0.5, 'F2': 0.55, 'F3': 0.5, 'F4': 0.6}
+
+
+def pdf_text(text: str) -> str:
+    """
+    Texto em WinAnsi (cp1252) escapado para uma string literal do PDF.
+    Caracteres fora do cp1252 viram '?'.
+    """
+    encoded = text.encode('cp1252', errors='replace').decode('latin-1')
+    return encoded.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def wrap_line(text: str, max_chars: int) -> List[str]:
+    lines: List[str] = []
+    current = ''
+    for word in text.split(' '):
+        while len(word) > max_chars:
+            if current:
+                lines.append(current)
+                current = ''
+            lines.append(word[:max_chars])
+            word = word[max_chars:]
+
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) > max_chars:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+
+    lines.append(current)
+    return lines
+
+
+def pdf_lines(blocks: List[Block]) -> Iterator[Tuple[str, int, int, str, int]]:
+    """
+    (fonte, tamanho, recuo, texto, espaço antes) de cada linha, já quebrada na largura da página.
+    """
+    for block in blocks:
+        font, size = PDF_FONTS.get(block.kind, PDF_FONTS['paragraph'])
+        indent = 0
+        text = ''.join(run.text for run in block.runs)
+        if block.kind == 'item':
+            indent = 18 * (block.level + 1)
+            text = f"{block.prefix} {text}"
+        elif block.kind == 'quote':
+            indent = 24
+
+        max_chars = max(10, int((PAGE_WIDTH - 2 * MARGIN - indent) / (size * CHAR_WIDTH[font])))
+        spacing = size // 2 if block.kind != 'item' else 2
+
+        first = True
+        for paragraph in text.replace('\t', '    ').split('\n'):
+            for line in wrap_line(paragraph, max_chars):
+                yield font, size, indent, line, spacing if first else 0
+                first = False
+
+
+def render_pdf(title: str, content: Any) -> bytes:
+    """
+    O documento em PDF (A4): título e blocos de texto com as fontes padrão do PDF.
+    A quebra de linha usa uma largura média por caractere (sem métricas das fontes).
+    Negrito/itálico/sublinhado dentro do texto não são mantidos (cada bloco usa uma
+    única fonte) e os limites do formato são informados em FORMAT_LIMITATIONS.
+    """
+    blocks = [Block('h1', [Run(title or '')]), *lexical_blocks(content)]
+
+    pages: List[List[str]] = [[]]
+    y = PAGE_HEIGHT - MARGIN
+    for font, size, indent, line, spacing in pdf_lines(blocks):
+        leading = int(size * 1.4)
+        y -= spacing + leading
+        if y < MARGIN:
+            pages.append([])
+            y = PAGE_HEIGHT - MARGIN - leading
+        pages[-1].append(f"BT /{font} {size} Tf {MARGIN + indent} {y} Td ({pdf_text(line)}) Tj ET")
+
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b'')
+    pages_id = add(b'')
+    font_ids = {
+        name: add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode('ascii'))
+        for name, base in PDF_BASE_FONTS.items()
+    }
+    fonts = ' '.join(f"/{name} {object_id} 0 R" for name, object_id in font_ids.items())
+
+    page_ids = []
+    for commands in pages:
+        stream = zlib.compress('\n'.join(commands).encode('latin-1'))
+        content_id = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> >> /Contents {content_id} 0 R >>".encode('ascii')
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode('ascii')
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{' '.join(f'{page} 0 R' for page in page_ids)}] /Count {len(page_ids)} >>".encode('ascii')
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref))
+
+    return output.getvalue()
+
+
+# Limites de cada formato, devolvidos junto com a exportação para o cliente avisar o usuário.
+FORMAT_LIMITATIONS: Dict[str, List[str]] = {
+    'pdf': [
+        "Negrito, itálico e sublinhado dentro do texto não são mantidos.",
+        "Imagens e vídeos do documento não são incluídos.",
+        "Caracteres fora do Windows-1252 (ex.: emojis e alfabetos não latinos) aparecem como '?'.",
+    ],
+    'docx': [
+        "Imagens e vídeos do documento não são incluídos.",
+    ],
+}
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'docx': render_docx,
+}
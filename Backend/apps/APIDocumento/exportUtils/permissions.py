@@ -0,0 +1,36 @@
+from rest_framework.permissions import BasePermission
+from apps.APISetor.models import Sector, SectorUser
+from apps.APIDocumento.models import Document, DocumentExport
+from apps.APIDocumento.permissions import IsLinkedToDocument
+
+
+class CanExport(BasePermission):
+    """
+    Concede permissão para exportar:
+    - um documento (obj Document): quem pode consultá-lo (IsLinkedToDocument);
+    - um setor (obj Sector): o dono da empresa, o gerente e os membros do setor.
+    """
+    message = "Você não tem permissão para exportar estes documentos."
+
+    def has_object_permission(self, request, view, obj):
+        if isinstance(obj, Document):
+            return IsLinkedToDocument().has_object_permission(request, view, obj)
+
+        if not isinstance(obj, Sector):
+            return False
+
+        return (
+            obj.enterprise.owner == request.user or
+            obj.manager == request.user or
+            SectorUser.objects.filter(user=request.user, sector=obj).exists()
+        )
+
+
+class IsExportOwner(BasePermission):
+    """
+    Só quem pediu a exportação acompanha o progresso e baixa o arquivo.
+    """
+    message = "Você não tem permissão para acessar esta exportação."
+
+    def has_object_permission(self, request, view, obj: DocumentExport):
+        return obj.requested_by_id == request.user.pk # type: ignore
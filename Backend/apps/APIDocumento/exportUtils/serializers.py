@@ -0,0 +1,70 @@
+from typing import List
+from rest_framework import serializers
+from apps.APIDocumento.models import Document, DocumentExport
+from apps.APISetor.models import Sector
+from .engine import download_url
+from .formats import FORMAT_LIMITATIONS
+
+
+class CreateDocumentExportSerializer(serializers.Serializer):
+    """
+    Pedido de exportação: um documento ou um setor inteiro.
+    """
+    document_id = serializers.PrimaryKeyRelatedField(queryset=Document.objects.all(), required=False, allow_null=True)
+    sector_id = serializers.PrimaryKeyRelatedField(queryset=Sector.objects.all(), required=False, allow_null=True)
+    format = serializers.ChoiceField(choices=DocumentExport.format_choices, default='pdf')
+    include_files = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        """
+        Exige exatamente um alvo: documento ou setor.
+        """
+        if bool(data.get('document_id')) == bool(data.get('sector_id')):
+            raise serializers.ValidationError("Informe 'document_id' ou 'sector_id' (apenas um).")
+        return data
+
+
+class DocumentExportSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+    limitations = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DocumentExport
+        fields = [
+            'export_id',
+            'document',
+            'sector',
+            'format',
+            'include_files',
+            'status',
+            'status_display',
+            'total',
+            'processed',
+            'progress',
+            'download_url',
+            'limitations',
+            'error',
+            'created_at',
+            'finished_at',
+        ]
+
+    def get_progress(self, obj: DocumentExport) -> int:
+        """
+        Percentual de documentos já gravados no arquivo.
+        """
+        if obj.status == DocumentExport.STATUS_COMPLETED:
+            return 100
+        if not obj.total:
+            return 0
+        return min(99, obj.processed * 100 // obj.total)
+
+    def get_download_url(self, obj: DocumentExport):
+        return download_url(obj)
+
+    def get_limitations(self, obj: DocumentExport) -> List[str]:
+        """
+        O que o formato escolhido não reproduz do documento (formatação, imagens, caracteres).
+        """
+        return FORMAT_LIMITATIONS.get(obj.format, [])
@@ -0,0 +1,122 @@
+import io
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import boto3
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from apps.core.metrics import instrument_s3_client
+
+# Partes do multipart upload: o S3 exige no mínimo 5 MB (exceto a última).
+PART_SIZE = 8 * 1024 * 1024
+# Arquivos copiados para o ZIP em blocos deste tamanho.
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Arquivo somente-escrita que envia o conteúdo ao S3 em partes (multipart upload).
+
+    A memória usada é de no máximo uma parte (PART_SIZE), qualquer que seja o tamanho final.
+    Não é "seekable": o zipfile grava os tamanhos em data descriptors.
+    """
+
+    def __init__(self, client: Any, bucket: str, key: str, content_type: str = 'application/zip'):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.buffer = bytearray()
+        self.parts: list = []
+        self.position = 0
+        self.upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)['UploadId']
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def write(self, data) -> int: # type: ignore
+        self.buffer.extend(data)
+        self.position += len(data)
+        while len(self.buffer) >= PART_SIZE:
+            self.upload_part(bytes(self.buffer[:PART_SIZE]))
+            del self.buffer[:PART_SIZE]
+        return len(data)
+
+    def upload_part(self, body: bytes) -> None:
+        number = len(self.parts) + 1
+        response = self.client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=body)
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+
+    def complete(self) -> None:
+        if self.buffer or not self.parts:
+            self.upload_part(bytes(self.buffer))
+            self.buffer.clear()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts}
+        )
+
+    def abort(self) -> None:
+        self.buffer.clear()
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+def storage_key(name: str) -> Optional[str]:
+    """
+    Chave no bucket do arquivo 'name' do default_storage (None se o storage não for o S3).
+    """
+    bucket_name = getattr(default_storage, 'bucket_name', None)
+    if not bucket_name:
+        return None
+
+    location = (getattr(default_storage, 'location', '') or '').strip('/')
+    return f"{location}/{name}" if location else name
+
+
+@contextmanager
+def open_storage_writer(name: str, content_type: str = 'application/zip') -> Iterator[Any]:
+    """
+    Arquivo para escrita gravado em 'name' no default_storage ao sair do bloco.
+
+    No S3 o conteúdo é enviado por multipart upload enquanto é escrito (abortado se
+    o bloco falhar). Em outros storages (ex.: testes) ele passa por um arquivo temporário.
+    """
+    key = storage_key(name)
+
+    if key is not None:
+        client = instrument_s3_client(boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_S3_REGION_NAME
+        ))
+        writer = S3MultipartWriter(client, default_storage.bucket_name, key, content_type) # type: ignore
+        try:
+            yield writer
+        except BaseException:
+            writer.abort()
+            raise
+        writer.complete()
+        return
+
+    with tempfile.TemporaryFile() as temporary:
+        yield temporary
+        temporary.seek(0)
+        default_storage.save(name, File(temporary, name=name))
+
+
+def copy_from_storage(name: str, destination: Any) -> None:
+    """
+    Copia o arquivo do default_storage para 'destination' em blocos.
+    """
+    with default_storage.open(name, 'rb') as source:
+        shutil.copyfileobj(source, destination, COPY_CHUNK_SIZE)
@@ -0,0 +1,264 @@
+import io
+import zipfile
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from typing import Dict, Any
+
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorUser
+from apps.APIDocumento.models import Document, DocumentExport, Classification, Classification_Status, Classification_Privacity
+from apps.APIDocumento.exportUtils.engine import run_export
+from apps.APIDocumento.exportUtils.formats import FORMAT_LIMITATIONS, render_docx, render_pdf
+from apps.core.tasks import export_documents_task
+
+User = get_user_model()
+
+
+def lexical(text: str) -> Dict[str, Any]:
+    """Conteúdo do editor (Lexical) com um parágrafo."""
+    return {"root": {"type": "root", "children": [{"type": "paragraph", "children": [{"type": "text", "text": text}]}]}}
+
+
+@pytest.mark.django_db
+class TestDocumentExportAPI:
+    """
+    Suíte de testes da exportação de documentos (/exportar/ e /exportar/<uuid:pk>/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture(autouse=True)
+    def local_export(self, settings, monkeypatch) -> None:
+        """
+        Storage em memória no lugar do S3 e a task executada localmente (sem broker).
+        """
+        settings.STORAGES = {**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+        monkeypatch.setattr(export_documents_task, "delay", lambda *args: export_documents_task.apply(args))
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Setor com um membro, dois documentos visíveis (um com anexo), um exclusivo
+        de outro usuário e um inativo; e um usuário de fora.
+        """
+        owner = User.objects.create_user(username="export_owner", password="pw", email="export_owner@e.com", name="Export Owner")
+        member = User.objects.create_user(username="export_member", password="pw", email="export_member@e.com", name="Export Member")
+        outsider = User.objects.create_user(username="export_outsider", password="pw", email="export_outsider@e.com", name="Export Outsider")
+        enterprise = Enterprise.objects.create(name="Export Corp", owner=owner)
+        sector = Sector.objects.create(name="Export Sector", enterprise=enterprise, manager=owner)
+        SectorUser.objects.create(user=member, sector=sector)
+
+        status, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        private, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+        exclusive, _ = Classification_Privacity.objects.get_or_create(privacity="Exclusivo")
+
+        def create(title: str, privacity, **kwargs) -> Document:
+            return Document.objects.create(
+                title=title,
+                content=lexical(f"Conteúdo de {title}"),
+                creator=owner,
+                sector=sector,
+                classification=Classification.objects.create(classification_status=status, privacity=privacity),
+                **kwargs
+            )
+
+        contract = create("Contrato", private)
+        report = create("Relatorio", private)
+        secret = create("Sigiloso", exclusive)
+        secret.classification.exclusive_users.add(owner) # type: ignore
+        create("Arquivado", private, is_active=False)
+
+        return {"owner": owner, "member": member, "outsider": outsider, "sector": sector, "contract": contract, "report": report}
+
+    # Success
+
+    def test_renderers_produce_valid_files_success(self) -> None:
+        """
+        Testa se o PDF e o DOCX gerados sem dependências têm a estrutura esperada.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        pdf = render_pdf("Título", lexical("Olá (mundo)"))
+        docx = zipfile.ZipFile(io.BytesIO(render_docx("Título", lexical("Olá <mundo>"))))
+
+        assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+        assert "word/document.xml" in docx.namelist()
+        assert "Olá &lt;mundo&gt;" in docx.read("word/document.xml").decode("utf-8")
+
+    def test_export_sector_with_attachments_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se a exportação do setor gera o ZIP com os documentos visíveis ao membro,
+        os anexos ativos e a URL de download ao final.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        contract: Document = scenario_data["contract"]
+        upload = SimpleUploadedFile("assinatura.pdf", b"%PDF-1.4 assinatura", content_type="application/pdf")
+        api_client.force_authenticate(user=scenario_data["owner"])
+        api_client.post(reverse("anexar-arquivo", kwargs={'pk': contract.pk}), {"title": "Assinatura", "file": upload}, format="multipart")
+
+        api_client.force_authenticate(user=scenario_data["member"])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                reverse("exportar-documentos"),
+                {"sector_id": scenario_data["sector"].pk, "format": "docx"},
+                format="json"
+            )
+
+        export_id = response.data['data']['export_id'] # type: ignore
+        progress = api_client.get(reverse("consultar-exportacao", kwargs={'pk': export_id}))
+        export = DocumentExport.objects.get(pk=export_id)
+
+        with default_storage.open(export.file.name) as stored:
+            names = zipfile.ZipFile(io.BytesIO(stored.read())).namelist()
+
+        assert response.status_code == 202 # type: ignore
+        assert progress.data['data']['status'] == DocumentExport.STATUS_COMPLETED # type: ignore
+        assert progress.data['data']['progress'] == 100 # type: ignore
+        assert progress.data['data']['download_url'] # type: ignore
+        assert export.total == export.processed == 2
+        assert f"{contract.pk}-contrato/contrato.docx" in names
+        assert f"{scenario_data['report'].pk}-relatorio/relatorio.docx" in names
+        assert any(name.startswith(f"{contract.pk}-contrato/anexos/") and name.endswith("-assinatura.pdf") for name in names)
+        assert not any("sigiloso" in name or "arquivado" in name for name in names)
+
+    def test_bulk_delete_exported_document_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se um documento já exportado pode ser excluído em lote: a exportação
+        perde a referência ao documento (SET_NULL) e a FK continua válida.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        contract: Document = scenario_data["contract"]
+        api_client.force_authenticate(user=scenario_data["owner"])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            exported = api_client.post(reverse("exportar-documentos"), {"document_id": contract.pk, "format": "pdf"}, format="json")
+
+        response = api_client.post(reverse("operacoes-em-lote-documentos"), {"action": "delete", "documents_id": [contract.pk]}, format="json")
+        # A FK é DEFERRABLE: força a verificação que aconteceria no commit.
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        export = DocumentExport.objects.get(pk=exported.data['data']['export_id']) # type: ignore
+
+        assert response.status_code == 200 # type: ignore
+        assert not Document.objects.filter(pk=contract.pk).exists()
+        assert export.status == DocumentExport.STATUS_COMPLETED
+        assert export.document_id is None # type: ignore
+        assert exported.data['data']['limitations'] == FORMAT_LIMITATIONS['pdf'] # type: ignore
+
+    # Failures
+
+    def test_run_export_already_running_fails(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se uma exportação já em andamento (task entregue duas vezes) não é
+        processada de novo por outro worker.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        export = DocumentExport.objects.create(
+            requested_by=scenario_data["owner"],
+            document=scenario_data["contract"],
+            format="pdf",
+            status=DocumentExport.STATUS_RUNNING
+        )
+
+        result = run_export(export.pk)
+        export.refresh_from_db()
+
+        assert result == "Skipped"
+        assert export.status == DocumentExport.STATUS_RUNNING
+        assert not export.file
+
+    def test_export_sector_by_outsider_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um usuário de fora do setor não consegue exportá-lo.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["outsider"])
+
+        response = api_client.post(reverse("exportar-documentos"), {"sector_id": scenario_data["sector"].pk}, format="json")
+
+        assert response.status_code == 403 # type: ignore
+        assert not DocumentExport.objects.exists()
+
+    def test_export_progress_by_other_user_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se outro usuário não acompanha a exportação (nem recebe o link de download).
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        export = DocumentExport.objects.create(requested_by=scenario_data["owner"], document=scenario_data["contract"])
+        api_client.force_authenticate(user=scenario_data["member"])
+
+        response = api_client.get(reverse("consultar-exportacao", kwargs={'pk': export.pk}))
+
+        assert response.status_code == 403 # type: ignore
+
+    def test_export_without_target_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o pedido sem documento nem setor é recusado.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+
+        response = api_client.post(reverse("exportar-documentos"), {"format": "pdf"}, format="json")
+
+        assert response.status_code == 400 # type: ignore
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import (
+    CreateDocumentExportView,
+    RetrieveDocumentExportView)
+
+export_urlpatterns = [
+    path('exportar/', CreateDocumentExportView.as_view(), name='exportar-documentos'),
+    path('exportar/<uuid:pk>/', RetrieveDocumentExportView.as_view(), name='consultar-exportacao'),
+]
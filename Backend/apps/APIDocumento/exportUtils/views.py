@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView, Response
+
+from apps.APIDocumento.models import Document, DocumentExport
+from apps.APIDocumento.exportUtils.permissions import CanExport, IsExportOwner
+from apps.APIDocumento.exportUtils.serializers import CreateDocumentExportSerializer, DocumentExportSerializer
+from apps.APISetor.models import Sector
+from apps.core.tasks import export_documents_task
+from apps.core.utils import default_response
+
+
+class CreateDocumentExportView(APIView):
+    """
+    Agenda a exportação (PDF/DOCX + arquivos originais e anexos em um ZIP)
+    de um documento ou de um setor inteiro.
+
+    Body:
+        - document_id ou sector_id
+        - format: 'pdf' | 'docx'
+        - include_files: bool
+    """
+    permission_classes = [IsAuthenticated, CanExport]
+
+    def post(self, request) -> HttpResponse:
+        """
+        Cria a exportação e dispara a task; o progresso é consultado em RetrieveDocumentExportView.
+        """
+        serializer = CreateDocumentExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        document = serializer.validated_data.get('document_id')
+        sector = serializer.validated_data.get('sector_id')
+
+        if document is not None:
+            target = get_object_or_404(
+                Document.objects.select_related('sector__enterprise__owner', 'sector__manager', 'classification__privacity'),
+                pk=document.pk
+            )
+        else:
+            target = get_object_or_404(Sector.objects.select_related('enterprise__owner', 'manager'), pk=sector.pk)
+        self.check_object_permissions(request, target)
+
+        export = DocumentExport.objects.create(
+            requested_by=request.user,
+            document=document,
+            sector=sector,
+            format=serializer.validated_data['format'],
+            include_files=serializer.validated_data['include_files'],
+        )
+        export_id = export.pk
+        transaction.on_commit(lambda: export_documents_task.delay(str(export_id)))
+
+        res: HttpResponse = Response()
+        res.status_code = 202
+        res.data = default_response(
+            success=True,
+            message="Exportação recebida e sendo processada.",
+            data=DocumentExportSerializer(export).data
+        )
+        return res
+
+
+class RetrieveDocumentExportView(APIView):
+    """
+    Progresso da exportação; ao terminar, traz a URL temporária de download.
+    """
+    permission_classes = [IsAuthenticated, IsExportOwner]
+
+    def get(self, request, pk) -> HttpResponse:
+        export = get_object_or_404(DocumentExport, pk=pk)
+
+        self.check_object_permissions(request, export)
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(success=True, data=DocumentExportSerializer(export).data)
+        return res
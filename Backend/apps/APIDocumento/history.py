@@ -0,0 +1,217 @@
+import hashlib
+import logging
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Document, DocumentRecordBlob
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TABLE = 'Document_Record'
+PARTITION_PREFIX = f'{HISTORY_TABLE}_'
+
+
+# --- Conteúdo deduplicado (Document_Record_Blob) ---
+
+def store_blob(value: Optional[Union[bytes, memoryview, str]]) -> Optional[str]:
+    """
+    Grava o conteúdo uma única vez e retorna o seu hash SHA-256.
+    Se o mesmo conteúdo já existe (ex.: um save que não mexeu no Yjs), nada é enviado ao banco.
+    """
+    if value is None:
+        return None
+
+    data = value.encode('utf-8') if isinstance(value, str) else bytes(value)
+    digest = hashlib.sha256(data).hexdigest()
+
+    if not DocumentRecordBlob.objects.filter(hash=digest).exists():
+        DocumentRecordBlob.objects.bulk_create(
+            [DocumentRecordBlob(hash=digest, data=data)],
+            ignore_conflicts=True
+        )
+
+    return digest
+
+
+def load_blob(digest: Optional[str]) -> Optional[bytes]:
+    if digest is None:
+        return None
+
+    data = DocumentRecordBlob.objects.filter(hash=digest).values_list('data', flat=True).first()
+    return bytes(data) if data is not None else None
+
+
+def restore_version_blobs(history_record, document: Document) -> Document:
+    """
+    Preenche no documento restaurado o estado Yjs e o HTML daquela versão.
+    (O simple_history preencheria os campos excluídos com os valores atuais.)
+    """
+    document.yjs_state = load_blob(history_record.yjs_state_hash)
+
+    html = load_blob(history_record.html_snapshot_hash)
+    document.html_snapshot = html.decode('utf-8') if html is not None else None
+
+    return document
+
+
+def latest_blob_hashes(document_ids: List[int]) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+    """
+    {document_id: (hash do Yjs, hash do HTML)} da última versão de cada documento, em uma consulta.
+    """
+    return {
+        document_id: (yjs_hash, html_hash)
+        for document_id, yjs_hash, html_hash in Document.history.filter( # type: ignore
+            document_id__in=document_ids
+        ).order_by('document_id', '-history_date', '-history_id').distinct('document_id').values_list(
+            'document_id', 'yjs_state_hash', 'html_snapshot_hash'
+        )
+    }
+
+
+def bulk_create_history(documents: Iterable[Document], history_type: str, user=None, change_reason: Optional[str] = None) -> List:
+    """
+    Grava uma versão para cada documento em um único INSERT (operações em lote).
+
+    Os sinais do simple_history não são disparados. Como as operações em lote não
+    mexem no conteúdo, os hashes do Yjs/HTML são copiados da última versão de cada documento.
+    """
+    documents = list(documents)
+    historical_model = Document.history.model # type: ignore
+
+    latest = latest_blob_hashes([document.pk for document in documents])
+
+    now = timezone.now()
+    records = []
+    for document in documents:
+        yjs_hash, html_hash = latest.get(document.pk, (None, None))
+        records.append(historical_model(
+            history_date=now,
+            history_user=user,
+            history_type=history_type,
+            history_change_reason=change_reason,
+            yjs_state_hash=yjs_hash,
+            html_snapshot_hash=html_hash,
+            **{field.attname: getattr(document, field.attname) for field in historical_model.tracked_fields}
+        ))
+
+    return historical_model.objects.bulk_create(records)
+
+
+# --- Partições mensais de Document_Record ---
+
+def month_partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def list_history_partitions() -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            ORDER BY child.relname
+            """,
+            [f'"{HISTORY_TABLE}"']
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_history_partitions(months_ahead: int = 3) -> List[str]:
+    """
+    Cria as partições do mês atual e dos próximos meses, se ainda não existirem.
+    Retorna os nomes das partições criadas.
+    """
+    existing = set(list_history_partitions())
+    current = timezone.localdate().replace(day=1)
+    created = []
+
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = month_partition_name(month)
+        if name in existing:
+            continue
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE TABLE "{name}" PARTITION OF "{HISTORY_TABLE}" '
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                )
+        except Exception as e:
+            # Ex.: a partição padrão já recebeu linhas deste intervalo.
+            logger.error("Não foi possível criar a partição %s: %s", name, e)
+            continue
+
+        created.append(name)
+
+    return created
+
+
+def expired_history_partitions(cutoff: date) -> List[str]:
+    """
+    Partições mensais inteiramente anteriores à data de corte.
+    """
+    cutoff_month = cutoff.replace(day=1)
+    expired = []
+
+    for name in list_history_partitions():
+        suffix = name[len(PARTITION_PREFIX):]
+        try:
+            year, month = (int(part) for part in suffix.split('_'))
+        except ValueError:
+            continue # partição padrão
+
+        if date(year, month, 1) < cutoff_month:
+            expired.append(name)
+
+    return expired
+
+
+def drop_history_partitions(names: List[str]) -> None:
+    with transaction.atomic(), connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'ALTER TABLE "{HISTORY_TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+
+
+def delete_default_partition_rows(cutoff: date) -> int:
+    """
+    Linhas antigas que caíram na partição padrão (fora das partições mensais).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{PARTITION_PREFIX}default" WHERE "history_date" < %s', [cutoff])
+        return cursor.rowcount
+
+
+def delete_orphan_blobs() -> int:
+    """
+    Remove os conteúdos que nenhuma versão referencia mais.
+    Conteúdos do último dia ficam: a versão que os usa pode ainda não ter sido commitada.
+    Um NOT EXISTS por coluna de hash, cada um sobre o seu índice (doc_record_yjs_hash_idx,
+    doc_record_html_hash_idx) em todas as partições; um OR entre as colunas não usaria nenhum.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM "Document_Record_Blob" blob
+            WHERE blob."date_created_at_document_record_blob" < now() - interval '1 day'
+            AND NOT EXISTS (
+                SELECT 1 FROM "{HISTORY_TABLE}" record
+                WHERE record."yjs_state_hash_document_record" = blob."PK_hash_document_record_blob"
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM "{HISTORY_TABLE}" record
+                WHERE record."html_snapshot_hash_document_record" = blob."PK_hash_document_record_blob"
+            )
+            """
+        )
+        return cursor.rowcount
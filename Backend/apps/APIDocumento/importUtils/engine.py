@@ -0,0 +1,317 @@
+import logging
+from collections import Counter
+from typing import Any, Dict, List
+
+from celery import chord, group
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from apps.APIAudit.models import AuditLog
+from apps.APIDashboard.utils.activity_feed import drop_enterprise_feeds
+from apps.APIDashboard.utils.rollups import apply_sector_deltas, classification_deltas, increment_contributor
+from apps.APIDocumento.blobs import release_blobs, store_upload
+from apps.APIDocumento.bulk_operations import DocumentCategory, chunked
+from apps.APIDocumento.history import bulk_create_history
+from apps.APIDocumento.models import Category, Classification, Classification_Status, Document, ImportItem, ImportJob
+from apps.APIDocumento.reference_data import (
+    PRIVACITY_EXCLUSIVE,
+    STATUS_IN_PROGRESS,
+    privacity_id_for,
+    privacity_label_for,
+    status_id_for)
+
+logger = logging.getLogger(__name__)
+
+# Itens criados por transação: classificações, documentos, categorias e histórico vão em um INSERT cada.
+BATCH_SIZE = 500
+MISSING_FILE_ERROR = "Arquivo não enviado."
+
+ClassificationExclusiveUser = Classification.exclusive_users.through
+
+
+# --- Manifesto e envio dos arquivos ---
+
+def add_items(job: ImportJob, entries: List[Dict[str, Any]]) -> int:
+    """
+    Acrescenta os itens do manifesto ao job (um INSERT por lote).
+    A posição segue a ordem do manifesto, continuando a partir dos itens já existentes.
+    """
+    start = job.total
+    ImportItem.objects.bulk_create([
+        ImportItem(
+            job=job,
+            position=start + index,
+            filename=entry['filename'],
+            title=entry.get('title') or entry['filename'],
+            privacity_id=entry.get('privacity'),
+            categories=entry.get('categories'),
+            exclusive_users=entry.get('users_exclusive_access'),
+        ) for index, entry in enumerate(entries)
+    ], batch_size=BATCH_SIZE)
+
+    ImportJob.objects.filter(pk=job.pk).update(total=F('total') + len(entries))
+    job.refresh_from_db(fields=['total'])
+    return len(entries)
+
+
+def attach_files(job: ImportJob, files: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Associa os arquivos enviados aos itens do manifesto pelo nome do arquivo.
+
+    Cada arquivo vira (ou reaproveita) um blob; o item guarda a referência até o documento ser criado.
+
+    Returns:
+        List[Dict[str, Any]]: Uma entrada por arquivo: 'filename', 'status' ('uploaded' | 'ignored') e 'error'.
+    """
+    items = {
+        item.filename: item.pk
+        for item in ImportItem.objects.filter(job=job, filename__in=[file.name for file in files]).only('pk', 'filename')
+    }
+
+    results = []
+    for file in files:
+        item_id = items.get(file.name)
+        if item_id is None:
+            results.append({'filename': file.name, 'status': 'ignored', 'error': "Arquivo fora do manifesto."})
+            continue
+
+        with transaction.atomic():
+            # A trava impede que dois envios do mesmo arquivo gerem duas referências ao blob.
+            item = ImportItem.objects.select_for_update(of=('self',)).filter(
+                pk=item_id,
+                status=ImportItem.STATUS_WAITING,
+                job__status=ImportJob.STATUS_UPLOADING
+            ).first()
+            if item is None:
+                results.append({'filename': file.name, 'status': 'ignored', 'error': "Arquivo já enviado."})
+                continue
+
+            blob = store_upload(file)
+            ImportItem.objects.filter(pk=item.pk).update(blob=blob, status=ImportItem.STATUS_UPLOADED)
+
+        results.append({'filename': file.name, 'status': 'uploaded', 'error': ''})
+
+    return results
+
+
+# --- Processamento ---
+
+def create_batch(job: ImportJob, item_ids: List[int], status_id: int) -> List[Document]:
+    """
+    Cria as classificações e os documentos de um lote de itens em uma transação.
+
+    bulk_create não dispara sinais: o histórico, a auditoria das classificações e os
+    consolidados do setor são gravados aqui, por lote.
+    """
+    user = job.requested_by
+
+    with transaction.atomic():
+        items = list(
+            ImportItem.objects.select_for_update(of=('self',)).select_related('blob')
+            .filter(pk__in=item_ids, status=ImportItem.STATUS_UPLOADED).order_by('position')
+        )
+        if not items:
+            return []
+
+        privacity_ids = [item.privacity_id or job.privacity_id for item in items] # type: ignore
+        classifications = Classification.objects.bulk_create([
+            Classification(classification_status_id=status_id, privacity_id=privacity_id, reviewer=None, is_reviewed=False)
+            for privacity_id in privacity_ids
+        ])
+
+        exclusive_id = privacity_id_for(PRIVACITY_EXCLUSIVE)
+        exclusive_rows = []
+        for item, classification, privacity_id in zip(items, classifications, privacity_ids):
+            if privacity_id != exclusive_id:
+                continue
+            # Como na criação individual, o criador também tem acesso ao documento exclusivo.
+            users = {*(item.exclusive_users if item.exclusive_users is not None else job.exclusive_users), user.pk}
+            exclusive_rows.extend(ClassificationExclusiveUser(classification_id=classification.pk, user_id=user_id) for user_id in users)
+        ClassificationExclusiveUser.objects.bulk_create(exclusive_rows, ignore_conflicts=True)
+
+        documents = Document.objects.bulk_create([
+            Document(
+                title=item.title,
+                file_blob=item.blob,
+                file_url=item.blob.file.name, # type: ignore
+                # Conteúdo já enviado antes: a miniatura é reaproveitada.
+                thumbnail_path=item.blob.thumbnail.name or None, # type: ignore
+                creator=user,
+                sector_id=job.sector_id, # type: ignore
+                classification=classification,
+            ) for item, classification in zip(items, classifications)
+        ])
+
+        # Categorias removidas depois do manifesto são ignoradas.
+        item_categories = [item.categories if item.categories is not None else job.categories for item in items]
+        existing = set(Category.objects.filter(
+            pk__in={category_id for categories in item_categories for category_id in categories}
+        ).values_list('pk', flat=True))
+        DocumentCategory.objects.bulk_create([
+            DocumentCategory(document_id=document.pk, category_id=category_id)
+            for document, categories in zip(documents, item_categories)
+            for category_id in set(categories) if category_id in existing
+        ], ignore_conflicts=True)
+
+        bulk_create_history(documents, '+', user)
+
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                actor=user,
+                action='+',
+                target_model='Classification',
+                target_id=classification.pk,
+                target_str='Importação em lote',
+                changes={'new_state': {
+                    'classification_status': status_id,
+                    'privacity': classification.privacity_id, # type: ignore
+                    'is_reviewed': False,
+                }}
+            ) for classification in classifications
+        ], batch_size=BATCH_SIZE)
+
+        deltas: Counter = Counter({'documents_delta': len(documents)})
+        for privacity_id in privacity_ids:
+            deltas.update(classification_deltas(STATUS_IN_PROGRESS, privacity_label_for(privacity_id)))
+        apply_sector_deltas(job.sector_id, timezone.localdate(), dict(deltas)) # type: ignore
+        increment_contributor(job.sector_id, user.pk, len(documents)) # type: ignore
+
+        # A referência ao blob passa do item para o documento.
+        for item, document in zip(items, documents):
+            item.document = document
+            item.blob = None
+            item.status = ImportItem.STATUS_CREATED
+        ImportItem.objects.bulk_update(items, ['document', 'blob', 'status'], batch_size=BATCH_SIZE)
+
+    return documents
+
+
+def fail_items(item_ids: List[int], error: str) -> int:
+    """
+    Marca os itens do lote como falhos e libera os blobs que eles seguravam.
+    """
+    with transaction.atomic():
+        items = list(
+            ImportItem.objects.select_for_update().filter(pk__in=item_ids, status=ImportItem.STATUS_UPLOADED)
+            .values_list('pk', 'blob_id')
+        )
+        release_blobs(blob_id for _, blob_id in items)
+        ImportItem.objects.filter(pk__in=[pk for pk, _ in items]).update(
+            status=ImportItem.STATUS_FAILED,
+            blob=None,
+            error=error[:500]
+        )
+    return len(items)
+
+
+def enqueue_renditions(job_id: Any, documents: List[Document]) -> None:
+    """
+    Miniaturas dos documentos do lote em um chord: um process_media_asset por documento
+    e, ao fim do grupo, o progresso do job é atualizado.
+    """
+    from apps.core.tasks import finish_import_renditions_task, process_media_asset
+
+    document_ids = [document.pk for document in documents if not document.thumbnail_path]
+    if not document_ids:
+        return
+
+    ImportJob.objects.filter(pk=job_id).update(renditions_total=F('renditions_total') + len(document_ids))
+    chord(
+        group(process_media_asset.si(document_id) for document_id in document_ids),
+        finish_import_renditions_task.si(str(job_id), len(document_ids))
+    ).apply_async()
+
+
+def finish_renditions(job_id: Any, count: int) -> None:
+    ImportJob.objects.filter(pk=job_id).update(renditions_done=F('renditions_done') + count)
+
+
+def run_import(job_id: Any) -> str:
+    """
+    Cria os documentos do job em lotes de BATCH_SIZE, cada lote em uma transação.
+
+    Um lote que falha marca os seus itens como falhos e o processamento segue com o próximo;
+    itens sem arquivo são marcados como falhos antes de começar.
+    """
+    if not ImportJob.objects.filter(pk=job_id, status=ImportJob.STATUS_PENDING).update(status=ImportJob.STATUS_RUNNING):
+        # Já processado (ex.: a task foi entregue duas vezes).
+        return "Skipped"
+
+    job = ImportJob.objects.select_related('requested_by', 'sector').get(pk=job_id)
+    failed = ImportItem.objects.filter(job=job, status=ImportItem.STATUS_WAITING).update(
+        status=ImportItem.STATUS_FAILED,
+        error=MISSING_FILE_ERROR
+    )
+    created = 0
+
+    try:
+        status_id = status_id_for(STATUS_IN_PROGRESS)
+        if status_id is None:
+            raise Classification_Status.DoesNotExist(f"Status padrão '{STATUS_IN_PROGRESS}' não encontrado.")
+
+        item_ids = list(
+            ImportItem.objects.filter(job=job, status=ImportItem.STATUS_UPLOADED).order_by('position').values_list('pk', flat=True)
+        )
+        for chunk in chunked(item_ids, BATCH_SIZE):
+            try:
+                documents = create_batch(job, chunk, status_id)
+            except Exception as e:
+                logger.exception("Falha em um lote da importação %s", job.pk)
+                failed += fail_items(chunk, str(e))
+            else:
+                created += len(documents)
+                enqueue_renditions(job.pk, documents)
+
+            ImportJob.objects.filter(pk=job.pk).update(created=created, failed=failed)
+    except Exception as e:
+        logger.exception("Falha na importação %s", job.pk)
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.STATUS_FAILED,
+            created=created,
+            failed=failed,
+            error=str(e)[:2000],
+            finished_at=timezone.now()
+        )
+        return "Failed"
+    finally:
+        if created:
+            drop_enterprise_feeds([job.sector.enterprise_id]) # type: ignore
+
+    ImportJob.objects.filter(pk=job.pk).update(
+        status=ImportJob.STATUS_COMPLETED,
+        created=created,
+        failed=failed,
+        finished_at=timezone.now()
+    )
+    return "Completed"
+
+
+def start_import(job: ImportJob) -> bool:
+    """
+    Fecha o envio de arquivos e coloca o job na fila (False se ele já saiu da etapa de envio).
+    """
+    from apps.core.tasks import import_documents_task
+
+    if not ImportJob.objects.filter(pk=job.pk, status=ImportJob.STATUS_UPLOADING).update(status=ImportJob.STATUS_PENDING):
+        return False
+
+    job_id = str(job.pk)
+    transaction.on_commit(lambda: import_documents_task.delay(job_id))
+    job.status = ImportJob.STATUS_PENDING
+    return True
+
+
+def items_summary(job: ImportJob) -> Dict[str, int]:
+    """
+    Quantidade de itens em cada estado (uma consulta agregada).
+    """
+    counts = dict(
+        ImportItem.objects.filter(job=job).order_by().values('status').annotate(total=Count('pk')).values_list('status', 'total')
+    )
+    return {label: counts.get(code, 0) for code, label in (
+        (ImportItem.STATUS_WAITING, 'waiting'),
+        (ImportItem.STATUS_UPLOADED, 'uploaded'),
+        (ImportItem.STATUS_CREATED, 'created'),
+        (ImportItem.STATUS_FAILED, 'failed'),
+    )}
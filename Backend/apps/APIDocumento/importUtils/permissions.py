@@ -0,0 +1,31 @@
+from rest_framework.permissions import BasePermission
+from apps.APISetor.models import Sector, SectorUser
+from apps.APIDocumento.models import ImportJob
+
+
+class CanImportToSector(BasePermission):
+    """
+    Concede permissão para importar documentos no setor (obj Sector):
+    o dono da empresa, o gerente e os membros do setor (as mesmas regras da criação de documentos).
+    """
+    message = "Você não tem permissão para criar documentos neste setor."
+
+    def has_object_permission(self, request, view, obj):
+        if not isinstance(obj, Sector):
+            return False
+
+        return (
+            obj.enterprise.owner == request.user or
+            obj.manager == request.user or
+            SectorUser.objects.filter(user=request.user, sector=obj).exists()
+        )
+
+
+class IsImportOwner(BasePermission):
+    """
+    Só quem criou a importação envia os arquivos, inicia o processamento e acompanha o progresso.
+    """
+    message = "Você não tem permissão para acessar esta importação."
+
+    def has_object_permission(self, request, view, obj: ImportJob):
+        return obj.requested_by_id == request.user.pk # type: ignore
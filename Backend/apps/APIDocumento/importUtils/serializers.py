@@ -0,0 +1,149 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+from apps.APIDocumento.models import Category, ImportItem, ImportJob
+from apps.APIDocumento.reference_data import PRIVACITY_EXCLUSIVE, privacity_id_for, privacity_label_for
+from apps.APISetor.models import Sector
+
+User = get_user_model()
+
+# Itens aceitos por requisição; manifestos maiores são enviados em partes (/itens/).
+MAX_MANIFEST_ITEMS = 5000
+
+
+def validate_privacity(value):
+    """
+    Privacidade resolvida pelo registro de referência: sem uma consulta por item do manifesto.
+    """
+    if value is not None and privacity_label_for(value) is None:
+        raise serializers.ValidationError(f'Pk inválido "{value}" - objeto não existe.')
+    return value
+
+
+class ImportManifestItemSerializer(serializers.Serializer):
+    """
+    Um arquivo do manifesto. Categorias, privacidade e usuários exclusivos
+    omitidos herdam os padrões do job.
+    """
+    filename = serializers.CharField(max_length=255)
+    title = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    privacity = serializers.IntegerField(required=False, allow_null=True, validators=[validate_privacity])
+    categories = serializers.ListField(child=serializers.IntegerField(), required=False, allow_null=True)
+    users_exclusive_access = serializers.ListField(child=serializers.IntegerField(), required=False, allow_null=True)
+
+
+class ImportItemsSerializer(serializers.Serializer):
+    """
+    Itens do manifesto. Ao acrescentar itens, o contexto traz o 'job' (setor e padrões);
+    na criação eles vêm no próprio corpo. Categorias e usuários são validados com poucas consultas.
+    """
+    items = serializers.ListField(child=ImportManifestItemSerializer(), min_length=1, max_length=MAX_MANIFEST_ITEMS)
+
+    def validate_items(self, items):
+        filenames = [item['filename'] for item in items]
+        if len(set(filenames)) != len(filenames):
+            raise serializers.ValidationError("O manifesto tem nomes de arquivo repetidos.")
+
+        job = self.context.get('job')
+        if job is not None and ImportItem.objects.filter(job=job, filename__in=filenames).exists():
+            raise serializers.ValidationError("Um ou mais arquivos já estão no manifesto desta importação.")
+
+        return items
+
+    def validate(self, data):
+        """
+        Categorias da empresa do setor e usuários existentes, checados de uma vez para todo o manifesto.
+        """
+        job = self.context.get('job')
+        sector = job.sector if job is not None else data['sector_id']
+        default_privacity = job.privacity_id if job is not None else data['privacity_id']
+        exclusive_id = privacity_id_for(PRIVACITY_EXCLUSIVE)
+        default_categories = job.categories if job is not None else data.get('categories', [])
+        default_users = job.exclusive_users if job is not None else data.get('users_exclusive_access', [])
+
+        category_ids = set(default_categories)
+        user_ids = set(default_users)
+        for item in data['items']:
+            category_ids.update(item.get('categories') or [])
+            user_ids.update(item.get('users_exclusive_access') or [])
+
+            privacity = item.get('privacity') or default_privacity
+            users = item.get('users_exclusive_access')
+            if privacity == exclusive_id and not (users if users is not None else default_users):
+                raise serializers.ValidationError({
+                    "users_exclusive_access": f"Para documentos exclusivos, é necessário fornecer a lista de usuários ({item['filename']})."
+                })
+
+        if category_ids and Category.objects.filter(
+            pk__in=category_ids,
+            category_enterprise_id=sector.enterprise_id
+        ).count() != len(category_ids):
+            raise serializers.ValidationError({"categories": "Uma ou mais categorias não pertencem à empresa do setor."})
+
+        if user_ids and User.objects.filter(pk__in=user_ids).count() != len(user_ids):
+            raise serializers.ValidationError({"users_exclusive_access": "Um ou mais IDs de usuário fornecidos são inválidos."})
+
+        return data
+
+
+class CreateImportJobSerializer(ImportItemsSerializer):
+    """
+    Manifesto da importação: o setor, os padrões dos documentos e os arquivos.
+    """
+    sector_id = serializers.PrimaryKeyRelatedField(queryset=Sector.objects.select_related('enterprise'))
+    privacity_id = serializers.IntegerField(validators=[validate_privacity])
+    categories = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    users_exclusive_access = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+
+class ImportItemSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ImportItem
+        fields = [
+            'item_id',
+            'position',
+            'filename',
+            'title',
+            'status',
+            'status_display',
+            'document',
+            'error',
+        ]
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'import_id',
+            'sector',
+            'privacity',
+            'categories',
+            'exclusive_users',
+            'status',
+            'status_display',
+            'total',
+            'created',
+            'failed',
+            'progress',
+            'renditions_total',
+            'renditions_done',
+            'error',
+            'created_at',
+            'finished_at',
+        ]
+
+    def get_progress(self, obj: ImportJob) -> int:
+        """
+        Percentual de itens já resolvidos (documento criado ou falha).
+        """
+        if obj.status == ImportJob.STATUS_COMPLETED:
+            return 100
+        if not obj.total:
+            return 0
+        return min(99, (obj.created + obj.failed) * 100 // obj.total)
@@ -0,0 +1,273 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from typing import Dict, Any, List
+
+from apps.APIDashboard.models import SectorDailyRollup
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorUser
+from apps.APIDocumento.models import Category, Document, FileBlob, ImportItem, ImportJob, Classification_Status, Classification_Privacity
+from apps.APIDocumento.importUtils import engine
+from apps.core.tasks import import_documents_task
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestImportJobAPI:
+    """
+    Suíte de testes da importação em lote (/importar/lote/...).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def renditions(self, settings, monkeypatch) -> List[List[int]]:
+        """
+        Storage em memória no lugar do S3, a task executada localmente (sem broker)
+        e os chords de miniaturas registrados em vez de enviados ao Celery.
+        """
+        settings.STORAGES = {**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+        monkeypatch.setattr(import_documents_task, "delay", lambda *args: import_documents_task.apply(args))
+
+        batches: List[List[int]] = []
+        monkeypatch.setattr(engine, "enqueue_renditions", lambda job_id, documents: batches.append([document.pk for document in documents]))
+        return batches
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Setor com um membro, categorias da empresa, uma categoria de outra empresa e um usuário de fora.
+        """
+        owner = User.objects.create_user(username="import_owner", password="pw", email="import_owner@e.com", name="Import Owner")
+        member = User.objects.create_user(username="import_member", password="pw", email="import_member@e.com", name="Import Member")
+        outsider = User.objects.create_user(username="import_outsider", password="pw", email="import_outsider@e.com", name="Import Outsider")
+        enterprise = Enterprise.objects.create(name="Import Corp", owner=owner)
+        other_enterprise = Enterprise.objects.create(name="Other Corp", owner=outsider)
+        sector = Sector.objects.create(name="Import Sector", enterprise=enterprise, manager=owner)
+        SectorUser.objects.create(user=member, sector=sector)
+
+        Classification_Status.objects.get_or_create(status="Em andamento")
+        private, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        contracts = Category.objects.create(category="Contratos", category_enterprise=enterprise, category_sector=sector)
+        invoices = Category.objects.create(category="Notas", category_enterprise=enterprise, category_sector=sector)
+        foreign = Category.objects.create(category="Externa", category_enterprise=other_enterprise)
+
+        return {
+            "owner": owner, "member": member, "outsider": outsider, "sector": sector, "private": private,
+            "contracts": contracts, "invoices": invoices, "foreign": foreign,
+        }
+
+    def create_job(self, api_client: APIClient, scenario_data: Dict[str, Any], items: List[Dict[str, Any]]):
+        return api_client.post(
+            reverse("importar-lote"),
+            {
+                "sector_id": scenario_data["sector"].pk,
+                "privacity_id": scenario_data["private"].pk,
+                "categories": [scenario_data["contracts"].pk],
+                "items": items,
+            },
+            format="json"
+        )
+
+    def upload(self, api_client: APIClient, job_id: str, files: Dict[str, bytes]):
+        return api_client.post(
+            reverse("enviar-arquivos-importacao", kwargs={'pk': job_id}),
+            {"files": [SimpleUploadedFile(name, content, content_type="application/pdf") for name, content in files.items()]},
+            format="multipart"
+        )
+
+    # Success
+
+    def test_import_folder_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], renditions: List[List[int]], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa o fluxo completo: manifesto, envio dos arquivos e processamento. Os documentos
+        são criados com as categorias do manifesto, o item sem arquivo falha e os consolidados
+        do setor contam os novos documentos.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            renditions (List[List[int]]) : lotes de miniaturas agendados
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["member"])
+        created = self.create_job(api_client, scenario_data, [
+            {"filename": "contrato.pdf", "title": "Contrato de locação"},
+            {"filename": "nota.pdf", "categories": [scenario_data["invoices"].pk]},
+            {"filename": "ausente.pdf"},
+        ])
+        job_id = created.data['data']['import_id'] # type: ignore
+
+        uploaded = self.upload(api_client, job_id, {"contrato.pdf": b"%PDF-1.4 contrato", "nota.pdf": b"%PDF-1.4 nota", "extra.pdf": b"%PDF-1.4 extra"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            started = api_client.post(reverse("processar-importacao", kwargs={'pk': job_id}))
+
+        progress = api_client.get(reverse("consultar-importacao", kwargs={'pk': job_id}), {"status": ImportItem.STATUS_FAILED})
+        contract = Document.objects.get(title="Contrato de locação")
+        invoice = Document.objects.get(title="nota.pdf")
+
+        assert created.status_code == 201 # type: ignore
+        assert [entry["status"] for entry in uploaded.data['data']['files']] == ["uploaded", "uploaded", "ignored"] # type: ignore
+        assert started.status_code == 202 # type: ignore
+        assert progress.data['data']['status'] == ImportJob.STATUS_COMPLETED # type: ignore
+        assert progress.data['data']['created'] == 2 and progress.data['data']['failed'] == 1 # type: ignore
+        assert [item["filename"] for item in progress.data['data']['items']['results']] == ["ausente.pdf"] # type: ignore
+        assert list(contract.categories.values_list('pk', flat=True)) == [scenario_data["contracts"].pk]
+        assert list(invoice.categories.values_list('pk', flat=True)) == [scenario_data["invoices"].pk]
+        assert contract.creator == scenario_data["member"] and contract.sector == scenario_data["sector"]
+        assert contract.classification.classification_status.status == "Em andamento" # type: ignore
+        assert contract.history.filter(history_type='+').count() == 1 # type: ignore
+        assert sum(SectorDailyRollup.objects.filter(sector=scenario_data["sector"]).values_list('documents_delta', flat=True)) == 2
+        assert sorted(renditions[0]) == sorted([contract.pk, invoice.pk])
+        assert not ImportItem.objects.filter(blob__isnull=False).exists()
+
+    def test_import_duplicate_content_shares_blob_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], renditions: List[List[int]], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se arquivos com o mesmo conteúdo viram documentos que apontam para um único blob.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            renditions (List[List[int]]) : lotes de miniaturas agendados
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        job_id = self.create_job(api_client, scenario_data, [{"filename": "a.pdf"}, {"filename": "b.pdf"}]).data['data']['import_id'] # type: ignore
+        self.upload(api_client, job_id, {"a.pdf": b"%PDF-1.4 igual", "b.pdf": b"%PDF-1.4 igual"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(reverse("processar-importacao", kwargs={'pk': job_id}))
+
+        blob = FileBlob.objects.get()
+
+        assert blob.ref_count == 2
+        assert Document.objects.filter(file_blob=blob).count() == 2
+
+    def test_bulk_delete_imported_document_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], renditions: List[List[int]], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se um documento importado pode ser excluído em lote: o item da importação
+        perde a referência ao documento (SET_NULL) e a FK continua válida.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            renditions (List[List[int]]) : lotes de miniaturas agendados
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        job_id = self.create_job(api_client, scenario_data, [{"filename": "contrato.pdf"}]).data['data']['import_id'] # type: ignore
+        self.upload(api_client, job_id, {"contrato.pdf": b"%PDF-1.4 contrato"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(reverse("processar-importacao", kwargs={'pk': job_id}))
+
+        item = ImportItem.objects.get(job_id=job_id)
+        document_id = item.document_id # type: ignore
+
+        response = api_client.post(reverse("operacoes-em-lote-documentos"), {"action": "delete", "documents_id": [document_id]}, format="json")
+        # A FK é DEFERRABLE: força a verificação que aconteceria no commit.
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        item.refresh_from_db()
+
+        assert response.status_code == 200 # type: ignore
+        assert response.data['data']['affected'] == 1 # type: ignore
+        assert not Document.objects.filter(pk=document_id).exists()
+        assert item.document_id is None # type: ignore
+
+    # Failures
+
+    def test_import_by_outsider_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um usuário de fora do setor não consegue criar a importação.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["outsider"])
+
+        response = self.create_job(api_client, scenario_data, [{"filename": "a.pdf"}])
+
+        assert response.status_code == 403 # type: ignore
+        assert not ImportJob.objects.exists()
+
+    def test_import_with_foreign_category_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o manifesto com categoria de outra empresa é recusado.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+
+        response = self.create_job(api_client, scenario_data, [{"filename": "a.pdf", "categories": [scenario_data["foreign"].pk]}])
+
+        assert response.status_code == 400 # type: ignore
+        assert not ImportJob.objects.exists()
+
+    def test_upload_after_start_fails(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], renditions: List[List[int]], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se o job já processado recusa novos arquivos e um segundo processamento.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            renditions (List[List[int]]) : lotes de miniaturas agendados
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        job_id = self.create_job(api_client, scenario_data, [{"filename": "a.pdf"}]).data['data']['import_id'] # type: ignore
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(reverse("processar-importacao", kwargs={'pk': job_id}))
+
+        uploaded = self.upload(api_client, job_id, {"a.pdf": b"%PDF-1.4 tarde"})
+        restarted = api_client.post(reverse("processar-importacao", kwargs={'pk': job_id}))
+
+        assert uploaded.status_code == 409 # type: ignore
+        assert restarted.status_code == 409 # type: ignore
+        assert not FileBlob.objects.exists()
@@ -0,0 +1,15 @@
+from django.urls import path
+from .views import (
+    AddImportItemsView,
+    CreateImportJobView,
+    RetrieveImportJobView,
+    StartImportJobView,
+    UploadImportFilesView)
+
+import_urlpatterns = [
+    path('importar/lote/', CreateImportJobView.as_view(), name='importar-lote'),
+    path('importar/lote/<uuid:pk>/', RetrieveImportJobView.as_view(), name='consultar-importacao'),
+    path('importar/lote/<uuid:pk>/itens/', AddImportItemsView.as_view(), name='adicionar-itens-importacao'),
+    path('importar/lote/<uuid:pk>/arquivos/', UploadImportFilesView.as_view(), name='enviar-arquivos-importacao'),
+    path('importar/lote/<uuid:pk>/processar/', StartImportJobView.as_view(), name='processar-importacao'),
+]
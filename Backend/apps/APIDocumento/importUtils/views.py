@@ -0,0 +1,191 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView, Response
+
+from apps.APIDocumento.models import ImportItem, ImportJob
+from apps.APIDocumento.importUtils.engine import add_items, attach_files, items_summary, start_import
+from apps.APIDocumento.importUtils.permissions import CanImportToSector, IsImportOwner
+from apps.APIDocumento.importUtils.serializers import (
+    CreateImportJobSerializer,
+    ImportItemSerializer,
+    ImportItemsSerializer,
+    ImportJobSerializer)
+from apps.core.pagination import DocumentPagination
+from apps.core.utils import default_response
+
+
+def get_job(view: APIView, request, pk) -> ImportJob:
+    job = get_object_or_404(ImportJob.objects.select_related('sector'), pk=pk)
+    view.check_object_permissions(request, job)
+    return job
+
+
+def closed_job_response(job: ImportJob) -> HttpResponse:
+    res: HttpResponse = Response()
+    res.status_code = 409
+    res.data = default_response(
+        success=False,
+        message=f"A importação não aceita mais alterações ({job.get_status_display()})." # type: ignore
+    )
+    return res
+
+
+class CreateImportJobView(APIView):
+    """
+    Cria a importação em lote a partir do manifesto.
+
+    Body:
+        - sector_id, privacity_id
+        - categories, users_exclusive_access: padrões dos documentos (opcionais)
+        - items: [{filename, title?, privacity?, categories?, users_exclusive_access?}]
+    """
+    permission_classes = [IsAuthenticated, CanImportToSector]
+
+    def post(self, request) -> HttpResponse:
+        """
+        Grava o job e os itens; os arquivos são enviados em seguida (/arquivos/).
+        """
+        serializer = CreateImportJobSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        sector = serializer.validated_data['sector_id']
+        self.check_object_permissions(request, sector)
+
+        with transaction.atomic():
+            job = ImportJob.objects.create(
+                requested_by=request.user,
+                sector=sector,
+                privacity_id=serializer.validated_data['privacity_id'],
+                categories=serializer.validated_data['categories'],
+                exclusive_users=serializer.validated_data['users_exclusive_access'],
+            )
+            add_items(job, serializer.validated_data['items'])
+
+        res: HttpResponse = Response()
+        res.status_code = 201
+        res.data = default_response(
+            success=True,
+            message="Importação criada. Envie os arquivos do manifesto.",
+            data=ImportJobSerializer(job).data
+        )
+        return res
+
+
+class AddImportItemsView(APIView):
+    """
+    Acrescenta itens ao manifesto (manifestos maiores que MAX_MANIFEST_ITEMS vão em partes).
+    """
+    permission_classes = [IsAuthenticated, IsImportOwner]
+
+    def post(self, request, pk) -> HttpResponse:
+        job = get_job(self, request, pk)
+        if job.status != ImportJob.STATUS_UPLOADING:
+            return closed_job_response(job)
+
+        serializer = ImportItemsSerializer(data=request.data, context={'job': job})
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            # Trava o job: pedidos simultâneos não repetem posições nem passam do envio para a fila.
+            job = ImportJob.objects.select_for_update().get(pk=job.pk)
+            if job.status != ImportJob.STATUS_UPLOADING:
+                return closed_job_response(job)
+            added = add_items(job, serializer.validated_data['items'])
+
+        res: HttpResponse = Response()
+        res.status_code = 201
+        res.data = default_response(
+            success=True,
+            message=f"{added} itens adicionados ao manifesto.",
+            data=ImportJobSerializer(job).data
+        )
+        return res
+
+
+class UploadImportFilesView(APIView):
+    """
+    Recebe arquivos do manifesto (campo 'files', vários por requisição), associados pelo nome.
+    """
+    permission_classes = [IsAuthenticated, IsImportOwner]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request, pk) -> HttpResponse:
+        job = get_job(self, request, pk)
+        if job.status != ImportJob.STATUS_UPLOADING:
+            return closed_job_response(job)
+
+        files = request.FILES.getlist('files')
+        if not files:
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="Nenhum arquivo enviado")
+            return res
+
+        results = attach_files(job, files)
+        uploaded = sum(1 for result in results if result['status'] == 'uploaded')
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(
+            success=True,
+            message=f"{uploaded} de {len(results)} arquivos recebidos.",
+            data={'files': results, 'items': items_summary(job)}
+        )
+        return res
+
+
+class StartImportJobView(APIView):
+    """
+    Encerra o envio e agenda a criação dos documentos. Itens sem arquivo são marcados como falhos.
+    """
+    permission_classes = [IsAuthenticated, IsImportOwner]
+
+    def post(self, request, pk) -> HttpResponse:
+        job = get_job(self, request, pk)
+
+        with transaction.atomic():
+            if not start_import(job):
+                job.refresh_from_db()
+                return closed_job_response(job)
+
+        res: HttpResponse = Response()
+        res.status_code = 202
+        res.data = default_response(
+            success=True,
+            message="Importação recebida e sendo processada.",
+            data=ImportJobSerializer(job).data
+        )
+        return res
+
+
+class RetrieveImportJobView(APIView):
+    """
+    Progresso da importação e o estado de cada item (paginado; ?status=F filtra os falhos).
+    """
+    permission_classes = [IsAuthenticated, IsImportOwner]
+
+    def get(self, request, pk) -> HttpResponse:
+        job = get_job(self, request, pk)
+
+        items = ImportItem.objects.filter(job=job).order_by('position')
+        status = request.query_params.get('status')
+        if status:
+            items = items.filter(status=status)
+
+        paginator = DocumentPagination()
+        page = paginator.paginate_queryset(items, request, view=self)
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(
+            success=True,
+            data={
+                **ImportJobSerializer(job).data,
+                'items_summary': items_summary(job),
+                'items': paginator.get_paginated_response(ImportItemSerializer(page, many=True).data).data,
+            }
+        )
+        return res
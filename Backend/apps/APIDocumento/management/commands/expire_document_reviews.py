@@ -0,0 +1,50 @@
+"""
+Django management command to apply the sector review policies.
+
+Documents whose last review (or creation, if never reviewed) is older than
+the sector's review window are moved to 'Revisão necessária'. This is the
+same engine run hourly by Celery beat.
+
+Usage:
+    python manage.py expire_document_reviews --dry-run
+    python manage.py expire_document_reviews
+    python manage.py expire_document_reviews --sector 3
+"""
+
+from django.core.management.base import BaseCommand
+from django.core.management import CommandError
+from apps.APIDocumento.classificationUtils.review_expiry import run_review_expiry
+
+
+class Command(BaseCommand):
+    help = 'Moves documents past their sector review window to "Revisão necessária"'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the expired documents, without changing them',
+        )
+        parser.add_argument(
+            '--sector',
+            action='append',
+            type=int,
+            dest='sectors',
+            help='Only apply the policy of the given sector id (may be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            metrics = run_review_expiry(dry_run=options['dry_run'], sector_ids=options['sectors'])
+        except Exception as e:
+            raise CommandError(f'Error applying review policies: {str(e)}')
+
+        if metrics['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No document will be changed'))
+
+        self.stdout.write(self.style.SUCCESS('=== Review Expiry ==='))
+        self.stdout.write(f"Active policies: {metrics['policies']}")
+        self.stdout.write(f"Expired documents: {metrics['expired_documents']}")
+        for sector_id, count in metrics['per_sector'].items():
+            self.stdout.write(f"  - sector {sector_id}: {count}")
+        self.stdout.write(f"Duration: {metrics['duration_ms']} ms")
@@ -0,0 +1,144 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Copia o estado Yjs/HTML das versões existentes para Document_Record_Blob
+# (uma linha por conteúdo distinto) antes de remover as colunas do histórico.
+BACKFILL_BLOBS_SQL = """
+INSERT INTO "Document_Record_Blob" ("PK_hash_document_record_blob", "data_document_record_blob", "date_created_at_document_record_blob")
+SELECT DISTINCT ON (hash) hash, data, now()
+FROM (
+    SELECT encode(sha256("yjs_state_document"), 'hex') AS hash, "yjs_state_document" AS data
+    FROM "Document_Record" WHERE "yjs_state_document" IS NOT NULL
+    UNION ALL
+    SELECT encode(sha256(convert_to("html_snapshot_document", 'UTF8')), 'hex'), convert_to("html_snapshot_document", 'UTF8')
+    FROM "Document_Record" WHERE "html_snapshot_document" IS NOT NULL
+) AS blobs
+ON CONFLICT DO NOTHING;
+
+UPDATE "Document_Record" SET
+    "yjs_state_hash_document_record" = encode(sha256("yjs_state_document"), 'hex'),
+    "html_snapshot_hash_document_record" = encode(sha256(convert_to("html_snapshot_document", 'UTF8')), 'hex')
+WHERE "yjs_state_document" IS NOT NULL OR "html_snapshot_document" IS NOT NULL;
+"""
+
+# Recria Document_Record particionada por mês em history_date.
+# A PK passa a ser (history_id, history_date), exigência do Postgres para
+# tabelas particionadas; os demais índices e FKs são recriados como estavam.
+# Novas partições: apps.core.tasks.create_document_record_partitions_task.
+PARTITION_DOCUMENT_RECORD_SQL = """
+DO $$
+DECLARE
+    index_defs text[];
+    fk_defs text[];
+    definition text;
+    month_start date;
+    last_month date;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = '"Document_Record"'::regclass) THEN
+        RETURN;
+    END IF;
+
+    SELECT coalesce(array_agg(pg_get_indexdef(indexrelid)), '{}') INTO index_defs
+    FROM pg_index WHERE indrelid = '"Document_Record"'::regclass AND NOT indisprimary;
+
+    SELECT coalesce(array_agg(format('ALTER TABLE "Document_Record" ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid))), '{}') INTO fk_defs
+    FROM pg_constraint WHERE conrelid = '"Document_Record"'::regclass AND contype = 'f';
+
+    ALTER TABLE "Document_Record" RENAME TO "Document_Record_old";
+
+    CREATE TABLE "Document_Record" (LIKE "Document_Record_old" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE ("history_date");
+
+    CREATE SEQUENCE "Document_Record_history_id_part_seq" OWNED BY "Document_Record"."history_id";
+    PERFORM setval('"Document_Record_history_id_part_seq"', coalesce(max("history_id"), 0) + 1, false) FROM "Document_Record_old";
+    ALTER TABLE "Document_Record" ALTER COLUMN "history_id" SET DEFAULT nextval('"Document_Record_history_id_part_seq"');
+    ALTER TABLE "Document_Record" ADD PRIMARY KEY ("history_id", "history_date");
+
+    SELECT date_trunc('month', coalesce(min("history_date"), now()))::date INTO month_start FROM "Document_Record_old";
+    last_month := (date_trunc('month', now()) + interval '3 months')::date;
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "Document_Record" FOR VALUES FROM (%L) TO (%L)',
+            'Document_Record_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + interval '1 month')::date
+        );
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    CREATE TABLE "Document_Record_default" PARTITION OF "Document_Record" DEFAULT;
+
+    INSERT INTO "Document_Record" SELECT * FROM "Document_Record_old";
+    DROP TABLE "Document_Record_old";
+
+    FOREACH definition IN ARRAY index_defs || fk_defs LOOP
+        EXECUTE definition;
+    END LOOP;
+END $$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0007_document_html_snapshot_document_yjs_state_and_more'),
+        ('APISetor', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentRecordBlob',
+            fields=[
+                ('hash', models.CharField(db_column='PK_hash_document_record_blob', max_length=64, primary_key=True, serialize=False)),
+                ('data', models.BinaryField(db_column='data_document_record_blob')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='date_created_at_document_record_blob')),
+            ],
+            options={
+                'verbose_name': 'Document Record Blob',
+                'verbose_name_plural': 'Document Record Blobs',
+                'db_table': 'Document_Record_Blob',
+            },
+        ),
+        migrations.AddField(
+            model_name='historicaldocument',
+            name='html_snapshot_hash',
+            field=models.CharField(blank=True, db_column='html_snapshot_hash_document_record', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicaldocument',
+            name='yjs_state_hash',
+            field=models.CharField(blank=True, db_column='yjs_state_hash_document_record', max_length=64, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_BLOBS_SQL, migrations.RunSQL.noop),
+        migrations.RemoveField(
+            model_name='historicaldocument',
+            name='html_snapshot',
+        ),
+        migrations.RemoveField(
+            model_name='historicaldocument',
+            name='search_content',
+        ),
+        migrations.RemoveField(
+            model_name='historicaldocument',
+            name='yjs_state',
+        ),
+        migrations.RunSQL(PARTITION_DOCUMENT_RECORD_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='historicaldocument',
+            index=models.Index(fields=['history_user', 'document_id', '-history_date'], name='doc_record_user_doc_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicaldocument',
+            index=models.Index(fields=['sector', '-history_date'], name='doc_record_sector_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicaldocument',
+            index=models.Index(fields=['sector', 'history_type', 'history_date'], name='doc_record_sector_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicaldocument',
+            index=models.Index(fields=['document_id', '-history_date'], name='doc_record_doc_date_idx'),
+        ),
+    ]
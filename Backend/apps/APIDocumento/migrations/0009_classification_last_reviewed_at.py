@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+# Preenche a data da última revisão com a edição mais recente no log de auditoria.
+BACKFILL_LAST_REVIEWED_AT_SQL = """
+UPDATE "Classification" SET "date_last_reviewed_at_classification" = last_review.timestamp
+FROM (
+    SELECT "target_id_audit" AS classification_id, max("timestamp_audit") AS timestamp
+    FROM "Audit_Log"
+    WHERE "target_audit" = 'Classification' AND "action" = '~'
+    GROUP BY "target_id_audit"
+) AS last_review
+WHERE "Classification"."PK_classification" = last_review.classification_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0008_document_record_storage_policy'),
+        ('APIAudit', '0003_auditlog_target_action_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classification',
+            name='last_reviewed_at',
+            field=models.DateTimeField(blank=True, db_column='date_last_reviewed_at_classification', null=True),
+        ),
+        migrations.RunSQL(BACKFILL_LAST_REVIEWED_AT_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0009_classification_last_reviewed_at'),
+        ('APISetor', '0003_sectorreviewpolicy_expired_until'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classification',
+            index=models.Index(fields=['last_reviewed_at'], name='classification_reviewed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['sector', 'created_at'], name='document_sector_created_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:38
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# Preenche a data de atualização com a versão mais recente do histórico
+# (documentos sem histórico ficam com a data de criação).
+BACKFILL_UPDATED_AT_SQL = """
+UPDATE "Document" SET "date_updated_at_document" = coalesce(last_version.history_date, "Document"."date_created_at_document")
+FROM (
+    SELECT "Document"."PK_document" AS document_id, max("Document_Record"."history_date") AS history_date
+    FROM "Document"
+    LEFT JOIN "Document_Record" ON "Document_Record"."PK_document" = "Document"."PK_document"
+    GROUP BY "Document"."PK_document"
+) AS last_version
+WHERE "Document"."PK_document" = last_version.document_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0010_review_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='revision',
+            field=models.PositiveIntegerField(db_column='revision_document', default=1),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_column='date_updated_at_document', default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunSQL(BACKFILL_UPDATED_AT_SQL, migrations.RunSQL.noop),
+    ]
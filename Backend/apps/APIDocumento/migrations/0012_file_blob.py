@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0011_document_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('digest', models.CharField(db_column='PK_digest_file_blob', max_length=64, primary_key=True, serialize=False)),
+                ('file', models.FileField(db_column='file_file_blob', max_length=255, upload_to='')),
+                ('size', models.PositiveBigIntegerField(db_column='size_file_blob')),
+                ('content_type', models.CharField(blank=True, db_column='content_type_file_blob', default='', max_length=100)),
+                ('ref_count', models.PositiveIntegerField(db_column='ref_count_file_blob', default=0)),
+                ('thumbnail', models.FileField(blank=True, db_column='thumbnail_file_blob', default='', max_length=255, upload_to='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='date_created_at_file_blob')),
+                ('optimized', models.ForeignKey(blank=True, db_column='FK_optimized_file_blob', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='APIDocumento.fileblob')),
+            ],
+            options={
+                'verbose_name': 'File Blob',
+                'verbose_name_plural': 'File Blobs',
+                'db_table': 'File_Blob',
+            },
+        ),
+        migrations.AddField(
+            model_name='attached_files_document',
+            name='blob',
+            field=models.ForeignKey(blank=True, db_column='FK_file_blob_attached_file', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='APIDocumento.fileblob'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='file_blob',
+            field=models.ForeignKey(blank=True, db_column='FK_file_blob_document', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documents', to='APIDocumento.fileblob'),
+        ),
+        migrations.AddIndex(
+            model_name='fileblob',
+            index=models.Index(condition=models.Q(('ref_count', 0)), fields=['ref_count'], name='file_blob_ref_count_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0012_file_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='html_snapshot_at',
+            field=models.DateTimeField(blank=True, db_column='date_html_snapshot_document', null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='html_snapshot_revision',
+            field=models.PositiveIntegerField(blank=True, db_column='html_snapshot_revision_document', null=True),
+        ),
+    ]
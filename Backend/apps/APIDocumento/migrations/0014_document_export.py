@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:54
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0013_document_html_snapshot_revision'),
+        ('APISetor', '0003_sectorreviewpolicy_expired_until'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentExport',
+            fields=[
+                ('export_id', models.UUIDField(db_column='PK_document_export', default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('format', models.CharField(choices=[('pdf', 'PDF'), ('docx', 'DOCX')], db_column='format_document_export', default='pdf', max_length=4)),
+                ('include_files', models.BooleanField(db_column='include_files_document_export', default=True)),
+                ('status', models.CharField(choices=[('P', 'Na fila'), ('R', 'Em andamento'), ('C', 'Concluída'), ('F', 'Falhou')], db_column='status_document_export', default='P', max_length=1)),
+                ('total', models.PositiveIntegerField(db_column='total_document_export', default=0)),
+                ('processed', models.PositiveIntegerField(db_column='processed_document_export', default=0)),
+                ('file', models.FileField(blank=True, db_column='file_document_export', default='', max_length=255, upload_to='')),
+                ('error', models.TextField(blank=True, db_column='error_document_export', default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='date_created_at_document_export')),
+                ('finished_at', models.DateTimeField(blank=True, db_column='date_finished_at_document_export', null=True)),
+                ('document', models.ForeignKey(blank=True, db_column='FK_document_document_export', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='APIDocumento.document')),
+                ('requested_by', models.ForeignKey(db_column='FK_user_document_export', on_delete=django.db.models.deletion.CASCADE, related_name='document_exports', to=settings.AUTH_USER_MODEL)),
+                ('sector', models.ForeignKey(blank=True, db_column='FK_sector_document_export', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='APISetor.sector')),
+            ],
+            options={
+                'verbose_name': 'Document Export',
+                'verbose_name_plural': 'Document Exports',
+                'db_table': 'Document_Export',
+                'indexes': [models.Index(fields=['requested_by', '-created_at'], name='document_export_user_idx')],
+            },
+        ),
+    ]
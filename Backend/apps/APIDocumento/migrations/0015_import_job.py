@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:58
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0014_document_export'),
+        ('APISetor', '0003_sectorreviewpolicy_expired_until'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('import_id', models.UUIDField(db_column='PK_import_job', default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('categories', models.JSONField(blank=True, db_column='categories_import_job', default=list)),
+                ('exclusive_users', models.JSONField(blank=True, db_column='exclusive_users_import_job', default=list)),
+                ('status', models.CharField(choices=[('U', 'Aguardando arquivos'), ('P', 'Na fila'), ('R', 'Em andamento'), ('C', 'Concluída'), ('F', 'Falhou')], db_column='status_import_job', default='U', max_length=1)),
+                ('total', models.PositiveIntegerField(db_column='total_import_job', default=0)),
+                ('created', models.PositiveIntegerField(db_column='created_import_job', default=0)),
+                ('failed', models.PositiveIntegerField(db_column='failed_import_job', default=0)),
+                ('renditions_total', models.PositiveIntegerField(db_column='renditions_total_import_job', default=0)),
+                ('renditions_done', models.PositiveIntegerField(db_column='renditions_done_import_job', default=0)),
+                ('error', models.TextField(blank=True, db_column='error_import_job', default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='date_created_at_import_job')),
+                ('finished_at', models.DateTimeField(blank=True, db_column='date_finished_at_import_job', null=True)),
+                ('privacity', models.ForeignKey(db_column='FK_privacity_import_job', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='APIDocumento.classification_privacity')),
+                ('requested_by', models.ForeignKey(db_column='FK_user_import_job', on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+                ('sector', models.ForeignKey(db_column='FK_sector_import_job', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='APISetor.sector')),
+            ],
+            options={
+                'verbose_name': 'Import Job',
+                'verbose_name_plural': 'Import Jobs',
+                'db_table': 'Import_Job',
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportItem',
+            fields=[
+                ('item_id', models.BigAutoField(db_column='PK_import_item', primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(db_column='position_import_item')),
+                ('filename', models.CharField(db_column='filename_import_item', max_length=255)),
+                ('title', models.CharField(db_column='title_import_item', max_length=255)),
+                ('categories', models.JSONField(blank=True, db_column='categories_import_item', null=True)),
+                ('exclusive_users', models.JSONField(blank=True, db_column='exclusive_users_import_item', null=True)),
+                ('status', models.CharField(choices=[('W', 'Aguardando arquivo'), ('U', 'Arquivo recebido'), ('C', 'Documento criado'), ('F', 'Falhou')], db_column='status_import_item', default='W', max_length=1)),
+                ('error', models.CharField(blank=True, db_column='error_import_item', default='', max_length=500)),
+                ('blob', models.ForeignKey(blank=True, db_column='FK_file_blob_import_item', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='APIDocumento.fileblob')),
+                ('document', models.ForeignKey(blank=True, db_column='FK_document_import_item', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='APIDocumento.document')),
+                ('privacity', models.ForeignKey(blank=True, db_column='FK_privacity_import_item', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='APIDocumento.classification_privacity')),
+                ('job', models.ForeignKey(db_column='FK_job_import_item', on_delete=django.db.models.deletion.CASCADE, related_name='items', to='APIDocumento.importjob')),
+            ],
+            options={
+                'verbose_name': 'Import Item',
+                'verbose_name_plural': 'Import Items',
+                'db_table': 'Import_Item',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importjob',
+            index=models.Index(fields=['requested_by', '-created_at'], name='import_job_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importitem',
+            index=models.Index(fields=['job', 'status', 'position'], name='import_item_job_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='importitem',
+            constraint=models.UniqueConstraint(fields=('job', 'filename'), name='import_item_job_filename_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0015_import_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['classification'], include=('sector',), name='document_class_sector_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIDocumento', '0016_document_class_sector_idx'),
+    ]
+
+    # Document_Record é particionada: o índice criado na tabela-mãe é replicado em cada partição.
+    operations = [
+        migrations.AddIndex(
+            model_name='historicaldocument',
+            index=models.Index(fields=['yjs_state_hash'], name='doc_record_yjs_hash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicaldocument',
+            index=models.Index(fields=['html_snapshot_hash'], name='doc_record_html_hash_idx'),
+        ),
+    ]
@@ -3,6 +3,9 @@ from apps.APIEmpresa.models import Enterprise
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Extract, Now
+from django.utils import timezone
 from apps.core.utils import rename_file_for_s3
 from simple_history.models import HistoricalRecords
 from django.db import models
@@ -12,6 +15,74 @@ import uuid
 User = get_user_model()
 
 
+class DocumentHistoricalRecords(HistoricalRecords):
+    """
+    HistoricalRecords com os índices compostos usados pelos dashboards
+    e pelo histórico do documento.
+    """
+    def get_meta_options(self, model):
+        meta_fields = super().get_meta_options(model)
+        meta_fields["indexes"] = [
+            # Dashboard operacional: últimas versões do usuário (DISTINCT ON document_id)
+            models.Index(fields=['history_user', 'document_id', '-history_date'], name='doc_record_user_doc_date_idx'),
+            # Feed de atividades e consolidados de setor
+            models.Index(fields=['sector', '-history_date'], name='doc_record_sector_date_idx'),
+            models.Index(fields=['sector', 'history_type', 'history_date'], name='doc_record_sector_type_idx'),
+            # Histórico de um documento
+            models.Index(fields=['document_id', '-history_date'], name='doc_record_doc_date_idx'),
+            # Coleta de conteúdos órfãos (history.delete_orphan_blobs): um NOT EXISTS por hash
+            models.Index(fields=['yjs_state_hash'], name='doc_record_yjs_hash_idx'),
+            models.Index(fields=['html_snapshot_hash'], name='doc_record_html_hash_idx'),
+        ]
+        return meta_fields
+
+
+class DocumentRecordBlobFields(models.Model):
+    """
+    Campos extras das versões do documento.
+
+    O estado Yjs e o snapshot HTML não são copiados em cada versão: a versão
+    guarda só o hash SHA-256 e o conteúdo fica uma única vez em Document_Record_Blob.
+    """
+    yjs_state_hash = models.CharField(max_length=64, null=True, blank=True, db_column='yjs_state_hash_document_record')
+    html_snapshot_hash = models.CharField(max_length=64, null=True, blank=True, db_column='html_snapshot_hash_document_record')
+
+    class Meta:
+        abstract = True
+
+
+# Colunas pesadas: Document.objects não as lê, a não ser que pedidas (with_heavy/with_content).
+HEAVY_FIELDS = ('content', 'search_content', 'yjs_state', 'html_snapshot')
+
+
+class DocumentQuerySet(models.QuerySet):
+    def with_heavy(self, *fields: str) -> 'DocumentQuerySet':
+        """
+        Volta a ler as colunas pesadas informadas (sem argumentos, todas).
+        Deve vir logo após o manager: descarta os demais .defer()/.only() da consulta.
+        """
+        wanted = set(fields or HEAVY_FIELDS)
+        unknown = wanted - set(HEAVY_FIELDS)
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {', '.join(sorted(unknown))}")
+
+        queryset = self.defer(None)
+        still_deferred = [field for field in HEAVY_FIELDS if field not in wanted]
+        return queryset.defer(*still_deferred) if still_deferred else queryset
+
+    def with_content(self) -> 'DocumentQuerySet':
+        return self.with_heavy('content')
+
+
+class DocumentManager(models.Manager.from_queryset(DocumentQuerySet)): # type: ignore
+    """
+    Por padrão as consultas não leem content, search_content, yjs_state nem html_snapshot.
+    values()/values_list() não são afetados: leem só as colunas pedidas.
+    """
+    def get_queryset(self):
+        return super().get_queryset().defer(*HEAVY_FIELDS)
+
+
 class Document(models.Model):
     document_id = models.AutoField(primary_key=True, db_column='PK_document')
     title = models.CharField(max_length=200, default="Novo Documento", db_column='title_document')
@@ -35,13 +106,66 @@ class Document(models.Model):
     is_active = models.BooleanField(default=True, db_column='is_active_document')
     file_url = models.FileField(upload_to='uploaded_documents/', blank=True, default=None, db_column='file_url_document')
     thumbnail_path = models.FileField(upload_to='thumbnails/', blank=True, default=None, db_column='thumbnail_path_document')
-    history = HistoricalRecords(table_name='Document_Record')
+    # Conteúdo do arquivo enviado (deduplicado); file_url guarda o caminho do blob.
+    file_blob = models.ForeignKey(
+        'FileBlob',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='documents',
+        db_column='FK_file_blob_document')
+    # Versão da representação do documento (ETag/Last-Modified): sobe a cada save
+    # e também quando a classificação ou as categorias mudam (ver versioning.touch_documents).
+    revision = models.PositiveIntegerField(default=1, db_column='revision_document')
+    updated_at = models.DateTimeField(auto_now=True, db_column='date_updated_at_document')
+    history = DocumentHistoricalRecords(
+        table_name='Document_Record',
+        # search_content é recalculado a partir de content a cada save;
+        # yjs_state/html_snapshot vão para Document_Record_Blob (ver DocumentRecordBlobFields);
+        # revision/updated_at repetem o history_date e não podem voltar atrás numa reversão;
+        # file_blob é fixo desde o upload e tem contagem de referências (ver blobs.py);
+        # html_snapshot_revision/html_snapshot_at descrevem a renderização, não a versão.
+        excluded_fields=[
+            'search_content', 'yjs_state', 'html_snapshot', 'revision', 'updated_at', 'file_blob',
+            'html_snapshot_revision', 'html_snapshot_at',
+        ],
+        bases=[DocumentRecordBlobFields],
+    )
     search_content = models.TextField(blank=True, null=True, db_column='search_content_document')
     yjs_state = models.BinaryField(null=True, blank=True, db_column='yjs_state_document')
     html_snapshot = models.TextField(null=True, blank=True, db_column='html_snapshot_document')
+    # Revisão do conteúdo de onde o html_snapshot foi renderizado (ver rendering.py).
+    html_snapshot_revision = models.PositiveIntegerField(null=True, blank=True, db_column='html_snapshot_revision_document')
+    html_snapshot_at = models.DateTimeField(null=True, blank=True, db_column='date_html_snapshot_document')
+
+    objects = DocumentManager()
 
     def __str__(self):
         return self.title 
+
+    def save(self, *args, **kwargs):
+        # pk e não _state.adding: a reversão salva por cima uma instância montada do histórico.
+        if self.pk is not None:
+            # Concorrência: duas gravações podem gerar a mesma revisão, mas o updated_at as diferencia.
+            self.revision = (self.revision or 0) + 1
+            update_fields = kwargs.get('update_fields')
+
+            deferred = self.get_deferred_fields()
+            if update_fields is None and deferred and not kwargs.get('force_insert'):
+                # Mesma regra do Django (só as colunas carregadas são gravadas), calculada
+                # aqui para incluir search_content, que é recalculado a partir de content.
+                update_fields = [
+                    field.attname for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+
+            if update_fields is not None:
+                update_fields = {*update_fields, 'revision', 'updated_at'}
+                if 'content' in update_fields:
+                    update_fields.add('search_content')
+                kwargs['update_fields'] = update_fields
+
+        super().save(*args, **kwargs)
     
     class Meta:
         db_table = 'Document'
@@ -49,8 +173,57 @@ class Document(models.Model):
         verbose_name_plural = 'Documents'
         indexes = [
             GinIndex(fields=['content'], name='document_content_gin_idx'),
+            models.Index(fields=['sector', 'created_at'], name='document_sector_created_idx'),
+            # Expiração de revisões: o setor das classificações sem visitar a tabela.
+            models.Index(fields=['classification'], include=['sector'], name='document_class_sector_idx'),
         ]
         
+class DocumentRecordBlob(models.Model):
+    """
+    Conteúdo pesado das versões do documento, endereçado pelo hash (deduplicado).
+    """
+    hash = models.CharField(max_length=64, primary_key=True, db_column='PK_hash_document_record_blob')
+    data = models.BinaryField(db_column='data_document_record_blob')
+    created_at = models.DateTimeField(auto_now_add=True, db_column='date_created_at_document_record_blob')
+
+    class Meta:
+        db_table = 'Document_Record_Blob'
+        verbose_name = 'Document Record Blob'
+        verbose_name_plural = 'Document Record Blobs'
+
+class FileBlob(models.Model):
+    """
+    Arquivo enviado (documento ou anexo), endereçado pelo SHA-256 do conteúdo:
+    cada conteúdo distinto é gravado uma única vez no storage.
+
+    ref_count conta os documentos e anexos que apontam para o blob; blobs sem
+    referências são removidos pelo cleanup_s3_orphans.
+    """
+    digest = models.CharField(max_length=64, primary_key=True, db_column='PK_digest_file_blob')
+    file = models.FileField(max_length=255, db_column='file_file_blob')
+    size = models.PositiveBigIntegerField(db_column='size_file_blob')
+    content_type = models.CharField(max_length=100, blank=True, default='', db_column='content_type_file_blob')
+    ref_count = models.PositiveIntegerField(default=0, db_column='ref_count_file_blob')
+    # Derivados gerados uma única vez por conteúdo.
+    thumbnail = models.FileField(max_length=255, blank=True, default='', db_column='thumbnail_file_blob')
+    optimized = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='FK_optimized_file_blob')
+    created_at = models.DateTimeField(auto_now_add=True, db_column='date_created_at_file_blob')
+
+    class Meta:
+        db_table = 'File_Blob'
+        verbose_name = 'File Blob'
+        verbose_name_plural = 'File Blobs'
+        indexes = [
+            # Coleta dos blobs sem referências
+            models.Index(fields=['ref_count'], name='file_blob_ref_count_idx', condition=models.Q(ref_count=0)),
+        ]
+
 class Attached_Files_Document(models.Model):
     attached_file_id = models.AutoField(primary_key=True, db_column='PK_attached_file')
     document_id = models.ForeignKey(
@@ -60,6 +233,13 @@ class Attached_Files_Document(models.Model):
         related_name='attached_files')
     title = models.CharField(max_length=100, db_column='title_attached_file')
     file = models.FileField(upload_to=rename_file_for_s3, db_column='file_attached_file')
+    blob = models.ForeignKey(
+        FileBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='attachments',
+        db_column='FK_file_blob_attached_file')
     attached_at = models.DateTimeField(auto_now_add=True, db_column='date_attached_at_attached_file')
     detached_at = models.DateTimeField(null=True, blank=True, db_column='date_detached_at_attached_file')
     
@@ -87,7 +267,21 @@ class Classification_Status(models.Model):
         verbose_name = 'Classification Status'
         verbose_name_plural = 'Classifications Statuses'
         
+class ClassificationQuerySet(models.QuerySet):
+    def with_review_age(self):
+        """
+        Anota 'review_age_days' (dias desde a última revisão) direto no SQL,
+        para qualquer lista de classificações em uma única consulta.
+        """
+        return self.annotate(
+            review_age_days=Extract(Now() - F('last_reviewed_at'), 'day')
+        )
+
+
 class Classification(models.Model):   
+    # Mudanças nestes campos contam como revisão (atualizam last_reviewed_at).
+    REVIEW_FIELDS = ('is_reviewed', 'reviewer_id', 'classification_status_id')
+
     classification_id = models.AutoField(primary_key=True, db_column='PK_classification')
     is_reviewed = models.BooleanField(default=False, db_column='review_status_classification')
     classification_status = models.ForeignKey(
@@ -113,14 +307,46 @@ class Classification(models.Model):
         blank=True,
         db_table='Classification_Privacity_Exclusivity'
     )
+    last_reviewed_at = models.DateTimeField(null=True, blank=True, db_column='date_last_reviewed_at_classification')
+
+    objects = ClassificationQuerySet.as_manager()
 
     def __str__(self):
         return f"Revisado por {self.reviewer}" 
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_review_state = instance.get_review_state()
+        return instance
+
+    def get_review_state(self):
+        return tuple(self.__dict__.get(field) for field in self.REVIEW_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded_review_state = getattr(self, '_loaded_review_state', None)
+
+        if loaded_review_state is None:
+            review_changed = self.is_reviewed or self.reviewer_id is not None # type: ignore
+        else:
+            review_changed = loaded_review_state != self.get_review_state()
+
+        if review_changed:
+            self.last_reviewed_at = timezone.now()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'last_reviewed_at'}
+
+        super().save(*args, **kwargs)
+        self._loaded_review_state = self.get_review_state()
     
     class Meta:
         db_table = 'Classification'
         verbose_name = 'Classification'
         verbose_name_plural = 'Classifications'
+        indexes = [
+            models.Index(fields=['last_reviewed_at'], name='classification_reviewed_idx'),
+        ]
         
 class Classification_Privacity(models.Model):    
     privacity_choices = [
@@ -168,4 +394,165 @@ class Category(models.Model):
         db_table = 'Category'
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
-        
\ No newline at end of file
+        
+class DocumentExport(models.Model):
+    """
+    Exportação de um documento ou de um setor inteiro (ver exportUtils/engine.py):
+    um ZIP com o conteúdo renderizado (PDF/DOCX), os arquivos originais e os anexos.
+    """
+    STATUS_PENDING = 'P'
+    STATUS_RUNNING = 'R'
+    STATUS_COMPLETED = 'C'
+    STATUS_FAILED = 'F'
+    status_choices = [
+        (STATUS_PENDING, 'Na fila'),
+        (STATUS_RUNNING, 'Em andamento'),
+        (STATUS_COMPLETED, 'Concluída'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+    format_choices = [
+        ('pdf', 'PDF'),
+        ('docx', 'DOCX'),
+    ]
+
+    export_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, db_column='PK_document_export')
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='document_exports', db_column='FK_user_document_export')
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='FK_document_document_export')
+    sector = models.ForeignKey(
+        Sector,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='FK_sector_document_export')
+    format = models.CharField(max_length=4, choices=format_choices, default='pdf', db_column='format_document_export')
+    include_files = models.BooleanField(default=True, db_column='include_files_document_export')
+    status = models.CharField(max_length=1, choices=status_choices, default=STATUS_PENDING, db_column='status_document_export')
+    total = models.PositiveIntegerField(default=0, db_column='total_document_export')
+    processed = models.PositiveIntegerField(default=0, db_column='processed_document_export')
+    file = models.FileField(max_length=255, blank=True, default='', db_column='file_document_export')
+    error = models.TextField(blank=True, default='', db_column='error_document_export')
+    created_at = models.DateTimeField(auto_now_add=True, db_column='date_created_at_document_export')
+    finished_at = models.DateTimeField(null=True, blank=True, db_column='date_finished_at_document_export')
+
+    class Meta:
+        db_table = 'Document_Export'
+        verbose_name = 'Document Export'
+        verbose_name_plural = 'Document Exports'
+        indexes = [
+            models.Index(fields=['requested_by', '-created_at'], name='document_export_user_idx'),
+        ]
+
+
+class ImportJob(models.Model):
+    """
+    Importação em lote de uma pasta de arquivos (ver importUtils/engine.py).
+
+    O manifesto (títulos, categorias e privacidade de cada arquivo) vira um ImportItem
+    por arquivo; os arquivos são enviados em seguida e o processamento cria as
+    classificações e os documentos por lote.
+    """
+    STATUS_UPLOADING = 'U'
+    STATUS_PENDING = 'P'
+    STATUS_RUNNING = 'R'
+    STATUS_COMPLETED = 'C'
+    STATUS_FAILED = 'F'
+    status_choices = [
+        (STATUS_UPLOADING, 'Aguardando arquivos'),
+        (STATUS_PENDING, 'Na fila'),
+        (STATUS_RUNNING, 'Em andamento'),
+        (STATUS_COMPLETED, 'Concluída'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+
+    import_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, db_column='PK_import_job')
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_jobs', db_column='FK_user_import_job')
+    sector = models.ForeignKey(Sector, on_delete=models.CASCADE, related_name='+', db_column='FK_sector_import_job')
+    # Padrões do manifesto; cada item pode sobrescrever.
+    privacity = models.ForeignKey('Classification_Privacity', on_delete=models.PROTECT, related_name='+', db_column='FK_privacity_import_job')
+    categories = models.JSONField(default=list, blank=True, db_column='categories_import_job')
+    exclusive_users = models.JSONField(default=list, blank=True, db_column='exclusive_users_import_job')
+    status = models.CharField(max_length=1, choices=status_choices, default=STATUS_UPLOADING, db_column='status_import_job')
+    total = models.PositiveIntegerField(default=0, db_column='total_import_job')
+    created = models.PositiveIntegerField(default=0, db_column='created_import_job')
+    failed = models.PositiveIntegerField(default=0, db_column='failed_import_job')
+    renditions_total = models.PositiveIntegerField(default=0, db_column='renditions_total_import_job')
+    renditions_done = models.PositiveIntegerField(default=0, db_column='renditions_done_import_job')
+    error = models.TextField(blank=True, default='', db_column='error_import_job')
+    created_at = models.DateTimeField(auto_now_add=True, db_column='date_created_at_import_job')
+    finished_at = models.DateTimeField(null=True, blank=True, db_column='date_finished_at_import_job')
+
+    class Meta:
+        db_table = 'Import_Job'
+        verbose_name = 'Import Job'
+        verbose_name_plural = 'Import Jobs'
+        indexes = [
+            models.Index(fields=['requested_by', '-created_at'], name='import_job_user_idx'),
+        ]
+
+
+class ImportItem(models.Model):
+    """
+    Um arquivo do manifesto e o seu estado na importação.
+
+    Enquanto o documento não é criado, o item guarda a referência ao blob enviado;
+    na criação a referência passa para o documento (blob fica nulo no item).
+    """
+    STATUS_WAITING = 'W'
+    STATUS_UPLOADED = 'U'
+    STATUS_CREATED = 'C'
+    STATUS_FAILED = 'F'
+    status_choices = [
+        (STATUS_WAITING, 'Aguardando arquivo'),
+        (STATUS_UPLOADED, 'Arquivo recebido'),
+        (STATUS_CREATED, 'Documento criado'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+
+    item_id = models.BigAutoField(primary_key=True, db_column='PK_import_item')
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='items', db_column='FK_job_import_item')
+    position = models.PositiveIntegerField(db_column='position_import_item')
+    filename = models.CharField(max_length=255, db_column='filename_import_item')
+    title = models.CharField(max_length=255, db_column='title_import_item')
+    privacity = models.ForeignKey(
+        'Classification_Privacity',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='FK_privacity_import_item')
+    categories = models.JSONField(null=True, blank=True, db_column='categories_import_item')
+    exclusive_users = models.JSONField(null=True, blank=True, db_column='exclusive_users_import_item')
+    blob = models.ForeignKey(
+        FileBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='FK_file_blob_import_item')
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='FK_document_import_item')
+    status = models.CharField(max_length=1, choices=status_choices, default=STATUS_WAITING, db_column='status_import_item')
+    error = models.CharField(max_length=500, blank=True, default='', db_column='error_import_item')
+
+    class Meta:
+        db_table = 'Import_Item'
+        verbose_name = 'Import Item'
+        verbose_name_plural = 'Import Items'
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'filename'], name='import_item_job_filename_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'status', 'position'], name='import_item_job_status_idx'),
+        ]
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Classification_Privacity, Classification_Status
+
+logger = logging.getLogger(__name__)
+
+# Valores das tabelas de referência (sql/inserto_classification_status_privacity.sql).
+STATUS_CONCLUDED = 'Concluído'
+STATUS_IN_PROGRESS = 'Em andamento'
+STATUS_REVIEW_REQUIRED = 'Revisão necessária'
+STATUS_ARCHIVED = 'Arquivado'
+PRIVACITY_PRIVATE = 'Privado'
+PRIVACITY_PUBLIC = 'Público'
+PRIVACITY_EXCLUSIVE = 'Exclusivo'
+
+VERSION_KEY = 'reference_data:version'
+# Intervalo (s) entre as conferências da versão compartilhada: fora delas, nenhuma consulta.
+CHECK_INTERVAL = 30
+
+
+class ReferenceData:
+    """
+    Status e privacidades carregados do banco (valor <-> ID), imutável depois de criado.
+    """
+    __slots__ = ('version', 'loaded_at', 'status_ids', 'status_labels', 'privacity_ids', 'privacity_labels')
+
+    def __init__(self, version: Optional[int], statuses: Dict[str, int], privacities: Dict[str, int]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.status_ids = statuses
+        self.status_labels = {pk: label for label, pk in statuses.items()}
+        self.privacity_ids = privacities
+        self.privacity_labels = {pk: label for label, pk in privacities.items()}
+
+    def status_ids_for(self, *labels: str) -> List[int]:
+        """
+        IDs dos status informados (os inexistentes ficam de fora). Use com __in nos filtros:
+        uma lista vazia não encontra nada, enquanto '=None' viraria IS NULL.
+        """
+        return [self.status_ids[label] for label in labels if label in self.status_ids]
+
+    def privacity_ids_for(self, *labels: str) -> List[int]:
+        return [self.privacity_ids[label] for label in labels if label in self.privacity_ids]
+
+
+_lock = threading.Lock()
+_registry: Optional[ReferenceData] = None
+_checked_at = 0.0
+
+
+def shared_version() -> Optional[int]:
+    """
+    Versão das tabelas de referência no cache (compartilhada entre processos).
+    None se o cache estiver indisponível: o registro local continua valendo.
+    """
+    try:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, time.time_ns() // 1_000_000, None)
+            version = cache.get(VERSION_KEY)
+        return version
+    except Exception as e:
+        logger.warning("Não foi possível ler a versão dos dados de referência: %s", e)
+        return None
+
+
+def load_reference_data(version: Optional[int]) -> ReferenceData:
+    return ReferenceData(
+        version,
+        dict(Classification_Status.objects.values_list('status', 'pk')),
+        dict(Classification_Privacity.objects.values_list('privacity', 'pk')),
+    )
+
+
+def get_reference_data(force: bool = False) -> ReferenceData:
+    """
+    Registro do processo, carregado uma vez (duas consultas) e recarregado só quando a
+    versão no cache muda; a versão é conferida no máximo a cada CHECK_INTERVAL segundos.
+    """
+    global _registry, _checked_at
+
+    registry = _registry
+    now = time.monotonic()
+    if registry is not None and not force and now - _checked_at < CHECK_INTERVAL:
+        return registry
+
+    with _lock:
+        version = shared_version()
+        if _registry is None or force or (version is not None and version != _registry.version):
+            # A versão é lida antes da carga: uma alteração no meio do caminho força outra recarga.
+            _registry = load_reference_data(version)
+        _checked_at = now
+        return _registry
+
+
+async def aget_reference_data() -> ReferenceData:
+    """
+    get_reference_data para views async: só sai do event loop quando precisa conferir/recarregar.
+    """
+    registry = _registry
+    if registry is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+        return registry
+    return await sync_to_async(get_reference_data)()
+
+
+def lookup(mapping_name: str, key) -> Optional[int | str]:
+    """
+    Busca no registro; valores ausentes recarregam o registro (no máximo uma vez por
+    CHECK_INTERVAL), cobrindo linhas inseridas direto no banco depois da carga.
+    """
+    registry = get_reference_data()
+    value = getattr(registry, mapping_name).get(key)
+    if value is None and time.monotonic() - registry.loaded_at >= CHECK_INTERVAL:
+        value = getattr(get_reference_data(force=True), mapping_name).get(key)
+    return value
+
+
+def status_id_for(label: str) -> Optional[int]:
+    return lookup('status_ids', label) # type: ignore
+
+
+def privacity_id_for(label: str) -> Optional[int]:
+    return lookup('privacity_ids', label) # type: ignore
+
+
+def status_label_for(pk: Optional[int]) -> Optional[str]:
+    return lookup('status_labels', pk) if pk is not None else None # type: ignore
+
+
+def privacity_label_for(pk: Optional[int]) -> Optional[str]:
+    return lookup('privacity_labels', pk) if pk is not None else None # type: ignore
+
+
+def status_ids_for(*labels: str) -> List[int]:
+    return [pk for pk in (status_id_for(label) for label in labels) if pk is not None]
+
+
+def privacity_ids_for(*labels: str) -> List[int]:
+    return [pk for pk in (privacity_id_for(label) for label in labels) if pk is not None]
+
+
+def labels_for(status_id: Optional[int], privacity_id: Optional[int]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (status, privacidade) de uma classificação a partir dos IDs, sem consulta.
+    """
+    return status_label_for(status_id), privacity_label_for(privacity_id)
+
+
+def invalidate_reference_data() -> None:
+    """
+    Descarta o registro deste processo e, após o commit, troca a versão compartilhada
+    (os outros processos recarregam na próxima conferência).
+    """
+    global _registry
+    _registry = None
+
+    def bump():
+        try:
+            cache.set(VERSION_KEY, time.time_ns() // 1_000_000, None)
+        except Exception as e:
+            logger.warning("Não foi possível invalidar os dados de referência: %s", e)
+
+    transaction.on_commit(bump)
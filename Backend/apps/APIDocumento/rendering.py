@@ -0,0 +1,258 @@
+import json
+import re
+from typing import Any, Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import Document
+
+# Profundidade máxima da árvore: conteúdo malformado não estoura a recursão.
+MAX_DEPTH = 64
+
+# Bits de formatação do TextNode do Lexical, na ordem em que as tags são abertas.
+TEXT_FORMATS = (
+    (16, 'code'),
+    (1, 'strong'),
+    (2, 'em'),
+    (8, 'u'),
+    (4, 's'),
+    (32, 'sub'),
+    (64, 'sup'),
+    (128, 'mark'),
+)
+
+ALIGNMENTS = {'left', 'start', 'center', 'right', 'end', 'justify'}
+# Formatos numéricos das versões antigas do Lexical.
+LEGACY_ALIGNMENTS = {1: 'left', 2: 'center', 3: 'right', 4: 'justify', 5: 'start', 6: 'end'}
+
+STYLE_PROPERTIES = {'color', 'background-color', 'font-size', 'font-family', 'font-weight', 'font-style', 'text-decoration'}
+STYLE_VALUE = re.compile(r"^[#\w\s,.%'\"-]+$")
+
+SAFE_URL = re.compile(r"^(https?:|mailto:|tel:|/|#)", re.IGNORECASE)
+SAFE_IMAGE_DATA = re.compile(r"^data:image/(png|jpe?g|gif|webp);base64,[A-Za-z0-9+/=\s]+$", re.IGNORECASE)
+YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{6,20}$")
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+def safe_url(url: Any, allow_data_image: bool = False) -> Optional[str]:
+    """
+    URL aceita no HTML (http/https/mailto/tel/relativa; imagens também em data:image base64).
+    """
+    if not isinstance(url, str):
+        return None
+
+    url = url.strip()
+    if SAFE_URL.match(url) or (allow_data_image and SAFE_IMAGE_DATA.match(url)):
+        return url
+    return None
+
+
+def safe_style(style: Any) -> str:
+    """
+    Mantém só as propriedades CSS de texto com valores simples (sem url(), expressões etc.).
+    """
+    if not isinstance(style, str):
+        return ''
+
+    declarations = []
+    for declaration in style.split(';'):
+        name, _, value = declaration.partition(':')
+        name, value = name.strip().lower(), value.strip()
+        if name in STYLE_PROPERTIES and value and STYLE_VALUE.match(value):
+            declarations.append(f"{name}: {value}")
+
+    return '; '.join(declarations)
+
+
+def element_style(node: Dict[str, Any]) -> str:
+    """
+    Alinhamento e recuo dos blocos.
+    """
+    declarations = []
+
+    alignment = node.get('format')
+    alignment = LEGACY_ALIGNMENTS.get(alignment) if isinstance(alignment, int) else alignment # type: ignore
+    if alignment in ALIGNMENTS:
+        declarations.append(f"text-align: {alignment}")
+
+    indent = node.get('indent')
+    if isinstance(indent, int) and 0 < indent <= 10:
+        declarations.append(f"padding-inline-start: {indent * 40}px")
+
+    return '; '.join(declarations)
+
+
+def attributes(**values: Any) -> str:
+    """
+    Atributos HTML escapados; valores vazios/None são omitidos.
+    """
+    return ''.join(
+        f' {name.rstrip("_").replace("_", "-")}="{escape(value)}"'
+        for name, value in values.items() if value not in (None, '')
+    )
+
+
+def render_text(node: Dict[str, Any]) -> str:
+    text = escape(node.get('text') or '')
+    if not text:
+        return ''
+
+    text_format = node.get('format') if isinstance(node.get('format'), int) else 0
+    for bit, tag in reversed(TEXT_FORMATS):
+        if text_format & bit: # type: ignore
+            text = f"<{tag}>{text}</{tag}>"
+
+    style = safe_style(node.get('style'))
+    return f"<span{attributes(style=style)}>{text}</span>" if style else text
+
+
+def render_children(node: Dict[str, Any], depth: int) -> str:
+    children = node.get('children')
+    if not isinstance(children, list):
+        return ''
+    return ''.join(render_node(child, depth + 1) for child in children)
+
+
+def render_node(node: Any, depth: int = 0) -> str:
+    """
+    HTML de um nó do Lexical. Só os tipos conhecidos geram tags; o texto e os atributos são
+    sempre escapados, então o resultado não carrega HTML/JS vindo do conteúdo.
+    Tipos desconhecidos rendem apenas os filhos.
+    """
+    if not isinstance(node, dict) or depth > MAX_DEPTH:
+        return ''
+
+    node_type = node.get('type')
+
+    if node_type == 'text' or node_type == 'code-highlight':
+        return render_text(node)
+    if node_type == 'linebreak':
+        return '<br>'
+    if node_type == 'tab':
+        return '\t'
+    if node_type == 'horizontalrule':
+        return '<hr>'
+
+    if node_type == 'image':
+        src = safe_url(node.get('src'), allow_data_image=True)
+        if not src:
+            return ''
+        width = node.get('width') if isinstance(node.get('width'), int) and node.get('width') > 0 else None # type: ignore
+        height = node.get('height') if isinstance(node.get('height'), int) and node.get('height') > 0 else None # type: ignore
+        return (
+            f"<figure{attributes(style=element_style(node))}>"
+            f"<img{attributes(src=src, alt=node.get('altText') or '', width=width, height=height, loading='lazy')}>"
+            f"</figure>"
+        )
+
+    if node_type == 'video':
+        src = node.get('src')
+        if node.get('sourceType') == 'youtube' and isinstance(src, str) and YOUTUBE_ID.match(src):
+            embed = f"https://www.youtube.com/embed/{src}"
+            return f"<div class=\"video\"><iframe{attributes(src=embed, allowfullscreen='allowfullscreen', loading='lazy')}></iframe></div>"
+        src = safe_url(src)
+        return f"<div class=\"video\"><video{attributes(src=src, controls='controls')}></video></div>" if src else ''
+
+    children = render_children(node, depth)
+    style = element_style(node)
+
+    if node_type == 'root':
+        return children
+    if node_type == 'paragraph':
+        return f"<p{attributes(style=style)}>{children}</p>"
+    if node_type == 'heading':
+        tag = node.get('tag') if node.get('tag') in HEADING_TAGS else 'h2'
+        return f"<{tag}{attributes(style=style)}>{children}</{tag}>"
+    if node_type == 'quote':
+        return f"<blockquote{attributes(style=style)}>{children}</blockquote>"
+    if node_type == 'code':
+        return f"<pre{attributes(data_language=node.get('language') if isinstance(node.get('language'), str) else None)}><code>{children}</code></pre>"
+    if node_type == 'list':
+        tag = 'ol' if node.get('listType') == 'number' or node.get('tag') == 'ol' else 'ul'
+        start = node.get('start') if tag == 'ol' and isinstance(node.get('start'), int) and node.get('start') != 1 else None
+        css_class = 'checklist' if node.get('listType') == 'check' else None
+        return f"<{tag}{attributes(class_=css_class, start=start)}>{children}</{tag}>"
+    if node_type == 'listitem':
+        checked = node.get('checked')
+        aria = ('true' if checked else 'false') if isinstance(checked, bool) else None
+        return f"<li{attributes(aria_checked=aria, style=style)}>{children}</li>"
+    if node_type in ('link', 'autolink'):
+        url = safe_url(node.get('url'))
+        if not url:
+            return children
+        target = '_blank' if node.get('target') == '_blank' else None
+        rel = 'noopener noreferrer' if target else None
+        return f"<a{attributes(href=url, target=target, rel=rel)}>{children}</a>"
+    if node_type == 'table':
+        return f"<table><tbody>{children}</tbody></table>"
+    if node_type == 'tablerow':
+        return f"<tr>{children}</tr>"
+    if node_type == 'tablecell':
+        tag = 'th' if node.get('headerState') else 'td'
+        return f"<{tag}>{children}</{tag}>"
+
+    return children
+
+
+def render_lexical_html(content: Any) -> str:
+    """
+    Converte o JSON do editor (Lexical) em HTML sanitizado.
+
+    Args:
+        content (dict | str): O JSON salvo em Document.content ({"root": {...}}).
+
+    Returns:
+        str: O HTML do documento ('' se o conteúdo for vazio ou inválido).
+    """
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return ''
+
+    if not isinstance(content, dict):
+        return ''
+
+    return render_node(content.get('root', content))
+
+
+def render_document_snapshot(document_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Renderiza o HTML do conteúdo atual do documento e grava em html_snapshot,
+    junto com a revisão de onde ele veio.
+
+    A gravação é um UPDATE condicionado ao conteúdo renderizado: se o conteúdo mudou
+    nesse meio-tempo, nada é gravado (o save mais novo agenda outra renderização).
+    Não passa por Document.save(): a revisão e o histórico não mudam.
+
+    Returns:
+        Optional[Dict[str, Any]]: {'html', 'revision', 'rendered_at'}; None se o documento não existe.
+    """
+    row = Document.objects.filter(pk=document_id).values('content', 'revision').first()
+    if row is None:
+        return None
+
+    html = render_lexical_html(row['content'])
+    rendered_at = timezone.now()
+
+    # content=None compararia com o JSON null, não com o NULL da coluna.
+    same_content = {'content__isnull': True} if row['content'] is None else {'content': row['content']}
+    Document.objects.filter(pk=document_id, **same_content).update(
+        html_snapshot=html,
+        html_snapshot_revision=row['revision'],
+        html_snapshot_at=rendered_at
+    )
+
+    return {'html': html, 'revision': row['revision'], 'rendered_at': rendered_at}
+
+
+def schedule_snapshot_render(document_id: int) -> None:
+    """
+    Agenda a renderização para depois do commit (o worker lê o conteúdo já gravado).
+    """
+    from apps.core.tasks import render_html_snapshot_task
+
+    transaction.on_commit(lambda: render_html_snapshot_task.delay(document_id))
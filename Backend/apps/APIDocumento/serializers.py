@@ -1,30 +1,37 @@
 from rest_framework import serializers
 from django.db import transaction
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, Value, When
 
 from apps.core.presigned_url import generate_presigned_url 
+from apps.core.fieldsets import SparseFieldsetMixin
+from .blobs import store_upload
+from .bulk_operations import ACTIONS, MAX_SELECTION, RECLASSIFY, DocumentCategory
 from .models import Attached_Files_Document, Document, Classification, Category, Classification_Status, Classification_Privacity
+from .reference_data import PRIVACITY_EXCLUSIVE, STATUS_IN_PROGRESS, privacity_id_for, privacity_label_for, status_id_for
 from apps.APISetor.models import Sector, SectorUser
-from apps.core.utils import optimize_image
 from typing import List, Dict
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+ClassificationExclusiveUser = Classification.exclusive_users.through
+
 class DocumentCreateSerializer(serializers.ModelSerializer):
+    """
+    Criação de documento em poucas consultas: o setor vem com a permissão do usuário
+    anotada, categorias e usuários exclusivos são validados com uma consulta cada e
+    as tabelas intermediárias recebem um INSERT só (bulk_create).
+    """
     
-    privacity_id = serializers.PrimaryKeyRelatedField(
-        source='privacity',
-        queryset=Classification_Privacity.objects.all(),
-        write_only=True
-    )
+    # Validado pelo registro de referência (reference_data.py), sem consulta.
+    privacity_id = serializers.IntegerField(write_only=True)
     
     sector = serializers.PrimaryKeyRelatedField(
         queryset=Sector.objects.all(),
     )
     
-    categories = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(),
-        many=True,
+    categories = serializers.ListField(
+        child=serializers.IntegerField(),
         required=False,
     )
     
@@ -34,26 +41,48 @@ class DocumentCreateSerializer(serializers.ModelSerializer):
         model = Document
         fields = ['content', 'sector', 'categories', 'privacity_id']
 
-    def validate_sector(self, sector):
-        user = self.context['request'].user
-        
-        is_owner = sector.enterprise.owner == user
-        is_manager = sector.manager == user
-        is_member = SectorUser.objects.filter(user=user, sector=sector).exists()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            # Dono da empresa, gerente ou membro: resolvido na mesma consulta que busca o setor.
+            user = request.user
+            self.fields['sector'].queryset = Sector.objects.annotate(
+                can_create=Case(
+                    When(
+                        Q(enterprise__owner_id=user.pk) | Q(manager_id=user.pk) |
+                        Exists(SectorUser.objects.filter(sector=OuterRef('pk'), user_id=user.pk)),
+                        then=Value(True)
+                    ),
+                    default=Value(False),
+                    output_field=BooleanField()
+                )
+            )
 
-        if not (is_owner or is_manager or is_member):
+    def validate_sector(self, sector):
+        if not getattr(sector, 'can_create', False):
             raise serializers.ValidationError("Você não tem permissão para criar documentos neste setor.")
             
         return sector
 
+    def validate_categories(self, categories):
+        categories = list(dict.fromkeys(categories))
+        if categories and Category.objects.filter(pk__in=categories).count() != len(categories):
+            raise serializers.ValidationError("Uma ou mais categorias fornecidas são inválidas.")
+        return categories
+
+    def validate_privacity_id(self, value):
+        if privacity_label_for(value) is None:
+            raise serializers.ValidationError(f'Pk inválido "{value}" - objeto não existe.')
+        return value
+
     def validate(self, data):
         """
         Validação cruzada entre campos.
-        Verifica se a privacidade é 'Exclusivo' (ID 3) e exige a lista de usuários.
+        Verifica se a privacidade é 'Exclusivo' e exige a lista de usuários.
         """
-        privacity_obj = data.get('privacity') 
         users_ids = self.context['user_exclusive_access'] if 'user_exclusive_access' in self.context else []
-        if privacity_obj.pk == 3: 
+        if data.get('privacity_id') == privacity_id_for(PRIVACITY_EXCLUSIVE): 
             if not users_ids:
                 raise serializers.ValidationError({
                     "users_exclusive_access": "Para documentos exclusivos, é necessário fornecer a lista de usuários."
@@ -71,48 +100,51 @@ class DocumentCreateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         
         categories = validated_data.pop('categories', [])
-        privacity_obj = validated_data.pop('privacity')
+        privacity_id = validated_data.pop('privacity_id')
         users_ids =  self.context['user_exclusive_access'] if 'user_exclusive_access' in self.context else []
         with transaction.atomic():
-            try:
-                status_padrao = Classification_Status.objects.get(status='Em andamento')
-            except Classification_Status.DoesNotExist:
+            status_padrao_id = status_id_for(STATUS_IN_PROGRESS)
+            if status_padrao_id is None:
                 raise serializers.ValidationError("Erro interno: Status padrão 'Em andamento' não encontrado.")
             
             classification = Classification.objects.create(
-                classification_status=status_padrao,
-                privacity=privacity_obj,
+                classification_status_id=status_padrao_id,
+                privacity_id=privacity_id,
                 reviewer=None,
                 is_reviewed=False
             )
             
-            if privacity_obj.pk == 3 and users_ids:
-                users_objs = User.objects.filter(pk__in=users_ids)
-                
-                # Inclusão dos usuários exclusivos selecionados
-                for user_o in users_objs:
-                    classification.exclusive_users.add(user_o) # type: ignore
-                    
-                # Inclusão do criador
-                classification.exclusive_users.add(user) # type: ignore
+            if privacity_id == privacity_id_for(PRIVACITY_EXCLUSIVE) and users_ids:
+                # Usuários exclusivos (já validados em validate) e o criador em um INSERT só.
+                # O documento ainda não existe: não há revisão para atualizar (m2m_changed).
+                ClassificationExclusiveUser.objects.bulk_create([
+                    ClassificationExclusiveUser(classification_id=classification.pk, user_id=user_id)
+                    for user_id in {*users_ids, user.pk}
+                ], ignore_conflicts=True)
                 
             title = "Novo Documento"
-            file_url = None
+            file_blob = None
             if self.context.get('file_obj'):
                 file_obj = self.context['file_obj']
-                file_url = file_obj
+                file_blob = store_upload(file_obj)
                 title = getattr(file_obj, 'name', title)
 
             documento = Document.objects.create(
                 title=title,
-                file_url=file_url,
+                file_blob=file_blob,
+                file_url=file_blob.file.name if file_blob else None,
+                # Conteúdo já enviado antes: a miniatura é reaproveitada.
+                thumbnail_path=file_blob.thumbnail.name if file_blob and file_blob.thumbnail else None,
                 creator=user,
                 classification=classification,
                 **validated_data
             )
             
             if categories:
-                documento.categories.set(categories)
+                DocumentCategory.objects.bulk_create([
+                    DocumentCategory(document_id=documento.pk, category_id=category_id)
+                    for category_id in categories
+                ])
             
         return documento
 
@@ -130,7 +162,11 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['category_id', 'category']
 
-class DocumentDetailSerializer(serializers.ModelSerializer):
+class DocumentDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Detalhe do documento. Aceita 'fields'/'exclude' (ex.: ?exclude=content para
+    ler só os metadados sem trazer o conteúdo do banco).
+    """
     document_id = serializers.IntegerField(source='pk')
     
     created_at = serializers.DateTimeField(format="%H:%M:%S - %d-%m-%Y", read_only=True) # type: ignore
@@ -155,11 +191,21 @@ class DocumentDetailSerializer(serializers.ModelSerializer):
             'classification',
             'categories'
         ]
+        field_columns = {
+            'title': ('title',),
+            'content': ('content',),
+            'created_at': ('created_at',),
+            'is_active': ('is_active',),
+        }
+        field_prefetches = {
+            'categories': ('categories',),
+        }
 
-class DocumentListSerializer(serializers.ModelSerializer):
+class DocumentListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer "leve" para a listagem de documentos.
     Retorna apenas metadados essenciais, excluindo o 'content' pesado.
+    Aceita 'fields'/'exclude': sem 'download_url', as URLs assinadas não são geradas.
     """
     
     document_id = serializers.IntegerField(source='pk', read_only=True)
@@ -215,6 +261,18 @@ class DocumentListSerializer(serializers.ModelSerializer):
             'thumbnail_path',
             'is_uploaded_document'
         ]
+        field_columns = {
+            'title': ('title',),
+            'created_at': ('created_at',),
+            'is_active': ('is_active',),
+            'file_url': ('file_url',),
+            'download_url': ('file_url',),
+            'is_uploaded_document': ('file_url',),
+            'thumbnail_path': ('thumbnail_path',),
+        }
+        field_prefetches = {
+            'categories_data': ('categories',),
+        }
         
 class DocumentUpdateSerializer(serializers.ModelSerializer):
     """
@@ -256,7 +314,7 @@ class AttachFileSerializer(serializers.ModelSerializer):
     def validate_file(self, value):
         """
         Validação opcional de tamanho ou tipo de arquivo.
-        Also optimizes images before upload.
+        Imagens são otimizadas depois, fora da requisição (ver attachments.optimize_attachment).
         
         Args:
             value (FileField): Arquivo a ser validado.
@@ -268,15 +326,77 @@ class AttachFileSerializer(serializers.ModelSerializer):
         if value.size > limit_mb * 1024 * 1024:
             raise serializers.ValidationError(f"O arquivo não pode exceder {limit_mb}MB.")
         
-        # Optimize image if it's an image file
-        optimized = optimize_image(
-            value,
-            max_width=1920,
-            max_height=1920,
-            quality=85,
-            convert_to_jpeg=True
-        )
-        if optimized:
-            return optimized
-        
         return value
+
+    def create(self, validated_data):
+        """
+        O arquivo vai para o blob do seu conteúdo (deduplicado); o anexo aponta para ele.
+        """
+        with transaction.atomic():
+            blob = store_upload(validated_data['file'])
+            validated_data['blob'] = blob
+            validated_data['file'] = blob.file.name
+            return super().create(validated_data)
+
+
+class BulkDocumentFilterSerializer(serializers.Serializer):
+    """
+    Critérios da seleção por filtro nas operações em lote.
+    """
+    sector_id = serializers.IntegerField(required=False)
+    status_id = serializers.IntegerField(required=False)
+    privacity_id = serializers.IntegerField(required=False)
+    is_reviewed = serializers.BooleanField(required=False)
+    is_active = serializers.BooleanField(required=False)
+    category_id = serializers.IntegerField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Informe ao menos um critério de filtro.")
+        return data
+
+
+class BulkDocumentOperationSerializer(serializers.Serializer):
+    """
+    Payload das operações em lote: a ação, a seleção ('documents_id' ou 'filter')
+    e, para 'reclassify', os novos valores da classificação.
+    """
+    action = serializers.ChoiceField(choices=ACTIONS)
+    documents_id = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_SELECTION
+    )
+    filter = BulkDocumentFilterSerializer(required=False)
+    classification_status = serializers.PrimaryKeyRelatedField(
+        queryset=Classification_Status.objects.all(),
+        required=False
+    )
+    privacity = serializers.PrimaryKeyRelatedField(
+        queryset=Classification_Privacity.objects.all(),
+        required=False
+    )
+    is_reviewed = serializers.BooleanField(required=False)
+
+    def validate(self, data):
+        if ('documents_id' in data) == ('filter' in data):
+            raise serializers.ValidationError("Informe 'documents_id' ou 'filter' (apenas um deles).")
+
+        changes = {field: data[field] for field in ('classification_status', 'privacity', 'is_reviewed') if field in data}
+
+        if data['action'] == RECLASSIFY and not changes:
+            raise serializers.ValidationError("Informe ao menos um campo da classificação para reclassificar.")
+
+        if data['action'] != RECLASSIFY and changes:
+            raise serializers.ValidationError("Campos de classificação só são aceitos na ação 'reclassify'.")
+
+        privacity = changes.get('privacity')
+        if privacity is not None and privacity.privacity == 'Exclusivo':
+            raise serializers.ValidationError({
+                "privacity": "Documentos exclusivos exigem a lista de usuários: altere-os individualmente."
+            })
+
+        data['changes'] = changes
+        return data
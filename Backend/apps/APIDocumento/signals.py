@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector
+from .blobs import release_blobs
+from .categoryUtils.catalog import bump_catalog_version
+from .rendering import schedule_snapshot_render
+from .models import Attached_Files_Document, Category, Classification, Classification_Privacity, Classification_Status, Document
+from .reference_data import invalidate_reference_data
+from .versioning import touch_documents
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_on_category_change(sender, instance, **kwargs):
+    enterprise_id = instance.category_enterprise_id
+    transaction.on_commit(lambda: bump_catalog_version(enterprise_id))
+
+
+@receiver(post_save, sender=Sector)
+@receiver(post_delete, sender=Sector)
+def invalidate_catalog_on_sector_change(sender, instance, **kwargs):
+    """
+    O catálogo guarda o nome do setor; na exclusão, as categorias ficam sem setor (SET_NULL).
+    """
+    enterprise_id = instance.enterprise_id
+    transaction.on_commit(lambda: bump_catalog_version(enterprise_id))
+
+
+@receiver(post_save, sender=Enterprise)
+def invalidate_catalog_on_enterprise_change(sender, instance, created, **kwargs):
+    """
+    O catálogo guarda o nome da empresa.
+    """
+    if created:
+        return
+
+    enterprise_id = instance.pk
+    transaction.on_commit(lambda: bump_catalog_version(enterprise_id))
+
+
+@receiver(post_save, sender=Classification_Status)
+@receiver(post_delete, sender=Classification_Status)
+@receiver(post_save, sender=Classification_Privacity)
+@receiver(post_delete, sender=Classification_Privacity)
+def invalidate_reference_data_on_change(sender, instance, **kwargs):
+    """
+    Status e privacidades são resolvidos pelo registro em memória (reference_data.py).
+    """
+    invalidate_reference_data()
+
+
+# --- Revisão dos documentos (ETag/Last-Modified) ---
+
+@receiver(post_save, sender=Classification)
+def touch_document_on_classification_change(sender, instance, created, **kwargs):
+    """
+    A classificação aparece no detalhe e define a visibilidade do documento na listagem.
+    """
+    if created:
+        return
+
+    document_ids = Document.objects.filter(classification_id=instance.pk).values_list('pk', flat=True)
+    touch_documents(document_ids)
+
+
+@receiver(m2m_changed, sender=Document.categories.through)
+def touch_document_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        touch_documents([instance.pk])
+    elif pk_set:
+        touch_documents(pk_set)
+
+
+@receiver(m2m_changed, sender=Classification.exclusive_users.through)
+def touch_document_on_exclusive_users_change(sender, instance, action, reverse, **kwargs):
+    """
+    Usuários exclusivos mudam quem vê o documento na listagem.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear') or reverse:
+        return
+
+    touch_documents(Document.objects.filter(classification_id=instance.pk).values_list('pk', flat=True))
+
+
+# --- Referências aos blobs dos arquivos ---
+
+@receiver(post_delete, sender=Document)
+def release_document_blob(sender, instance, **kwargs):
+    release_blobs([instance.file_blob_id])
+
+
+@receiver(post_delete, sender=Attached_Files_Document)
+def release_attachment_blob(sender, instance, **kwargs):
+    release_blobs([instance.blob_id])
+
+
+# --- HTML renderizado (html_snapshot) ---
+
+@receiver(post_save, sender=Document)
+def render_snapshot_on_content_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Todo save que grava content agenda uma nova renderização.
+    """
+    if 'content' in instance.get_deferred_fields() or (update_fields is not None and 'content' not in update_fields):
+        return
+
+    schedule_snapshot_render(instance.pk)
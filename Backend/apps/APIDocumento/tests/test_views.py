@@ -1,13 +1,30 @@
+import io
 import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from PIL import Image
 from rest_framework.test import APIClient
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response as DRFResponse
 from typing import Dict, Any, List
 
 from apps.APIEmpresa.models import Enterprise
 from apps.APISetor.models import Sector, SectorUser
-from apps.APIDocumento.models import Document, Classification, Category, Classification_Status, Classification_Privacity
+from apps.core.tasks import optimize_attached_image_task, render_html_snapshot_task
+from apps.APIDocumento.blobs import collect_unreferenced_blobs
+from apps.APIDocumento.history import delete_orphan_blobs
+from apps.APIDocumento.reference_data import get_reference_data, privacity_id_for, privacity_label_for, status_id_for
+from apps.APIDocumento.rendering import render_lexical_html
+from apps.APIDocumento.models import HEAVY_FIELDS, Attached_Files_Document, Document, Classification, Category, Classification_Status, Classification_Privacity, DocumentRecordBlob, FileBlob
+from apps.APIDocumento import versioning
+from apps.APIDocumento.views import CreateDocumentView
+from apps.APIDocumento.bulk_operations import DELETE_CASCADE, DELETE_SET_NULL
 
 User = get_user_model()
 
@@ -113,6 +130,52 @@ class TestCreateDocumentAPI:
         assert new_doc.sector == sector
         assert Classification.objects.filter(pk=new_doc.classification.pk).exists()
 
+    def test_create_document_query_budget(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a criação de um documento exclusivo gasta o mesmo número de consultas
+        com 1 ou 5 usuários exclusivos e 1 ou 2 categorias (INSERT único nas tabelas
+        intermediárias), dentro do query_budget da view.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        exclusive = Classification_Privacity.objects.create(privacity="Exclusivo", classification_privacity_id=3)
+        readers = [
+            User.objects.create_user(username=f"doc_reader{i}", password="pw", email=f"doc_reader{i}@e.com", name=f"Doc Reader {i}")
+            for i in range(5)
+        ]
+        get_reference_data(force=True)
+
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("criar-documento")
+
+        def create(users: List[Any], categories: List[Category]):
+            payload: Dict[str, Any] = {
+                "content": {"ops": [{"insert": "Conteúdo exclusivo."}]},
+                "sector": scenario_data["sector"].pk,
+                "privacity_id": exclusive.pk,
+                "categories": [category.pk for category in categories],
+                "users_exclusive_access": [user.pk for user in users],
+            }
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.post(url, payload, format="json")
+            assert response.status_code == 201 # type: ignore
+            return Document.objects.get(pk=response.data['data']['document_id']), len(context) # type: ignore
+
+        small, small_queries = create(readers[:1], [scenario_data["category1"]])
+        large, large_queries = create(readers, [scenario_data["category1"], scenario_data["category2"]])
+
+        assert small_queries == large_queries
+        assert large_queries <= CreateDocumentView.query_budget
+        assert small.classification.exclusive_users.count() == 2 # type: ignore
+        assert set(large.classification.exclusive_users.values_list('pk', flat=True)) == {*(user.pk for user in readers), scenario_data["member"].pk} # type: ignore
+        assert large.categories.count() == 2
+
     # Failures
 
     def test_create_document_by_outsider_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
@@ -319,6 +382,86 @@ class TestRetrieveDocumentAPI:
         assert "classification" in response.data['data'] # type: ignore
         assert "categories" in response.data['data'] # type: ignore
 
+    def test_retrieve_document_without_content_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se ?exclude=content devolve só os metadados do documento.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"] # type: ignore
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("consultar-documento", kwargs={'pk': document.pk})
+
+        full = api_client.get(url)
+        response = api_client.get(url, {"exclude": "content"})
+
+        assert response.status_code == 200
+        assert "content" not in response.data['data'] # type: ignore
+        assert response.data['data']['title'] == document.title # type: ignore
+        assert response['ETag'] != full['ETag']
+
+    def test_retrieve_document_not_modified_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o cliente com a versão atual (If-None-Match) recebe 304 sem corpo.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"] # type: ignore
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("consultar-documento", kwargs={'pk': document.pk})
+
+        first = api_client.get(url)
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert first.status_code == 200
+        assert 'Last-Modified' in first
+        assert response.status_code == 304
+        assert response['ETag'] == first['ETag']
+        assert not response.content
+
+    def test_retrieve_document_etag_changes_after_update_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a edição do documento ou da classificação invalida o ETag anterior.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"] # type: ignore
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("consultar-documento", kwargs={'pk': document.pk})
+
+        etag = api_client.get(url)['ETag']
+        document.title = "Título Alterado"
+        document.save()
+        after_save = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        classification = document.classification
+        classification.is_reviewed = True # type: ignore
+        classification.save() # type: ignore
+        after_classification = api_client.get(url, HTTP_IF_NONE_MATCH=after_save['ETag'])
+
+        assert after_save.status_code == 200
+        assert after_save.data['data']['title'] == "Título Alterado" # type: ignore
+        assert after_classification.status_code == 200
+        assert after_classification.data['data']['classification']['is_reviewed'] is True # type: ignore
+
     # Failures
 
     def test_retrieve_non_existent_document_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
@@ -488,6 +631,114 @@ class TestListDocumentsAPI:
         
         assert scenario_data["doc_unrelated"].pk not in returned_doc_ids # type: ignore
 
+    def test_list_documents_sparse_fieldset_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se ?fields= limita os campos de cada item da listagem.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["test_user"])
+        url: str = reverse("visualizar-documentos")
+
+        response = api_client.get(url, {"fields": "document_id,title"})
+
+        assert response.status_code == 200
+        results: List[Dict[str, Any]] = response.data['data']['results'] # type: ignore
+
+        # Só entram documentos das empresas do usuário: o "Doc (Criador)" fica de fora.
+        assert {item['document_id'] for item in results} == {
+            scenario_data["doc_in_owned_enterprise"].pk,
+            scenario_data["doc_in_managed_sector"].pk,
+            scenario_data["doc_in_member_sector"].pk,
+        }
+        assert all(set(item) == {"document_id", "title"} for item in results)
+        assert {item['title'] for item in results} == {"Doc (Dono)", "Doc (Gerente)", "Doc (Membro)"}
+
+    def test_list_documents_unknown_field_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um campo inexistente em ?fields= é rejeitado.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["test_user"])
+        url: str = reverse("visualizar-documentos")
+
+        response = api_client.get(url, {"fields": "title,yjs_state"})
+
+        assert response.status_code == 400
+
+    def test_list_documents_not_modified_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a listagem responde 304 enquanto nenhum documento visível muda,
+        e volta a responder 200 após uma alteração.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["test_user"])
+        url: str = reverse("visualizar-documentos")
+
+        etag = api_client.get(url)['ETag']
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        document: Document = scenario_data["doc_in_member_sector"] # type: ignore
+        document.title = "Doc (Membro) Alterado"
+        document.save()
+        modified = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert not_modified.status_code == 304
+        assert modified.status_code == 200
+        assert modified['ETag'] != etag
+
+    def test_list_documents_signed_urls_window_success(self, api_client: APIClient, scenario_data: Dict[str, Any], monkeypatch) -> None:
+        """
+        Testa se a listagem (que embute URLs assinadas) volta a responder 200 quando a
+        janela das URLs muda, tanto por If-None-Match quanto por If-Modified-Since.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            monkeypatch : fixture do pytest para alterar atributos
+
+        Return:
+            None
+        """
+        now = timezone.now()
+        monkeypatch.setattr(versioning, "timezone", SimpleNamespace(now=lambda: now))
+        api_client.force_authenticate(user=scenario_data["test_user"])
+        url: str = reverse("visualizar-documentos")
+
+        first = api_client.get(url)
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        later = now + timedelta(seconds=versioning.SIGNED_URL_WINDOW)
+        monkeypatch.setattr(versioning, "timezone", SimpleNamespace(now=lambda: later))
+        by_etag = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        by_date = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+        assert not_modified.status_code == 304
+        assert by_etag.status_code == 200
+        assert by_etag['ETag'] != first['ETag']
+        assert by_date.status_code == 200
+
     def test_list_documents_no_links_success(self, api_client: APIClient) -> None:
         """
         Testa se um utilizador autenticado mas sem vínculos a nenhum documento
@@ -756,4 +1007,879 @@ class TestUpdateDocumentAPI:
 
         assert response.status_code == 400 # type: ignore
         assert response.data['sucesso'] is False # type: ignore
-        assert "title" in response.data['data'] # type: ignore
\ No newline at end of file
+        assert "title" in response.data['data'] # type: ignore
+
+@pytest.mark.django_db
+class TestDocumentHistoryStorage:
+    """
+    Suíte de testes da política de armazenamento do histórico (Document_Record).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Cria um documento e duas versões do seu estado Yjs, com uma edição de título entre elas.
+        """
+        owner = User.objects.create_user(username="hist_owner", password="pw", email="hist_owner@e.com", name="Hist Owner")
+        enterprise = Enterprise.objects.create(name="Hist Corp", owner=owner)
+        sector = Sector.objects.create(name="Hist Sector", enterprise=enterprise, manager=owner)
+        SectorUser.objects.create(user=owner, sector=sector, is_adm=True)
+
+        status, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        privacity, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        document = Document.objects.create(
+            title="Versão 1",
+            content={},
+            creator=owner,
+            sector=sector,
+            yjs_state=b"yjs-v1",
+            classification=Classification.objects.create(classification_status=status, privacity=privacity),
+        )
+        first_version = document.history.latest() # type: ignore
+
+        document.title = "Versão 1 (renomeado)"
+        document.save()
+
+        document.yjs_state = b"yjs-v2"
+        document.save()
+
+        return {"owner": owner, "document": document, "first_version": first_version}
+
+    # Success
+
+    def test_history_stores_blobs_once(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se as versões guardam só o hash e se o mesmo estado Yjs é gravado uma única vez.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"]
+        versions = list(document.history.order_by('history_date')) # type: ignore
+
+        assert len(versions) == 3
+        assert versions[0].yjs_state_hash == versions[1].yjs_state_hash
+        assert versions[1].yjs_state_hash != versions[2].yjs_state_hash
+        assert DocumentRecordBlob.objects.count() == 2
+
+    def test_delete_orphan_blobs_keeps_referenced(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a coleta remove só os conteúdos antigos que nenhuma versão referencia.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        DocumentRecordBlob.objects.create(hash="f" * 64, data=b"orfao")
+        DocumentRecordBlob.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        assert delete_orphan_blobs() == 1
+        assert DocumentRecordBlob.objects.count() == 2
+        assert not DocumentRecordBlob.objects.filter(hash="f" * 64).exists()
+
+    def test_revert_restores_version_yjs_state(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se reverter para uma versão restaura também o estado Yjs daquela versão.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+        
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"]
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("reverter-documento", kwargs={
+            'pk': document.pk,
+            'history_id': scenario_data["first_version"].history_id
+        })
+
+        response = api_client.post(url)
+
+        assert response.status_code == 200 # type: ignore
+        document.refresh_from_db()
+        assert document.title == "Versão 1"
+        assert bytes(document.yjs_state) == b"yjs-v1" # type: ignore
+
+@pytest.mark.django_db
+class TestBulkDocumentOperationsAPI:
+    """
+    Suíte de testes para o endpoint BulkDocumentOperationView (/operacoes-em-lote/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Três documentos de um setor, com dono, administrador e membro comum.
+        """
+        owner = User.objects.create_user(username="bulk_doc_owner", password="pw", email="bulk_doc_owner@e.com", name="Bulk Owner")
+        admin = User.objects.create_user(username="bulk_doc_admin", password="pw", email="bulk_doc_admin@e.com", name="Bulk Admin")
+        member = User.objects.create_user(username="bulk_doc_member", password="pw", email="bulk_doc_member@e.com", name="Bulk Member")
+
+        enterprise = Enterprise.objects.create(name="Bulk Doc Corp", owner=owner)
+        sector = Sector.objects.create(name="Bulk Doc Sector", enterprise=enterprise, manager=owner)
+        SectorUser.objects.create(user=admin, sector=sector, is_adm=True)
+        SectorUser.objects.create(user=member, sector=sector, is_adm=False)
+
+        status, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        Classification_Status.objects.get_or_create(status="Arquivado")
+        privacity, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        documents = [
+            Document.objects.create(
+                title=f"Lote {i}",
+                content={},
+                creator=owner,
+                sector=sector,
+                classification=Classification.objects.create(classification_status=status, privacity=privacity),
+            ) for i in range(3)
+        ]
+
+        return {"owner": owner, "admin": admin, "member": member, "sector": sector, "documents": documents}
+
+    # Success
+
+    def test_bulk_deactivate_writes_history_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o administrador do setor desativa vários documentos, com uma versão de histórico para cada.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        documents: List[Document] = scenario_data["documents"]
+        api_client.force_authenticate(user=scenario_data["admin"])
+        url: str = reverse("operacoes-em-lote-documentos")
+
+        response = api_client.post(url, {"action": "deactivate", "documents_id": [doc.pk for doc in documents]}, format="json")
+
+        assert response.status_code == 200
+        assert response.data['data']['affected'] == 3 # type: ignore
+        assert not Document.objects.filter(pk__in=[doc.pk for doc in documents], is_active=True).exists()
+        assert Document.history.filter(document_id=documents[0].pk, history_type='~', is_active=False).count() == 1 # type: ignore
+
+    def test_bulk_reclassify_by_filter_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa a reclassificação de todos os documentos do setor selecionados por filtro.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        archived = Classification_Status.objects.get(status="Arquivado")
+        api_client.force_authenticate(user=scenario_data["member"])
+        url: str = reverse("operacoes-em-lote-documentos")
+        data = {
+            "action": "reclassify",
+            "filter": {"sector_id": scenario_data["sector"].pk},
+            "classification_status": archived.pk,
+        }
+
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == 200
+        assert response.data['data']['affected'] == 3 # type: ignore
+        assert Classification.objects.filter(document__sector=scenario_data["sector"], classification_status=archived).count() == 3
+
+    def test_bulk_delete_by_owner_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o dono exclui vários documentos, registrando a exclusão no histórico.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        documents: List[Document] = scenario_data["documents"]
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("operacoes-em-lote-documentos")
+
+        response = api_client.post(url, {"action": "delete", "documents_id": [documents[0].pk, documents[1].pk]}, format="json")
+
+        assert response.status_code == 200
+        assert list(Document.objects.filter(sector=scenario_data["sector"]).values_list('pk', flat=True)) == [documents[2].pk]
+        assert Document.history.filter(history_type='-', document_id__in=[documents[0].pk, documents[1].pk]).count() == 2 # type: ignore
+
+    def test_bulk_delete_handles_every_relation_success(self) -> None:
+        """
+        Testa se toda relação reversa de Document (inclusive as ocultas, related_name='+')
+        tem tratamento em delete_documents, que apaga com delete_rows sem o collector do Django.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        def reverse_relations(model) -> Dict[Any, Any]:
+            return {
+                (field.related_model, field.field.name): field.on_delete
+                for field in model._meta.get_fields(include_hidden=True)
+                if field.auto_created and not field.concrete
+            }
+
+        on_delete = reverse_relations(Document)
+
+        assert set(on_delete) == {*DELETE_CASCADE, *DELETE_SET_NULL}
+        assert all(on_delete[relation] is models.CASCADE for relation in DELETE_CASCADE)
+        assert all(on_delete[relation] is models.SET_NULL for relation in DELETE_SET_NULL)
+        # O DELETE bruto das tabelas em cascata também não propaga para as relações delas.
+        assert not any(reverse_relations(model) for model, _ in DELETE_CASCADE)
+
+    # Failure
+
+    def test_bulk_delete_by_admin_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o administrador do setor não pode excluir (mesma regra de CanDELETEDocument).
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        documents: List[Document] = scenario_data["documents"]
+        api_client.force_authenticate(user=scenario_data["admin"])
+        url: str = reverse("operacoes-em-lote-documentos")
+
+        response = api_client.post(url, {"action": "delete", "documents_id": [doc.pk for doc in documents]}, format="json")
+
+        assert response.status_code == 403
+        assert sorted(response.data['data']['forbidden']) == sorted(doc.pk for doc in documents) # type: ignore
+        assert Document.objects.filter(sector=scenario_data["sector"]).count() == 3
+
+    def test_bulk_operation_requires_single_selection_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a seleção precisa ser por IDs ou por filtro, nunca ambos.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("operacoes-em-lote-documentos")
+        data = {
+            "action": "activate",
+            "documents_id": [scenario_data["documents"][0].pk],
+            "filter": {"sector_id": scenario_data["sector"].pk},
+        }
+
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestDocumentQueryBudget:
+    """
+    Regressão de I/O dos endpoints de documento: quantidade de consultas e
+    colunas pesadas (content, search_content, yjs_state, html_snapshot) lidas de "Document".
+    """
+
+    # (nome da rota, método, dados, máximo de consultas, colunas pesadas permitidas)
+    ENDPOINTS = [
+        ("visualizar-documentos", "get", None, 8, ()),
+        ("buscar-documentos", "get", None, 8, ()),
+        ("consultar-documento", "get", {"exclude": "content"}, 6, ()),
+        ("consultar-documento", "get", None, 8, ("content",)),
+        ("alterar-documento", "patch", {"title": "Relatório revisado"}, 30, ("content",)),
+        ("ativar-ou-desativar-documento", "patch", None, 30, ("content",)),
+        ("listar-arquivos-anexados", "get", None, 6, ()),
+        ("visualizar-classificacao", "get", None, 6, ()),
+        ("listar-vinculos-categoria", "get", None, 8, ()),
+        ("listar-categoria-disponiveis-documento", "get", None, 8, ()),
+        ("historico-documento", "get", None, 8, ()),
+    ]
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Cria um documento com todas as colunas pesadas preenchidas e algumas versões no histórico.
+        """
+        owner = User.objects.create_user(username="budget_owner", password="pw", email="budget_owner@e.com", name="Budget Owner")
+        enterprise = Enterprise.objects.create(name="Budget Corp", owner=owner)
+        sector = Sector.objects.create(name="Budget Sector", enterprise=enterprise, manager=owner)
+
+        status, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        privacity, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        content = {"root": {"children": [{"children": [{"text": "Relatório trimestral " * 500}]}]}}
+        documents = [
+            Document.objects.create(
+                title=f"Relatório {index}",
+                content=content,
+                creator=owner,
+                sector=sector,
+                yjs_state=b"y" * 100_000,
+                html_snapshot="<p>Relatório</p>" * 5_000,
+                classification=Classification.objects.create(classification_status=status, privacity=privacity),
+            ) for index in range(3)
+        ]
+        category = Category.objects.create(category="Budget", category_enterprise=enterprise, category_sector=sector)
+        for document in documents:
+            document.categories.add(category)
+            document.title = f"{document.title} (editado)"
+            document.save()
+
+        return {"owner": owner, "document": documents[0]}
+
+    @staticmethod
+    def fetched_heavy_columns(queries: List[Dict[str, str]]) -> set:
+        """
+        Colunas pesadas de "Document" presentes na lista de colunas de algum SELECT.
+        """
+        columns = {name: f'"Document"."{Document._meta.get_field(name).column}"' for name in HEAVY_FIELDS} # type: ignore
+
+        fetched = set()
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            selected = sql.split(' FROM ', 1)[0]
+            fetched |= {name for name, column in columns.items() if column in selected}
+        return fetched
+
+    # Success
+
+    @pytest.mark.parametrize("route, method, data, max_queries, allowed_heavy", ENDPOINTS)
+    def test_endpoint_query_budget(
+        self, api_client: APIClient, scenario_data: Dict[str, Any],
+        route: str, method: str, data: Any, max_queries: int, allowed_heavy: tuple
+    ) -> None:
+        """
+        Testa se o endpoint respeita o limite de consultas e só lê as colunas pesadas que usa.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            route (str): Nome da rota
+            method (str): Método HTTP
+            data (Any): Parâmetros ou corpo da requisição
+            max_queries (int): Máximo de consultas permitido
+            allowed_heavy (tuple): Colunas pesadas que o endpoint precisa ler
+
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"] # type: ignore
+        api_client.force_authenticate(user=scenario_data["owner"])
+        kwargs = {} if route in ("visualizar-documentos", "buscar-documentos") else {'pk': document.pk}
+        url: str = reverse(route, kwargs=kwargs)
+
+        with CaptureQueriesContext(connection) as context:
+            if method == "get":
+                response = api_client.get(url, data)
+            else:
+                response = api_client.patch(url, data, format="json")
+
+        assert response.status_code == 200
+        assert len(context.captured_queries) <= max_queries, [query['sql'] for query in context.captured_queries]
+        assert self.fetched_heavy_columns(context.captured_queries) <= set(allowed_heavy)
+
+    def test_default_manager_defers_heavy_columns(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se Document.objects não lê as colunas pesadas e se with_heavy as traz de volta.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"] # type: ignore
+
+        default = Document.objects.get(pk=document.pk)
+        with_yjs = Document.objects.with_heavy('yjs_state').get(pk=document.pk)
+
+        assert default.get_deferred_fields() == set(HEAVY_FIELDS)
+        assert with_yjs.get_deferred_fields() == set(HEAVY_FIELDS) - {'yjs_state'}
+        assert bytes(with_yjs.yjs_state) == b"y" * 100_000 # type: ignore
+
+    def test_saving_deferred_document_keeps_heavy_columns(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se salvar um documento sem as colunas pesadas não as apaga
+        e se a nova versão do histórico reaproveita os hashes do Yjs/HTML.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        document: Document = scenario_data["document"] # type: ignore
+        previous_version = document.history.latest() # type: ignore
+
+        deferred = Document.objects.get(pk=document.pk)
+        deferred.is_active = False
+        deferred.save()
+
+        stored = Document.objects.with_heavy().get(pk=document.pk)
+        latest_version = document.history.latest() # type: ignore
+
+        assert stored.is_active is False
+        assert bytes(stored.yjs_state) == b"y" * 100_000 # type: ignore
+        assert stored.search_content
+        assert latest_version.yjs_state_hash == previous_version.yjs_state_hash
+        assert latest_version.html_snapshot_hash == previous_version.html_snapshot_hash
+
+    @pytest.mark.parametrize("route", ["visualizar-documentos", "buscar-documentos"])
+    def test_listing_filters_without_reference_joins(self, api_client: APIClient, scenario_data: Dict[str, Any], route: str) -> None:
+        """
+        Testa se a listagem e a busca filtram a privacidade pelo ID (registro de referência),
+        sem juntar as tabelas de status e privacidade.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            route (str): Nome da rota
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        get_reference_data()
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(reverse(route))
+
+        sql = " ".join(query['sql'] for query in context.captured_queries)
+
+        assert response.status_code == 200
+        assert '"Classification_Privacity"' not in sql
+        assert '"Classification_Status"' not in sql
+
+    def test_reference_data_resolves_without_queries(self, scenario_data: Dict[str, Any], django_assert_num_queries) -> None:
+        """
+        Testa se o registro resolve status/privacidade sem consultas depois de carregado
+        e se um novo status o invalida.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_assert_num_queries : conta as consultas do bloco
+
+        Return:
+            None
+        """
+        private = Classification_Privacity.objects.get(privacity="Privado")
+        get_reference_data()
+
+        with django_assert_num_queries(0):
+            privacity_id = privacity_id_for("Privado")
+            label = privacity_label_for(private.pk)
+
+        archived = Classification_Status.objects.create(status="Arquivado")
+
+        assert privacity_id == private.pk
+        assert label == "Privado"
+        assert status_id_for("Arquivado") == archived.pk
+
+
+@pytest.mark.django_db
+class TestAttachFileAPI:
+    """
+    Suíte de testes para o endpoint AttachFileToDocumentView (/<int:pk>/anexar-arquivo/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture(autouse=True)
+    def memory_storage(self, settings, monkeypatch) -> None:
+        """
+        Storage em memória no lugar do S3 e a task executada localmente (sem broker).
+        """
+        settings.STORAGES = {**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+        monkeypatch.setattr(optimize_attached_image_task, "delay", lambda *args: optimize_attached_image_task.apply(args))
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Cria um documento no setor de um dono de empresa.
+        """
+        owner = User.objects.create_user(username="attach_owner", password="pw", email="attach_owner@e.com", name="Attach Owner")
+        enterprise = Enterprise.objects.create(name="Attach Corp", owner=owner)
+        sector = Sector.objects.create(name="Attach Sector", enterprise=enterprise, manager=owner)
+
+        status, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        privacity, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        document = Document.objects.create(
+            title="Documento com anexos",
+            content={},
+            creator=owner,
+            sector=sector,
+            classification=Classification.objects.create(classification_status=status, privacity=privacity),
+        )
+
+        return {"owner": owner, "document": document}
+
+    @staticmethod
+    def jpeg_upload(width: int, height: int) -> SimpleUploadedFile:
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height), (120, 80, 40)).save(buffer, format="JPEG", quality=100)
+        return SimpleUploadedFile("foto.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    # Success
+
+    def test_attach_image_is_optimized_after_upload_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se o upload grava o original e se a versão otimizada substitui o arquivo do anexo depois.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("anexar-arquivo", kwargs={'pk': scenario_data["document"].pk})
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = api_client.post(url, {"title": "Foto", "file": self.jpeg_upload(4000, 3000)}, format="multipart")
+
+        attachment = Attached_Files_Document.objects.get(document_id=scenario_data["document"])
+        original_name = attachment.file.name
+        with default_storage.open(original_name) as stored:
+            assert Image.open(stored).size == (4000, 3000)
+
+        for callback in callbacks:
+            callback()
+        attachment.refresh_from_db()
+
+        assert response.status_code == 201
+        assert len(callbacks) == 1
+        assert attachment.file.name != original_name
+        assert attachment.blob.file.name == attachment.file.name # type: ignore
+        # O original perde a referência e fica para o cleanup_s3_orphans.
+        assert FileBlob.objects.get(file=original_name).ref_count == 0
+        with default_storage.open(attachment.file.name) as stored:
+            assert Image.open(stored).size == (1920, 1440)
+
+    def test_attach_non_image_is_not_scheduled_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se arquivos que não são imagem não agendam a otimização.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("anexar-arquivo", kwargs={'pk': scenario_data["document"].pk})
+        upload = SimpleUploadedFile("contrato.pdf", b"%PDF-1.4 contrato", content_type="application/pdf")
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = api_client.post(url, {"title": "Contrato", "file": upload}, format="multipart")
+
+        assert response.status_code == 201
+        assert callbacks == []
+
+    def test_same_file_attached_twice_is_stored_once_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any]
+    ) -> None:
+        """
+        Testa se o mesmo conteúdo anexado duas vezes vira um único blob com duas referências.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("anexar-arquivo", kwargs={'pk': scenario_data["document"].pk})
+
+        for name in ("contrato.pdf", "copia.pdf"):
+            upload = SimpleUploadedFile(name, b"%PDF-1.4 contrato", content_type="application/pdf")
+            response = api_client.post(url, {"title": name, "file": upload}, format="multipart")
+            assert response.status_code == 201
+
+        attachments = list(Attached_Files_Document.objects.filter(document_id=scenario_data["document"]))
+        blob = FileBlob.objects.get()
+
+        assert blob.ref_count == 2
+        assert blob.size == len(b"%PDF-1.4 contrato")
+        assert {attachment.file.name for attachment in attachments} == {blob.file.name}
+
+    def test_optimized_rendition_is_reused_for_same_image_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se a segunda cópia da mesma imagem reaproveita a versão otimizada da primeira.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("anexar-arquivo", kwargs={'pk': scenario_data["document"].pk})
+        content = self.jpeg_upload(4000, 3000).read()
+
+        for title in ("Foto", "Copia"):
+            with django_capture_on_commit_callbacks(execute=True):
+                upload = SimpleUploadedFile("foto.jpg", content, content_type="image/jpeg")
+                api_client.post(url, {"title": title, "file": upload}, format="multipart")
+
+        attachments = list(Attached_Files_Document.objects.filter(document_id=scenario_data["document"]))
+        source = FileBlob.objects.get(optimized__isnull=False)
+
+        assert FileBlob.objects.count() == 2
+        assert source.ref_count == 0
+        assert {attachment.blob_id for attachment in attachments} == {source.optimized_id} # type: ignore
+        assert source.optimized.ref_count == 2 # type: ignore
+
+    def test_document_delete_releases_blobs_and_cleanup_collects_them_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any]
+    ) -> None:
+        """
+        Testa se excluir o documento libera as referências e se a coleta remove blob e arquivo.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("anexar-arquivo", kwargs={'pk': scenario_data["document"].pk})
+        upload = SimpleUploadedFile("contrato.pdf", b"%PDF-1.4 contrato", content_type="application/pdf")
+        api_client.post(url, {"title": "Contrato", "file": upload}, format="multipart")
+        blob = FileBlob.objects.get()
+
+        scenario_data["document"].delete()
+        blob.refresh_from_db()
+
+        assert blob.ref_count == 0
+        assert default_storage.exists(blob.file.name)
+
+        results = collect_unreferenced_blobs(dry_run=False)
+
+        assert results["blobs"] == 1
+        assert not FileBlob.objects.exists()
+        assert not default_storage.exists(blob.file.name)
+
+
+def lexical(*children: Dict[str, Any]) -> Dict[str, Any]:
+    """Conteúdo do editor (Lexical) com os blocos informados."""
+    return {"root": {"type": "root", "children": list(children)}}
+
+
+def paragraph(text: str, text_format: int = 0) -> Dict[str, Any]:
+    return {"type": "paragraph", "children": [{"type": "text", "text": text, "format": text_format}]}
+
+
+@pytest.mark.django_db
+class TestDocumentSnapshotAPI:
+    """
+    Suíte de testes para o endpoint DocumentSnapshotView (/consultar/<int:pk>/html/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture(autouse=True)
+    def local_tasks(self, monkeypatch) -> None:
+        """
+        A renderização roda localmente (sem broker).
+        """
+        monkeypatch.setattr(render_html_snapshot_task, "delay", lambda *args: render_html_snapshot_task.apply(args))
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Cria um documento privado no setor de um dono de empresa e um usuário de fora.
+        """
+        owner = User.objects.create_user(username="snapshot_owner", password="pw", email="snapshot_owner@e.com", name="Snapshot Owner")
+        outsider = User.objects.create_user(username="snapshot_outsider", password="pw", email="snapshot_outsider@e.com", name="Snapshot Outsider")
+        enterprise = Enterprise.objects.create(name="Snapshot Corp", owner=owner)
+        sector = Sector.objects.create(name="Snapshot Sector", enterprise=enterprise, manager=owner)
+
+        status, _ = Classification_Status.objects.get_or_create(status="Em andamento")
+        privacity, _ = Classification_Privacity.objects.get_or_create(privacity="Privado")
+
+        document = Document.objects.create(
+            title="Documento renderizado",
+            content=lexical(paragraph("Primeira versão", text_format=1)),
+            creator=owner,
+            sector=sector,
+            classification=Classification.objects.create(classification_status=status, privacity=privacity),
+        )
+
+        return {"owner": owner, "outsider": outsider, "document": document}
+
+    # Success
+
+    def test_render_lexical_html_is_sanitized_success(self) -> None:
+        """
+        Testa se o texto é escapado, a formatação vira tags e URLs perigosas são descartadas.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        html = render_lexical_html(lexical(
+            paragraph("<script>alert(1)</script>"),
+            {"type": "heading", "tag": "h1", "format": "center", "children": [{"type": "text", "text": "Título", "format": 3}]},
+            {"type": "paragraph", "children": [
+                {"type": "link", "url": "javascript:alert(1)", "children": [{"type": "text", "text": "clique"}]},
+                {"type": "text", "text": "cor", "style": "color: red; background: url(x)"},
+            ]},
+            {"type": "image", "src": "javascript:alert(1)", "altText": "x"},
+        ))
+
+        assert "<script>" not in html
+        assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+        assert '<h1 style="text-align: center"><strong><em>Título</em></strong></h1>' in html
+        assert "javascript:" not in html
+        assert '<span style="color: red">cor</span>' in html
+        assert "<img" not in html
+
+    def test_snapshot_rendered_after_content_update_success(
+        self, api_client: APIClient, scenario_data: Dict[str, Any], django_capture_on_commit_callbacks
+    ) -> None:
+        """
+        Testa se salvar o conteúdo agenda a renderização e se o endpoint serve o HTML da nova revisão.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            django_capture_on_commit_callbacks : captura os callbacks de on_commit
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        document: Document = scenario_data["document"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(
+                reverse("alterar-documento", kwargs={'pk': document.pk}),
+                {"content": lexical(paragraph("Segunda versão"))},
+                format="json"
+            )
+
+        document.refresh_from_db()
+        response = api_client.get(reverse("consultar-documento-html", kwargs={'pk': document.pk}))
+
+        assert response.status_code == 200 # type: ignore
+        assert response.data['data']['html'] == "<p>Segunda versão</p>" # type: ignore
+        assert response.data['data']['revision'] == document.revision # type: ignore
+        assert document.html_snapshot_revision == document.revision
+
+    def test_snapshot_not_modified_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o endpoint responde 304 quando o cliente já tem o HTML atual.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("consultar-documento-html", kwargs={'pk': scenario_data["document"].pk})
+
+        first = api_client.get(url)
+        second = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert first.status_code == 200 # type: ignore
+        assert first.data['data']['html'] == "<p><strong>Primeira versão</strong></p>" # type: ignore
+        assert second.status_code == 304 # type: ignore
+        assert second["ETag"] == first["ETag"]
+
+    # Failures
+
+    def test_snapshot_by_outsider_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um usuário sem vínculo com o documento não recebe o HTML.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["outsider"])
+        url: str = reverse("consultar-documento-html", kwargs={'pk': scenario_data["document"].pk})
+
+        response = api_client.get(url)
+
+        assert response.status_code == 403 # type: ignore
@@ -6,9 +6,11 @@ from .views import (
     ListAttachedFilesToDocumentView,
     ListDocumentsView,
     RetrieveDocumentView,
+    DocumentSnapshotView,
     UpdateDocumentView,
     ActivateOrDeactivateDocumentView,
     DeleteDocumentView,
+    BulkDocumentOperationView,
     DetachFileToDocumentView,
     DocumentSearchView,
     FileUploadView
@@ -16,14 +18,18 @@ from .views import (
 
 from .classificationUtils.urls import classification_urlpatterns
 from .categoryUtils.urls import category_urlpatterns
+from .exportUtils.urls import export_urlpatterns
+from .importUtils.urls import import_urlpatterns
 
 urlpatterns = [
     path("criar/", CreateDocumentView.as_view(), name="criar-documento"),
     path("consultar/<int:pk>/", RetrieveDocumentView.as_view(), name="consultar-documento"),
+    path("consultar/<int:pk>/html/", DocumentSnapshotView.as_view(), name="consultar-documento-html"),
     path("visualizar/", ListDocumentsView.as_view(), name="visualizar-documentos"),
     path("alterar/<int:pk>/", UpdateDocumentView.as_view(), name="alterar-documento"),
     path("ativar-desativar/<int:pk>/", ActivateOrDeactivateDocumentView.as_view(), name="ativar-ou-desativar-documento"),
     path("excluir/<int:pk>/", DeleteDocumentView.as_view(), name="excluir-documento"),
+    path("operacoes-em-lote/", BulkDocumentOperationView.as_view(), name="operacoes-em-lote-documentos"),
     
     # Attach Documents
     
@@ -36,4 +42,4 @@ urlpatterns = [
     
     # Information Retrieval (IR)
     path("buscar/", DocumentSearchView.as_view(), name="buscar-documentos")
-] + classification_urlpatterns + category_urlpatterns
\ No newline at end of file
+] + classification_urlpatterns + category_urlpatterns + export_urlpatterns + import_urlpatterns
\ No newline at end of file
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Iterable, Optional
+
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.presigned_url import PRESIGNED_URL_EXPIRATION
+from .categoryUtils.catalog import catalog_etag
+from .models import Document
+
+
+def touch_documents(document_ids: Iterable[int]) -> int:
+    """
+    Sobe a revisão dos documentos cuja representação mudou sem passar por Document.save()
+    (classificação, categorias, operações em lote). Um único UPDATE.
+    """
+    document_ids = [document_id for document_id in set(document_ids) if document_id is not None]
+    if not document_ids:
+        return 0
+
+    return Document.objects.filter(pk__in=document_ids).update(
+        revision=F('revision') + 1,
+        updated_at=timezone.now()
+    )
+
+
+def document_etag(document_id: int, revision: int, updated_at, catalog_version: Optional[int] = None, *parts: Any) -> str:
+    """
+    ETag do detalhe do documento. A versão do catálogo da empresa cobre os
+    nomes/cores das categorias e o nome do setor exibidos junto; 'parts' são
+    os demais parâmetros que mudam a resposta (ex.: campos selecionados).
+    """
+    return catalog_etag('document', document_id, revision, updated_at.isoformat(), catalog_version, *parts)
+
+
+def listing_etag(*parts: Any) -> str:
+    """
+    ETag de uma listagem: agregados da consulta (quantidade, última atualização)
+    mais os parâmetros que mudam a resposta (página, usuário, versões dos catálogos).
+    """
+    return catalog_etag('listing', *parts)
+
+
+# Respostas com URLs assinadas trocam de validador a cada janela: uma resposta guardada
+# pelo cliente nunca é revalidada (304) depois que as URLs dela expiraram.
+SIGNED_URL_WINDOW = PRESIGNED_URL_EXPIRATION // 4
+
+
+def signed_url_window() -> datetime:
+    """
+    Início da janela atual das URLs assinadas. Entra no ETag e no Last-Modified
+    das respostas que as embutem (ex.: 'download_url' da listagem).
+    """
+    now = int(timezone.now().timestamp())
+    return datetime.fromtimestamp(now - now % SIGNED_URL_WINDOW, tz=dt_timezone.utc)
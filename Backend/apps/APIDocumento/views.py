@@ -1,6 +1,8 @@
 import json
 from django.utils import timezone
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from asgiref.sync import sync_to_async
+from adrf.views import APIView as AsyncAPIView
 from rest_framework.views import APIView, Response
 from django.contrib.auth import get_user_model
 from apps.core.tasks import process_media_asset
@@ -9,8 +11,15 @@ from apps.APIEmpresa.models import Enterprise
 from apps.APISetor.models import Sector, SectorUser
 from apps.APIDocumento.models import Attached_Files_Document, Document
 from rest_framework.permissions import IsAuthenticated
+from .attachments import is_image, schedule_attachment_optimization
+from .bulk_operations import resolve_selection, run_bulk_operation
+from .categoryUtils.catalog import get_catalog_versions
+from .reference_data import PRIVACITY_EXCLUSIVE, PRIVACITY_PUBLIC, aget_reference_data
+from .rendering import render_document_snapshot
+from .versioning import document_etag, listing_etag, signed_url_window
 from .serializers import (
     AttachFileSerializer, 
+    BulkDocumentOperationSerializer,
     DocumentCreateSerializer, 
     DocumentDetailSerializer, 
     DocumentListSerializer, 
@@ -18,9 +27,10 @@ from .serializers import (
 )
 from rest_framework.parsers import JSONParser
 from apps.APIDocumento.permissions import CanAttachDocument, CanDELETEDocument, IsLinkedToDocument, CanActivateOrDeactivateDocument
-from apps.core.utils import default_response
+from apps.core.fieldsets import parse_fieldset
+from apps.core.utils import default_response, is_not_modified, not_modified_response, set_cache_validators
 from django.http import HttpResponse
-from django.db.models import Q
+from django.db.models import Count, Max, Q, aprefetch_related_objects
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank, TrigramSimilarity
 from django.db.models import Value, TextField
@@ -35,6 +45,7 @@ class CreateDocumentView(APIView):
     A permissão de acesso é tratada pelo serializer (validate_sector).
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 30
     parser_classes = [JSONParser] 
     
     def post(self, request) -> HttpResponse:
@@ -56,7 +67,7 @@ class CreateDocumentView(APIView):
         res.data = default_response(success=True, message="Documento criado com sucesso!", data={"document_id": documento.pk}) # type: ignore
         return res
     
-class ListDocumentsView(APIView):
+class ListDocumentsView(AsyncAPIView):
     """
     Recupera uma lista de todos os documentos visíveis para o usuário.
     Isso inclui:
@@ -66,9 +77,11 @@ class ListDocumentsView(APIView):
     4. Todos os documentos se o usuário for o Dono da Empresa.
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 10
 
-    def get(self, request) -> HttpResponse:
+    async def get(self, request) -> HttpResponse:
         request_user = request.user
+        reference = await aget_reference_data()
 
         enterprise_links = Enterprise.objects.filter(
             Q(owner=request_user) |
@@ -81,7 +94,7 @@ class ListDocumentsView(APIView):
         )
         
         queryset = queryset.filter(
-            Q(classification__privacity__privacity='Público') |
+            Q(classification__privacity_id__in=reference.privacity_ids_for(PRIVACITY_PUBLIC)) |
             Q(creator=request_user) |
             Q(sector__enterprise__owner=request_user) |
             Q(sector__manager=request_user) |
@@ -89,51 +102,88 @@ class ListDocumentsView(APIView):
         ).distinct() 
         
         queryset = queryset.exclude(
-            Q(classification__privacity__privacity='Exclusivo') &
+            Q(classification__privacity_id__in=reference.privacity_ids_for(PRIVACITY_EXCLUSIVE)) &
             ~Q(classification__exclusive_users=request_user)
         )
         
-        queryset = queryset.select_related(
-            'classification__classification_status', 
-            'sector'
+        fields, exclude = parse_fieldset(request)
+        selected = DocumentListSerializer.selected_fields(fields, exclude)
+
+        # Validação condicional antes de paginar/serializar: a listagem só muda
+        # quando algum documento visível muda (revisão), entra ou sai do conjunto.
+        state = await queryset.order_by().aaggregate(total=Count('pk', distinct=True), last_update=Max('updated_at'))
+        enterprise_ids = [enterprise_id async for enterprise_id in enterprise_links.values_list('enterprise_id', flat=True)]
+        versions = await sync_to_async(get_catalog_versions)(enterprise_ids)
+
+        last_modified = state['last_update']
+        etag_parts = [
+            request_user.pk,
+            state['total'],
+            last_modified.isoformat() if last_modified else None,
+            sorted(versions.items()),
+            sorted(request.query_params.items())
+        ]
+        if 'download_url' in selected:
+            # As URLs assinadas expiram: o validador muda a cada janela (ver signed_url_window).
+            window = signed_url_window()
+            etag_parts.append(window.isoformat())
+            last_modified = max(last_modified, window) if last_modified else window
+        etag = listing_etag(*etag_parts)
+
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        # Tudo o que o DocumentListSerializer lê precisa vir carregado:
+        # em contexto async um acesso lazy ao banco levanta SynchronousOnlyOperation.
+        # Colunas fora da seleção (e sempre content/yjs_state/html_snapshot) não são lidas.
+        queryset = DocumentListSerializer.optimize_queryset(
+            queryset.select_related(
+                'sector__enterprise',
+                'creator'
+            ),
+            selected
         ).order_by('-is_active', '-created_at')
 
         paginator = DocumentPagination()
-        result_page = paginator.paginate_queryset(queryset, request, view=self)
+        result_page = await paginator.apaginate_queryset(queryset, request, view=self)
         
         if result_page is not None:
-            serializer = DocumentListSerializer(result_page, many=True)
+            serializer = DocumentListSerializer(result_page, many=True, fields=selected)
             paginated_data = paginator.get_paginated_response(serializer.data).data
             
             res: HttpResponse = Response()
             res.status_code = 200
             res.data = default_response(
                 success=True, 
-                message=f"Encontrados {queryset.count()} documentos.", 
+                message=f"Encontrados {paginator.page.paginator.count} documentos.", 
                 data=paginated_data # type: ignore
             )
+            set_cache_validators(res, etag, last_modified)
             return res
         
-        serializer = DocumentListSerializer(queryset, many=True)
+        documents = [document async for document in queryset]
+        serializer = DocumentListSerializer(documents, many=True, fields=selected)
         
         res: HttpResponse = Response()
         res.status_code = 200
         res.data = default_response(
             success=True, 
-            message=f"Encontrados {queryset.count()} documentos.", 
+            message=f"Encontrados {len(documents)} documentos.", 
             data=serializer.data
         )
+        set_cache_validators(res, etag, last_modified)
         return res
     
-class RetrieveDocumentView(APIView):
+class RetrieveDocumentView(AsyncAPIView):
     """
     Recupera os detalhes de um único documento.
     O ID do documento deve ser passado na URL.
     A permissão é verificada pela classe IsLinkedToDocument.
     """
     permission_classes = [IsAuthenticated, IsLinkedToDocument]
+    query_budget = 10
 
-    def get(self, request, pk: int) -> HttpResponse:
+    async def get(self, request, pk: int) -> HttpResponse:
         """
         Handles the GET request to retrieve a specific document by its PK.
 
@@ -144,6 +194,11 @@ class RetrieveDocumentView(APIView):
         Returns:
             HttpResponse: A response containing the document details or an error.
         """
+        fields, exclude = parse_fieldset(request)
+        selected = DocumentDetailSerializer.selected_fields(fields, exclude)
+
+        # Document.objects não lê content nem os campos pesados: content só é lido se o
+        # cliente não tiver a versão atual (e se fizer parte dos campos pedidos).
         queryset = Document.objects.select_related(
             'sector', 
             'sector__manager',
@@ -152,18 +207,92 @@ class RetrieveDocumentView(APIView):
             'classification__classification_status',
             'classification__privacity',
             'classification__reviewer'
-        ).prefetch_related(
-            'categories'
         )
-        document = get_object_or_404(queryset, pk=pk)
+        document = await aget_object_or_404(queryset, pk=pk)
         
-        self.check_object_permissions(request, document)
+        # As permissões de objeto consultam o banco (SectorUser), então rodam em thread.
+        await sync_to_async(self.check_object_permissions)(request, document)
+
+        enterprise_id = document.sector.enterprise_id if document.sector else None # type: ignore
+        catalog_version = None
+        if enterprise_id is not None:
+            catalog_version = (await sync_to_async(get_catalog_versions)([enterprise_id]))[enterprise_id]
+
+        etag = document_etag(document.pk, document.revision, document.updated_at, catalog_version, sorted(selected))
 
-        serializer = DocumentDetailSerializer(document)
+        if is_not_modified(request, etag, document.updated_at):
+            return not_modified_response(etag, document.updated_at)
+
+        if 'content' in selected:
+            document.content = await Document.objects.filter(pk=pk).values_list('content', flat=True).aget()
+        if 'categories' in selected:
+            await aprefetch_related_objects([document], 'categories')
+
+        serializer = DocumentDetailSerializer(document, fields=selected)
 
         res: HttpResponse = Response()
         res.status_code = 200
         res.data = default_response(success=True, data=serializer.data)
+        set_cache_validators(res, etag, document.updated_at)
+        return res
+    
+class DocumentSnapshotView(AsyncAPIView):
+    """
+    HTML já renderizado do documento (html_snapshot), para leitura, exportação e prévia:
+    o cliente não baixa o JSON do editor nem renderiza nada.
+    A permissão é a mesma do detalhe (IsLinkedToDocument).
+    """
+    permission_classes = [IsAuthenticated, IsLinkedToDocument]
+    query_budget = 12
+
+    async def get(self, request, pk: int) -> HttpResponse:
+        """
+        Handles the GET request to retrieve the rendered HTML of a document.
+
+        Args:
+            request (Request): The user request object.
+            pk (int): The primary key of the document, from the URL.
+
+        Returns:
+            HttpResponse: A response containing the rendered HTML, or 304 if the client has it.
+        """
+        queryset = Document.objects.select_related(
+            'sector__manager',
+            'sector__enterprise__owner',
+            'classification__privacity'
+        )
+        document = await aget_object_or_404(queryset, pk=pk)
+
+        await sync_to_async(self.check_object_permissions)(request, document)
+
+        if document.html_snapshot_revision is None:
+            # Documento ainda não renderizado (ex.: anterior ao snapshot): renderiza agora.
+            snapshot = await sync_to_async(render_document_snapshot)(document.pk)
+            html, revision, rendered_at = snapshot['html'], snapshot['revision'], snapshot['rendered_at'] # type: ignore
+        else:
+            revision, rendered_at = document.html_snapshot_revision, document.html_snapshot_at
+            html = None
+
+        etag = document_etag(document.pk, revision, rendered_at, None, 'snapshot')
+
+        if is_not_modified(request, etag, rendered_at):
+            return not_modified_response(etag, rendered_at)
+
+        if html is None:
+            html = await Document.objects.filter(pk=pk).values_list('html_snapshot', flat=True).aget()
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(
+            success=True,
+            data={
+                'document_id': document.pk,
+                'revision': revision,
+                'rendered_at': rendered_at,
+                'html': html or '',
+            }
+        )
+        set_cache_validators(res, etag, rendered_at)
         return res
     
 class UpdateDocumentView(APIView):
@@ -185,7 +314,7 @@ class UpdateDocumentView(APIView):
         Returns:
             HttpResponse: Uma resposta contendo o documento atualizado ou um erro.
         """
-        queryset = Document.objects.select_related(
+        queryset = Document.objects.with_content().select_related(
             'sector__enterprise__owner',
             'sector__manager'
         ).prefetch_related('sector__sector_links__user')
@@ -203,7 +332,8 @@ class UpdateDocumentView(APIView):
 
         updated_document = serializer.save()
 
-        response_serializer = DocumentDetailSerializer(updated_document)
+        fields, exclude = parse_fieldset(request)
+        response_serializer = DocumentDetailSerializer(updated_document, fields=fields, exclude=exclude)
 
         res: HttpResponse = Response()
         res.status_code = 200
@@ -214,12 +344,13 @@ class ActivateOrDeactivateDocumentView(APIView):
     permission_classes = [IsAuthenticated, CanActivateOrDeactivateDocument]
     
     def patch(self, request, pk: int):
-        document = get_object_or_404(Document, pk=pk)
+        # A nova versão do histórico copia content; Yjs/HTML reaproveitam os hashes da última versão.
+        document = get_object_or_404(Document.objects.with_content(), pk=pk)
         
         self.check_object_permissions(request, document)
         
         document.is_active = not document.is_active
-        document.save()
+        document.save(update_fields=['is_active'])
         
         ret = Response()
         ret.status_code = 200
@@ -231,7 +362,7 @@ class DeleteDocumentView(APIView):
     
     def delete(self, request, pk: int):
 
-        document = get_object_or_404(Document, pk=pk)
+        document = get_object_or_404(Document.objects.with_content(), pk=pk)
         
         self.check_object_permissions(request, document)
         
@@ -242,6 +373,64 @@ class DeleteDocumentView(APIView):
         ret.data = default_response(success=True, message="Documento excluído com sucesso.")
         return ret
     
+class BulkDocumentOperationView(APIView):
+    """
+    Operações em lote sobre documentos: ativar, desativar, excluir ou reclassificar.
+
+    A seleção é feita por 'documents_id' ou por 'filter'. As permissões seguem as
+    mesmas regras das views individuais e são verificadas em uma única consulta.
+    Por IDs, a operação é recusada se algum documento não puder ser alterado.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request) -> HttpResponse:
+        """
+        Manipula a requisição POST da operação em lote.
+
+        Args:
+            request (Request): Contém o payload {action, documents_id[] | filter{}, classification_status?, privacity?, is_reviewed?}.
+
+        Returns:
+            HttpResponse: O resumo da operação (selecionados e alterados).
+        """
+        serializer = BulkDocumentOperationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+        action = data['action'] # type: ignore
+
+        selection = resolve_selection(
+            request.user,
+            action,
+            document_ids=data.get('documents_id'), # type: ignore
+            filters=data.get('filter') # type: ignore
+        )
+
+        if selection['not_found']:
+            res: HttpResponse = Response()
+            res.status_code = 404
+            res.data = default_response(success=False, message="Documentos não encontrados.", data={"not_found": selection['not_found']})
+            return res
+
+        if selection['forbidden']:
+            res: HttpResponse = Response()
+            res.status_code = 403
+            res.data = default_response(success=False, message="Você não tem permissão para alterar estes documentos.", data={"forbidden": selection['forbidden']})
+            return res
+
+        if selection['truncated']:
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="O filtro seleciona documentos demais. Refine os critérios.")
+            return res
+
+        summary = run_bulk_operation(action, selection, request.user, changes=data['changes']) # type: ignore
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(success=True, message=f"{summary['affected']} documentos alterados.", data=summary) # type: ignore
+        return res
+    
 # Attaching Files
 
 class AttachFileToDocumentView(APIView):
@@ -275,6 +464,9 @@ class AttachFileToDocumentView(APIView):
 
         instance = serializer.save(document_id=document)
 
+        if is_image(serializer.validated_data['file'].content_type): # type: ignore
+            schedule_attachment_optimization(instance)
+
         res: HttpResponse = Response()
         res.status_code = 201
         res.data = default_response(
@@ -312,11 +504,17 @@ class ListAttachedFilesToDocumentView(APIView):
         """
         Realiza a consulta de todos os arquivos anexados ao documento.
         """
-        queryset = get_object_or_404(Document, pk=pk)
+        # CanAttachDocument lê setor, empresa, dono, gerente e privacidade: tudo em uma consulta.
+        queryset = Document.objects.select_related(
+            'sector__enterprise__owner',
+            'sector__manager',
+            'classification__privacity'
+        )
+        document = get_object_or_404(queryset, pk=pk)
         
-        self.check_object_permissions(request, queryset)
+        self.check_object_permissions(request, document)
         
-        attached_files = queryset.attached_files.filter(detached_at__isnull=True) # type: ignore
+        attached_files = document.attached_files.filter(detached_at__isnull=True) # type: ignore
         
         serializer = AttachFileSerializer(attached_files, many=True)
         
@@ -325,17 +523,19 @@ class ListAttachedFilesToDocumentView(APIView):
         res.data = default_response(success=True, message="Arquivos recuperados com sucesso.", data=serializer.data)
         return res
     
-class DocumentSearchView(APIView):
+class DocumentSearchView(AsyncAPIView):
     """
     Endpoint unificado de Busca e Filtro de Documentos.
     Combina IR (q=) com filtros estruturados (status_id=, etc.).
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 10
 
     serializer_class = DocumentListSerializer 
 
-    def get(self, request):
+    async def get(self, request):
         request_user = request.user
+        reference = await aget_reference_data()
         
         querySearch = request.query_params.get('q', None)
         status_id = request.query_params.get('status_id', None)
@@ -385,7 +585,7 @@ class DocumentSearchView(APIView):
             queryset = queryset.filter(classification__privacity=privacity_id)
         else:
             queryset = queryset.filter(
-            Q(classification__privacity__privacity='Exclusivo') & 
+            Q(classification__privacity_id__in=reference.privacity_ids_for(PRIVACITY_EXCLUSIVE)) & 
             (
                 Q(classification__exclusive_users=request_user) |
                 Q(sector__enterprise__owner=request_user) |
@@ -423,40 +623,42 @@ class DocumentSearchView(APIView):
         else:
             queryset = queryset.order_by('-created_at')
 
-        queryset = queryset.distinct().select_related(
-            'sector', 
-            'classification__classification_status', 
-            'classification__privacity',
-            'classification__reviewer',
-            'creator'
-        ).prefetch_related(
-            'categories'
+        fields, exclude = parse_fieldset(request)
+        selected = self.serializer_class.selected_fields(fields, exclude)
+
+        queryset = self.serializer_class.optimize_queryset(
+            queryset.distinct().select_related(
+                'sector__enterprise', 
+                'creator'
+            ),
+            selected
         )
         
         paginator = DocumentPagination()
-        result_page = paginator.paginate_queryset(queryset, request, view=self)
+        result_page = await paginator.apaginate_queryset(queryset, request, view=self)
         # result_page = self.get_categories_color(result_page)
         
         if result_page is not None:
-            serializer = self.serializer_class(result_page, many=True)
+            serializer = self.serializer_class(result_page, many=True, fields=selected)
             paginated_data = paginator.get_paginated_response(serializer.data).data
             
             res: HttpResponse = Response()
             res.status_code = 200
             res.data = default_response(
                 success=True, 
-                message=f"Encontrados {queryset.count()} documentos.", 
+                message=f"Encontrados {paginator.page.paginator.count} documentos.", 
                 data=paginated_data # type: ignore
             )
             return res
         
-        serializer = self.serializer_class(queryset, many=True)
+        documents = [document async for document in queryset]
+        serializer = self.serializer_class(documents, many=True, fields=selected)
         
         res: HttpResponse = Response()
         res.status_code = 200
         res.data = default_response(
             success=True,
-            message=f"Encontrados {queryset.count()} documentos relevantes.",
+            message=f"Encontrados {len(documents)} documentos relevantes.",
             data=serializer.data
         )
         return res
@@ -471,6 +673,7 @@ class FileUploadView(APIView):
     Receive the file and save it on S3. Also triggers for celery stack task.
     """
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 40
     parser_classes = (MultiPartParser, FormParser)
 
     def post(self, request, *args, **kwargs):
@@ -495,7 +698,9 @@ class FileUploadView(APIView):
         serializer.is_valid(raise_exception=True)
         
         document = serializer.save()
-        process_media_asset.delay(document.pk) # type: ignore
+        if not document.thumbnail_path:
+            # Conteúdo já enviado antes tem a miniatura no blob (ver blobs.py).
+            process_media_asset.delay(document.pk) # type: ignore
 
         res = Response()
         res.status_code = 201
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APISetor', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sectorreviewpolicy',
+            name='expired_until',
+            field=models.DateTimeField(blank=True, db_column='date_expired_until_sector_review_policy', null=True),
+        ),
+    ]
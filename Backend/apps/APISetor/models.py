@@ -58,6 +58,10 @@ class SectorReviewPolicy(models.Model):
     
     is_active = models.BooleanField(default=False, db_column='is_active_sector_review_policy')
 
+    # Até onde a expiração já foi aplicada: a próxima execução só olha
+    # documentos revisados/criados entre esta data e o novo corte.
+    expired_until = models.DateTimeField(null=True, blank=True, db_column='date_expired_until_sector_review_policy')
+
     class Meta:
         db_table = 'Sector_Review_Policy'
         verbose_name = "Política de Revisão"
@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from apps.APIAudit.models import AuditLog
+from apps.APISetor.models import Sector, SectorUser
+from apps.APIUser.utils.colleague_directory import drop_directory
+from apps.core.utils import delete_rows
+
+USER = get_user_model()
+
+MAX_BULK_USERS = 500
+
+
+@dataclass
+class MembershipPlan:
+    """
+    Resultado da validação de uma operação em lote sobre os membros de um setor.
+    """
+    # (user_id, email, is_adm)
+    to_create: List[Tuple[int, str, bool]] = field(default_factory=list)
+    # (sector_user_id, email, is_adm)
+    to_update: List[Tuple[int, str, bool]] = field(default_factory=list)
+    # (sector_user_id, user_id, email)
+    to_delete: List[Tuple[int, int, str]] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    not_found: List[str] = field(default_factory=list)
+
+    @property
+    def changes_roles(self) -> bool:
+        return bool(self.to_update) or any(is_adm for _, _, is_adm in self.to_create)
+
+
+def sector_members_by_email(sector: Sector, emails: List[str]) -> Dict[str, Tuple[int, Any, Any]]:
+    """
+    Usuários dos e-mails informados e o vínculo de cada um com o setor, em uma única consulta.
+    Retorna {email: (user_id, sector_user_id, is_adm)}; sem vínculo, os dois últimos são None.
+    """
+    links = SectorUser.objects.filter(sector=sector, user=OuterRef('pk'))
+
+    rows = USER.objects.filter(email__in=emails).annotate(
+        link_id=Subquery(links.values('sector_user_id')[:1]),
+        link_is_adm=Subquery(links.values('is_adm')[:1]),
+    ).values_list('email', 'pk', 'link_id', 'link_is_adm')
+
+    return {email: (user_id, link_id, is_adm) for email, user_id, link_id, is_adm in rows}
+
+
+def plan_member_upsert(sector: Sector, members: List[Dict[str, Any]]) -> MembershipPlan:
+    """
+    Vincula os usuários ao setor com o papel informado.
+    Quem já é membro só tem o papel (is_adm) atualizado, se diferente.
+    """
+    # O último papel informado para um mesmo e-mail prevalece.
+    roles = {member['user_email']: member.get('is_adm', False) for member in members}
+    found = sector_members_by_email(sector, list(roles))
+
+    plan = MembershipPlan()
+    for email, is_adm in roles.items():
+        if email not in found:
+            plan.not_found.append(email)
+            continue
+
+        user_id, link_id, current_is_adm = found[email]
+        if link_id is None:
+            plan.to_create.append((user_id, email, is_adm))
+        elif current_is_adm != is_adm:
+            plan.to_update.append((link_id, email, is_adm))
+        else:
+            plan.unchanged.append(email)
+
+    return plan
+
+
+def plan_member_removal(sector: Sector, emails: List[str]) -> MembershipPlan:
+    """
+    Desvincula os usuários do setor. E-mails sem vínculo com o setor são inválidos.
+    """
+    found = sector_members_by_email(sector, list(dict.fromkeys(emails)))
+
+    plan = MembershipPlan()
+    for email in dict.fromkeys(emails):
+        user_id, link_id, _ = found.get(email, (None, None, None))
+        if link_id is None:
+            plan.not_found.append(email)
+        else:
+            plan.to_delete.append((link_id, user_id, email)) # type: ignore
+
+    return plan
+
+
+def apply_membership_plan(sector: Sector, plan: MembershipPlan, actor) -> Dict[str, Any]:
+    """
+    Aplica o plano em uma única transação: bulk_create, bulk_update e um único DELETE.
+
+    As operações em lote não disparam os sinais por linha, então a auditoria
+    é registrada em uma única entrada agregada e o diretório de colegas da
+    empresa é descartado uma vez (reconstruído na próxima leitura).
+    """
+    summary: Dict[str, Any] = {
+        'added': [email for _, email, _ in plan.to_create],
+        'updated': [email for _, email, _ in plan.to_update],
+        'removed': [email for _, _, email in plan.to_delete],
+        'unchanged': plan.unchanged,
+    }
+
+    if not (plan.to_create or plan.to_update or plan.to_delete):
+        return summary
+
+    with transaction.atomic():
+        if plan.to_create:
+            SectorUser.objects.bulk_create([
+                SectorUser(sector=sector, user_id=user_id, is_adm=is_adm)
+                for user_id, _, is_adm in plan.to_create
+            ], batch_size=MAX_BULK_USERS)
+
+        if plan.to_update:
+            SectorUser.objects.bulk_update([
+                SectorUser(sector_user_id=link_id, is_adm=is_adm)
+                for link_id, _, is_adm in plan.to_update
+            ], ['is_adm'], batch_size=MAX_BULK_USERS)
+
+        changes: Dict[str, Any] = {'members': {key: value for key, value in summary.items() if key != 'unchanged' and value}}
+
+        if plan.to_delete:
+            removed_user_ids = {user_id for _, user_id, _ in plan.to_delete}
+
+            # Um único DELETE, sem carregar as linhas nem disparar post_delete por vínculo:
+            # o diretório da empresa é descartado uma vez no commit (abaixo).
+            delete_rows(SectorUser, 'sector_user_id', [link_id for link_id, _, _ in plan.to_delete])
+
+            # Mesma regra da remoção individual: o gestor removido devolve a gestão ao dono.
+            if sector.manager_id in removed_user_ids: # type: ignore
+                owner_id = sector.enterprise.owner_id # type: ignore
+                Sector.objects.filter(pk=sector.pk).update(manager_id=owner_id)
+                changes['manager'] = {'old': sector.manager_id, 'new': owner_id} # type: ignore
+                sector.manager_id = owner_id # type: ignore
+
+        AuditLog.objects.create(
+            actor=actor,
+            action='~',
+            target_model='Sector',
+            target_id=sector.pk,
+            target_str=str(sector)[:200],
+            changes=changes
+        )
+
+        enterprise_id = sector.enterprise_id # type: ignore
+        transaction.on_commit(lambda: drop_directory(enterprise_id))
+
+    return summary
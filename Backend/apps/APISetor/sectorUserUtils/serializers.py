@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from apps.APISetor.sectorUserUtils.bulk_membership import MAX_BULK_USERS
 
 User = get_user_model()
 
@@ -17,4 +18,20 @@ class SectorUserRoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['user_id', 'user_name', 'user_email', 'role', 'sector_user_id']
-        
\ No newline at end of file
+
+
+class BulkMemberSerializer(serializers.Serializer):
+    user_email = serializers.EmailField()
+    is_adm = serializers.BooleanField(default=False)
+
+class BulkAddMembersSerializer(serializers.Serializer):
+    """
+    Payload de vínculo em lote: [{"user_email": ..., "is_adm": bool}, ...].
+    """
+    users = BulkMemberSerializer(many=True, allow_empty=False, max_length=MAX_BULK_USERS)
+
+class BulkRemoveMembersSerializer(serializers.Serializer):
+    """
+    Payload de desvínculo em lote: ["email", ...].
+    """
+    user_emails = serializers.ListField(child=serializers.EmailField(), allow_empty=False, max_length=MAX_BULK_USERS)
@@ -7,6 +7,8 @@ from typing import Dict, Any
 
 from apps.APIEmpresa.models import Enterprise
 from apps.APISetor.models import Sector, SectorUser
+from apps.APIAudit.models import AuditLog
+from apps.core.get_request_user import request_context
 
 User = get_user_model()
 
@@ -1010,3 +1012,202 @@ class TestShowSectorUsersAPI:
 
         assert response.status_code == 403 # type: ignore
         assert response.data['sucesso'] is False # type: ignore
+
+@pytest.mark.django_db
+class TestBulkSectorMembershipAPI:
+    """
+    Suíte de testes dos endpoints de vínculo e desvínculo em lote
+    (POST /adicionar-usuarios/<pk>/ e DELETE /remover-usuarios/<pk>/).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Retorna uma instância de APIClient."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Setor com um administrador e um membro comum, e três usuários ainda fora do setor.
+        """
+        # Modelos auditados: os sinais de auditoria precisam de uma requisição ativa.
+        with request_context():
+            owner = User.objects.create_user(username="bulk_owner", password="pw", email="bulk_owner@e.com", name="Bulk Owner")
+            manager = User.objects.create_user(username="bulk_manager", password="pw", email="bulk_manager@e.com", name="Bulk Manager")
+            admin_worker = User.objects.create_user(username="bulk_admin", password="pw", email="bulk_admin@e.com", name="Bulk Admin")
+            worker = User.objects.create_user(username="bulk_worker", password="pw", email="bulk_worker@e.com", name="Bulk Worker")
+            new_users = [
+                User.objects.create_user(username=f"bulk_new_{i}", password="pw", email=f"bulk_new_{i}@e.com", name=f"Bulk New {i}")
+                for i in range(3)
+            ]
+
+            enterprise = Enterprise.objects.create(name="Bulk Corp", owner=owner)
+            sector = Sector.objects.create(name="Bulk Sector", enterprise=enterprise, manager=manager)
+
+            SectorUser.objects.create(user=admin_worker, sector=sector, is_adm=True)
+            SectorUser.objects.create(user=worker, sector=sector, is_adm=False)
+
+        return {
+            "owner": owner,
+            "manager": manager,
+            "admin_worker": admin_worker,
+            "worker": worker,
+            "new_users": new_users,
+            "sector": sector,
+        }
+
+    # Success
+
+    def test_bulk_add_users_with_roles_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o gestor vincula vários usuários com papéis em uma requisição,
+        atualizando o papel de quem já é membro e gerando uma única auditoria.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        sector: Sector = scenario_data["sector"]
+        new_users = scenario_data["new_users"]
+        api_client.force_authenticate(user=scenario_data["manager"])
+        url: str = reverse("adicionar-usuarios-setor", kwargs={'pk': sector.pk})
+        payload = {"users": [
+            {"user_email": new_users[0].email},
+            {"user_email": new_users[1].email, "is_adm": True},
+            {"user_email": scenario_data["worker"].email, "is_adm": True},
+            {"user_email": scenario_data["admin_worker"].email, "is_adm": True},
+        ]}
+
+        response = api_client.post(url, payload, format="json")
+
+        assert response.status_code == 200 # type: ignore
+        assert response.data['sucesso'] is True # type: ignore
+        assert sorted(response.data['data']['added']) == sorted([new_users[0].email, new_users[1].email]) # type: ignore
+        assert response.data['data']['updated'] == [scenario_data["worker"].email] # type: ignore
+        assert response.data['data']['unchanged'] == [scenario_data["admin_worker"].email] # type: ignore
+
+        assert SectorUser.objects.filter(sector=sector).count() == 4
+        assert SectorUser.objects.get(sector=sector, user=new_users[1]).is_adm is True
+        assert SectorUser.objects.get(sector=sector, user=scenario_data["worker"]).is_adm is True
+        assert AuditLog.objects.filter(target_model='Sector', target_id=sector.pk).count() == 1
+
+    def test_bulk_remove_users_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o dono remove vários membros em uma requisição.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        sector: Sector = scenario_data["sector"]
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("remover-usuarios-setor", kwargs={'pk': sector.pk})
+        payload = {"user_emails": [scenario_data["worker"].email, scenario_data["admin_worker"].email]}
+
+        response = api_client.delete(url, payload, format="json")
+
+        assert response.status_code == 200 # type: ignore
+        assert response.data['sucesso'] is True # type: ignore
+        assert not SectorUser.objects.filter(sector=sector).exists()
+
+    # Failure
+
+    def test_bulk_add_unknown_email_applies_nothing(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um e-mail inexistente na lista invalida toda a operação.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        sector: Sector = scenario_data["sector"]
+        api_client.force_authenticate(user=scenario_data["owner"])
+        url: str = reverse("adicionar-usuarios-setor", kwargs={'pk': sector.pk})
+        payload = {"users": [
+            {"user_email": scenario_data["new_users"][0].email},
+            {"user_email": "ninguem@e.com"},
+        ]}
+
+        response = api_client.post(url, payload, format="json")
+
+        assert response.status_code == 400 # type: ignore
+        assert response.data['data']['not_found'] == ["ninguem@e.com"] # type: ignore
+        assert SectorUser.objects.filter(sector=sector).count() == 2
+
+    def test_bulk_add_admin_by_sector_admin_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um administrador do setor pode vincular membros, mas não conceder administração.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        sector: Sector = scenario_data["sector"]
+        new_users = scenario_data["new_users"]
+        api_client.force_authenticate(user=scenario_data["admin_worker"])
+        url: str = reverse("adicionar-usuarios-setor", kwargs={'pk': sector.pk})
+
+        response = api_client.post(url, {"users": [{"user_email": new_users[0].email, "is_adm": True}]}, format="json")
+        assert response.status_code == 403 # type: ignore
+
+        response = api_client.post(url, {"users": [{"user_email": new_users[0].email}]}, format="json")
+        assert response.status_code == 200 # type: ignore
+
+    def test_bulk_remove_user_not_linked_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a remoção em lote falha inteira quando algum usuário não é membro do setor.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        sector: Sector = scenario_data["sector"]
+        api_client.force_authenticate(user=scenario_data["manager"])
+        url: str = reverse("remover-usuarios-setor", kwargs={'pk': sector.pk})
+        payload = {"user_emails": [scenario_data["worker"].email, scenario_data["new_users"][0].email]}
+
+        response = api_client.delete(url, payload, format="json")
+
+        assert response.status_code == 400 # type: ignore
+        assert SectorUser.objects.filter(sector=sector).count() == 2
+
+    def test_bulk_add_by_unauthorized_user_fails(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se um membro comum recebe 403.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        sector: Sector = scenario_data["sector"]
+        api_client.force_authenticate(user=scenario_data["worker"])
+        url: str = reverse("adicionar-usuarios-setor", kwargs={'pk': sector.pk})
+
+        response = api_client.post(url, {"users": [{"user_email": scenario_data["new_users"][0].email}]}, format="json")
+
+        assert response.status_code == 403 # type: ignore
+        assert response.data['sucesso'] is False # type: ignore
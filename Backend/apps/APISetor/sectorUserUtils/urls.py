@@ -6,6 +6,8 @@ from .views import (
     SetManagerForSectorView,
     SetUnsetUserAdministrator,
     ListSectorUsersView,
+    BulkAddUsersToSectorView,
+    BulkRemoveUsersFromSectorView,
     )
 
 sector_user_urlpatterns = [
@@ -14,4 +16,6 @@ sector_user_urlpatterns = [
     path("definir-gerente/<int:pk>/", SetManagerForSectorView.as_view(), name="definir-gerente-setor"),
     path("definir-administrador/<int:pk>/", SetUnsetUserAdministrator.as_view(), name="definir-administrador-setor"),
     path("listar-usuarios-setor/<int:pk>/", ListSectorUsersView.as_view(), name="listar-usuarios-setor"),
+    path("adicionar-usuarios/<int:pk>/", BulkAddUsersToSectorView.as_view(), name="adicionar-usuarios-setor"),
+    path("remover-usuarios/<int:pk>/", BulkRemoveUsersFromSectorView.as_view(), name="remover-usuarios-setor"),
 ]
\ No newline at end of file
@@ -3,7 +3,8 @@ from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404
 from rest_framework.views import APIView, Response
 from rest_framework.permissions import IsAuthenticated
-from apps.APISetor.sectorUserUtils.serializers import SectorUserRoleSerializer
+from apps.APISetor.sectorUserUtils.serializers import SectorUserRoleSerializer, BulkAddMembersSerializer, BulkRemoveMembersSerializer
+from apps.APISetor.sectorUserUtils.bulk_membership import plan_member_upsert, plan_member_removal, apply_membership_plan
 from apps.APISetor.models import Sector, SectorUser
 from apps.APIEmpresa.models import Enterprise
 from django.contrib.auth import get_user_model
@@ -208,3 +209,89 @@ class ListSectorUsersView(APIView):
         res.status_code = 200
         res.data = default_response(success=True, message="Lista de usuários recuperada com sucesso!", data=serializer.data)
         return res
+
+class BulkAddUsersToSectorView(APIView):
+    """
+    Links several users to a sector in a single request.
+
+    Payload: {"users": [{"user_email": str, "is_adm": bool}, ...]}.
+    Users already linked only have their role updated. Every e-mail is
+    validated in one query and nothing is applied if any of them is unknown.
+
+    Requires the enterprise owner, the sector manager or a sector admin;
+    granting or revoking admin privileges requires the owner or the manager,
+    as in `SetUnsetUserAdministrator`.
+    """
+    permission_classes = [IsAuthenticated, IsOwnerManagerOrSectorAdmin]
+
+    def post(self, request, pk: int):
+        serializer = BulkAddMembersSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="Erro na validação da lista de usuários.", data=serializer.errors)
+            return res
+
+        sector_query: Sector = get_object_or_404(Sector.objects.select_related('enterprise'), pk=pk)
+        self.check_object_permissions(request, sector_query)
+
+        plan = plan_member_upsert(sector_query, serializer.validated_data['users']) # type: ignore
+
+        if plan.not_found:
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="Usuários não encontrados.", data={"not_found": plan.not_found})
+            return res
+
+        if plan.changes_roles and not IsEnterpriseOwnerOrSectorManager().has_object_permission(request, self, sector_query):
+            res: HttpResponse = Response()
+            res.status_code = 403
+            res.data = default_response(success=False, message="Apenas o dono da empresa ou o gestor do setor podem alterar administradores.")
+            return res
+
+        summary = apply_membership_plan(sector_query, plan, request.user)
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(success=True, message="Usuários vinculados ao setor com sucesso.", data=summary)
+        return res
+
+class BulkRemoveUsersFromSectorView(APIView):
+    """
+    Removes several users from a sector in a single request.
+
+    Payload: {"user_emails": [str, ...]}. Every e-mail must be linked to the
+    sector, otherwise nothing is removed. If the sector manager is removed,
+    the management returns to the enterprise owner, as in `RemoveUserFromSectorView`.
+
+    Requires the enterprise owner, the sector manager or a sector admin.
+    """
+    permission_classes = [IsAuthenticated, IsOwnerManagerOrSectorAdmin]
+
+    def delete(self, request, pk: int):
+        serializer = BulkRemoveMembersSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="Erro na validação da lista de usuários.", data=serializer.errors)
+            return res
+
+        sector_query: Sector = get_object_or_404(Sector.objects.select_related('enterprise'), pk=pk)
+        self.check_object_permissions(request, sector_query)
+
+        plan = plan_member_removal(sector_query, serializer.validated_data['user_emails']) # type: ignore
+
+        if plan.not_found:
+            res: HttpResponse = Response()
+            res.status_code = 400
+            res.data = default_response(success=False, message="Usuários não vinculados a este setor.", data={"not_found": plan.not_found})
+            return res
+
+        summary = apply_membership_plan(sector_query, plan, request.user)
+
+        res: HttpResponse = Response()
+        res.status_code = 200
+        res.data = default_response(success=True, message="Usuários removidos do setor com sucesso.", data=summary)
+        return res
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiuserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.APIUser"
+
+    def ready(self):
+        import apps.APIUser.signals
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:29
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('APIUser', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        # Já instalada por APIDocumento (0006); repetida aqui porque esta migração pode rodar antes.
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='absuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='user_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='absuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+        ),
+    ]
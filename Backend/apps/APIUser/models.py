@@ -4,6 +4,8 @@ from datetime import timedelta
 
 # DJANGO
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.utils.timezone import now
 from django.contrib.auth.models import BaseUserManager
 from django.contrib.auth.models import AbstractUser, PermissionsMixin
@@ -73,6 +75,11 @@ class AbsUser(AbstractUser, PermissionsMixin):
 
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            # Type-ahead do seletor de colegas (name__istartswith / username__istartswith)
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='user_name_trgm_idx'),
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorUser
+from .utils import colleague_directory as directory
+
+User = get_user_model()
+
+DIRECTORY_USER_FIELDS = {'name', 'username'}
+
+
+@receiver(post_save, sender=SectorUser)
+def add_sector_member_to_directory(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    enterprise_id = Sector.objects.filter(pk=instance.sector_id).values_list('enterprise_id', flat=True).first()
+    transaction.on_commit(lambda: directory.add_member(enterprise_id, instance.user_id)) # type: ignore
+
+
+@receiver(post_delete, sender=SectorUser)
+def remove_sector_member_from_directory(sender, instance, **kwargs):
+    enterprise_id = Sector.objects.filter(pk=instance.sector_id).values_list('enterprise_id', flat=True).first()
+    if enterprise_id is None:
+        return # Setor excluído junto: o diretório é descartado pelo sinal do setor.
+
+    transaction.on_commit(lambda: directory.remove_member(enterprise_id, instance.user_id))
+
+
+@receiver(pre_save, sender=Sector)
+@receiver(pre_save, sender=Enterprise)
+def remember_previous_directory_user(sender, instance, **kwargs):
+    """
+    Guarda o gestor/dono anterior para saber se ele saiu do diretório.
+    """
+    field = 'manager_id' if sender is Sector else 'owner_id'
+    instance._previous_directory_user_id = (
+        sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Sector)
+@receiver(post_save, sender=Enterprise)
+def update_directory_on_manager_change(sender, instance, created, **kwargs):
+    if sender is Sector:
+        enterprise_id, user_id = instance.enterprise_id, instance.manager_id
+    else:
+        enterprise_id, user_id = instance.pk, instance.owner_id
+
+    previous_user_id = getattr(instance, '_previous_directory_user_id', None)
+    if not created and previous_user_id == user_id:
+        return
+
+    def update():
+        directory.add_member(enterprise_id, user_id)
+        if previous_user_id is not None and previous_user_id != user_id:
+            directory.remove_member(enterprise_id, previous_user_id)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_delete, sender=Sector)
+def drop_directory_on_sector_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: directory.drop_directory(instance.enterprise_id))
+
+
+@receiver(post_delete, sender=Enterprise)
+def drop_directory_on_enterprise_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: directory.drop_directory(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def refresh_user_in_directories(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Nome ou username alterados: atualiza a entrada nos diretórios das empresas.
+    """
+    if created:
+        return
+    if update_fields is not None and not DIRECTORY_USER_FIELDS & set(update_fields):
+        return
+
+    transaction.on_commit(lambda: directory.refresh_member(instance.pk))
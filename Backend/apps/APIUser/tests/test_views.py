@@ -8,6 +8,7 @@ from pytest_mock import MockerFixture
 
 from apps.APIEmpresa.models import Enterprise
 from apps.APISetor.models import Sector, SectorUser # type: ignore
+from apps.core.get_request_user import request_context
  
 User = get_user_model()
 
@@ -476,4 +477,92 @@ class TestUserRetrieveAPI:
         assert response.status_code == 200 # type: ignore
         assert response.data['sucesso'] is True # type: ignore
         
-        
\ No newline at end of file
+        
+
+@pytest.mark.django_db
+class TestUsersLinkedToMyListAPI:
+
+    @pytest.fixture
+    def api_client(self):
+        """
+        Returns a API CLIENT for use.
+        
+        Args:
+            self: The test instance.
+
+        Returns:
+            None
+        """
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self):
+        """
+        Create an enterprise with an owner, a sector manager and two members,
+        plus an outsider from another enterprise.
+        
+        Args:
+            self: The test instance.
+
+        Returns:
+            None
+        """
+        # Modelos auditados: os sinais de auditoria precisam de uma requisição ativa.
+        with request_context():
+            owner = User.objects.create_user(username="dir_owner", password="pw", name="Ana Owner", email="dir_owner@e.com")
+            manager = User.objects.create_user(username="dir_manager", password="pw", name="Bruno Gestor", email="dir_manager@e.com")
+            member = User.objects.create_user(username="carla", password="pw", name="Carla Membro", email="dir_member@e.com")
+            outsider = User.objects.create_user(username="dir_outsider", password="pw", name="Ana Outsider", email="dir_outsider@e.com")
+
+            enterprise = Enterprise.objects.create(name='Directory Corp', owner=owner)
+            sector = Sector.objects.create(enterprise=enterprise, name="Directory Sector", image="", manager=manager)
+            SectorUser.objects.create(sector=sector, user=member)
+
+            Enterprise.objects.create(name='Other Corp', owner=outsider)
+
+        return {
+            "owner": owner,
+            "manager": manager,
+            "member": member,
+            "outsider": outsider,
+        }
+
+    def test_list_colleagues_success(self, scenario_data: dict, api_client: APIClient):
+        """
+        Test if the list has every colleague of the user's enterprises, ordered by name,
+        and nobody from other enterprises.
+
+        Args:
+            self = the test instance
+            api_client (APIClient): api client for log in use
+            scenario_data (dict): scenario for simulate a determinated environment
+        """
+        api_client.force_authenticate(user=scenario_data["member"])
+
+        response = api_client.get(reverse("usuario-listar"))
+
+        assert response.status_code == 200 # type: ignore
+        names = [user["name"] for user in response.data['data']] # type: ignore
+        assert names == ["Ana Owner", "Bruno Gestor", "Carla Membro"]
+        assert all(set(user) == {"user_id", "name"} for user in response.data['data']) # type: ignore
+
+    def test_search_colleagues_by_prefix_success(self, scenario_data: dict, api_client: APIClient):
+        """
+        Test the type-ahead search by name (any word) and username prefix.
+
+        Args:
+            self = the test instance
+            api_client (APIClient): api client for log in use
+            scenario_data (dict): scenario for simulate a determinated environment
+        """
+        api_client.force_authenticate(user=scenario_data["member"])
+        url = reverse("usuario-listar")
+
+        response = api_client.get(url, {"q": "ges"})
+        assert [user["user_id"] for user in response.data['data']] == [scenario_data["manager"].pk] # type: ignore
+
+        response = api_client.get(url, {"q": "ana"})
+        assert [user["user_id"] for user in response.data['data']] == [scenario_data["owner"].pk] # type: ignore
+
+        response = api_client.get(url, {"q": "carla"})
+        assert [user["user_id"] for user in response.data['data']] == [scenario_data["member"].pk] # type: ignore
@@ -0,0 +1,235 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django_redis import get_redis_connection
+
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorUser
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+DIRECTORY_TTL = 60 * 60 * 24 # 1 dia
+SEARCH_LIMIT = 20
+# Campo sentinela: diferencia "diretório vazio" de "diretório não construído".
+BUILT_FIELD = '_'
+
+# (user_id, name, username): o username só serve à busca, a resposta tem user_id e name.
+DirectoryEntry = Tuple[int, str, str]
+
+
+def directory_key(enterprise_id: int) -> str:
+    return f"member_directory:{enterprise_id}"
+
+
+def user_enterprise_ids(user_id: int) -> List[int]:
+    """
+    Empresas às quais o usuário está vinculado (dono, gestor ou membro).
+    """
+    return list(Enterprise.objects.filter(
+        Q(owner_id=user_id) |
+        Q(sectors__sector_links__user_id=user_id) |
+        Q(sectors__manager_id=user_id)
+    ).values_list('enterprise_id', flat=True).distinct())
+
+
+def enterprise_member_filter(enterprise_id: int) -> Q:
+    return (
+        Q(enterprises__enterprise_id=enterprise_id) |
+        Q(managers__enterprise_id=enterprise_id) |
+        Q(user_links__sector__enterprise_id=enterprise_id)
+    )
+
+
+def is_enterprise_member(user_id: int, enterprise_id: int) -> bool:
+    return (
+        Enterprise.objects.filter(pk=enterprise_id, owner_id=user_id).exists() or
+        Sector.objects.filter(enterprise_id=enterprise_id, manager_id=user_id).exists() or
+        SectorUser.objects.filter(sector__enterprise_id=enterprise_id, user_id=user_id).exists()
+    )
+
+
+def entry_from_row(row) -> DirectoryEntry:
+    user_id, name, username = row
+    return (user_id, name, username)
+
+
+def build_enterprise_directory(enterprise_id: int) -> Dict[int, DirectoryEntry]:
+    """
+    Membros da empresa lidos do banco (uma consulta, só as colunas do diretório).
+    """
+    rows = User.objects.filter(
+        enterprise_member_filter(enterprise_id)
+    ).values_list('user_id', 'name', 'username').distinct()
+
+    return {row[0]: entry_from_row(row) for row in rows}
+
+
+def get_enterprise_directories(enterprise_ids: List[int]) -> Optional[Dict[int, Dict[int, DirectoryEntry]]]:
+    """
+    Lê os diretórios de várias empresas em um único round-trip ao Redis.
+    Diretórios ausentes são reconstruídos do banco e gravados.
+    Retorna None se o Redis estiver indisponível.
+    """
+    directories: Dict[int, Dict[int, DirectoryEntry]] = {}
+
+    try:
+        con = get_redis_connection("default")
+        pipe = con.pipeline()
+        for enterprise_id in enterprise_ids:
+            pipe.hgetall(directory_key(enterprise_id))
+        for enterprise_id, raw in zip(enterprise_ids, pipe.execute()):
+            if raw:
+                directories[enterprise_id] = {
+                    int(user_id): tuple(json.loads(value)) # type: ignore
+                    for user_id, value in raw.items() if user_id != BUILT_FIELD.encode()
+                }
+    except Exception as e:
+        logger.warning("Diretório de colegas indisponível no Redis: %s", e)
+        return None
+
+    for enterprise_id in enterprise_ids:
+        if enterprise_id in directories:
+            continue
+
+        directory = build_enterprise_directory(enterprise_id)
+        directories[enterprise_id] = directory
+
+        key = directory_key(enterprise_id)
+        try:
+            pipe = con.pipeline()
+            pipe.delete(key)
+            pipe.hset(key, mapping={
+                BUILT_FIELD: 1,
+                **{user_id: json.dumps(entry) for user_id, entry in directory.items()}
+            })
+            pipe.expire(key, DIRECTORY_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Não foi possível gravar o diretório da empresa %s: %s", enterprise_id, e)
+
+    return directories
+
+
+def normalize(text: Optional[str]) -> str:
+    return (text or '').casefold()
+
+
+def get_colleagues(enterprise_ids: List[int], query: Optional[str] = None, limit: Optional[int] = None) -> List[DirectoryEntry]:
+    """
+    Colegas do usuário (membros das empresas dele - ver user_enterprise_ids), ordenados por nome.
+    Com 'query', filtra por prefixo do nome (qualquer palavra) ou do username.
+    """
+    if not enterprise_ids:
+        return []
+
+    directories = get_enterprise_directories(enterprise_ids)
+
+    if directories is None:
+        if query:
+            return search_colleagues_in_db(enterprise_ids, query, limit or SEARCH_LIMIT)
+        directories = {enterprise_id: build_enterprise_directory(enterprise_id) for enterprise_id in enterprise_ids}
+
+    colleagues: Dict[int, DirectoryEntry] = {}
+    for directory in directories.values():
+        colleagues.update(directory)
+
+    entries: Iterable[DirectoryEntry] = colleagues.values()
+
+    if query:
+        prefix = normalize(query)
+        entries = (
+            entry for entry in entries
+            if normalize(entry[2]).startswith(prefix) or
+            any(word.startswith(prefix) for word in normalize(entry[1]).split())
+        )
+
+    ordered = sorted(entries, key=lambda entry: (normalize(entry[1]), entry[0]))
+    return ordered[:limit] if limit else ordered
+
+
+def search_colleagues_in_db(enterprise_ids: List[int], query: str, limit: int) -> List[DirectoryEntry]:
+    """
+    Busca por prefixo direto no banco (índices trigram em UPPER(name)/UPPER(username)).
+    Usada pelo type-ahead quando o Redis está indisponível.
+    """
+    members = Q()
+    for enterprise_id in enterprise_ids:
+        members |= enterprise_member_filter(enterprise_id)
+
+    rows = User.objects.filter(members).filter(
+        Q(name__istartswith=query) |
+        Q(name__icontains=f" {query}") |
+        Q(username__istartswith=query)
+    ).values_list('user_id', 'name', 'username').distinct().order_by('name')[:limit]
+
+    return [entry_from_row(row) for row in rows]
+
+
+# --- Atualização incremental (chamada pelos sinais de vínculo) ---
+
+def _update_directories(enterprise_ids: Iterable[int], set_entry: Optional[DirectoryEntry] = None, remove_user_id: Optional[int] = None) -> None:
+    """
+    Altera só os diretórios já construídos; os demais serão construídos na próxima leitura.
+    """
+    enterprise_ids = [enterprise_id for enterprise_id in enterprise_ids if enterprise_id is not None]
+    if not enterprise_ids:
+        return
+
+    try:
+        con = get_redis_connection("default")
+        pipe = con.pipeline()
+        for enterprise_id in enterprise_ids:
+            pipe.exists(directory_key(enterprise_id))
+        built = [enterprise_id for enterprise_id, exists in zip(enterprise_ids, pipe.execute()) if exists]
+
+        pipe = con.pipeline()
+        for enterprise_id in built:
+            key = directory_key(enterprise_id)
+            if set_entry is not None:
+                pipe.hset(key, set_entry[0], json.dumps(set_entry))
+            if remove_user_id is not None:
+                pipe.hdel(key, remove_user_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Não foi possível atualizar o diretório de colegas: %s", e)
+
+
+def user_entry(user_id: int) -> Optional[DirectoryEntry]:
+    row = User.objects.filter(pk=user_id).values_list('user_id', 'name', 'username').first()
+    return entry_from_row(row) if row else None
+
+
+def add_member(enterprise_id: int, user_id: int) -> None:
+    entry = user_entry(user_id)
+    if entry is not None:
+        _update_directories([enterprise_id], set_entry=entry)
+
+
+def remove_member(enterprise_id: int, user_id: int) -> None:
+    """
+    Remove o usuário do diretório, a não ser que ele continue vinculado
+    à empresa por outro papel (ex.: gestor de outro setor).
+    """
+    if not is_enterprise_member(user_id, enterprise_id):
+        _update_directories([enterprise_id], remove_user_id=user_id)
+
+
+def refresh_member(user_id: int) -> None:
+    """
+    Atualiza nome/username/foto do usuário em todos os diretórios em que ele aparece.
+    """
+    entry = user_entry(user_id)
+    if entry is not None:
+        _update_directories(user_enterprise_ids(user_id), set_entry=entry)
+
+
+def drop_directory(enterprise_id: int) -> None:
+    try:
+        get_redis_connection("default").delete(directory_key(enterprise_id))
+    except Exception as e:
+        logger.warning("Não foi possível remover o diretório da empresa %s: %s", enterprise_id, e)
@@ -18,6 +18,7 @@ from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from .models import AbsUser, PasswordResetToken
+from .utils.colleague_directory import get_colleagues, user_enterprise_ids
 from django.template.loaders.cached import Loader
 from uuid import uuid4
 from rest_framework import status
@@ -471,48 +472,47 @@ class UsersLinkedToMyListView(APIView):
     
     Isso inclui todos os usuários que compartilham ao menos
     uma empresa com o usuário (Owners, Managers, Members).
+
+    Lido do diretório de membros de cada empresa no Redis
+    (utils/colleague_directory.py), mantido pelos sinais de vínculo.
+
+    Query params:
+        q: prefixo do nome ou do username (type-ahead).
+        limit: quantidade máxima de usuários (padrão 20 quando há 'q').
     """
     permission_classes = [IsAuthenticated]
     serializer_class = UserSearchSerializer
+    search_limit = 20
+    max_limit = 200
 
     def get(self, request):
         request_user = request.user
+        query = (request.query_params.get('q') or '').strip()
+
+        try:
+            limit = int(request.query_params.get('limit', self.search_limit if query else 0))
+        except ValueError:
+            limit = self.search_limit
+        limit = min(limit, self.max_limit) if limit > 0 else (self.max_limit if query else None)
 
-        user_enterprises = Enterprise.objects.filter(
-            Q(owner=request_user) |
-            Q(sectors__sector_links__user=request_user) |
-            Q(sectors__manager=request_user)
-        ).distinct()
+        enterprise_ids = user_enterprise_ids(request_user.pk)
 
-        if not user_enterprises.exists():
+        if not enterprise_ids:
             queryset = AbsUser.objects.filter(pk=request_user.pk)
             serializer = self.serializer_class(queryset, many=True)
             return Response(default_response(True, "Usuário não vinculado a empresas.", serializer.data))
 
-        owner_ids = user_enterprises.values_list('owner_id', flat=True)
-
-        manager_ids = Sector.objects.filter(
-            enterprise__in=user_enterprises
-        ).values_list('manager_id', flat=True)
-
-        member_ids = SectorUser.objects.filter(
-            sector__enterprise__in=user_enterprises
-        ).values_list('user_id', flat=True)
-
-        all_user_ids = set(owner_ids) | set(manager_ids) | set(member_ids)
-
-        queryset = AbsUser.objects.filter(
-            pk__in=all_user_ids
-        ).order_by('name')
+        colleagues = get_colleagues(enterprise_ids, query=query or None, limit=limit)
 
-        serializer = self.serializer_class(queryset, many=True)
+        # Mesmo formato de UserSearchSerializer (user_id, name).
+        data = [{"user_id": entry[0], "name": entry[1]} for entry in colleagues]
 
         res: HttpResponse = Response()
         res.status_code = 200
         res.data = default_response(
             success=True,
-            message=f"Encontrados {queryset.count()} usuários.",
-            data=serializer.data
+            message=f"Encontrados {len(data)} usuários.",
+            data=data
         )
         return res
     
\ No newline at end of file
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .query_stats import install_query_stats
+        from . import metrics  # noqa: F401 (connects the Celery signals)
+
+        connection_created.connect(install_query_stats, dispatch_uid='core_query_stats')
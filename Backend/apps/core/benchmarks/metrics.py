@@ -0,0 +1,143 @@
+"""
+Measurements of the benchmark suite: latency percentiles, queries and rows fetched
+per request, and the comparison against a stored baseline.
+"""
+
+import json
+import math
+import platform
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.utils import timezone
+
+from apps.core.query_stats import capture_query_stats
+
+BASELINE_VERSION = 1
+
+
+class Sample(NamedTuple):
+    elapsed_ms: float
+    queries: int
+    rows: int
+    ok: bool
+
+
+class Measurement:
+    """
+    Times one request and records the queries it ran (any connection or thread,
+    see apps/core/query_stats.py).
+
+    Usage:
+        with Measurement() as measurement:
+            response = client.get(url)
+        samples.append(measurement.sample(response.status_code < 400))
+    """
+
+    def __enter__(self):
+        self.capture = capture_query_stats()
+        self.stats = self.capture.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed_ms = (time.perf_counter() - self.started) * 1000
+        self.capture.__exit__(*exc_info)
+        return False
+
+    def sample(self, ok: bool) -> Sample:
+        return Sample(self.elapsed_ms, self.stats.count, self.stats.rows, ok)
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Percentile with linear interpolation between the closest ranks.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: List[Sample]) -> Dict[str, Any]:
+    latencies = [sample.elapsed_ms for sample in samples]
+    count = len(samples) or 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not sample.ok),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / count, 3),
+        'queries_per_request': round(sum(sample.queries for sample in samples) / count, 2),
+        'max_queries': max((sample.queries for sample in samples), default=0),
+        'rows_per_request': round(sum(sample.rows for sample in samples) / count, 2),
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    latency_tolerance: float = 0.25,
+    min_latency_delta_ms: float = 2.0,
+    query_tolerance: float = 0.0,
+    rows_tolerance: float = 0.1,
+) -> List[str]:
+    """
+    Regressions of `results` against `baseline` (both keyed by workload).
+
+    Latency regresses when p95 grows more than `latency_tolerance` (and at least
+    `min_latency_delta_ms`, so tiny timings do not fail on noise). Queries and rows
+    per request are deterministic for the same seed, so the default tolerances are tight.
+    Workloads missing from the baseline are not compared.
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+
+        if current['errors'] > reference.get('errors', 0):
+            regressions.append(f"{name}: errors {reference.get('errors', 0)} -> {current['errors']}")
+
+        allowed_p95 = max(reference['p95_ms'] * (1 + latency_tolerance), reference['p95_ms'] + min_latency_delta_ms)
+        if current['p95_ms'] > allowed_p95:
+            regressions.append(f"{name}: p95 {reference['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms")
+
+        if current['queries_per_request'] > reference['queries_per_request'] * (1 + query_tolerance) + 0.01:
+            regressions.append(
+                f"{name}: queries/request {reference['queries_per_request']} -> {current['queries_per_request']}"
+            )
+
+        if current['rows_per_request'] > reference['rows_per_request'] * (1 + rows_tolerance) + 0.01:
+            regressions.append(f"{name}: rows/request {reference['rows_per_request']} -> {current['rows_per_request']}")
+
+    return regressions
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with path.open(encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, Any]], scale: Dict[str, int], settings: Dict[str, Any]) -> None:
+    """
+    Stores the results with what is needed to judge whether a later run is comparable
+    (seed scale, iterations and the machine that produced them).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as file:
+        json.dump({
+            'version': BASELINE_VERSION,
+            'created_at': timezone.now().isoformat(),
+            'machine': platform.node(),
+            'python': platform.python_version(),
+            'scale': scale,
+            'settings': settings,
+            'workloads': results,
+        }, file, indent=2, ensure_ascii=False)
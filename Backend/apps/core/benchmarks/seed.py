@@ -0,0 +1,333 @@
+"""
+Synthetic tenants for the benchmark suite.
+
+Every object created here is tagged with BENCH_PREFIX (enterprise names, usernames
+and emails), so the data can live next to the development data and be flushed
+without touching it. Rows are written with bulk_create; the side effects normally
+done by signals (search_content, history, sector rollups) are applied explicitly.
+"""
+
+import os
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import CommandError
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from apps.APIAudit.signals import extract_text_from_json, log_delete_handler, log_save_handler
+from apps.APIDashboard.utils.rollups import reconcile_sector_rollups
+from apps.APIDocumento.bulk_operations import CHUNK_SIZE, DocumentCategory, chunked
+from apps.APIDocumento.models import Category, Classification, Classification_Privacity, Classification_Status, Document
+from apps.APIDocumento.reference_data import (
+    PRIVACITY_EXCLUSIVE,
+    PRIVACITY_PRIVATE,
+    PRIVACITY_PUBLIC,
+    STATUS_ARCHIVED,
+    STATUS_CONCLUDED,
+    STATUS_IN_PROGRESS,
+    STATUS_REVIEW_REQUIRED,
+    get_reference_data)
+from apps.APIEmpresa.models import Enterprise
+from apps.APISetor.models import Sector, SectorUser
+
+User = get_user_model()
+
+BENCH_PREFIX = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+# Vocabulary of the synthetic documents; the search workload queries the same words.
+WORDS = [
+    'contrato', 'fornecedor', 'pagamento', 'relatório', 'auditoria', 'orçamento', 'projeto',
+    'cliente', 'entrega', 'licitação', 'proposta', 'reunião', 'ata', 'fiscal', 'nota',
+    'processo', 'prazo', 'revisão', 'política', 'segurança', 'treinamento', 'inventário',
+    'compra', 'serviço', 'garantia', 'manutenção', 'equipamento', 'financeiro', 'jurídico',
+    'recursos', 'humanos', 'planejamento', 'estratégia', 'indicador', 'meta', 'qualidade',
+]
+
+STATUS_WEIGHTS = {STATUS_IN_PROGRESS: 50, STATUS_CONCLUDED: 30, STATUS_REVIEW_REQUIRED: 15, STATUS_ARCHIVED: 5}
+PRIVACITY_WEIGHTS = {PRIVACITY_PRIVATE: 60, PRIVACITY_PUBLIC: 35, PRIVACITY_EXCLUSIVE: 5}
+
+
+class SeedScale(NamedTuple):
+    enterprises: int = 2
+    sectors: int = 3
+    members: int = 5
+    documents: int = 200
+    history: int = 3
+    categories: int = 8
+    paragraphs: int = 12
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[:1].upper() + text[1:] + '.'
+
+
+def text_node(text: str, format: int = 0) -> Dict[str, Any]:
+    return {'detail': 0, 'format': format, 'mode': 'normal', 'style': '', 'text': text, 'type': 'text', 'version': 1}
+
+
+def block_node(node_type: str, children: List[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+    return {'children': children, 'direction': 'ltr', 'format': '', 'indent': 0, 'type': node_type, 'version': 1, **extra}
+
+
+def lexical_content(rng: random.Random, paragraphs: int) -> Dict[str, Any]:
+    """
+    Lexical editor state with the node mix of real documents: headings,
+    formatted paragraphs, lists, quotes and the occasional table.
+    """
+    children: List[Dict[str, Any]] = [block_node('heading', [text_node(sentence(rng, 4))], tag='h1')]
+
+    for _ in range(paragraphs):
+        kind = rng.random()
+        if kind < 0.6:
+            children.append(block_node('paragraph', [
+                text_node(sentence(rng, rng.randint(12, 40))),
+                text_node(sentence(rng, rng.randint(3, 8)), format=rng.choice([1, 2, 8])),
+            ]))
+        elif kind < 0.75:
+            items = [
+                block_node('listitem', [text_node(sentence(rng, rng.randint(4, 10)))], value=position + 1)
+                for position in range(rng.randint(2, 6))
+            ]
+            children.append(block_node('list', items, listType=rng.choice(['bullet', 'number']), start=1, tag='ul'))
+        elif kind < 0.85:
+            children.append(block_node('heading', [text_node(sentence(rng, 3))], tag='h2'))
+        elif kind < 0.95:
+            children.append(block_node('quote', [text_node(sentence(rng, rng.randint(8, 20)))]))
+        else:
+            rows = [
+                block_node('tablerow', [
+                    block_node('tablecell', [block_node('paragraph', [text_node(rng.choice(WORDS))])], headerState=0)
+                    for _ in range(3)
+                ])
+                for _ in range(rng.randint(2, 5))
+            ]
+            children.append(block_node('table', rows))
+
+    return {'root': block_node('root', children)}
+
+
+@contextmanager
+def without_audit():
+    """
+    Benchmark tenants are not business data: their creation and removal are not audited
+    (the audit handlers also expect a request, which management commands do not have).
+    """
+    post_save.disconnect(log_save_handler)
+    post_delete.disconnect(log_delete_handler)
+    try:
+        yield
+    finally:
+        post_save.connect(log_save_handler)
+        post_delete.connect(log_delete_handler)
+
+
+def check_database(allow_production: bool = False) -> None:
+    """
+    The suite writes tenants and documents: it refuses the production settings unless told otherwise.
+    """
+    # SETTINGS_MODULE is None under override_settings (and the pytest settings fixture).
+    settings_module = settings.SETTINGS_MODULE or os.environ.get('DJANGO_SETTINGS_MODULE', '')
+    if settings_module.endswith('.prod') and not allow_production:
+        raise CommandError(
+            f"Refusing to run against {settings_module}; use a local database or pass --allow-production"
+        )
+
+
+def ensure_reference_data() -> Dict[str, Dict[str, int]]:
+    """
+    Status and privacity rows the documents are classified with (same values as sql/).
+    """
+    for status in STATUS_WEIGHTS:
+        Classification_Status.objects.get_or_create(status=status)
+    for privacity in PRIVACITY_WEIGHTS:
+        Classification_Privacity.objects.get_or_create(privacity=privacity)
+
+    reference = get_reference_data(force=True)
+    return {'status': reference.status_ids, 'privacity': reference.privacity_ids}
+
+
+def benchmark_enterprises():
+    return Enterprise.objects.filter(name__startswith=f'{BENCH_PREFIX}-')
+
+
+def benchmark_users():
+    return User.objects.filter(username__startswith=f'{BENCH_PREFIX}_')
+
+
+def create_users(usernames: List[str], password: str) -> Dict[str, Any]:
+    User.objects.bulk_create([
+        User(username=username, email=f'{username}@{BENCH_PREFIX}.local', name=username.replace('_', ' ').title(), password=password)
+        for username in usernames
+    ], batch_size=CHUNK_SIZE)
+    return {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+
+def seed_sector_documents(
+    rng: random.Random,
+    scale: SeedScale,
+    sector: Sector,
+    authors: List[Any],
+    categories: List[int],
+    reference: Dict[str, Dict[str, int]],
+) -> int:
+    """
+    Documents of one sector, with their classifications, categories and history.
+    """
+    statuses = [reference['status'][label] for label in STATUS_WEIGHTS]
+    privacities = [reference['privacity'][label] for label in PRIVACITY_WEIGHTS]
+    exclusive_id = reference['privacity'][PRIVACITY_EXCLUSIVE]
+    historical_model = Document.history.model # type: ignore
+    now = timezone.now()
+
+    for batch in chunked(list(range(scale.documents)), CHUNK_SIZE):
+        with transaction.atomic():
+            classifications = Classification.objects.bulk_create([
+                Classification(
+                    classification_status_id=rng.choices(statuses, weights=list(STATUS_WEIGHTS.values()))[0],
+                    privacity_id=rng.choices(privacities, weights=list(PRIVACITY_WEIGHTS.values()))[0],
+                    is_reviewed=rng.random() < 0.3,
+                ) for _ in batch
+            ])
+
+            documents = []
+            for classification in classifications:
+                content = lexical_content(rng, max(1, int(rng.gauss(scale.paragraphs, scale.paragraphs / 3))))
+                documents.append(Document(
+                    title=sentence(rng, rng.randint(2, 6))[:200],
+                    content=content,
+                    search_content=extract_text_from_json(content)[:500000],
+                    creator=rng.choice(authors),
+                    sector=sector,
+                    classification=classification,
+                    is_active=rng.random() > 0.05,
+                ))
+            documents = Document.objects.bulk_create(documents)
+
+            exclusive_through = Classification.exclusive_users.through
+            exclusive_through.objects.bulk_create([
+                exclusive_through(classification_id=document.classification_id, user_id=user.pk)
+                for document in documents if document.classification.privacity_id == exclusive_id # type: ignore
+                for user in {document.creator, *rng.sample(authors, min(2, len(authors)))}
+            ], ignore_conflicts=True)
+
+            if categories:
+                DocumentCategory.objects.bulk_create([
+                    DocumentCategory(document_id=document.pk, category_id=category_id)
+                    for document in documents
+                    for category_id in rng.sample(categories, rng.randint(0, min(3, len(categories))))
+                ], ignore_conflicts=True)
+
+            # Creation plus `history` edits per document, spread over the last 90 days.
+            records = []
+            for document in documents:
+                created_at = now - timedelta(days=rng.uniform(0, 90))
+                fields = {field.attname: getattr(document, field.attname) for field in historical_model.tracked_fields}
+                records.append(historical_model(history_date=created_at, history_user=document.creator, history_type='+', **fields))
+                for _ in range(scale.history):
+                    records.append(historical_model(
+                        history_date=created_at + (now - created_at) * rng.random(),
+                        history_user=rng.choice(authors),
+                        history_type='~',
+                        **fields
+                    ))
+            historical_model.objects.bulk_create(records, batch_size=CHUNK_SIZE)
+
+    return scale.documents
+
+
+def seed_tenants(scale: SeedScale, seed: int = 0, log: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
+    """
+    Creates `scale.enterprises` new tenants (owner, sectors with manager and members,
+    categories and documents) and reconciles their sector rollups.
+
+    New tenants are numbered after the existing ones, so seeding twice adds data.
+
+    Returns:
+        Dict[str, int]: Number of enterprises, sectors, users and documents created.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    reference = ensure_reference_data()
+    password = make_password(BENCH_PASSWORD)
+    start = benchmark_enterprises().count()
+    totals = {'enterprises': 0, 'sectors': 0, 'users': 0, 'documents': 0}
+
+    for tenant in range(start, start + scale.enterprises):
+        tag = f'{BENCH_PREFIX}_e{tenant}'
+        usernames = [f'{tag}_owner'] + [
+            f'{tag}_s{sector}_{role}'
+            for sector in range(scale.sectors)
+            for role in ['manager', *(f'm{member}' for member in range(scale.members))]
+        ]
+        users = create_users(usernames, password)
+        owner = users[f'{tag}_owner']
+
+        with without_audit(), transaction.atomic():
+            enterprise = Enterprise.objects.create(name=f'{BENCH_PREFIX}-{tenant}', owner=owner)
+            sectors = Sector.objects.bulk_create([
+                Sector(name=f'{BENCH_PREFIX}-{tenant}-{sector}', enterprise=enterprise, manager=users[f'{tag}_s{sector}_manager'])
+                for sector in range(scale.sectors)
+            ])
+            SectorUser.objects.bulk_create([
+                SectorUser(sector=sector, user=users[f'{tag}_s{index}_m{member}'])
+                for index, sector in enumerate(sectors)
+                for member in range(scale.members)
+            ])
+            categories = Category.objects.bulk_create([
+                Category(
+                    category=f'{rng.choice(WORDS).title()} {index}',
+                    category_enterprise=enterprise,
+                    category_sector=rng.choice(sectors),
+                ) for index in range(scale.categories)
+            ])
+
+        category_ids = [category.pk for category in categories]
+        for index, sector in enumerate(sectors):
+            authors = [users[f'{tag}_s{index}_manager'], *(users[f'{tag}_s{index}_m{member}'] for member in range(scale.members))]
+            totals['documents'] += seed_sector_documents(rng, scale, sector, authors, category_ids, reference)
+
+        reconcile_sector_rollups([sector.pk for sector in sectors])
+
+        totals['enterprises'] += 1
+        totals['sectors'] += len(sectors)
+        totals['users'] += len(users)
+        log(f"Tenant {enterprise.name}: {len(sectors)} sectors, {len(users)} users, {scale.documents * len(sectors)} documents")
+
+    return totals
+
+
+def flush_benchmark_data(log: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
+    """
+    Deletes every benchmark tenant: documents (and their history), classifications,
+    enterprises (sectors, memberships and categories cascade) and users.
+
+    Documents go through the regular delete so the blob references are released.
+    """
+    log = log or (lambda message: None)
+    enterprise_ids = list(benchmark_enterprises().values_list('pk', flat=True))
+    document_ids = list(Document.objects.filter(sector__enterprise_id__in=enterprise_ids).values_list('pk', flat=True))
+    totals = {'documents': len(document_ids), 'enterprises': len(enterprise_ids), 'users': 0}
+
+    with without_audit():
+        for chunk in chunked(document_ids, CHUNK_SIZE):
+            with transaction.atomic():
+                classification_ids = list(Document.objects.filter(pk__in=chunk).values_list('classification_id', flat=True))
+                Document.objects.filter(pk__in=chunk).delete()
+                Document.history.filter(document_id__in=chunk).delete() # type: ignore
+                Classification.objects.filter(pk__in=classification_ids).delete()
+            log(f"Documents deleted: {len(chunk)}")
+
+        Enterprise.objects.filter(pk__in=enterprise_ids).delete()
+        totals['users'] = benchmark_users().count()
+        benchmark_users().delete()
+
+    return totals
@@ -0,0 +1,124 @@
+import json
+import pytest
+from django.core.management import CommandError, call_command
+from typing import Any, Dict
+
+from apps.APIDashboard.models import SectorDailyRollup
+from apps.APIDocumento.models import Document
+from apps.APISetor.models import Sector
+from apps.core.benchmarks.metrics import Sample, compare_to_baseline, summarize
+from apps.core.benchmarks.seed import SeedScale, benchmark_enterprises, benchmark_users, flush_benchmark_data, seed_tenants
+from apps.core.benchmarks.workloads import WORKLOADS, BenchmarkContext
+
+SCALE = SeedScale(enterprises=1, sectors=2, members=2, documents=6, history=1, categories=3, paragraphs=3)
+
+
+@pytest.mark.django_db
+class TestBenchmarkSuite:
+    """
+    Suíte de testes do seed de tenants sintéticos e da comparação com a baseline.
+    """
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Um tenant sintético pequeno (1 empresa, 2 setores, 6 documentos por setor).
+        """
+        return seed_tenants(SCALE, seed=1)
+
+    # Success
+
+    def test_seed_and_flush_success(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o seed cria documentos com busca, histórico e consolidados, e se o flush
+        remove tudo o que foi criado.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        documents = Document.objects.filter(sector__enterprise__in=benchmark_enterprises())
+        sectors = Sector.objects.filter(enterprise__in=benchmark_enterprises())
+
+        assert scenario_data == {'enterprises': 1, 'sectors': 2, 'users': 7, 'documents': 12}
+        assert documents.count() == 12
+        assert not documents.filter(search_content='').exists()
+        assert Document.history.filter(document_id__in=documents.values('pk')).count() == 24 # type: ignore
+        assert sum(SectorDailyRollup.objects.filter(sector__in=sectors).values_list('documents_delta', flat=True)) == 12
+
+        flushed = flush_benchmark_data()
+
+        assert flushed['documents'] == 12 and flushed['enterprises'] == 1
+        assert not benchmark_enterprises().exists()
+        assert not benchmark_users().exists()
+
+    @pytest.mark.parametrize("workload", ["listing", "detail", "dashboard"])
+    def test_http_workload_success(self, scenario_data: Dict[str, Any], workload: str) -> None:
+        """
+        Testa se os workloads HTTP respondem sem erros e registram as consultas de cada requisição.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            workload (str) : nome do workload
+
+        Return:
+            None
+        """
+        samples = WORKLOADS[workload].run(BenchmarkContext(seed=1), iterations=5, warmup=1)
+        summary = summarize(samples)
+
+        assert summary['requests'] == 5
+        assert summary['errors'] == 0
+        assert summary['queries_per_request'] > 0
+
+    def test_compare_flags_regressions_success(self) -> None:
+        """
+        Testa se a comparação aponta o aumento de consultas e de p95, mas ignora
+        variações de latência abaixo do mínimo absoluto.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        baseline = {
+            'listing': summarize([Sample(1.0, 4, 21, True)] * 10),
+            'detail': summarize([Sample(20.0, 3, 1, True)] * 10),
+        }
+        results = {
+            'listing': summarize([Sample(2.5, 4, 21, True)] * 10),
+            'detail': summarize([Sample(40.0, 5, 1, True)] * 10),
+        }
+
+        regressions = compare_to_baseline(results, baseline)
+
+        assert regressions == ['detail: p95 20.0ms -> 40.0ms', 'detail: queries/request 3.0 -> 5.0']
+
+    # Failures
+
+    def test_compare_run_with_regression_fails(self, scenario_data: Dict[str, Any], tmp_path) -> None:
+        """
+        Testa se o run_benchmarks --compare falha quando a baseline tem menos consultas por requisição.
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            tmp_path : diretório temporário do pytest
+
+        Return:
+            None
+        """
+        baseline = tmp_path / 'baseline.json'
+        call_command('run_benchmarks', '--workload', 'detail', '--iterations', '3', '--warmup', '1', '--save-baseline', '--baseline', str(baseline))
+
+        data = json.loads(baseline.read_text())
+        data['workloads']['detail']['queries_per_request'] = 0
+        baseline.write_text(json.dumps(data))
+
+        with pytest.raises(CommandError):
+            call_command('run_benchmarks', '--workload', 'detail', '--iterations', '3', '--warmup', '1', '--compare', '--baseline', str(baseline))
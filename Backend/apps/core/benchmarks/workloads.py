@@ -0,0 +1,317 @@
+"""
+Workloads replayed by the benchmark suite against the seeded tenants.
+
+HTTP workloads go through the full Django stack in process (middleware, DRF,
+adrf async views) with an authenticated APIClient; the JWT handshake itself is
+not measured. The editor workloads drive the WebSocket consumer through the
+channels router, so they need the channel layer (Redis) of the settings in use.
+"""
+
+import json
+import random
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import y_py
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.APIDocumento.models import Document
+from apps.APIDocumento.reference_data import PRIVACITY_EXCLUSIVE, PRIVACITY_PRIVATE, privacity_id_for, privacity_ids_for
+from apps.APIDocumento.routing import websocket_urlpatterns
+from apps.APISetor.models import Sector, SectorUser
+from apps.core.benchmarks.metrics import Measurement, Sample
+from apps.core.benchmarks.seed import WORDS, benchmark_enterprises, lexical_content, sentence
+
+User = get_user_model()
+
+# Seconds an editor waits for the relayed update before the sample counts as an error.
+RELAY_TIMEOUT = 5
+
+
+class BenchmarkContext:
+    """
+    The seeded tenants as plain ids (loaded once) plus the client and the random
+    source shared by the workloads. The same seed replays the same requests.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.client = APIClient(raise_request_exception=False, HTTP_HOST='localhost')
+        self.sectors: List[Dict[str, Any]] = []
+        self.users: Dict[int, Any] = {}
+        self.load()
+
+    def load(self) -> None:
+        sectors = list(
+            Sector.objects.filter(enterprise__in=benchmark_enterprises())
+            .values('sector_id', 'enterprise_id', 'manager_id').order_by('sector_id')
+        )
+        members = defaultdict(list)
+        for sector_id, user_id in SectorUser.objects.filter(
+            sector_id__in=[sector['sector_id'] for sector in sectors]
+        ).order_by('pk').values_list('sector_id', 'user_id'):
+            members[sector_id].append(user_id)
+
+        # Documents any member of the sector can open (exclusive ones are left out).
+        documents = defaultdict(list)
+        for document_id, sector_id in Document.objects.filter(
+            sector_id__in=[sector['sector_id'] for sector in sectors],
+            is_active=True
+        ).exclude(
+            classification__privacity_id__in=privacity_ids_for(PRIVACITY_EXCLUSIVE)
+        ).order_by('pk').values_list('pk', 'sector_id'):
+            documents[sector_id].append(document_id)
+
+        self.sectors = [
+            {**sector, 'members': members[sector['sector_id']], 'documents': documents[sector['sector_id']]}
+            for sector in sectors if members[sector['sector_id']] and documents[sector['sector_id']]
+        ]
+        user_ids = {user_id for sector in self.sectors for user_id in [sector['manager_id'], *sector['members']]}
+        self.users = User.objects.in_bulk(user_ids)
+
+    def pick_sector(self) -> Dict[str, Any]:
+        return self.rng.choice(self.sectors)
+
+    def pick_member(self, sector: Dict[str, Any]):
+        return self.users[self.rng.choice(sector['members'])]
+
+    def authenticate(self, user) -> APIClient:
+        self.client.force_authenticate(user=user)
+        return self.client
+
+
+class Workload(ABC):
+    """
+    A named scenario of the suite: `run` returns one sample per iteration, after
+    `warmup` iterations that are discarded.
+    """
+    name = ''
+    description = ''
+
+    @abstractmethod
+    def run(self, context: BenchmarkContext, iterations: int, warmup: int = 0) -> List[Sample]:
+        ...
+
+
+class RequestWorkload(Workload):
+    """
+    One HTTP request per iteration, timed with the queries it ran. The warmup
+    iterations warm connections, caches and the reference registry.
+    """
+
+    def setup(self, context: BenchmarkContext) -> None:
+        pass
+
+    def teardown(self, context: BenchmarkContext) -> None:
+        pass
+
+    @abstractmethod
+    def request(self, context: BenchmarkContext):
+        ...
+
+    def run(self, context: BenchmarkContext, iterations: int, warmup: int = 0) -> List[Sample]:
+        self.setup(context)
+        try:
+            for _ in range(warmup):
+                self.request(context)
+
+            samples = []
+            for _ in range(iterations):
+                with Measurement() as measurement:
+                    response = self.request(context)
+                samples.append(measurement.sample(response.status_code < 400))
+            return samples
+        finally:
+            self.teardown(context)
+
+
+class ListingWorkload(RequestWorkload):
+    name = 'listing'
+    description = 'First page of the documents visible to a sector member'
+
+    def request(self, context):
+        sector = context.pick_sector()
+        return context.authenticate(context.pick_member(sector)).get(reverse('visualizar-documentos'), {'page': 1})
+
+
+class SearchWorkload(RequestWorkload):
+    name = 'search'
+    description = 'Full-text search with two words of the seeded vocabulary'
+
+    def request(self, context):
+        sector = context.pick_sector()
+        query = ' '.join(context.rng.sample(WORDS, 2))
+        return context.authenticate(context.pick_member(sector)).get(reverse('buscar-documentos'), {'q': query})
+
+
+class DetailWorkload(RequestWorkload):
+    name = 'detail'
+    description = 'Detail (with content) of a document of the member sector'
+
+    def request(self, context):
+        sector = context.pick_sector()
+        document_id = context.rng.choice(sector['documents'])
+        return context.authenticate(context.pick_member(sector)).get(reverse('consultar-documento', kwargs={'pk': document_id}))
+
+
+class DashboardWorkload(RequestWorkload):
+    name = 'dashboard'
+    description = 'Operational dashboard of a member and managerial dashboard of a manager, alternated'
+
+    def request(self, context):
+        sector = context.pick_sector()
+        if context.rng.random() < 0.5:
+            return context.authenticate(context.pick_member(sector)).get(reverse('dashboard-operacional'))
+
+        client = context.authenticate(context.users[sector['manager_id']])
+        return client.get(reverse('dashboard-gerencial-setor', kwargs={'sector_pk': sector['sector_id']}))
+
+
+class UploadWorkload(RequestWorkload):
+    """
+    Files are kept in memory instead of S3 and the thumbnail task is not enqueued:
+    both run outside the request (storage latency is not what is measured here).
+    """
+    name = 'upload'
+    description = 'File upload that creates a document (private, new content each time)'
+    FILE_SIZE = 64 * 1024
+
+    def setup(self, context):
+        from apps.core.tasks import process_media_asset
+
+        self.storage = override_settings(STORAGES={
+            **settings.STORAGES,
+            'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+        })
+        self.storage.enable()
+        self.delay = mock.patch.object(process_media_asset, 'delay')
+        self.delay.start()
+
+    def teardown(self, context):
+        self.delay.stop()
+        self.storage.disable()
+
+    def request(self, context):
+        sector = context.pick_sector()
+        content = b'%PDF-1.4\n' + context.rng.randbytes(self.FILE_SIZE)
+        return context.authenticate(context.pick_member(sector)).post(
+            reverse('importar-documentos'),
+            {
+                'file': SimpleUploadedFile(f'{sentence(context.rng, 2)}.pdf', content, content_type='application/pdf'),
+                'sector': sector['sector_id'],
+                'privacity_id': privacity_id_for(PRIVACITY_PRIVATE),
+                'content': json.dumps(lexical_content(context.rng, 2)),
+                'users_exclusive_access': '[]',
+            },
+            format='multipart'
+        )
+
+
+def editor_application():
+    return URLRouter(websocket_urlpatterns)
+
+
+def editor_path(document_id: int) -> str:
+    return f'/ws/editor/{document_id}/'
+
+
+class EditorConnectWorkload(Workload):
+    name = 'editor_connect'
+    description = 'WebSocket handshake of the collaborative editor (initial state included)'
+
+    def run(self, context, iterations, warmup=0):
+        return async_to_sync(self.arun)(context, iterations, warmup)
+
+    async def arun(self, context: BenchmarkContext, iterations: int, warmup: int) -> List[Sample]:
+        samples = []
+        for index in range(warmup + iterations):
+            document_id = context.rng.choice(context.pick_sector()['documents'])
+            communicator = WebsocketCommunicator(editor_application(), editor_path(document_id))
+            with Measurement() as measurement:
+                connected, _ = await communicator.connect()
+            await communicator.disconnect()
+
+            if index >= warmup:
+                samples.append(measurement.sample(connected))
+        return samples
+
+
+class EditorRelayWorkload(Workload):
+    """
+    Two editors on the same document: each sample is one Yjs update sent by the
+    first editor until it reaches the second (queue in Redis + channel layer broadcast).
+    """
+    name = 'editor_relay'
+    description = 'Yjs update relayed between two editors of the same document'
+
+    def run(self, context, iterations, warmup=0):
+        return async_to_sync(self.arun)(context, iterations, warmup)
+
+    async def arun(self, context: BenchmarkContext, iterations: int, warmup: int) -> List[Sample]:
+        document_id = context.rng.choice(context.pick_sector()['documents'])
+        sender = WebsocketCommunicator(editor_application(), editor_path(document_id))
+        receiver = WebsocketCommunicator(editor_application(), editor_path(document_id))
+        await sender.connect()
+        await receiver.connect()
+        # The consumer sends the saved state on connect: it is not part of the relay.
+        while not await receiver.receive_nothing(timeout=0.2):
+            await receiver.receive_output()
+
+        ydoc = y_py.YDoc()
+        text = ydoc.get_text('content')
+        samples = []
+        try:
+            for index in range(warmup + iterations):
+                update = self.next_update(context, ydoc, text)
+                with Measurement() as measurement:
+                    await sender.send_to(bytes_data=update)
+                    received = await self.receive(receiver)
+
+                if index >= warmup:
+                    samples.append(measurement.sample(received == update))
+        finally:
+            await sender.disconnect()
+            await receiver.disconnect()
+        return samples
+
+    @staticmethod
+    def next_update(context: BenchmarkContext, ydoc, text) -> bytes:
+        """
+        A typing burst encoded as a y-websocket sync update ([Sync=0][Update=2][update]).
+        """
+        state = y_py.encode_state_vector(ydoc)
+        with ydoc.begin_transaction() as transaction:
+            text.extend(transaction, sentence(context.rng, context.rng.randint(1, 6)) + ' ')
+        return b'\x00\x02' + bytes(y_py.encode_state_as_update(ydoc, state))
+
+    @staticmethod
+    async def receive(communicator: WebsocketCommunicator) -> Optional[bytes]:
+        try:
+            return (await communicator.receive_output(RELAY_TIMEOUT)).get('bytes')
+        except Exception:
+            return None
+
+
+WORKLOADS: Dict[str, Workload] = {
+    workload.name: workload
+    for workload in [
+        ListingWorkload(),
+        SearchWorkload(),
+        DetailWorkload(),
+        DashboardWorkload(),
+        EditorConnectWorkload(),
+        EditorRelayWorkload(),
+        # Last: the uploaded documents would change what the other workloads read.
+        UploadWorkload(),
+    ]
+}
@@ -0,0 +1,82 @@
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+
+
+def split_param(value: Optional[str]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse_fieldset(request: Any) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+    """
+    Reads the sparse fieldset query parameters (?fields=a,b / ?exclude=c).
+
+    Args:
+        request (Request): The user request object.
+
+    Returns:
+        Tuple[Optional[List[str]], Optional[List[str]]]: (fields, exclude); None when absent.
+    """
+    return split_param(request.query_params.get('fields')), split_param(request.query_params.get('exclude'))
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer com seleção de campos: recebe 'fields' e/ou 'exclude' no construtor.
+
+    No Meta:
+    - field_columns: {campo do serializer: colunas do modelo que ele lê}. Colunas
+      que nenhum campo selecionado lê são adiadas (.defer()) na consulta.
+    - field_prefetches: {campo do serializer: relações a pré-carregar}.
+    """
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs) # type: ignore
+
+        selected = self.selected_fields(fields, exclude)
+        for name in list(self.fields): # type: ignore
+            if name not in selected:
+                self.fields.pop(name) # type: ignore
+
+    @classmethod
+    def selected_fields(cls, fields: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Campos que a resposta vai conter. Nomes desconhecidos são um erro de validação.
+        """
+        available = list(cls.Meta.fields) # type: ignore
+        requested = set(fields) if fields else set(available)
+        excluded = set(exclude or ())
+
+        unknown = sorted((requested | excluded) - set(available))
+        if unknown:
+            raise ValidationError({'fields': [f"Campos inválidos: {', '.join(unknown)}. Disponíveis: {', '.join(available)}."]})
+
+        return requested - excluded
+
+    @classmethod
+    def optimize_queryset(cls, queryset: QuerySet, selected: Set[str]) -> QuerySet:
+        """
+        Adia as colunas e pré-carrega só as relações que os campos selecionados usam.
+        """
+        meta = cls.Meta # type: ignore
+        field_columns = getattr(meta, 'field_columns', {})
+
+        needed = {column for name in selected for column in field_columns.get(name, ())}
+        mapped = {column for columns in field_columns.values() for column in columns}
+        deferred = mapped - needed
+
+        if deferred:
+            queryset = queryset.defer(*sorted(deferred))
+
+        prefetches = [
+            relation
+            for name, relations in getattr(meta, 'field_prefetches', {}).items() if name in selected
+            for relation in relations
+        ]
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+
+        return queryset
@@ -1,11 +1,29 @@
-from threading import current_thread
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
 
 from django.utils.deprecation import MiddlewareMixin
 
-_requests = {}
+# ContextVar em vez de um dicionário por thread: no ASGI várias requisições
+# compartilham a mesma thread, mas cada uma tem seu próprio contexto
+# (propagado pelo asgiref para o sync_to_async).
+_request: ContextVar = ContextVar('current_request', default=None)
 
 def current_request():
-    return _requests.get(current_thread().ident, None)
+    return _request.get()
+
+
+@contextmanager
+def request_context(user=None):
+    """
+    Requisição mínima (só request.user) para gravações feitas fora de uma view,
+    como as fixtures dos testes: os sinais de auditoria leem current_request().user.
+    """
+    token = _request.set(SimpleNamespace(user=user))
+    try:
+        yield
+    finally:
+        _request.reset(token)
 
 
 class RequestMiddleware(MiddlewareMixin):
@@ -14,11 +32,11 @@ class RequestMiddleware(MiddlewareMixin):
     """
 
     def process_request(self, request):
-        _requests[current_thread().ident] = request
+        _request.set(request)
 
     def process_response(self, request, response):
-        _requests.pop(current_thread().ident, None)
+        _request.set(None)
         return response
 
     def process_exception(self, request, exception):
-         _requests.pop(current_thread().ident, None)
+         _request.set(None)
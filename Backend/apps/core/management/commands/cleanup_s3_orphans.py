@@ -2,7 +2,8 @@
 Django management command to clean up orphaned files in S3.
 
 This command compares files in S3 with database references and deletes
-files that are no longer used.
+files that are no longer used. Content-addressed blobs are reference counted:
+blobs no longer referenced by any document or attachment are collected too.
 
 Usage:
     python manage.py cleanup_s3_orphans
@@ -14,6 +15,7 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from django.core.management import CommandError
+from apps.APIDocumento.blobs import collect_unreferenced_blobs
 from apps.core.utils import find_orphaned_s3_files, delete_s3_files
 import logging
 
@@ -59,6 +61,12 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('Starting S3 cleanup process...'))
         self.stdout.write('')
 
+        # Blobs without references: row and files are removed together, after the scan
+        try:
+            unreferenced_blobs = collect_unreferenced_blobs(dry_run=True)['blobs']
+        except Exception as e:
+            raise CommandError(f'Error counting unreferenced blobs: {str(e)}')
+
         # Find orphaned files
         self.stdout.write('Scanning S3 and comparing with database...')
         try:
@@ -78,9 +86,10 @@ class Command(BaseCommand):
         self.stdout.write(f"Default files in DB: {stats['default_db_files']}")
         self.stdout.write('')
         self.stdout.write(self.style.WARNING(f"Orphaned files found: {stats['orphaned_files']}"))
+        self.stdout.write(self.style.WARNING(f"Unreferenced blobs found: {unreferenced_blobs}"))
         self.stdout.write('')
 
-        if stats['orphaned_files'] == 0:
+        if stats['orphaned_files'] == 0 and unreferenced_blobs == 0:
             self.stdout.write(self.style.SUCCESS('No orphaned files found. S3 is clean!'))
             return
 
@@ -96,6 +105,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No files will be deleted'))
             self.stdout.write('')
             self.stdout.write(f"Would delete {len(orphaned_files)} orphaned files")
+            self.stdout.write(f"Would collect {unreferenced_blobs} unreferenced blobs")
             self.stdout.write('')
             self.stdout.write('Run with --delete to actually delete these files')
         else:
@@ -104,18 +114,21 @@ class Command(BaseCommand):
             
             # Ask for confirmation if not in dry-run
             if not options.get('skip_confirmation', False):
-                confirm = input(f'Are you sure you want to delete {len(orphaned_files)} files? (yes/no): ')
+                confirm = input(f'Are you sure you want to delete {len(orphaned_files)} files and {unreferenced_blobs} blobs? (yes/no): ')
                 if confirm.lower() != 'yes':
                     self.stdout.write(self.style.ERROR('Operation cancelled.'))
                     return
 
             try:
                 results = delete_s3_files(orphaned_files, dry_run=False)
+                blob_results = collect_unreferenced_blobs(dry_run=False)
+                results['errors'].extend(blob_results['errors'])
                 
                 self.stdout.write('')
                 self.stdout.write(self.style.SUCCESS('=== Deletion Results ==='))
                 self.stdout.write(f"Successfully deleted: {results['success']}")
                 self.stdout.write(f"Failed to delete: {results['failed']}")
+                self.stdout.write(f"Collected blobs: {blob_results['blobs']} ({blob_results['files']} files)")
                 
                 if results['errors'] and verbose:
                     self.stdout.write('')
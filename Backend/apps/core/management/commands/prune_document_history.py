@@ -0,0 +1,82 @@
+"""
+Django management command to apply the retention policy of the document history.
+
+Document_Record is partitioned by month on history_date, so expired months
+are dropped as whole partitions (no row-by-row DELETE). Blobs (Yjs state /
+HTML snapshots) no longer referenced by any version are removed afterwards.
+
+Usage:
+    python manage.py prune_document_history --months 24
+    python manage.py prune_document_history --months 24 --delete
+    python manage.py prune_document_history --create-partitions
+"""
+
+from django.core.management.base import BaseCommand
+from django.core.management import CommandError
+from django.utils import timezone
+from apps.APIDocumento.history import (
+    add_months,
+    create_history_partitions,
+    delete_default_partition_rows,
+    delete_orphan_blobs,
+    drop_history_partitions,
+    expired_history_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Drops document history partitions older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=24,
+            help='Number of months of history to keep (default: 24)',
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Actually drop the expired partitions (default is a dry run)',
+        )
+        parser.add_argument(
+            '--create-partitions',
+            action='store_true',
+            help='Only create the partitions for the current and next months',
+        )
+
+    def handle(self, *args, **options):
+        if options['create_partitions']:
+            created = create_history_partitions()
+            self.stdout.write(self.style.SUCCESS(f"Partitions created: {', '.join(created) or 'none'}"))
+            return
+
+        if options['months'] < 1:
+            raise CommandError('--months must be at least 1')
+
+        cutoff = add_months(timezone.localdate().replace(day=1), -options['months'])
+        expired = expired_history_partitions(cutoff)
+
+        self.stdout.write(f"Retention cutoff: {cutoff.isoformat()}")
+        self.stdout.write(self.style.WARNING(f"Expired partitions: {len(expired)}"))
+        for name in expired:
+            self.stdout.write(f"  - {name}")
+
+        if not options['delete']:
+            self.stdout.write('')
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - Nothing will be deleted'))
+            self.stdout.write('Run with --delete to drop these partitions')
+            return
+
+        try:
+            drop_history_partitions(expired)
+            default_rows = delete_default_partition_rows(cutoff)
+            blobs = delete_orphan_blobs()
+        except Exception as e:
+            raise CommandError(f'Error pruning document history: {str(e)}')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=== Retention Results ==='))
+        self.stdout.write(f"Partitions dropped: {len(expired)}")
+        self.stdout.write(f"Rows deleted from the default partition: {default_rows}")
+        self.stdout.write(f"Orphaned blobs deleted: {blobs}")
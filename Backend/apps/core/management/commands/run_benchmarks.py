@@ -0,0 +1,129 @@
+"""
+Django management command to replay the benchmark workloads against the seeded tenants.
+
+Reports p50/p95/p99 latency, queries and rows fetched per request for each
+workload. With --save-baseline the results become the baseline; with --compare
+a run fails (exit code 1) when a workload regresses against the baseline.
+
+Seed the tenants first (seed_benchmark_data) and keep the same scale/seed for
+runs that are compared with each other.
+
+Usage:
+    python manage.py run_benchmarks
+    python manage.py run_benchmarks --workload listing --workload search --iterations 500
+    python manage.py run_benchmarks --save-baseline
+    python manage.py run_benchmarks --compare --baseline benchmarks/baseline.json
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+from apps.core.benchmarks.metrics import compare_to_baseline, load_baseline, save_baseline, summarize
+from apps.core.benchmarks.seed import benchmark_enterprises, check_database
+from apps.core.benchmarks.workloads import WORKLOADS, BenchmarkContext
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR).parent / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = 'Replays the HTTP and WebSocket benchmark workloads and compares them with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workload',
+            action='append',
+            choices=list(WORKLOADS),
+            dest='workloads',
+            help='Only run the given workload (may be repeated; default: all)',
+        )
+        parser.add_argument('--iterations', type=int, default=200, help='Measured requests per workload (default: 200)')
+        parser.add_argument('--warmup', type=int, default=20, help='Discarded requests per workload (default: 20)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the request sequence')
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help=f'Baseline file (default: {DEFAULT_BASELINE})')
+        parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+        parser.add_argument('--compare', action='store_true', help='Fail if a workload regressed against the baseline')
+        parser.add_argument(
+            '--latency-tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed p95 growth as a fraction (default: 0.25)',
+        )
+        parser.add_argument(
+            '--query-tolerance',
+            type=float,
+            default=0.0,
+            help='Allowed growth of queries per request as a fraction (default: 0)',
+        )
+        parser.add_argument(
+            '--rows-tolerance',
+            type=float,
+            default=0.1,
+            help='Allowed growth of rows fetched per request as a fraction (default: 0.1)',
+        )
+        parser.add_argument(
+            '--allow-production',
+            action='store_true',
+            help='Allow running with the production settings',
+        )
+
+    def handle(self, *args, **options):
+        check_database(options['allow_production'])
+
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        context = BenchmarkContext(seed=options['seed'])
+        if not context.sectors:
+            raise CommandError('No benchmark tenants found. Run seed_benchmark_data first.')
+
+        names = options['workloads'] or list(WORKLOADS)
+        results = {}
+
+        self.stdout.write(f"Tenants: {benchmark_enterprises().count()} | Sectors: {len(context.sectors)}")
+        self.stdout.write(f"{'workload':<16}{'reqs':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'rows':>10}")
+        for name in names:
+            try:
+                samples = WORKLOADS[name].run(context, options['iterations'], options['warmup'])
+            except Exception as e:
+                raise CommandError(f'Error running the {name} workload: {str(e)}')
+
+            summary = results[name] = summarize(samples)
+            self.stdout.write(
+                f"{name:<16}{summary['requests']:>6}{summary['errors']:>5}"
+                f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}"
+                f"{summary['queries_per_request']:>9.1f}{summary['rows_per_request']:>10.1f}"
+            )
+
+        if options['compare']:
+            baseline = load_baseline(options['baseline'])
+            if baseline is None:
+                raise CommandError(f"Baseline not found: {options['baseline']}")
+
+            regressions = compare_to_baseline(
+                results,
+                baseline['workloads'],
+                latency_tolerance=options['latency_tolerance'],
+                query_tolerance=options['query_tolerance'],
+                rows_tolerance=options['rows_tolerance'],
+            )
+            self.stdout.write('')
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f"  - {regression}"))
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+        if options['save_baseline']:
+            save_baseline(
+                options['baseline'],
+                results,
+                scale={
+                    'enterprises': benchmark_enterprises().count(),
+                    'sectors': len(context.sectors),
+                    'documents': sum(len(sector['documents']) for sector in context.sectors),
+                },
+                settings={'iterations': options['iterations'], 'warmup': options['warmup'], 'seed': options['seed']},
+            )
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved: {options['baseline']}"))
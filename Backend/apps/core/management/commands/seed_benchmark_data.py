@@ -0,0 +1,60 @@
+"""
+Django management command to seed synthetic tenants for the benchmark suite.
+
+Each tenant is an enterprise with its owner, sectors (manager and members),
+categories and documents with Lexical content and history. Everything is tagged
+with the 'bench' prefix and can be removed with --flush.
+
+Usage:
+    python manage.py seed_benchmark_data
+    python manage.py seed_benchmark_data --enterprises 10 --sectors 5 --members 20 --documents 2000
+    python manage.py seed_benchmark_data --flush --enterprises 0
+"""
+
+from django.core.management.base import BaseCommand
+from apps.core.benchmarks.seed import SeedScale, check_database, flush_benchmark_data, seed_tenants
+
+
+class Command(BaseCommand):
+    help = 'Seeds synthetic tenants (enterprises, sectors, members, documents) for run_benchmarks'
+
+    def add_arguments(self, parser):
+        defaults = SeedScale()
+        parser.add_argument('--enterprises', type=int, default=defaults.enterprises, help='Tenants to create')
+        parser.add_argument('--sectors', type=int, default=defaults.sectors, help='Sectors per tenant')
+        parser.add_argument('--members', type=int, default=defaults.members, help='Members per sector (besides the manager)')
+        parser.add_argument('--documents', type=int, default=defaults.documents, help='Documents per sector')
+        parser.add_argument('--history', type=int, default=defaults.history, help='Edits in the history of each document')
+        parser.add_argument('--categories', type=int, default=defaults.categories, help='Categories per tenant')
+        parser.add_argument('--paragraphs', type=int, default=defaults.paragraphs, help='Average blocks per document')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same data)')
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Delete the existing benchmark tenants before seeding',
+        )
+        parser.add_argument(
+            '--allow-production',
+            action='store_true',
+            help='Allow running with the production settings',
+        )
+
+    def handle(self, *args, **options):
+        check_database(options['allow_production'])
+
+        if options['flush']:
+            flushed = flush_benchmark_data(log=self.stdout.write)
+            self.stdout.write(self.style.WARNING(
+                f"Flushed: {flushed['enterprises']} tenants, {flushed['documents']} documents, {flushed['users']} users"
+            ))
+
+        scale = SeedScale(**{field: options[field] for field in SeedScale._fields})
+        if scale.enterprises < 1:
+            return
+
+        totals = seed_tenants(scale, seed=options['seed'], log=self.stdout.write)
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=== Seed Results ==='))
+        for name, value in totals.items():
+            self.stdout.write(f"{name.capitalize()} created: {value}")
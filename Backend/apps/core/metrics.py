@@ -0,0 +1,288 @@
+"""
+Prometheus metrics of the web (WSGI/ASGI), Channels and Celery processes.
+
+    - HTTP: latency per view, method and status (MetricsMiddleware).
+    - Database: duration of every statement (query_stats.record_queries).
+    - Redis / S3: duration of each call (observe_call, instrument_s3_client).
+    - Editor: WebSocket connections, active rooms, frames relayed and the depth
+      of the Yjs queue of a document when an update is pushed.
+    - Celery: duration (persist, thumbnails, ...) and queue lag per task, plus
+      the stages of the thumbnail pipeline.
+
+In production the web processes serve them on METRICS_PORT, reached only through
+the internal Service of service-metrics.yaml (the gunicorn master, see
+gunicorn.conf.py; daphne, see asgi.py). Celery workers serve them on
+METRICS_WORKER_PORT. /metrics (MetricsView) stays for development and, behind
+the public ingress, answers 403 unless METRICS_TOKEN is configured and sent
+(METRICS_TOKEN_REQUIRED). Prefork workers (and several gunicorn workers) need
+PROMETHEUS_MULTIPROC_DIR pointing to an empty directory shared by the processes,
+so the samples of every child are aggregated; see the prometheus_client
+multiprocess documentation.
+"""
+
+import hmac
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_ready
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+# Buckets in seconds: fast calls (DB/Redis) and slow jobs (tasks, queue lag).
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Duration of the HTTP requests.',
+    ['view', 'method', 'status'],
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds',
+    'Duration of the SQL statements.',
+    ['alias'],
+    buckets=FAST_BUCKETS,
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    'external_call_duration_seconds',
+    'Duration of the calls to Redis and S3.',
+    ['service', 'operation'],
+    buckets=FAST_BUCKETS,
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    'websocket_connections',
+    'Open editor WebSocket connections.',
+    multiprocess_mode='livesum',
+)
+WEBSOCKET_ROOMS = Gauge(
+    'websocket_rooms',
+    'Documents with at least one editor connected (per process).',
+    multiprocess_mode='livesum',
+)
+WEBSOCKET_FRAMES_RELAYED = Counter(
+    'websocket_frames_relayed_total',
+    'Editor frames received and broadcast to the room.',
+)
+WEBSOCKET_BYTES_RELAYED = Counter(
+    'websocket_bytes_relayed_total',
+    'Bytes of the editor frames broadcast to the room.',
+)
+# One series per document would not scale: the depth is a distribution, observed on each push.
+YJS_QUEUE_DEPTH = Histogram(
+    'yjs_queue_depth',
+    'Pending Yjs updates of the document right after a push.',
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+CELERY_TASK_DURATION = Histogram(
+    'celery_task_duration_seconds',
+    'Duration of the Celery tasks.',
+    ['task', 'state'],
+    buckets=SLOW_BUCKETS,
+)
+CELERY_QUEUE_LAG = Histogram(
+    'celery_task_queue_lag_seconds',
+    'Time between publishing a task and a worker starting it.',
+    ['task'],
+    buckets=SLOW_BUCKETS,
+)
+THUMBNAIL_STAGE_DURATION = Histogram(
+    'thumbnail_stage_duration_seconds',
+    'Duration of each stage of the thumbnail pipeline.',
+    ['stage'],
+    buckets=SLOW_BUCKETS,
+)
+
+# Editors connected per document in this process (the rooms gauge is its size).
+_rooms = {}
+# Start time of the running tasks, by task id.
+_task_started = {}
+
+
+def collector_registry():
+    """
+    Registry to export: the aggregate of every process in multiprocess mode.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+@contextmanager
+def observe_call(service: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, operation).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def observe_thumbnail_stage(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        THUMBNAIL_STAGE_DURATION.labels(stage).observe(time.perf_counter() - started)
+
+
+def _before_s3_call(context, **kwargs) -> None:
+    context['metrics_started'] = time.perf_counter()
+
+
+def _after_s3_call(context, model, **kwargs) -> None:
+    started = context.get('metrics_started')
+    if started is not None:
+        EXTERNAL_CALL_DURATION.labels('s3', model.name).observe(time.perf_counter() - started)
+
+
+def instrument_s3_client(client):
+    """
+    Times every API call of a boto3 S3 client (GetObject, PutObject, UploadPart, ...).
+    """
+    client.meta.events.register('before-parameter-build.s3.*', _before_s3_call)
+    client.meta.events.register('after-call.s3.*', _after_s3_call)
+    return client
+
+
+def editor_connected(doc_id) -> None:
+    WEBSOCKET_CONNECTIONS.inc()
+    _rooms[doc_id] = _rooms.get(doc_id, 0) + 1
+    WEBSOCKET_ROOMS.set(len(_rooms))
+
+
+def editor_disconnected(doc_id) -> None:
+    WEBSOCKET_CONNECTIONS.dec()
+    remaining = _rooms.get(doc_id, 0) - 1
+    if remaining > 0:
+        _rooms[doc_id] = remaining
+    else:
+        _rooms.pop(doc_id, None)
+    WEBSOCKET_ROOMS.set(len(_rooms))
+
+
+def frame_relayed(size: int) -> None:
+    WEBSOCKET_FRAMES_RELAYED.inc()
+    WEBSOCKET_BYTES_RELAYED.inc(size)
+
+
+def view_label(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name or match.func.__name__) if match else '<unresolved>'
+
+
+class MetricsMiddleware:
+    """
+    Latency of every request, labelled by the route name of the view (bounded
+    cardinality: unresolved paths share one label). Keep it first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    @staticmethod
+    def observe(request, response, started: float) -> None:
+        HTTP_REQUEST_DURATION.labels(view_label(request), request.method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+
+
+def start_exporter(port, process: str) -> Optional[int]:
+    """
+    Serves the metrics on a separate port (none when the port is not configured).
+    """
+    if not port:
+        return None
+    start_http_server(int(port), registry=collector_registry())
+    logger.info('%s metrics exporter listening on port %s', process, port)
+    return int(port)
+
+
+class MetricsView(View):
+    """
+    Prometheus text exposition. With METRICS_TOKEN set, the scraper must send
+    `Authorization: Bearer <token>`; without it the view only answers when
+    METRICS_TOKEN_REQUIRED is off (development), so it fails closed in production.
+    """
+
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        if not token and getattr(settings, 'METRICS_TOKEN_REQUIRED', False):
+            return HttpResponse(status=403)
+        # Constant-time comparison: the response time does not leak how much of the token matched.
+        if token and not hmac.compare_digest(
+            request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()
+        ):
+            return HttpResponse(status=403)
+        return HttpResponse(generate_latest(collector_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+# --- Celery ---
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs) -> None:
+    if headers is not None:
+        headers.setdefault('published_at', time.time())
+
+
+@task_prerun.connect
+def task_started(task_id=None, task=None, **kwargs) -> None:
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, 'published_at', None)
+    if published_at is not None:
+        CELERY_QUEUE_LAG.labels(task.name).observe(max(time.time() - float(published_at), 0))
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@worker_ready.connect
+def start_worker_exporter(**kwargs) -> Optional[int]:
+    """
+    Serves the metrics of the worker (and its children, in multiprocess mode)
+    on METRICS_WORKER_PORT.
+    """
+    return start_exporter(getattr(settings, 'METRICS_WORKER_PORT', None), 'Celery')
@@ -1,3 +1,5 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 
 class DocumentPagination(PageNumberPagination):
@@ -8,4 +10,35 @@ class DocumentPagination(PageNumberPagination):
     page_size = 21
     page_size_query_param = 'page_size'
     max_page_size = 100
-    page_query_param = 'page'
\ No newline at end of file
+    page_query_param = 'page'
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Versão assíncrona de `paginate_queryset` para views async.
+        
+        O total é obtido com `acount()` e a página é materializada com
+        iteração assíncrona, sem bloquear o event loop.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # 'count' é um cached_property: preenchendo-o, o Paginator não executa COUNT síncrono.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
@@ -1,19 +1,29 @@
+from functools import lru_cache
+
 import boto3
 from django.conf import settings
 
-def generate_presigned_url(file_path, expiration=3600) -> None | str:
-    if not file_path:
-        return None
-        
-    s3_client = boto3.client(
+# Validade padrão das URLs assinadas (segundos).
+PRESIGNED_URL_EXPIRATION = 3600
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    # Criar o client custa mais que assinar a URL (e as listagens assinam uma por linha):
+    # um client por processo, reaproveitado (boto3 clients são thread-safe).
+    return boto3.client(
         's3',
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
         region_name=settings.AWS_S3_REGION_NAME
     )
-    
+
+def generate_presigned_url(file_path, expiration=PRESIGNED_URL_EXPIRATION) -> None | str:
+    if not file_path:
+        return None
+
     try:
-        response = s3_client.generate_presigned_url('get_object',
+        response = get_s3_client().generate_presigned_url('get_object',
             Params={
                 'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
                 'Key': file_path
@@ -22,4 +32,4 @@ def generate_presigned_url(file_path, expiration=3600) -> None | str:
         )
         return response
     except Exception as e:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,220 @@
+"""
+Per-request SQL instrumentation: query count, time spent in the database, rows
+fetched and repeated query shapes (the usual sign of an N+1).
+
+A single execute_wrapper is installed on every database connection when it is
+opened (see CoreConfig.ready). Besides feeding the database latency metric
+(metrics.py), it only records while a collector is active in the current
+context, so queries run by sync_to_async(thread_sensitive=False) workers are
+still attributed to the request that spawned them.
+
+QueryStatsMiddleware reports each request:
+    - QUERY_STATS_SERVER_TIMING: `Server-Timing` header (dev tools / benchmarks).
+    - QUERY_STATS_LOG: one JSON line on the 'apps.core.query_stats' logger (prod).
+    - QUERY_BUDGET_ENFORCE: raises QueryBudgetExceeded when the view declares a
+      `query_budget` and the request goes over it (enabled by the test suite).
+
+In tests:
+    with capture_query_stats() as stats:
+        api_client.get(url)
+    assert stats.count <= ListDocumentsView.query_budget
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from apps.core.metrics import DB_QUERY_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Collectors active in the current context (nested captures all record the query).
+_collectors: ContextVar[Tuple['QueryStats', ...]] = ContextVar('query_stats_collectors', default=())
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Shape of a statement: literals and placeholders become '?' and IN lists of
+    any length collapse to '(...)', so the same query with other ids matches.
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """
+    Queries recorded while the collector is active, from any connection or thread.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.rows = 0
+        self.fingerprints: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, duration_ms: float, rows: int) -> None:
+        shape = fingerprint(sql)
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            self.rows += rows
+            self.fingerprints[shape] += 1
+
+    @property
+    def duplicates(self) -> int:
+        """
+        Queries that repeated the shape of an earlier one.
+        """
+        return sum(count - 1 for count in self.fingerprints.values())
+
+    def repeated(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """
+        The most repeated query shapes (only those run more than once).
+        """
+        return [(shape, count) for shape, count in self.fingerprints.most_common(limit) if count > 1]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'queries': self.count,
+            'db_ms': round(self.duration_ms, 3),
+            'rows': self.rows,
+            'duplicates': self.duplicates,
+            'repeated': [{'sql': shape, 'count': count} for shape, count in self.repeated()],
+        }
+
+
+def record_queries(execute, sql, params, many, context):
+    """
+    execute_wrapper installed on every connection: feeds the database latency
+    metric and, when a collector is active, the stats of the request.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_QUERY_DURATION.labels(context['connection'].alias).observe(elapsed)
+
+        collectors = _collectors.get()
+        if collectors:
+            cursor = context['cursor']
+            rows = cursor.rowcount if cursor.description is not None and cursor.rowcount > 0 else 0
+            for collector in collectors:
+                collector.record(sql, elapsed * 1000, rows)
+
+
+def install_query_stats(sender, connection, **kwargs) -> None:
+    """
+    connection_created receiver: adds the wrapper once per connection.
+    """
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+@contextmanager
+def capture_query_stats():
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+def view_query_budget(request) -> Optional[int]:
+    """
+    `query_budget` declared on the class of the view that handled the request.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view_class = getattr(match.func, 'view_class', None) or getattr(match.func, 'cls', None)
+    return getattr(view_class, 'query_budget', None)
+
+
+class QueryStatsMiddleware:
+    """
+    Records the queries of each request and reports them according to the
+    QUERY_STATS_* / QUERY_BUDGET_ENFORCE settings (see the module docstring).
+    Keep it first in MIDDLEWARE so the queries of the other middlewares count too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        with capture_query_stats() as stats:
+            response = self.get_response(request)
+        return self.report(request, response, stats, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with capture_query_stats() as stats:
+            response = await self.get_response(request)
+        return self.report(request, response, stats, started)
+
+    def report(self, request, response, stats: QueryStats, started: float):
+        total_ms = (time.perf_counter() - started) * 1000
+        budget = view_query_budget(request)
+        over_budget = budget is not None and stats.count > budget
+
+        if getattr(settings, 'QUERY_STATS_SERVER_TIMING', False):
+            response['Server-Timing'] = (
+                f'app;dur={total_ms:.1f}, '
+                f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries, '
+                f'{stats.duplicates} duplicated, {stats.rows} rows"'
+            )
+
+        if getattr(settings, 'QUERY_STATS_LOG', False):
+            match = getattr(request, 'resolver_match', None)
+            entry = {
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 3),
+                **stats.as_dict(),
+                'budget': budget,
+                'over_budget': over_budget,
+            }
+            logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps(entry, ensure_ascii=False))
+
+        if over_budget and getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+            repeated = ''.join(f'\n  {count}x {shape}' for shape, count in stats.repeated())
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path} ran {stats.count} queries '
+                f'(budget {budget}, {stats.duplicates} duplicated){repeated}'
+            )
+
+        return response
@@ -1,13 +1,18 @@
+import logging
 import os
 import sys
 import boto3
 from celery import shared_task
 from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
 from io import BytesIO
 from PIL import Image
 from pdf2image import convert_from_bytes
 from urllib.parse import urlparse, unquote
-from apps.APIDocumento.models import Document
+from apps.APIDocumento.blobs import blob_thumbnail_path
+from apps.APIDocumento.models import Document, FileBlob
+from apps.core.metrics import instrument_s3_client, observe_call, observe_thumbnail_stage
 import time
 from dotenv import load_dotenv
 from celery import shared_task
@@ -16,8 +21,19 @@ import y_py
 
 load_dotenv(".env")
 
-if (os.getenv("DEBUG", 'False').lower() in ("true", "1", "t", "y", "yes", "on")):
-    boto3.set_stream_logger('botocore', level='DEBUG') # type: ignore
+logger = logging.getLogger(__name__)
+
+
+def set_thumbnail_path(document_id, thumb_path) -> None:
+    """
+    Grava só a miniatura (um UPDATE): sem Document.save(), o conteúdo não é
+    regravado nem gera versão no histórico. A revisão sobe para invalidar os ETags.
+    """
+    Document.objects.filter(pk=document_id).update(
+        thumbnail_path=thumb_path,
+        revision=F('revision') + 1,
+        updated_at=timezone.now()
+    )
 
 @shared_task
 def process_media_asset(document_id):
@@ -29,23 +45,31 @@ def process_media_asset(document_id):
     if sys.platform == 'win32':
         exe_path = os.path.join(POPPLER_BIN_PATH, 'pdfinfo.exe')
         if not os.path.exists(exe_path):
-            print(f"[Celery Error] Poppler não encontrado em: {exe_path}")
+            logger.error("Poppler não encontrado em: %s", exe_path)
     else:
         POPPLER_BIN_PATH = None # Linux/Produção usa PATH do sistema
 
     try:
-        document = Document.objects.get(pk=document_id)
+        # Só os campos do arquivo: nada lido aqui é regravado depois das tentativas no S3.
+        document = Document.objects.select_related('file_blob').get(pk=document_id)
+        blob = document.file_blob
 
-        s3 = boto3.client(
+        if blob is not None and blob.thumbnail:
+            # Mesmo conteúdo já processado: a miniatura do blob é reaproveitada.
+            if document.thumbnail_path != blob.thumbnail.name:
+                set_thumbnail_path(document.pk, blob.thumbnail.name)
+            return "Reused"
+
+        s3 = instrument_s3_client(boto3.client(
             's3',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
             region_name=settings.AWS_S3_REGION_NAME
-        )
+        ))
         bucket_name = settings.AWS_STORAGE_BUCKET_NAME
 
         raw_url = str(document.file_url)
-        print(f"[Celery] URL Bruta no Banco: {raw_url}")
+        logger.debug("URL bruta no banco: %s", raw_url)
 
         if raw_url.startswith('http'):
             parsed = urlparse(raw_url)
@@ -56,80 +80,88 @@ def process_media_asset(document_id):
         file_key = unquote(clean_path.lstrip('/'))
         file_key = "media/" + file_key if not file_key.startswith("media/") else file_key
         
-        print(f"[Celery] Key Limpa para o S3: '{file_key}'") 
+        logger.debug("Key limpa para o S3: '%s'", file_key)
         file_obj = None
         tentativas = 0
         max_tentativas = 5
         
-        while tentativas < max_tentativas:
-            try:
-                file_obj = s3.get_object(Bucket=bucket_name, Key=file_key)
-                print("[Celery] Arquivo encontrado e baixado!")
-                break
-            except s3.exceptions.NoSuchKey:
-                print(f"[Celery] Arquivo ainda não encontrado no S3... tentativa {tentativas+1}")
-                time.sleep(5)
-                tentativas += 1
-            except Exception as e:
-                print(f"[Celery] Erro genérico S3: {e}")
-                raise e
-
-        if file_obj is None:
-            raise Exception(f"S3 NoSuchKey: O arquivo '{file_key}' não apareceu no bucket após várias tentativas.")
-
-        file_content = file_obj['Body'].read()
+        with observe_thumbnail_stage('download'):
+            while tentativas < max_tentativas:
+                try:
+                    file_obj = s3.get_object(Bucket=bucket_name, Key=file_key)
+                    logger.debug("Arquivo encontrado e baixado: %s", file_key)
+                    break
+                except s3.exceptions.NoSuchKey:
+                    logger.warning("Arquivo ainda não encontrado no S3 (tentativa %s): %s", tentativas + 1, file_key)
+                    time.sleep(5)
+                    tentativas += 1
+                except Exception as e:
+                    logger.error("Erro genérico S3: %s", e)
+                    raise e
+
+            if file_obj is None:
+                raise Exception(f"S3 NoSuchKey: O arquivo '{file_key}' não apareceu no bucket após várias tentativas.")
+
+            file_content = file_obj['Body'].read()
         thumb_io = BytesIO()
         
         file_ext = file_key.split('.')[-1].lower()
 
-        if 'pdf' in file_ext:
-            print("[Celery] Convertendo PDF...")
-            pages = convert_from_bytes(
-                file_content, 
-                first_page=1, 
-                last_page=1, 
-                fmt='jpeg', 
-                poppler_path=POPPLER_BIN_PATH
-            )
-            if pages:
-                image = pages[0]
+        with observe_thumbnail_stage('render'):
+            if 'pdf' in file_ext:
+                logger.debug("Convertendo PDF: %s", file_key)
+                pages = convert_from_bytes(
+                    file_content, 
+                    first_page=1, 
+                    last_page=1, 
+                    fmt='jpeg', 
+                    poppler_path=POPPLER_BIN_PATH
+                )
+                if pages:
+                    image = pages[0]
+                    image.thumbnail((400, 400))
+                    image.save(thumb_io, format='JPEG', quality=80)
+                else:
+                    logger.warning("PDF vazio ou ilegível: %s", file_key)
+                    return "Empty PDF"
+        
+            elif file_ext in ['jpg', 'jpeg', 'png', 'webp']:
+                logger.debug("Convertendo imagem: %s", file_key)
+                image = Image.open(BytesIO(file_content))
                 image.thumbnail((400, 400))
+                if image.mode in ("RGBA", "P"):
+                    image = image.convert("RGB")
                 image.save(thumb_io, format='JPEG', quality=80)
-            else:
-                print("[Celery] PDF vazio ou ilegível.")
-                return "Empty PDF"
-        
-        elif file_ext in ['jpg', 'jpeg', 'png', 'webp']:
-            print("[Celery] Convertendo Imagem...")
-            image = Image.open(BytesIO(file_content))
-            image.thumbnail((400, 400))
-            if image.mode in ("RGBA", "P"):
-                image = image.convert("RGB")
-            image.save(thumb_io, format='JPEG', quality=80)
         
-        else:
-            print(f"[Celery] Tipo não suportado: {file_ext}")
-            return "Skipped"
+            else:
+                logger.info("Tipo não suportado para miniatura: %s", file_ext)
+                return "Skipped"
 
-        thumb_filename = f"thumb_{document.pk}_{int(time.time())}.jpg"
-        thumb_path = f"thumbnails/{thumb_filename}"
+        if blob is not None:
+            thumb_path = blob_thumbnail_path(blob.pk)
+        else:
+            thumb_filename = f"thumb_{document.pk}_{int(time.time())}.jpg"
+            thumb_path = f"thumbnails/{thumb_filename}"
         
         thumb_io.seek(0)
         
-        print(f"[Celery] Subindo thumbnail para: {thumb_path}")
-        s3.put_object(
-            Bucket=bucket_name,
-            Key="media/" + thumb_path,
-            Body=thumb_io,
-            ContentType='image/jpeg'
-        )
-        document.thumbnail_path = thumb_path # type: ignore
-        document.save()
+        logger.debug("Subindo miniatura para: %s", thumb_path)
+        with observe_thumbnail_stage('upload'):
+            s3.put_object(
+                Bucket=bucket_name,
+                Key="media/" + thumb_path,
+                Body=thumb_io,
+                ContentType='image/jpeg'
+            )
+        if blob is not None:
+            FileBlob.objects.filter(pk=blob.pk).update(thumbnail=thumb_path)
+
+        set_thumbnail_path(document.pk, thumb_path)
         
         return "Success"
 
     except Exception as e:
-        print(f"[Celery Error] Fatal: {str(e)}")
+        logger.exception("Falha ao gerar a miniatura do documento %s", document_id)
         raise e
 
 @shared_task
@@ -143,15 +175,18 @@ def persist_document_task(doc_id):
     # Mas para simplificar e ser robusto:
     
     # Pega tudo
-    raw_updates = con.lrange(redis_queue_key, 0, -1)
+    with observe_call('redis', 'lrange'):
+        raw_updates = con.lrange(redis_queue_key, 0, -1)
     if not raw_updates:
         return "Fila vazia"
         
     # Limpa o que pegamos
-    con.delete(redis_queue_key)
+    with observe_call('redis', 'delete'):
+        con.delete(redis_queue_key)
 
     try:
-        doc = Document.objects.get(pk=doc_id)
+        # Só o estado Yjs: content e html_snapshot não mudam aqui (a versão reaproveita os hashes).
+        doc = Document.objects.with_heavy('yjs_state').get(pk=doc_id)
         ydoc = y_py.YDoc()
         
         # Carrega estado anterior
@@ -178,8 +213,78 @@ def persist_document_task(doc_id):
 
         if applied > 0:
             doc.yjs_state = y_py.encode_state_as_update(ydoc)
-            doc.save()
+            doc.save(update_fields=['yjs_state'])
             return f"Salvo: {applied} updates"
             
     except Exception as e:
-        return f"Erro task: {e}"
\ No newline at end of file
+        return f"Erro task: {e}"
+
+@shared_task
+def create_document_record_partitions_task():
+    """
+    Garante as partições mensais do histórico de documentos para os próximos meses.
+    """
+    from apps.APIDocumento.history import create_history_partitions
+
+    created = create_history_partitions()
+    return f"Partições criadas: {', '.join(created) or 'nenhuma'}"
+
+
+@shared_task
+def expire_document_reviews_task():
+    """
+    Aplica as políticas de revisão dos setores (documentos vencidos -> 'Revisão necessária').
+    """
+    from apps.APIDocumento.classificationUtils.review_expiry import run_review_expiry
+
+    return run_review_expiry()
+
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def optimize_attached_image_task(attached_file_id, file_name):
+    """
+    Otimiza (redimensiona/recomprime) a imagem anexada fora da requisição de upload.
+    """
+    from apps.APIDocumento.attachments import optimize_attachment
+
+    return optimize_attachment(attached_file_id, file_name)
+
+@shared_task
+def render_html_snapshot_task(document_id):
+    """
+    Renderiza o HTML do documento (html_snapshot) a partir do conteúdo salvo.
+    """
+    from apps.APIDocumento.rendering import render_document_snapshot
+
+    snapshot = render_document_snapshot(document_id)
+    return "Missing" if snapshot is None else f"Rendered revision {snapshot['revision']}"
+
+# Exportações de setores inteiros passam do limite padrão (CELERY_TASK_TIME_LIMIT).
+@shared_task(time_limit=4 * 60 * 60)
+def export_documents_task(export_id):
+    """
+    Gera o ZIP da exportação (PDF/DOCX, originais e anexos) direto no S3.
+    """
+    from apps.APIDocumento.exportUtils.engine import run_export
+
+    return run_export(export_id)
+
+# Importações grandes (milhares de arquivos) passam do limite padrão (CELERY_TASK_TIME_LIMIT).
+@shared_task(time_limit=4 * 60 * 60)
+def import_documents_task(import_id):
+    """
+    Cria os documentos da importação em lote e agenda as miniaturas (chords por lote).
+    """
+    from apps.APIDocumento.importUtils.engine import run_import
+
+    return run_import(import_id)
+
+@shared_task
+def finish_import_renditions_task(import_id, count):
+    """
+    Corpo do chord de miniaturas de um lote da importação: atualiza o progresso.
+    """
+    from apps.APIDocumento.importUtils.engine import finish_renditions
+
+    finish_renditions(import_id, count)
+    return f"{count} renditions"
@@ -0,0 +1,166 @@
+import boto3
+import time
+import pytest
+from botocore.stub import Stubber
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from apps.core.metrics import editor_connected, editor_disconnected, instrument_s3_client, task_finished, task_started
+
+User = get_user_model()
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """
+    Suíte de testes das métricas Prometheus (endpoint /metrics, editor e Celery).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Um usuário autenticável.
+        """
+        user = User.objects.create_user(username="metrics_user", password="pw", email="metrics_user@e.com", name="Metrics User")
+        return {"user": user}
+
+    # Success
+
+    def test_metrics_endpoint_success(self, api_client: APIClient, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se a latência da requisição aparece em /metrics com o nome da rota e as consultas ao banco.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        api_client.force_authenticate(user=scenario_data["user"])
+        api_client.get(reverse("visualizar-documentos"))
+
+        response = api_client.get(reverse("metrics"))
+        body = response.content.decode()
+
+        assert response.status_code == 200 # type: ignore
+        assert 'http_request_duration_seconds_count{method="GET",status="200",view="visualizar-documentos"}' in body
+        assert 'db_query_duration_seconds_count{alias="default"}' in body
+
+    def test_editor_rooms_success(self) -> None:
+        """
+        Testa se as conexões e as salas ativas acompanham a entrada e a saída dos editores.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        connections, rooms = sample('websocket_connections'), sample('websocket_rooms')
+
+        editor_connected('901')
+        editor_connected('901')
+        editor_connected('902')
+        assert sample('websocket_connections') == connections + 3
+        assert sample('websocket_rooms') == rooms + 2
+
+        editor_disconnected('901')
+        editor_disconnected('902')
+        assert sample('websocket_connections') == connections + 1
+        assert sample('websocket_rooms') == rooms + 1
+
+        editor_disconnected('901')
+        assert sample('websocket_rooms') == rooms
+
+    def test_celery_task_metrics_success(self) -> None:
+        """
+        Testa se a duração e o atraso na fila são registrados pelos sinais do Celery.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        task = SimpleNamespace(name='apps.core.tasks.persist_document_task', request=SimpleNamespace(published_at=time.time() - 2))
+        lag = sample('celery_task_queue_lag_seconds_count', task=task.name)
+        duration = sample('celery_task_duration_seconds_count', task=task.name, state='SUCCESS')
+
+        task_started(task_id='metrics-task', task=task)
+        task_finished(task_id='metrics-task', task=task, state='SUCCESS')
+
+        assert sample('celery_task_queue_lag_seconds_count', task=task.name) == lag + 1
+        assert sample('celery_task_queue_lag_seconds_sum', task=task.name) >= 2
+        assert sample('celery_task_duration_seconds_count', task=task.name, state='SUCCESS') == duration + 1
+
+    def test_s3_call_timing_success(self) -> None:
+        """
+        Testa se as chamadas de um client S3 instrumentado são cronometradas por operação.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        client = instrument_s3_client(boto3.client('s3', region_name='us-east-1', aws_access_key_id='a', aws_secret_access_key='b'))
+        calls = sample('external_call_duration_seconds_count', service='s3', operation='HeadObject')
+
+        with Stubber(client) as stubber:
+            stubber.add_response('head_object', {}, {'Bucket': 'bucket', 'Key': 'media/arquivo.pdf'})
+            client.head_object(Bucket='bucket', Key='media/arquivo.pdf')
+
+        assert sample('external_call_duration_seconds_count', service='s3', operation='HeadObject') == calls + 1
+
+    # Failures
+
+    def test_metrics_without_token_fails(self, api_client: APIClient, settings) -> None:
+        """
+        Testa se /metrics exige o token quando METRICS_TOKEN está configurado.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            settings : configurações do Django (pytest-django)
+
+        Return:
+            None
+        """
+        settings.METRICS_TOKEN = "segredo"
+
+        assert api_client.get(reverse("metrics")).status_code == 403 # type: ignore
+        assert api_client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer segredo").status_code == 200 # type: ignore
+
+    def test_metrics_token_required_fails(self, api_client: APIClient, settings) -> None:
+        """
+        Testa se /metrics responde 403 sem METRICS_TOKEN configurado quando o token é
+        obrigatório (produção), mesmo para quem não envia nenhum cabeçalho.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            settings : configurações do Django (pytest-django)
+
+        Return:
+            None
+        """
+        settings.METRICS_TOKEN = None
+        settings.METRICS_TOKEN_REQUIRED = True
+
+        assert api_client.get(reverse("metrics")).status_code == 403 # type: ignore
+        assert api_client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ").status_code == 403 # type: ignore
@@ -0,0 +1,142 @@
+import json
+import logging
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from typing import Any, Dict
+
+from apps.APIDocumento.views import ListDocumentsView
+from apps.APIEmpresa.models import Enterprise
+from apps.core.query_stats import QueryBudgetExceeded, capture_query_stats, fingerprint
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestQueryStats:
+    """
+    Suíte de testes da instrumentação de consultas por requisição (middleware e helper de testes).
+    """
+
+    @pytest.fixture
+    def api_client(self) -> APIClient:
+        """Returns an APIClient instance for use in tests."""
+        return APIClient()
+
+    @pytest.fixture
+    def scenario_data(self) -> Dict[str, Any]:
+        """
+        Um usuário autenticável e duas empresas.
+        """
+        user = User.objects.create_user(username="stats_user", password="pw", email="stats_user@e.com", name="Stats User")
+        enterprises = [Enterprise.objects.create(name=f"Stats Corp {index}", owner=user) for index in range(2)]
+        return {"user": user, "enterprises": enterprises}
+
+    # Success
+
+    def test_fingerprint_success(self) -> None:
+        """
+        Testa se consultas com outros ids e listas IN de outro tamanho têm o mesmo formato.
+
+        Args:
+            self: A instância de teste.
+
+        Return:
+            None
+        """
+        first = fingerprint('SELECT * FROM "Document" WHERE "id" IN (%s, %s) AND "title" = \'a\'')
+        second = fingerprint('SELECT *  FROM "Document"\nWHERE "id" IN (%s) AND "title" = \'b\'')
+
+        assert first == second == 'SELECT * FROM "Document" WHERE "id" IN (...) AND "title" = ?'
+
+    def test_capture_detects_duplicates_success(self, scenario_data: Dict[str, Any]) -> None:
+        """
+        Testa se o helper conta as consultas, as linhas lidas e os formatos repetidos (N+1).
+
+        Args:
+            self: A instância de teste.
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+
+        Return:
+            None
+        """
+        with capture_query_stats() as stats:
+            for enterprise in scenario_data["enterprises"]:
+                Enterprise.objects.get(pk=enterprise.pk)
+
+        assert stats.count == 2
+        assert stats.rows == 2
+        assert stats.duplicates == 1
+        assert stats.repeated()[0][1] == 2
+
+    def test_server_timing_header_success(self, api_client: APIClient, scenario_data: Dict[str, Any], settings) -> None:
+        """
+        Testa se a resposta traz o header Server-Timing com as consultas da requisição.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            settings : configurações do Django (pytest-django)
+
+        Return:
+            None
+        """
+        settings.QUERY_STATS_SERVER_TIMING = True
+        api_client.force_authenticate(user=scenario_data["user"])
+
+        with capture_query_stats() as stats:
+            response = api_client.get(reverse("visualizar-documentos"))
+
+        assert response.status_code == 200 # type: ignore
+        assert response['Server-Timing'].startswith('app;dur=') # type: ignore
+        assert f'desc="{stats.count} queries' in response['Server-Timing'] # type: ignore
+
+    def test_structured_log_success(self, api_client: APIClient, scenario_data: Dict[str, Any], settings, caplog) -> None:
+        """
+        Testa se cada requisição gera uma linha JSON com as consultas e o orçamento da view.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            settings : configurações do Django (pytest-django)
+            caplog : captura de logs do pytest
+
+        Return:
+            None
+        """
+        settings.QUERY_STATS_LOG = True
+        api_client.force_authenticate(user=scenario_data["user"])
+
+        with caplog.at_level(logging.INFO, logger='apps.core.query_stats'):
+            api_client.get(reverse("visualizar-documentos"))
+
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry['view'] == "visualizar-documentos"
+        assert entry['status'] == 200
+        assert entry['budget'] == ListDocumentsView.query_budget
+        assert 0 < entry['queries'] <= entry['budget']
+        assert entry['over_budget'] is False
+
+    # Failures
+
+    def test_query_budget_exceeded_fails(self, api_client: APIClient, scenario_data: Dict[str, Any], monkeypatch) -> None:
+        """
+        Testa se uma requisição acima do query_budget da view falha o teste.
+
+        Args:
+            self: A instância de teste.
+            api_client (APIClient) : cliente de API para uso em login
+            scenario_data (Dict[str, object]) : cenário para simular um ambiente determinado
+            monkeypatch : fixture do pytest para alterar atributos
+
+        Return:
+            None
+        """
+        monkeypatch.setattr(ListDocumentsView, 'query_budget', 0)
+        api_client.force_authenticate(user=scenario_data["user"])
+
+        with pytest.raises(QueryBudgetExceeded):
+            api_client.get(reverse("visualizar-documentos"))
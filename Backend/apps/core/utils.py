@@ -1,12 +1,16 @@
 import os
 import io
-from typing import Dict, List, Union, Any, Optional, Tuple, Set
+from datetime import datetime
+from typing import IO, Dict, List, Union, Any, Optional, Tuple, Set
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.http import http_date, parse_http_date_safe
 from django.utils.text import slugify
 from django.utils import timezone
 from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
 from django.core.files.storage import default_storage
 from PIL import Image
-import sys
+from rest_framework.response import Response
 
 def default_response(success: bool, 
                      message: str = "",
@@ -42,6 +46,100 @@ def default_response(success: bool,
     }
 
 
+def etag_matches(request: Any, etag: str) -> bool:
+    """
+    Checks if the client already has this version of the resource (If-None-Match).
+    
+    Args:
+        request (Request): The user request object.
+        etag (str): The current ETag of the resource (quoted).
+
+    Returns:
+        bool: True if the response can be a 304 Not Modified.
+    """
+    header = request.headers.get('If-None-Match')
+    
+    if not header:
+        return False
+    
+    if header.strip() == '*':
+        return True
+    
+    return etag in [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+
+def is_not_modified(request: Any, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Checks the conditional request headers (RFC 9110): If-None-Match takes precedence,
+    If-Modified-Since is only considered when the client did not send an ETag.
+    
+    Args:
+        request (Request): The user request object.
+        etag (str): The current ETag of the resource (quoted).
+        last_modified (datetime, optional): Last modification date of the resource.
+
+    Returns:
+        bool: True if the response can be a 304 Not Modified.
+    """
+    if request.headers.get('If-None-Match'):
+        return etag_matches(request, etag)
+    
+    if last_modified is None:
+        return False
+    
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since'))
+    
+    # A data HTTP tem resolução de segundos.
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def set_cache_validators(res: HttpResponse, etag: str, last_modified: Optional[datetime] = None) -> None:
+    """
+    Sets ETag/Last-Modified. The client keeps the response and revalidates it on every read.
+    
+    Args:
+        res (HttpResponse): The response object.
+        etag (str): The current ETag of the resource (quoted).
+        last_modified (datetime, optional): Last modification date of the resource.
+    """
+    res['ETag'] = etag
+    res['Cache-Control'] = 'private, no-cache'
+    
+    if last_modified is not None:
+        res['Last-Modified'] = http_date(last_modified.timestamp())
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> HttpResponse:
+    """
+    Empty 304 response carrying the current validators.
+    """
+    res: HttpResponse = Response()
+    res.status_code = 304
+    set_cache_validators(res, etag, last_modified)
+    return res
+
+def delete_rows(model: Any, field_name: str, values: List[Any]) -> int:
+    """
+    Deletes the rows of `model` whose `field_name` is in `values` with a single
+    DELETE statement.
+
+    Unlike QuerySet.delete(), nothing is collected: the rows are not loaded, no
+    pre/post_delete signal is sent and on_delete of the reverse relations is not
+    applied. Callers handle those themselves (bulk history, references to the rows).
+
+    Returns:
+        int: number of deleted rows.
+    """
+    if not values:
+        return 0
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field_name).column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} = ANY(%s)', [list(values)])
+        return cursor.rowcount
+
+
 def rename_file_for_s3(instance: Any, filename: str):
     """
     Renomeia o arquivo para um formato padrão sendo ele: nome ( ou titulo ) do objeto + Data atual incluindo segundos.
@@ -64,125 +162,140 @@ def rename_file_for_s3(instance: Any, filename: str):
     return os.path.join('attached_documents/', new_filename)
 
 
-def optimize_image(
-    image_file: UploadedFile,
+def encode_optimized_image(
+    source: IO[bytes],
+    content_type: str,
     max_width: int = 1920,
     max_height: int = 1920,
     quality: int = 85,
     convert_to_jpeg: bool = True
-) -> Optional[InMemoryUploadedFile]:
+) -> Optional[Tuple[io.BytesIO, str, str]]:
     """
-    Optimizes an image by resizing and compressing it before upload to S3.
+    Decodes, downscales and re-encodes an image without resampling the full-size bitmap:
+    JPEGs are decoded already reduced (Image.draft, DCT scaling) and large images are
+    first shrunk by an integer factor (Image.reduce) before the final LANCZOS resize.
     
     Args:
-        image_file (UploadedFile): The uploaded image file.
+        source (IO[bytes]): Seekable binary stream with the image.
+        content_type (str): MIME type of the source image.
         max_width (int): Maximum width in pixels. Default: 1920.
         max_height (int): Maximum height in pixels. Default: 1920.
-        quality (int): JPEG quality (1-100). Default: 85.
+        quality (int): JPEG/WebP quality (1-100). Default: 85.
         convert_to_jpeg (bool): Convert PNG/other formats to JPEG. Default: True.
     
     Returns:
-        InMemoryUploadedFile: Optimized image file, or None if not an image.
+        Optional[Tuple[io.BytesIO, str, str]]: (buffer, content type, extension), or None if the source is not a readable image.
     """
-    # Check if file is an image
-    if not image_file.content_type or not image_file.content_type.startswith('image/'):
-        return None
-    
     try:
-        # Open the image
-        img = Image.open(image_file)
+        img = Image.open(source)
         
-        # Convert RGBA to RGB if necessary (for JPEG compatibility)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            # Create a white background
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        elif img.mode != 'RGB':
+        # Only JPEG supports draft; the decoder picks the smallest scale still >= the requested size.
+        img.draft('RGB', (max_width, max_height))
+        
+        # reduce() does not support palette/CMYK images
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        elif img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
             img = img.convert('RGB')
         
-        # Get original dimensions
-        original_width, original_height = img.size
+        width, height = img.size
+        ratio = min(max_width / width, max_height / height)
         
-        # Calculate new dimensions maintaining aspect ratio
-        if original_width <= max_width and original_height <= max_height:
-            # Image is already smaller than max dimensions
-            new_width, new_height = original_width, original_height
-        else:
-            # Calculate scaling factor
-            width_ratio = max_width / original_width
-            height_ratio = max_height / original_height
-            ratio = min(width_ratio, height_ratio)
+        if ratio < 1:
+            # Integer box reduction while the image is at least 2x the target (reducing gap 2.0)
+            factor = int(1 / (ratio * 2))
+            if factor >= 2:
+                img = img.reduce(factor)
             
-            new_width = int(original_width * ratio)
-            new_height = int(original_height * ratio)
+            img = img.resize((max(1, int(width * ratio)), max(1, int(height * ratio))), Image.Resampling.LANCZOS)
         
-        # Resize image if needed
-        if new_width != original_width or new_height != original_height:
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Convert RGBA to RGB if necessary (for JPEG compatibility), on the already reduced image
+        if img.mode in ('RGBA', 'LA'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
         
         # Determine output format
         output_format = 'JPEG'
-        if not convert_to_jpeg and image_file.content_type in ['image/png', 'image/gif', 'image/webp']:
-            # Keep original format for PNG/GIF/WebP if convert_to_jpeg is False
-            if image_file.content_type == 'image/png':
-                output_format = 'PNG'
-            elif image_file.content_type == 'image/gif':
-                output_format = 'GIF'
-            elif image_file.content_type == 'image/webp':
-                output_format = 'WEBP'
+        if not convert_to_jpeg and content_type in ['image/png', 'image/gif', 'image/webp']:
+            output_format = {'image/png': 'PNG', 'image/gif': 'GIF', 'image/webp': 'WEBP'}[content_type]
         
-        # Save to in-memory buffer
         output = io.BytesIO()
         
         if output_format == 'JPEG':
             img.save(output, format='JPEG', quality=quality, optimize=True)
-            content_type = 'image/jpeg'
-            extension = 'jpg'
+            result_type, extension = 'image/jpeg', 'jpg'
         elif output_format == 'PNG':
             img.save(output, format='PNG', optimize=True)
-            content_type = 'image/png'
-            extension = 'png'
+            result_type, extension = 'image/png', 'png'
         elif output_format == 'WEBP':
             img.save(output, format='WEBP', quality=quality, method=6)
-            content_type = 'image/webp'
-            extension = 'webp'
+            result_type, extension = 'image/webp', 'webp'
         else:
             img.save(output, format=output_format, optimize=True)
-            content_type = image_file.content_type
-            extension = image_file.name.split('.')[-1] if '.' in image_file.name else 'jpg'
+            result_type, extension = content_type, 'gif'
         
         output.seek(0)
+        return output, result_type, extension
         
-        # Create new InMemoryUploadedFile
-        original_name = image_file.name
-        if '.' in original_name:
-            name_without_ext = '.'.join(original_name.split('.')[:-1])
-        else:
-            name_without_ext = original_name
-        
-        new_filename = f"{name_without_ext}.{extension}"
-        
-        optimized_file = InMemoryUploadedFile(
-            output,
-            None,
-            new_filename,
-            content_type,
-            sys.getsizeof(output),
-            None
-        )
-        
-        return optimized_file
-        
-    except Exception as e:
+    except Exception:
+        return None
+
+
+def optimize_image(
+    image_file: UploadedFile,
+    max_width: int = 1920,
+    max_height: int = 1920,
+    quality: int = 85,
+    convert_to_jpeg: bool = True
+) -> Optional[InMemoryUploadedFile]:
+    """
+    Optimizes an image by resizing and compressing it before upload to S3.
+    Runs in the request: meant for small images (avatars, logos). Attachments are
+    optimized in background (apps.APIDocumento.attachments).
+    
+    Args:
+        image_file (UploadedFile): The uploaded image file.
+        max_width (int): Maximum width in pixels. Default: 1920.
+        max_height (int): Maximum height in pixels. Default: 1920.
+        quality (int): JPEG quality (1-100). Default: 85.
+        convert_to_jpeg (bool): Convert PNG/other formats to JPEG. Default: True.
+    
+    Returns:
+        InMemoryUploadedFile: Optimized image file, or None if not an image.
+    """
+    # Check if file is an image
+    if not image_file.content_type or not image_file.content_type.startswith('image/'):
         return None
+    
+    result = encode_optimized_image(image_file, image_file.content_type, max_width, max_height, quality, convert_to_jpeg)
+    if result is None:
+        return None
+    
+    output, content_type, extension = result
+    
+    original_name = image_file.name or ''
+    name_without_ext = original_name.rsplit('.', 1)[0] if '.' in original_name else original_name
+    
+    return InMemoryUploadedFile(
+        output,
+        None,
+        f"{name_without_ext}.{extension}",
+        content_type,
+        output.getbuffer().nbytes,
+        None
+    )
 
 
 def get_all_database_file_paths() -> Dict[str, Set[str]]:
     """
     Retrieves all file paths referenced in the database.
+
+    Every FileBlob row owns its files, whatever its reference count: blobs without
+    references are collected by apps.APIDocumento.blobs.collect_unreferenced_blobs,
+    which removes the row together with the files.
     
     Returns:
         Dict[str, Set[str]]: Dictionary with categories as keys and sets of file paths as values.
@@ -191,7 +304,7 @@ def get_all_database_file_paths() -> Dict[str, Set[str]]:
     from apps.APIEmpresa.models import Enterprise
     from apps.APISetor.models import Sector
     from apps.APIUser.models import AbsUser
-    from apps.APIDocumento.models import Attached_Files_Document
+    from apps.APIDocumento.models import Attached_Files_Document, Document, DocumentExport, FileBlob
     
     active_files: Set[str] = set()
     detached_files: Set[str] = set()
@@ -224,6 +337,18 @@ def get_all_database_file_paths() -> Dict[str, Set[str]]:
             else:
                 active_files.add(path)
     
+    # Uploaded documents and their thumbnails
+    for file_url, thumbnail_path in Document.objects.values_list('file_url', 'thumbnail_path').iterator():
+        active_files.update(path for path in (file_url, thumbnail_path) if path)
+
+    # Content-addressed blobs (shared by documents and attachments) and their renditions
+    for file, thumbnail in FileBlob.objects.values_list('file', 'thumbnail').iterator():
+        active_files.update(path for path in (file, thumbnail) if path)
+    
+    # Document exports (ZIP archives)
+    for file in DocumentExport.objects.exclude(file='').values_list('file', flat=True).iterator():
+        active_files.add(file)
+    
     # Attached files - active (not detached)
     for attached_file in Attached_Files_Document.objects.filter(detached_at__isnull=True).exclude(file__isnull=True).exclude(file=''):
         if attached_file.file:
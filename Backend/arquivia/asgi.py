@@ -22,8 +22,16 @@ if (os.getenv("DEBUG", 'False').lower() in ("true", "1", "t", "y", "yes", "on"))
 else:
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "arquivia.settings.prod")
 
+django_asgi_app = get_asgi_application()
+
+from django.conf import settings
+from apps.core.metrics import start_exporter
+
+# Processo único do daphne: serve as métricas na porta interna (service-metrics.yaml).
+start_exporter(settings.METRICS_PORT, 'ASGI')
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
         AuthMiddlewareStack(
             URLRouter(
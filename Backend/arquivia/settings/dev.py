@@ -28,7 +28,7 @@ DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NA
 DATABASES = {
     'default': dj_database_url.parse(
         DATABASE_URL,
-        conn_max_age=600, 
+        conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', 600)), 
         conn_health_checks=True
     )
 }
@@ -111,4 +111,7 @@ STORAGES = {
 }
 
 STATIC_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/static/"
-MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/media/"
\ No newline at end of file
+MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/media/"
+
+# Consultas de cada requisição no header Server-Timing (DevTools > Network > Timing)
+QUERY_STATS_SERVER_TIMING = True
@@ -24,7 +24,7 @@ DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NA
 DATABASES = {
     'default': dj_database_url.parse(
         DATABASE_URL,
-        conn_max_age=600, 
+        conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', 600)), 
         conn_health_checks=True
     )
 }
@@ -77,6 +77,10 @@ CSRF_COOKIE_SAMESITE = 'None'
 SESSION_COOKIE_SAMESITE = 'None'
 CORS_ALLOW_CREDENTIALS = True
 
+# /metrics passa pelo ingress público: sem METRICS_TOKEN responde 403. O Prometheus
+# raspa a porta interna METRICS_PORT (service-metrics.yaml).
+METRICS_TOKEN_REQUIRED = True
+
 SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'] = timedelta(days=1)
 SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'] = timedelta(days=3)
 
@@ -117,4 +121,21 @@ STORAGES = {
 }
 
 STATIC_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/static/"
-MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/media/"
\ No newline at end of file
+MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/media/"
+
+# Consultas de cada requisição como uma linha JSON (WARNING quando passa do query_budget da view)
+QUERY_STATS_LOG = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_line': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'query_stats': {'class': 'logging.StreamHandler', 'formatter': 'json_line'},
+    },
+    'loggers': {
+        'apps.core.query_stats': {'handlers': ['query_stats'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,6 +54,8 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    "apps.core.metrics.MetricsMiddleware",
+    "apps.core.query_stats.QueryStatsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -68,6 +71,18 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "arquivia.urls"
 
+# Instrumentação de consultas por requisição (apps/core/query_stats.py)
+QUERY_STATS_SERVER_TIMING = False
+QUERY_STATS_LOG = False
+QUERY_BUDGET_ENFORCE = False
+
+# Métricas Prometheus (apps/core/metrics.py): token de /metrics, se ele é obrigatório
+# e portas internas dos exporters do processo web e dos workers Celery
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_TOKEN_REQUIRED = False
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_WORKER_PORT = os.getenv("METRICS_WORKER_PORT")
+
 ALLOWED_HOSTS = []
 
 CORS_ALLOWED_ORIGINS = []
@@ -176,4 +191,22 @@ CELERY_TIMEZONE = "America/Sao_Paulo"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60 # 30 min
 
-CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
\ No newline at end of file
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
+CELERY_BEAT_SCHEDULE = {
+    # Corrige as divergências dos consolidados do Dashboard de Setor
+    'reconciliar-consolidados-setor': {
+        'task': 'apps.APIDashboard.tasks.reconcile_sector_rollups_task',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    # Documentos com a revisão vencida segundo a política do setor
+    'expirar-revisoes-documentos': {
+        'task': 'apps.core.tasks.expire_document_reviews_task',
+        'schedule': crontab(minute=15),
+    },
+    # Cria com antecedência as partições mensais de Document_Record
+    'criar-particoes-historico-documentos': {
+        'task': 'apps.core.tasks.create_document_record_partitions_task',
+        'schedule': crontab(day_of_month=1, hour=2, minute=0),
+    },
+}
\ No newline at end of file
@@ -18,6 +18,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from apps.core.metrics import MetricsView
+
 VERSAO = "v2"
 
 urlpatterns = [
@@ -28,4 +30,5 @@ urlpatterns = [
     path(f"api/{VERSAO}/documento/", include("apps.APIDocumento.urls")),
     path(f"api/{VERSAO}/documento-auditoria/", include("apps.APIAudit.urls")),
     path(f"api/{VERSAO}/painel/", include("apps.APIDashboard.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
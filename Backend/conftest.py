@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings) -> None:
+    """
+    Requisições acima do `query_budget` da view falham o teste (ver apps/core/query_stats.py).
+    """
+    settings.QUERY_BUDGET_ENFORCE = True
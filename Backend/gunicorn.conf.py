@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration (deployment.yaml).
+
+With METRICS_PORT set, the master serves the Prometheus metrics of every worker
+on that internal port (service-metrics.yaml, outside the public ingress). The
+workers write their samples to PROMETHEUS_MULTIPROC_DIR, which must be an empty
+directory shared by them; see apps/core/metrics.py.
+"""
+
+import os
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+
+def when_ready(server):
+    port = os.getenv('METRICS_PORT')
+    if not port:
+        return
+    # Only the aggregate of the workers: the master does not import the app.
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(int(port), registry=registry)
+    server.log.info('Metrics exporter listening on port %s', port)
+
+
+def child_exit(server, worker):
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(worker.pid)